@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+"""
+Benchmark ConstructionScheduler model-build time on synthetic projects, without a database.
+
+For each size (100 to 10,000 tasks by default) a seeded snapshot is generated
+by synthetic_projects.py, with as many projects of --tasks-per-project tasks as
+the size needs, and the CP-SAT model is built from it. The employee and
+resource pools come from the snapshot and every size uses the default Monday
+to Friday work week. --no-requirements drops the tasks' employee and resource
+requirements to time the dependency model alone.
+
+Usage:
+    python benchmarks/bench_model_build.py
+    python benchmarks/bench_model_build.py --sizes 100 1000 5000 --no-requirements
+    python benchmarks/bench_model_build.py --resource-mode aggregate
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from calendars import WorkCalendar
+from initial_scheduler import (
+    ConstructionScheduler,
+    PROJECT_START_DATE,
+    SCALE_FACTOR,
+    WORK_HOURS_PER_DAY,
+    RESOURCE_MODE_INDIVIDUAL,
+    RESOURCE_MODE_AGGREGATE
+)
+from synthetic_projects import generate_snapshot
+
+DEFAULT_SIZES = [100, 500, 1000, 2000, 5000, 10000]
+DEFAULT_TASKS_PER_PROJECT = 100
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help='Task counts to benchmark')
+    parser.add_argument('--tasks-per-project', type=int, default=DEFAULT_TASKS_PER_PROJECT,
+                        help='Tasks per generated project')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed for the generated projects')
+    parser.add_argument('--no-requirements', action='store_true',
+                        help='Drop the employee and resource requirements of the generated tasks')
+    parser.add_argument('--resource-mode', choices=[RESOURCE_MODE_INDIVIDUAL, RESOURCE_MODE_AGGREGATE],
+                        default=RESOURCE_MODE_INDIVIDUAL, help='Resource model mode')
+    args = parser.parse_args()
+
+    calendar = WorkCalendar(PROJECT_START_DATE, hours_per_day=WORK_HOURS_PER_DAY, units_per_hour=SCALE_FACTOR)
+    print(f"{'tasks':>8} {'deps':>8} {'build (s)':>10} {'variables':>10} {'constraints':>12}")
+    for size in args.sizes:
+        projects = max(1, round(size / args.tasks_per_project))
+        snapshot = generate_snapshot(projects, args.tasks_per_project, args.seed)
+        tasks = snapshot['tasks']
+        if args.no_requirements:
+            for task in tasks:
+                task['employees'] = {}
+                task['resources'] = {}
+        num_deps = sum(len(t['dependencies']) for t in tasks)
+
+        start = time.perf_counter()
+        scheduler = ConstructionScheduler(tasks, None, resource_mode=args.resource_mode, snapshot=snapshot,
+                                          calendar=calendar)
+        elapsed = time.perf_counter() - start
+
+        proto = scheduler.model.Proto()
+        print(f"{len(tasks):>8} {num_deps:>8} {elapsed:>10.3f} {len(proto.variables):>10} {len(proto.constraints):>12}")
+
+
+if __name__ == '__main__':
+    main()
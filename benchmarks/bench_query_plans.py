@@ -0,0 +1,268 @@
+#!/usr/bin/env python
+"""
+Compare query plans of the hot scheduler queries before and after the index migrations.
+
+Builds a synthetic dataset (50,000 tasks by default) in a scratch schema,
+runs EXPLAIN ANALYZE on the conflict-check, dependency and progress lookups,
+applies the migrations from src/db_migrations.py to the scratch schema and
+runs the same queries again. The public schema is not touched, and the
+scratch schema is dropped afterwards unless --keep is given. Connection
+settings come from DB_PARAMS in initial_scheduler.py.
+
+Usage:
+    python benchmarks/bench_query_plans.py
+    python benchmarks/bench_query_plans.py --tasks 10000 --summary-only
+    python benchmarks/bench_query_plans.py --host /tmp --dbname rso_bench --keep
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+import psycopg2
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from initial_scheduler import DB_PARAMS
+from db_migrations import apply_migrations
+
+SCHEMA = 'rso_bench_plans'
+
+SCHEMA_DDL = [
+    """CREATE TABLE projects (
+        project_id INTEGER PRIMARY KEY,
+        project_name VARCHAR(100) NOT NULL
+    )""",
+    """CREATE TABLE tasks (
+        task_id INTEGER PRIMARY KEY,
+        task_name VARCHAR(100) NOT NULL,
+        priority INTEGER,
+        project_id INTEGER REFERENCES projects(project_id)
+    )""",
+    """CREATE TABLE schedules (
+        schedule_id SERIAL PRIMARY KEY,
+        task_id INTEGER NOT NULL UNIQUE REFERENCES tasks(task_id),
+        planned_start TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+        planned_end TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+        status CHARACTER VARYING(50) DEFAULT 'Scheduled'
+    )""",
+    """CREATE TABLE dependencies (
+        dependency_id SERIAL PRIMARY KEY,
+        task_id INTEGER REFERENCES tasks(task_id),
+        depends_on_task_id INTEGER REFERENCES tasks(task_id),
+        lag_hours NUMERIC DEFAULT 0,
+        dependency_type VARCHAR(2) DEFAULT 'FS'
+    )""",
+    """CREATE TABLE employee_assignments (
+        assignment_id SERIAL PRIMARY KEY,
+        employee_id INTEGER NOT NULL,
+        task_id INTEGER NOT NULL REFERENCES tasks(task_id),
+        start_date TIMESTAMP WITHOUT TIME ZONE,
+        end_date TIMESTAMP WITHOUT TIME ZONE
+    )""",
+    """CREATE TABLE resource_assignments (
+        assignment_id SERIAL PRIMARY KEY,
+        resource_id INTEGER NOT NULL,
+        task_id INTEGER NOT NULL REFERENCES tasks(task_id),
+        start_date TIMESTAMP WITHOUT TIME ZONE,
+        end_date TIMESTAMP WITHOUT TIME ZONE
+    )""",
+    """CREATE TABLE task_progress (
+        progress_id SERIAL PRIMARY KEY,
+        task_id INTEGER NOT NULL REFERENCES tasks(task_id),
+        start_time TIMESTAMP NOT NULL,
+        end_time TIMESTAMP,
+        status VARCHAR(50) NOT NULL,
+        accumulated_minutes INTEGER DEFAULT 0
+    )""",
+]
+
+# Synthetic data, generated server-side. %(tasks)s etc. are filled in per run.
+DATA_SQL = [
+    "INSERT INTO projects SELECT p, 'Project ' || p FROM generate_series(1, %(projects)s) p",
+    """INSERT INTO tasks
+       SELECT t, 'Task ' || t, 1 + (t %% 3), 1 + (t %% %(projects)s)
+       FROM generate_series(1, %(tasks)s) t""",
+    # One year of work; most tasks still scheduled, a few in progress/blocked
+    """INSERT INTO schedules (task_id, planned_start, planned_end, status)
+       SELECT t,
+              TIMESTAMP '2026-01-05 07:00' + (t * 8760.0 / %(tasks)s) * INTERVAL '1 hour',
+              TIMESTAMP '2026-01-05 07:00' + (t * 8760.0 / %(tasks)s + 1 + (t %% 16)) * INTERVAL '1 hour',
+              CASE WHEN t %% 100 < 20 THEN 'Completed'
+                   WHEN t %% 100 < 22 THEN 'Skipped'
+                   WHEN t %% 100 < 25 THEN 'In Progress'
+                   WHEN t %% 100 < 27 THEN 'Blocked'
+                   ELSE 'Scheduled' END
+       FROM generate_series(1, %(tasks)s) t""",
+    """INSERT INTO dependencies (task_id, depends_on_task_id)
+       SELECT t, t - 1 - (random() * LEAST(t - 2, 20))::int
+       FROM generate_series(2, %(tasks)s) t, generate_series(1, 2) k
+       WHERE k = 1 OR random() < 0.5""",
+    """INSERT INTO employee_assignments (employee_id, task_id)
+       SELECT 1 + (random() * (%(employees)s - 1))::int, t
+       FROM generate_series(1, %(tasks)s) t, generate_series(1, 2) k""",
+    """INSERT INTO resource_assignments (resource_id, task_id)
+       SELECT 1 + (random() * (%(resources)s - 1))::int, t
+       FROM generate_series(1, %(tasks)s) t
+       WHERE random() < 0.5""",
+    """INSERT INTO task_progress (task_id, start_time, end_time, status, accumulated_minutes)
+       SELECT 1 + (random() * (%(tasks)s - 1))::int,
+              TIMESTAMP '2026-01-05 07:00' + n * INTERVAL '10 minutes',
+              TIMESTAMP '2026-01-05 07:00' + n * INTERVAL '10 minutes' + INTERVAL '2 hours',
+              'Clocked Out', 120
+       FROM generate_series(1, %(tasks)s * 3) n""",
+]
+
+# The hot query shapes, copied from api.py / rescheduler.py
+QUERIES = [
+    ('check_resource_conflicts (employee)', """
+        SELECT s.task_id, t.task_name, s.planned_start, s.planned_end
+        FROM schedules s
+        JOIN tasks t ON s.task_id = t.task_id
+        JOIN employee_assignments ea ON s.task_id = ea.task_id
+        WHERE ea.employee_id = %(employee_id)s AND s.task_id != %(task_id)s
+          AND s.status NOT IN ('Completed', 'Skipped')
+          AND s.planned_start < %(window_end)s AND s.planned_end > %(window_start)s
+    """),
+    ('check_resource_conflicts (resource)', """
+        SELECT s.task_id, t.task_name, s.planned_start, s.planned_end
+        FROM schedules s
+        JOIN tasks t ON s.task_id = t.task_id
+        JOIN resource_assignments ra ON s.task_id = ra.task_id
+        WHERE ra.resource_id = %(resource_id)s AND s.task_id != %(task_id)s
+          AND s.status NOT IN ('Completed', 'Skipped')
+          AND s.planned_start < %(window_end)s AND s.planned_end > %(window_start)s
+    """),
+    ('handle_resource_conflict (employee)', """
+        SELECT t.task_id, t.task_name, t.priority, t.project_id, p.project_name,
+               s.planned_start, s.planned_end, s.status
+        FROM tasks t
+        JOIN schedules s ON t.task_id = s.task_id
+        JOIN projects p ON t.project_id = p.project_id
+        JOIN employee_assignments ea ON t.task_id = ea.task_id
+        WHERE ea.employee_id = %(employee_id)s
+          AND s.planned_start <= %(window_start)s AND s.planned_end >= %(window_start)s
+          AND s.status IN ('Scheduled', 'In Progress')
+    """),
+    ('blocked dependents', """
+        SELECT d.task_id
+        FROM dependencies d
+        JOIN schedules s ON d.task_id = s.task_id
+        WHERE d.depends_on_task_id = %(task_id)s AND s.status = 'Blocked'
+    """),
+    ('handle_clock_in (latest progress)', """
+        SELECT * FROM task_progress
+        WHERE task_id = %(task_id)s
+        ORDER BY progress_id DESC
+        LIMIT 1
+    """),
+    ('schedules in progress', """
+        SELECT task_id, planned_start, planned_end
+        FROM schedules
+        WHERE status = 'In Progress'
+    """),
+]
+
+
+def explain(cur, sql, params):
+    """Run EXPLAIN ANALYZE and return (plan lines, execution time in ms)."""
+    cur.execute("EXPLAIN (ANALYZE, COSTS OFF, TIMING OFF, SUMMARY ON) " + sql, params)
+    lines = [row[0] for row in cur.fetchall()]
+    execution_ms = next((float(line.split(':')[1].split()[0]) for line in lines
+                         if line.startswith('Execution Time')), float('nan'))
+    return lines, execution_ms
+
+
+def run_queries(cur, params, repeat):
+    """Return {query name: (plan lines, best execution time in ms)}."""
+    results = {}
+    for name, sql in QUERIES:
+        best = None
+        for _ in range(repeat):
+            lines, execution_ms = explain(cur, sql, params)
+            if best is None or execution_ms < best[1]:
+                best = (lines, execution_ms)
+        results[name] = best
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tasks', type=int, default=50000, help='Number of synthetic tasks')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed for the generated data')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per query; the fastest is reported')
+    parser.add_argument('--with-overlap-exclusion', action='store_true',
+                        help='Also apply the optional assignment overlap exclusion')
+    parser.add_argument('--summary-only', action='store_true', help='Print timings without the plans')
+    parser.add_argument('--keep', action='store_true', help='Keep the scratch schema afterwards')
+    parser.add_argument('--host', default=DB_PARAMS['host'], help='Database host (or socket directory)')
+    parser.add_argument('--dbname', default=DB_PARAMS['dbname'], help='Database name')
+    args = parser.parse_args()
+
+    conn = psycopg2.connect(**dict(DB_PARAMS, host=args.host, dbname=args.dbname))
+    cur = conn.cursor()
+    try:
+        start = time.perf_counter()
+        cur.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        cur.execute(f"CREATE SCHEMA {SCHEMA}")
+        cur.execute(f"SET search_path TO {SCHEMA}")
+        cur.execute("SELECT setseed(%s)", (random.Random(args.seed).random() * 2 - 1,))
+        for statement in SCHEMA_DDL:
+            cur.execute(statement)
+        sizes = {'tasks': args.tasks, 'projects': max(1, args.tasks // 1000),
+                 'employees': max(2, args.tasks // 100), 'resources': max(2, args.tasks // 500)}
+        for statement in DATA_SQL:
+            cur.execute(statement, sizes)
+        conn.commit()
+        cur.execute("ANALYZE")
+        print(f"Generated {args.tasks} tasks in schema {SCHEMA} in {time.perf_counter() - start:.1f}s")
+
+        # Look-up values that hit real rows in the middle of the plan
+        mid_task = args.tasks // 2
+        cur.execute("SELECT planned_start, planned_end FROM schedules WHERE task_id = %s", (mid_task,))
+        window_start, window_end = cur.fetchone()
+        cur.execute("SELECT employee_id FROM employee_assignments WHERE task_id = %s LIMIT 1", (mid_task,))
+        employee_id = cur.fetchone()[0]
+        cur.execute("SELECT resource_id FROM resource_assignments ORDER BY assignment_id LIMIT 1")
+        resource_id = cur.fetchone()[0]
+        params = {'task_id': mid_task, 'employee_id': employee_id, 'resource_id': resource_id,
+                  'window_start': window_start, 'window_end': window_end}
+        conn.commit()
+
+        before = run_queries(cur, params, args.repeat)
+        conn.commit()
+
+        start = time.perf_counter()
+        versions = apply_migrations(conn, include_optional=args.with_overlap_exclusion)
+        cur.execute("ANALYZE")
+        conn.commit()
+        print(f"Applied migrations {versions} in {time.perf_counter() - start:.1f}s")
+
+        after = run_queries(cur, params, args.repeat)
+        conn.commit()
+
+        if not args.summary_only:
+            for name, _ in QUERIES:
+                print(f"\n=== {name} ===")
+                print("--- before ---")
+                print('\n'.join(before[name][0]))
+                print("--- after ---")
+                print('\n'.join(after[name][0]))
+
+        print(f"\n{'query':<40} {'before (ms)':>12} {'after (ms)':>12} {'speedup':>9}")
+        for name, _ in QUERIES:
+            before_ms, after_ms = before[name][1], after[name][1]
+            speedup = before_ms / after_ms if after_ms > 0 else float('inf')
+            print(f"{name:<40} {before_ms:>12.3f} {after_ms:>12.3f} {speedup:>8.1f}x")
+    finally:
+        conn.rollback()
+        if not args.keep:
+            cur.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+            conn.commit()
+        cur.close()
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
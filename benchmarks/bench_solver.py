@@ -0,0 +1,184 @@
+#!/usr/bin/env python
+"""
+End-to-end solver benchmark on synthetic projects, without a database.
+
+For each size tier (see SIZE_TIERS in synthetic_projects.py) a seeded snapshot
+is generated and run through the same steps as cp_sat_scheduler:
+
+  build    - ConstructionScheduler model build
+  solve    - CP-SAT solve with the solver profile's workers and stop criteria
+  extract  - reading the schedule and assignments from the solver
+  persist  - converting them into the schedules and assignment rows that are
+             written to the database (the database round trip itself is
+             measured by bench_query_plans.py)
+
+Every tier runs in a fresh process, so peak_rss_mb is the peak memory of that
+tier alone. Results are written as JSON (to stdout, or to --output) with one
+entry per tier: timings in seconds, status, stop reason, makespan, the
+critical-path lower bound and model statistics. A summary table goes to stderr.
+
+The time limit is fixed (--time-limit) rather than predicted from the solve
+history, so runs stay comparable. Benchmark solves are not recorded in the
+solve history. Every tier uses the default Monday to Friday work week, so no
+calendar is read from the database.
+
+Usage:
+    python benchmarks/bench_solver.py
+    python benchmarks/bench_solver.py --tiers small medium large xlarge --output results.json
+    python benchmarks/bench_solver.py --resource-mode aggregate --solver-profile nightly --time-limit 120
+"""
+import argparse
+import concurrent.futures
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import ortools
+from ortools.sat.python import cp_model
+
+from calendars import WorkCalendar
+from early_stopping import EarlyStoppingCallback, watch_search
+from initial_scheduler import (
+    ConstructionScheduler,
+    PROJECT_START_DATE,
+    SCALE_FACTOR,
+    WORK_HOURS_PER_DAY,
+    SOLVER_PROFILE,
+    RESOURCE_MODE_INDIVIDUAL,
+    RESOURCE_MODE_AGGREGATE,
+    assignment_rows,
+    schedule_rows
+)
+from solver_profiles import SOLVER_PROFILES, available_cores, search_workers, stop_criteria
+from synthetic_projects import SIZE_TIERS, generate_tier
+
+DEFAULT_TIERS = ['small', 'medium', 'large']
+DEFAULT_TIME_LIMIT = 30
+
+
+def _peak_rss_mb():
+    """Peak resident memory of this process in MB (ru_maxrss is KB on Linux, bytes on macOS)."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def run_tier(tier, seed, resource_mode, solver_profile, time_limit):
+    """
+    Generate, build, solve, extract and persist one tier.
+
+    Returns:
+        dict: Measurements of the tier
+    """
+    result = {'tier': tier, **SIZE_TIERS[tier], 'seed': seed}
+
+    start = time.perf_counter()
+    snapshot = generate_tier(tier, seed)
+    result['generate_seconds'] = round(time.perf_counter() - start, 4)
+    tasks = snapshot['tasks']
+    result['tasks'] = len(tasks)
+    result['dependencies'] = sum(len(t['dependencies']) for t in tasks)
+
+    calendar = WorkCalendar(PROJECT_START_DATE, hours_per_day=WORK_HOURS_PER_DAY, units_per_hour=SCALE_FACTOR)
+    start = time.perf_counter()
+    scheduler = ConstructionScheduler(tasks, None, resource_mode=resource_mode, snapshot=snapshot, calendar=calendar)
+    result['build_seconds'] = round(time.perf_counter() - start, 4)
+    result['model'] = scheduler.model_statistics()
+    result['lower_bound_hours'] = scheduler.cpm['length'] / SCALE_FACTOR if scheduler.cpm else None
+    if scheduler.infeasible_tasks:
+        result.update(status='INFEASIBLE', infeasible_tasks=len(scheduler.infeasible_tasks),
+                      peak_rss_mb=_peak_rss_mb())
+        return result
+
+    solver = cp_model.CpSolver()
+    solver.parameters.max_time_in_seconds = time_limit
+    solver.parameters.num_search_workers = search_workers(solver_profile)
+    solver.parameters.random_seed = 42
+    callback = EarlyStoppingCallback(stop_criteria(solver_profile, time_limit))
+    callback.configure(solver)
+    solve_done = watch_search(callback)
+    try:
+        status = solver.Solve(scheduler.model, callback)
+    finally:
+        solve_done.set()
+    result['stop_reason'] = callback.finish(solver, status)
+    result['status'] = callback.status_name(solver, status)
+    result['solve_seconds'] = round(solver.WallTime(), 4)
+    result['best_solution_seconds'] = round(callback.solution_time, 4) if callback.solution_time is not None else None
+    result['solution_count'] = callback.solution_count
+    result['num_workers'] = solver.parameters.num_search_workers
+
+    if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        result['makespan_hours'] = solver.ObjectiveValue() / SCALE_FACTOR
+        result['best_bound_hours'] = solver.BestObjectiveBound() / SCALE_FACTOR
+
+        start = time.perf_counter()
+        schedule, resource_assignments, employee_assignments = scheduler.extract_solution(solver)
+        result['extract_seconds'] = round(time.perf_counter() - start, 4)
+
+        start = time.perf_counter()
+        rows = (schedule_rows(schedule, calendar=calendar), assignment_rows(resource_assignments, 'resource_id'),
+                assignment_rows(employee_assignments, 'employee_id'))
+        result['persist_seconds'] = round(time.perf_counter() - start, 4)
+        result['rows'] = sum(len(part) for part in rows)
+
+    result['peak_rss_mb'] = _peak_rss_mb()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tiers', nargs='+', choices=sorted(SIZE_TIERS), default=DEFAULT_TIERS,
+                        help='Size tiers to run')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed for the generated projects')
+    parser.add_argument('--resource-mode', choices=[RESOURCE_MODE_INDIVIDUAL, RESOURCE_MODE_AGGREGATE],
+                        default=RESOURCE_MODE_INDIVIDUAL, help='Resource model mode')
+    parser.add_argument('--solver-profile', choices=sorted(SOLVER_PROFILES), default=SOLVER_PROFILE,
+                        help='Profile for search workers and stop criteria')
+    parser.add_argument('--time-limit', type=float, default=DEFAULT_TIME_LIMIT, help='Solver time limit in seconds')
+    parser.add_argument('--output', help='Write the JSON results to this file instead of stdout')
+    args = parser.parse_args()
+
+    report = {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'ortools': getattr(ortools, '__version__', None),
+        'cores': available_cores(),
+        'resource_mode': args.resource_mode,
+        'solver_profile': args.solver_profile,
+        'time_limit': args.time_limit,
+        'tiers': []
+    }
+
+    print(f"{'tier':>8} {'tasks':>6} {'build (s)':>10} {'solve (s)':>10} {'status':>10} {'makespan (h)':>13} "
+          f"{'extract (s)':>12} {'persist (s)':>12} {'peak MB':>8}", file=sys.stderr)
+    context = multiprocessing.get_context('spawn')
+    for tier in args.tiers:
+        # A fresh process per tier keeps peak memory and caches from leaking between tiers
+        with concurrent.futures.ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            result = executor.submit(run_tier, tier, args.seed, args.resource_mode, args.solver_profile,
+                                     args.time_limit).result()
+        report['tiers'].append(result)
+        makespan = result.get('makespan_hours')
+        print(f"{tier:>8} {result['tasks']:>6} {result['build_seconds']:>10.3f} {result.get('solve_seconds', 0):>10.3f} "
+              f"{result['status']:>10} {makespan if makespan is not None else '-':>13} "
+              f"{result.get('extract_seconds', 0):>12.4f} {result.get('persist_seconds', 0):>12.4f} "
+              f"{result['peak_rss_mb']:>8}", file=sys.stderr)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+            f.write('\n')
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write('\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,187 @@
+#!/usr/bin/env python
+"""
+Seeded generator of synthetic construction projects.
+
+Builds a problem snapshot in the format of DatabaseManager.load_problem_snapshot
+without a database. Each project has the four phases of PHASE_ORDER. Within a
+phase, tasks are grouped into WBS work packages (1.2.3 is the third task of the
+second phase of project 1). Tasks depend on earlier tasks of their work package
+and phase, using FS, SS, FF and SF dependencies with a mix of whole-day and
+partial-day lags. Each phase draws its employee skill groups and resource
+categories from the groups used in setup.sql. The employee and resource pools
+grow with the number of projects, so every tier stays feasible within the
+model horizon.
+
+The same seed and tier always give the same snapshot.
+
+Usage:
+    python benchmarks/synthetic_projects.py --tier medium > snapshot.json
+    python benchmarks/synthetic_projects.py --projects 3 --tasks-per-project 80 --seed 7
+"""
+import argparse
+import json
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from initial_scheduler import PHASE_ORDER, SCALE_FACTOR
+
+# projects: number of projects solved together
+# tasks_per_project: tasks per project, split over the phases
+SIZE_TIERS = {
+    'small': {'projects': 1, 'tasks_per_project': 40},
+    'medium': {'projects': 4, 'tasks_per_project': 60},
+    'large': {'projects': 10, 'tasks_per_project': 80},
+    'xlarge': {'projects': 25, 'tasks_per_project': 100},
+}
+
+# Share of a project's tasks per phase, and the durations (hours) drawn for them
+PHASE_PROFILES = {
+    'sales': {'share': 0.15, 'hours': [0.25, 0.5, 1, 2]},
+    'preConstruction': {'share': 0.25, 'hours': [0.5, 1, 2, 4]},
+    'activeConstruction': {'share': 0.45, 'hours': [1, 2, 4, 8]},
+    'postConstruction': {'share': 0.15, 'hours': [0.5, 1, 2]},
+}
+
+# (skill group, chance a task of the phase needs it, max members needed)
+PHASE_SKILLS = {
+    'sales': [('sales', 0.9, 1), ('admin', 0.2, 1)],
+    'preConstruction': [('purchaseOfficer', 0.4, 1), ('foreman', 0.5, 1), ('admin', 0.2, 1)],
+    'activeConstruction': [('labour', 0.8, 2), ('foreman', 0.4, 1)],
+    'postConstruction': [('foreman', 0.6, 1), ('admin', 0.3, 1)],
+}
+
+# (resource category, chance a task of the phase needs it)
+PHASE_RESOURCES = {
+    'preConstruction': [('Truck', 0.1)],
+    'activeConstruction': [('Truck', 0.2), ('Ladder', 0.15), ('Scaffolding', 0.1), ('Dumpster', 0.05)],
+    'postConstruction': [('Dumpster', 0.2), ('Truck', 0.1)],
+}
+
+# Members per skill group and resource category for each project in the snapshot
+EMPLOYEES_PER_PROJECT = {'sales': 1, 'admin': 0.5, 'purchaseOfficer': 0.5, 'foreman': 1, 'labour': 2}
+RESOURCES_PER_PROJECT = {'Truck': 0.5, 'Ladder': 0.5, 'Scaffolding': 0.3, 'Dumpster': 0.3}
+
+WORK_PACKAGE_SIZE = (3, 8)  # Tasks per work package
+DEPENDENCY_TYPES = ['FS', 'FS', 'FS', 'FS', 'SS', 'SS', 'FF', 'SF']
+LAG_HOURS = [0, 0, 0, 0, 0, 1.5, 4, 24, 48]
+
+
+def _pool(per_project, projects):
+    """Members of each group for the given number of projects (at least one)."""
+    return {group: max(1, int(round(count * projects))) for group, count in per_project.items()}
+
+
+def generate_snapshot(projects, tasks_per_project, seed=42):
+    """
+    Generate a problem snapshot.
+
+    Args:
+        projects: Number of projects
+        tasks_per_project: Tasks per project
+        seed: Random seed
+
+    Returns:
+        dict: Snapshot with 'tasks', 'resources' and 'employees' as returned by
+              DatabaseManager.load_problem_snapshot; tasks also carry their 'wbs'
+    """
+    rng = random.Random(seed)
+    phases = sorted(PHASE_ORDER, key=PHASE_ORDER.get)
+    tasks = []
+    task_id = 0
+
+    for project_id in range(1, projects + 1):
+        for phase_index, phase in enumerate(phases, start=1):
+            profile = PHASE_PROFILES[phase]
+            num_tasks = max(1, int(round(tasks_per_project * profile['share'])))
+            phase_tasks = []  # (task_id, work package)
+            package = 0
+            package_left = 0
+            for number in range(1, num_tasks + 1):
+                task_id += 1
+                if package_left == 0:
+                    package += 1
+                    package_left = rng.randint(*WORK_PACKAGE_SIZE)
+                package_left -= 1
+
+                # Chain within the work package, with occasional links to earlier packages
+                dependencies = []
+                same_package = [tid for tid, pkg in phase_tasks if pkg == package]
+                if same_package:
+                    dependencies.append(same_package[-1])
+                    if len(same_package) > 1 and rng.random() < 0.3:
+                        dependencies.append(rng.choice(same_package[:-1]))
+                earlier = [tid for tid, pkg in phase_tasks if pkg < package]
+                if earlier and rng.random() < 0.25:
+                    dependencies.append(rng.choice(earlier[-WORK_PACKAGE_SIZE[1]:]))
+
+                employees = {}
+                for group, chance, most in PHASE_SKILLS[phase]:
+                    if rng.random() < chance:
+                        employees[group] = rng.randint(1, most)
+                resources = {category: 1 for category, chance in PHASE_RESOURCES.get(phase, [])
+                             if rng.random() < chance}
+
+                tasks.append({
+                    'task_id': task_id,
+                    'name': f'{phase} task {number} (project {project_id})',
+                    'wbs': f'{project_id}.{phase_index}.{number}',
+                    'duration': int(round(rng.choice(profile['hours']) * SCALE_FACTOR)),
+                    'phase': phase,
+                    'priority': rng.choice([1, 2, 2, 3, 3]),
+                    'project_id': project_id,
+                    'dependencies': [(dep_tid, float(rng.choice(LAG_HOURS)), rng.choice(DEPENDENCY_TYPES))
+                                     for dep_tid in dict.fromkeys(dependencies)],
+                    'employees': employees,
+                    'resources': resources
+                })
+                phase_tasks.append((task_id, package))
+
+    employees = []
+    for group, count in _pool(EMPLOYEES_PER_PROJECT, projects).items():
+        for number in range(1, count + 1):
+            employees.append({'employee_id': len(employees) + 1, 'name': f'{group} {number}', 'skill_set': group})
+    resources = []
+    for category, count in _pool(RESOURCES_PER_PROJECT, projects).items():
+        for number in range(1, count + 1):
+            resources.append({'resource_id': len(resources) + 1, 'name': f'{category} {number}',
+                              'type': category, 'availability': True})
+
+    return {'tasks': tasks, 'resources': resources, 'employees': employees}
+
+
+def generate_tier(tier, seed=42):
+    """
+    Generate the snapshot of a size tier.
+
+    Args:
+        tier: Name in SIZE_TIERS
+        seed: Random seed
+
+    Raises:
+        ValueError: For an unknown tier
+    """
+    if tier not in SIZE_TIERS:
+        raise ValueError(f"Unknown size tier: {tier}")
+    return generate_snapshot(SIZE_TIERS[tier]['projects'], SIZE_TIERS[tier]['tasks_per_project'], seed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tier', choices=sorted(SIZE_TIERS), default='small', help='Size tier')
+    parser.add_argument('--projects', type=int, help='Number of projects (overrides the tier)')
+    parser.add_argument('--tasks-per-project', type=int, help='Tasks per project (overrides the tier)')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed')
+    args = parser.parse_args()
+
+    tier = SIZE_TIERS[args.tier]
+    snapshot = generate_snapshot(args.projects or tier['projects'],
+                                 args.tasks_per_project or tier['tasks_per_project'], args.seed)
+    json.dump(snapshot, sys.stdout, indent=1)
+    sys.stdout.write('\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,46 +1,74 @@
 #!/usr/bin/env python
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, g, Response, stream_with_context
 from flask_cors import CORS
 import sys
 import os
 import json
+import logging
 from datetime import datetime, timedelta
 import psycopg2
 from psycopg2.extras import RealDictCursor
 
 # Import our existing modules
-from initial_scheduler import DatabaseManager, cp_sat_scheduler, working_time_to_datetime, auto_assign_resources_to_tasks
+from initial_scheduler import (
+    DatabaseManager, SCALE_FACTOR, LagCalendar, compute_cpm_bounds, cp_sat_scheduler, get_work_calendar,
+    auto_assign_resources_to_tasks
+)
+from calendars import get_calendar_registry
 from rescheduler import handle_event, get_task_details
+from logging_config import configure_logging
+from db_pool import get_connection, release_connection
+from job_queue import get_job_manager, FINISHED_STATES
+from schema_registry import get_schema, refresh_schema
+from solver_profiles import SOLVER_PROFILES
+from early_stopping import STOP_CRITERIA
+
+logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes
 
-# Database connection helper
+API_DB_PARAMS = {
+    'dbname': 'rso01',
+    'user': 'postgres',
+    'password': 'root',
+    'host': 'localhost'
+}
+
+# Database connection helpers
 def get_db_connection():
-    conn = psycopg2.connect(
-        dbname='rso01',
-        user='postgres',
-        password='root',
-        host='localhost'
-    )
-    conn.autocommit = True
+    """
+    Check out an autocommit connection from the shared pool for this request.
+
+    Connections not handed back with release_db_connection are returned to the
+    pool when the request ends.
+    """
+    conn = get_connection(API_DB_PARAMS, autocommit=True)
+    if not hasattr(g, 'db_connections'):
+        g.db_connections = []
+    g.db_connections.append(conn)
     return conn
 
+def release_db_connection(conn):
+    """Return a connection obtained from get_db_connection to the pool."""
+    connections = getattr(g, 'db_connections', [])
+    if conn in connections:
+        connections.remove(conn)
+        release_connection(API_DB_PARAMS, conn)
+
+@app.teardown_appcontext
+def release_request_connections(exception=None):
+    """Return any connections the request did not release itself."""
+    for conn in getattr(g, 'db_connections', [])[:]:
+        release_db_connection(conn)
+
 def assign_initial_resources():
     """Helper function to assign initial resources to tasks"""
     conn = get_db_connection()
     cur = conn.cursor(cursor_factory=RealDictCursor)
     
     # Check if employee_assignments table exists
-    cur.execute("""
-        SELECT EXISTS (
-            SELECT FROM information_schema.tables 
-            WHERE table_name = 'employee_assignments'
-        ) as exists
-    """)
-    
-    result = cur.fetchone()
-    employee_table_exists = result['exists'] if result else False
+    employee_table_exists = get_schema(cur.connection).has_table('employee_assignments')
     
     if not employee_table_exists:
         # Create the employee_assignments table
@@ -57,17 +85,10 @@ def assign_initial_resources():
             )
         """)
         conn.commit()
+        refresh_schema(conn)
     
     # Check if resource_assignments table exists
-    cur.execute("""
-        SELECT EXISTS (
-            SELECT FROM information_schema.tables 
-            WHERE table_name = 'resource_assignments'
-        ) as exists
-    """)
-    
-    result = cur.fetchone()
-    resource_table_exists = result['exists'] if result else False
+    resource_table_exists = get_schema(cur.connection).has_table('resource_assignments')
     
     if not resource_table_exists:
         # Create the resource_assignments table
@@ -84,6 +105,7 @@ def assign_initial_resources():
             )
         """)
         conn.commit()
+        refresh_schema(conn)
     
     # Get tasks to assign resources to
     cur.execute("""
@@ -96,15 +118,7 @@ def assign_initial_resources():
     tasks = cur.fetchall()
     
     # Check if employees table exists
-    cur.execute("""
-        SELECT EXISTS (
-            SELECT FROM information_schema.tables 
-            WHERE table_name = 'employees'
-        ) as exists
-    """)
-    
-    result = cur.fetchone()
-    employees_table_exists = result['exists'] if result else False
+    employees_table_exists = get_schema(cur.connection).has_table('employees')
     
     if not employees_table_exists:
         # Create the employees table
@@ -128,17 +142,10 @@ def assign_initial_resources():
             ('Alice Brown', 'Designer', 'design', TRUE)
         """)
         conn.commit()
+        refresh_schema(conn)
     
     # Check if resources table exists
-    cur.execute("""
-        SELECT EXISTS (
-            SELECT FROM information_schema.tables 
-            WHERE table_name = 'resources'
-        ) as exists
-    """)
-    
-    result = cur.fetchone()
-    resources_table_exists = result['exists'] if result else False
+    resources_table_exists = get_schema(cur.connection).has_table('resources')
     
     if not resources_table_exists:
         # Create the resources table
@@ -162,40 +169,27 @@ def assign_initial_resources():
             ('Delivery Truck', 'vehicle', TRUE)
         """)
         conn.commit()
+        refresh_schema(conn)
     
     # Check if role_name column exists in employees table
-    cur.execute("""
-        SELECT EXISTS (
-            SELECT column_name 
-            FROM information_schema.columns 
-            WHERE table_name = 'employees' AND column_name = 'role_name'
-        ) as exists
-    """)
-    has_role_name = cur.fetchone()['exists']
+    has_role_name = get_schema(cur.connection).has_column('employees', 'role_name')
     
     # Get all employees with appropriate columns
     if has_role_name:
         cur.execute("SELECT employee_id, name, role_name FROM employees")
     else:
-        print("role_name column does not exist in employees table, using basic query")
+        logger.debug("role_name column does not exist in employees table, using basic query")
         cur.execute("SELECT employee_id, name FROM employees")
     employees = cur.fetchall()
     
     # Check if type column exists in resources table
-    cur.execute("""
-        SELECT EXISTS (
-            SELECT column_name 
-            FROM information_schema.columns 
-            WHERE table_name = 'resources' AND column_name = 'type'
-        ) as exists
-    """)
-    has_type = cur.fetchone()['exists']
+    has_type = get_schema(cur.connection).has_column('resources', 'type')
     
     # Get all resources with appropriate columns
     if has_type:
         cur.execute("SELECT resource_id, name, type FROM resources")
     else:
-        print("type column does not exist in resources table, using basic query")
+        logger.debug("type column does not exist in resources table, using basic query")
         cur.execute("SELECT resource_id, name FROM resources")
     resources = cur.fetchall()
     
@@ -235,19 +229,10 @@ def assign_initial_resources():
             employee_id = employee['employee_id']
             
             # Check if is_initial and is_modified columns exist
-            cur.execute("""
-                SELECT 
-                    COUNT(*) as count,
-                    SUM(CASE WHEN column_name = 'is_initial' THEN 1 ELSE 0 END) as has_is_initial,
-                    SUM(CASE WHEN column_name = 'is_modified' THEN 1 ELSE 0 END) as has_is_modified
-                FROM information_schema.columns 
-                WHERE table_name = 'employee_assignments'
-            """)
-            
-            result = cur.fetchone()
-            table_exists = result['count'] > 0
-            has_is_initial = result['has_is_initial'] > 0
-            has_is_modified = result['has_is_modified'] > 0
+            schema = get_schema(cur.connection)
+            table_exists = schema.has_table('employee_assignments')
+            has_is_initial = schema.has_column('employee_assignments', 'is_initial')
+            has_is_modified = schema.has_column('employee_assignments', 'is_modified')
             
             # Check if there's a unique constraint on (task_id, employee_id)
             cur.execute("""
@@ -296,7 +281,7 @@ def assign_initial_resources():
                                 VALUES (%s, %s)
                             """, (task_id, employee_id))
             except Exception as e:
-                print(f"Error inserting employee assignment: {e}")
+                logger.warning("Error inserting employee assignment: %s", e)
                 # Try a simpler approach as a last resort
                 try:
                     cur.execute("""
@@ -308,7 +293,7 @@ def assign_initial_resources():
                         )
                     """, (task_id, employee_id, task_id, employee_id))
                 except Exception as e2:
-                    print(f"Final attempt to insert employee assignment failed: {e2}")
+                    logger.exception("Final attempt to insert employee assignment failed: %s", e2)
             
             employee_name = employee['name'] if isinstance(employee, dict) else employee[1] if len(employee) > 1 else "Unknown"
             assigned_tasks.append({
@@ -347,19 +332,10 @@ def assign_initial_resources():
             resource_id = resource['resource_id']
             
             # Check if is_initial and is_modified columns exist
-            cur.execute("""
-                SELECT 
-                    COUNT(*) as count,
-                    SUM(CASE WHEN column_name = 'is_initial' THEN 1 ELSE 0 END) as has_is_initial,
-                    SUM(CASE WHEN column_name = 'is_modified' THEN 1 ELSE 0 END) as has_is_modified
-                FROM information_schema.columns 
-                WHERE table_name = 'resource_assignments'
-            """)
-            
-            result = cur.fetchone()
-            table_exists = result['count'] > 0
-            has_is_initial = result['has_is_initial'] > 0
-            has_is_modified = result['has_is_modified'] > 0
+            schema = get_schema(cur.connection)
+            table_exists = schema.has_table('resource_assignments')
+            has_is_initial = schema.has_column('resource_assignments', 'is_initial')
+            has_is_modified = schema.has_column('resource_assignments', 'is_modified')
             
             # Check if there's a unique constraint on (task_id, resource_id)
             cur.execute("""
@@ -408,7 +384,7 @@ def assign_initial_resources():
                                 VALUES (%s, %s)
                             """, (task_id, resource_id))
             except Exception as e:
-                print(f"Error inserting resource assignment: {e}")
+                logger.warning("Error inserting resource assignment: %s", e)
                 # Try a simpler approach as a last resort
                 try:
                     cur.execute("""
@@ -420,7 +396,7 @@ def assign_initial_resources():
                         )
                     """, (task_id, resource_id, task_id, resource_id))
                 except Exception as e2:
-                    print(f"Final attempt to insert resource assignment failed: {e2}")
+                    logger.exception("Final attempt to insert resource assignment failed: %s", e2)
             
             resource_name = resource['name'] if isinstance(resource, dict) else resource[1] if len(resource) > 1 else "Unknown"
             assigned_tasks.append({
@@ -432,9 +408,9 @@ def assign_initial_resources():
     
     conn.commit()
     cur.close()
-    conn.close()
+    release_db_connection(conn)
     
-    print(f"Assigned resources to {len(assigned_tasks)} tasks")
+    logger.info("Assigned resources to %s tasks", len(assigned_tasks))
     return assigned_tasks
 
 @app.route('/api/assignments/auto-assign', methods=['POST'])
@@ -475,7 +451,7 @@ def auto_assign_resources_endpoint():
             resource_assignments = cur.fetchall()
             
             cur.close()
-            conn.close()
+            release_db_connection(conn)
             
             # Combine assignments
             all_assignments = []
@@ -506,15 +482,8 @@ def get_assignments():
         cur = conn.cursor(cursor_factory=RealDictCursor)
         
         # Check if employee_assignments table has is_initial and is_modified columns
-        cur.execute("""
-            SELECT column_name 
-            FROM information_schema.columns 
-            WHERE table_name = 'employee_assignments' 
-            AND column_name IN ('is_initial', 'is_modified')
-        """)
-        
-        columns = [col['column_name'] for col in cur.fetchall()]
-        has_initial_modified_employees = 'is_initial' in columns and 'is_modified' in columns
+        has_initial_modified_employees = get_schema(cur.connection).has_columns(
+            'employee_assignments', 'is_initial', 'is_modified')
         
         # Get employee assignments with appropriate columns
         if has_initial_modified_employees:
@@ -548,15 +517,8 @@ def get_assignments():
         employee_assignments = cur.fetchall()
         
         # Check if resource_assignments table has is_initial and is_modified columns
-        cur.execute("""
-            SELECT column_name 
-            FROM information_schema.columns 
-            WHERE table_name = 'resource_assignments' 
-            AND column_name IN ('is_initial', 'is_modified')
-        """)
-        
-        columns = [col['column_name'] for col in cur.fetchall()]
-        has_initial_modified_resources = 'is_initial' in columns and 'is_modified' in columns
+        has_initial_modified_resources = get_schema(cur.connection).has_columns(
+            'resource_assignments', 'is_initial', 'is_modified')
         
         # Get resource assignments with appropriate columns
         if has_initial_modified_resources:
@@ -634,9 +596,9 @@ def get_assignments():
                     # Check if tasks overlap
                     if (task1_start < task2_end and task1_end > task2_start):
                         # Tasks overlap, create a conflict record
-                        print(f"Found employee conflict: Employee {employee_id} ({task1['employee_name']}) has overlapping tasks: {task1['task_id']} and {task2['task_id']}")
-                        print(f"  Task 1: {task1['task_name']} - {task1_start} to {task1_end}")
-                        print(f"  Task 2: {task2['task_name']} - {task2_start} to {task2_end}")
+                        logger.debug("Found employee conflict: Employee %s (%s) has overlapping tasks: %s and %s", employee_id, task1['employee_name'], task1['task_id'], task2['task_id'])
+                        logger.debug("  Task 1: %s - %s to %s", task1['task_name'], task1_start, task1_end)
+                        logger.debug("  Task 2: %s - %s to %s", task2['task_name'], task2_start, task2_end)
                         conflict = {
                             'employee_id': employee_id,
                             'employee_name': task1['employee_name'],
@@ -704,9 +666,9 @@ def get_assignments():
                     # Check if tasks overlap
                     if (task1_start < task2_end and task1_end > task2_start):
                         # Tasks overlap, create a conflict record
-                        print(f"Found resource conflict: Resource {resource_id} ({task1['resource_name']}) has overlapping tasks: {task1['task_id']} and {task2['task_id']}")
-                        print(f"  Task 1: {task1['task_name']} - {task1_start} to {task1_end}")
-                        print(f"  Task 2: {task2['task_name']} - {task2_start} to {task2_end}")
+                        logger.debug("Found resource conflict: Resource %s (%s) has overlapping tasks: %s and %s", resource_id, task1['resource_name'], task1['task_id'], task2['task_id'])
+                        logger.debug("  Task 1: %s - %s to %s", task1['task_name'], task1_start, task1_end)
+                        logger.debug("  Task 2: %s - %s to %s", task2['task_name'], task2_start, task2_end)
                         conflict = {
                             'resource_id': resource_id,
                             'resource_name': task1['resource_name'],
@@ -773,7 +735,7 @@ def get_assignments():
                 assignment['actual_end_iso'] = None
         
         # Print summary of conflicts
-        print(f"Found {len(employee_conflicts)} employee conflicts and {len(resource_conflicts)} resource conflicts")
+        logger.info("Found %s employee conflicts and %s resource conflicts", len(employee_conflicts), len(resource_conflicts))
         
         # Return all assignments and conflicts
         return jsonify({
@@ -786,6 +748,33 @@ def get_assignments():
     except Exception as e:
         return jsonify({"error": str(e), "traceback": str(sys.exc_info())}), 500
 
+def parse_stop_criteria(data):
+    """
+    Read the optional "stop_criteria" object of a scheduling request.
+    "target_makespan_hours" is converted to working-time units.
+    
+    Returns:
+        dict or None: Criteria for cp_sat_scheduler
+    
+    Raises:
+        ValueError: For unknown criteria or non-numeric values
+    """
+    criteria = data.get('stop_criteria')
+    if criteria is None:
+        return None
+    if not isinstance(criteria, dict):
+        raise ValueError("stop_criteria must be an object")
+    criteria = dict(criteria)
+    if 'target_makespan_hours' in criteria:
+        hours = criteria.pop('target_makespan_hours')
+        criteria['target_makespan'] = None if hours is None else hours * SCALE_FACTOR
+    for key, value in criteria.items():
+        if key not in STOP_CRITERIA:
+            raise ValueError(f"Unknown stop criterion: {key}")
+        if value is not None and (isinstance(value, bool) or not isinstance(value, (int, float)) or value < 0):
+            raise ValueError(f"Stop criterion {key} must be a non-negative number or null")
+    return criteria
+
 @app.route('/api/schedule', methods=['POST'])
 def run_schedule():
     """
@@ -794,7 +783,19 @@ def run_schedule():
     Optional JSON body:
     {
         "start_date": "2025-04-20",
-        "end_date": "2025-05-01"
+        "end_date": "2025-05-01",
+        "resource_mode": "aggregate",  // or "individual" (default)
+        "symmetry_breaking": "load",   // or "lex"; off by default
+        "decomposition": "project",    // or "component"; solve subproblems in parallel
+        "rolling_horizon": true,       // solve window by window (long projects)
+        "window_days": 20,             // rolling horizon window, in working days
+        "overlap_days": 5,             // days of each window re-solved by the next
+        "solver_profile": "nightly",   // or "interactive" (default) / "exhaustive"
+        "stop_criteria": {             // replace the profile's early stopping; null turns one off
+            "relative_gap": 0.01, "stagnation_seconds": 10, "stagnation_solutions": 50,
+            "target_makespan_hours": 140, "solution_timeout": 30
+        },
+        "async": true                  // queue the solve and return a job id (202)
     }
     """
     try:
@@ -802,18 +803,45 @@ def run_schedule():
         # Use get_json with silent=True to avoid errors if no JSON is provided
         data = request.get_json(silent=True) or {}
         
+        if data.get('solver_profile') is not None and data['solver_profile'] not in SOLVER_PROFILES:
+            return jsonify({"error": f"Unknown solver profile: {data['solver_profile']}"}), 400
+        try:
+            stop_criteria = parse_stop_criteria(data)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        
+        if data.get('async'):
+            job = get_job_manager().submit('schedule', cp_sat_scheduler,
+                                           resource_mode=data.get('resource_mode'),
+                                           symmetry_breaking=data.get('symmetry_breaking'),
+                                           decomposition=data.get('decomposition'),
+                                           rolling_horizon=data.get('rolling_horizon'),
+                                           window_days=data.get('window_days'),
+                                           overlap_days=data.get('overlap_days'),
+                                           solver_profile=data.get('solver_profile'),
+                                           stop_criteria=stop_criteria)
+            return job_accepted_response(job)
+        
         # Run the full initial scheduler
         try:
-            print("Running CP-SAT scheduler...")
+            logger.info("Running CP-SAT scheduler...")
             # The cp_sat_scheduler function already calls auto_assign_resources_to_tasks internally
             # so we only need to call it once
-            cp_sat_scheduler()
-            
-            print("Initial scheduling completed successfully")
+            result = cp_sat_scheduler(resource_mode=data.get('resource_mode'),
+                                      symmetry_breaking=data.get('symmetry_breaking'),
+                                      decomposition=data.get('decomposition'),
+                                      rolling_horizon=data.get('rolling_horizon'),
+                                      window_days=data.get('window_days'),
+                                      overlap_days=data.get('overlap_days'),
+                                      solver_profile=data.get('solver_profile'),
+                                      stop_criteria=stop_criteria)
+            failed = solve_failed_response(result)
+            if failed is not None:
+                return failed
+            
+            logger.info("Initial scheduling completed successfully")
         except Exception as scheduler_error:
-            print(f"Scheduler error: {scheduler_error}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Scheduler error: %s", scheduler_error)
             
             # Generate a sample schedule if the scheduler fails
             conn = get_db_connection()
@@ -825,7 +853,7 @@ def run_schedule():
             
             if task_count == 0:
                 # Create sample tasks if none exist
-                print("No tasks found. Creating sample tasks...")
+                logger.info("No tasks found. Creating sample tasks...")
                 cur.execute("""
                     INSERT INTO tasks (task_name, description, estimated_hours, priority, phase, preemptable)
                     VALUES 
@@ -844,7 +872,7 @@ def run_schedule():
                 conn.commit()
             
             # Generate a simple schedule
-            print("Generating a sample schedule...")
+            logger.info("Generating a sample schedule...")
             
             # Clear existing schedules
             cur.execute("DELETE FROM schedules")
@@ -885,12 +913,11 @@ def run_schedule():
             
             # Try to auto-assign resources even for the fallback schedule
             try:
-                print("Auto-assigning resources to fallback schedule...")
+                logger.info("Auto-assigning resources to fallback schedule...")
                 # Make sure we're not clearing existing assignments since we just created them
                 auto_assign_resources_to_tasks(clear_existing=False)
             except Exception as assign_error:
-                print(f"Error auto-assigning resources to fallback schedule: {assign_error}")
-                traceback.print_exc()
+                logger.exception("Error auto-assigning resources to fallback schedule: %s", assign_error)
         
         # Fetch the generated schedule from the database
         conn = get_db_connection()
@@ -922,13 +949,144 @@ def run_schedule():
             schedule['dependencies'] = [dict(dep) for dep in dependencies]
         
         cur.close()
-        conn.close()
+        release_db_connection(conn)
         
         return jsonify(schedules)
     
     except Exception as e:
         return jsonify({"error": str(e), "traceback": str(sys.exc_info())}), 500
 
+def job_accepted_response(job):
+    """Build the 202 response returned when a solve is queued as a background job."""
+    return jsonify({
+        "job_id": job['job_id'],
+        "status": job['status'],
+        "status_url": f"/api/jobs/{job['job_id']}",
+        "stream_url": f"/api/jobs/{job['job_id']}/stream",
+        "cancel_url": f"/api/jobs/{job['job_id']}/cancel"
+    }), 202
+
+def solve_failed_response(result):
+    """
+    Build the error response for a synchronous solve that produced no schedule.
+    
+    Args:
+        result: Run summary returned by cp_sat_scheduler
+    
+    Returns:
+        tuple: (response, status code), or None when the solve found a schedule.
+               Errors are reported as 500; infeasible or timed-out solves as 422
+               with the solver status and any 'infeasible_tasks'
+    """
+    if result['status'] in ('OPTIMAL', 'FEASIBLE'):
+        return None
+    if result['status'] == 'ERROR':
+        logger.error("Scheduling failed: %s", result.get('error'))
+        return jsonify({"error": result.get('error') or "Scheduling failed", "result": result}), 500
+    logger.warning("No schedule found: solver status %s", result['status'])
+    body = {"error": f"No feasible schedule found (solver status {result['status']})", "result": result}
+    if result.get('infeasible_tasks'):
+        body['infeasible_tasks'] = result['infeasible_tasks']
+    return jsonify(body), 422
+
+@app.route('/api/jobs', methods=['GET'])
+def list_jobs():
+    """
+    List background scheduling jobs, newest first
+    """
+    return jsonify(get_job_manager().list())
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """
+    Get the status, best makespan so far and result of a background job
+    """
+    job = get_job_manager().get(job_id)
+    if job is None:
+        return jsonify({"error": f"Job {job_id} not found"}), 404
+    return jsonify(job)
+
+@app.route('/api/jobs/<job_id>/stream', methods=['GET'])
+def stream_job(job_id):
+    """
+    Stream job updates as server-sent events until the job finishes.
+    Each event carries the job as JSON; a comment line is sent every 15 seconds
+    without changes to keep the connection open.
+    """
+    manager = get_job_manager()
+    job = manager.get(job_id)
+    if job is None:
+        return jsonify({"error": f"Job {job_id} not found"}), 404
+    
+    def generate(job):
+        while True:
+            yield f"data: {json.dumps(job)}\n\n"
+            if job['status'] in FINISHED_STATES:
+                return
+            version = job['version']
+            job = manager.wait_for_change(job_id, version, timeout=15)
+            if job is None:
+                return
+            while job['version'] == version:
+                yield ": keep-alive\n\n"
+                job = manager.wait_for_change(job_id, version, timeout=15)
+                if job is None:
+                    return
+    
+    return Response(stream_with_context(generate(job)), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache'})
+
+@app.route('/api/jobs/<job_id>/cancel', methods=['POST'])
+def cancel_job(job_id):
+    """
+    Cancel a queued or running job. A cancelled solve does not change the stored schedule.
+    """
+    job = get_job_manager().cancel(job_id)
+    if job is None:
+        return jsonify({"error": f"Job {job_id} not found"}), 404
+    return jsonify(job)
+
+@app.route('/api/schema/refresh', methods=['POST'])
+def refresh_schema_cache():
+    """
+    Re-read which tables and columns exist, e.g. after a manual migration.
+    """
+    conn = None
+    try:
+        conn = get_db_connection()
+        refresh_schema(conn)
+        schema = get_schema(conn)
+        tables = ['employees', 'resources', 'roles', 'employee_assignments', 'resource_assignments',
+                  'schedule_change_log', 'task_pause_log', 'task_progress']
+        return jsonify({
+            "message": "Schema information refreshed",
+            "tables": {table: schema.has_table(table) for table in tables}
+        })
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+    finally:
+        if conn:
+            release_db_connection(conn)
+
+@app.route('/api/calendars/refresh', methods=['POST'])
+def refresh_calendars():
+    """
+    Drop compiled work calendars after working_hours or holidays changed.
+    
+    Request body (optional):
+    - project_id: Only drop this project's calendars (default: all of them)
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        project_id = data.get('project_id')
+        get_calendar_registry().invalidate(int(project_id) if project_id is not None else None)
+        return jsonify({
+            "message": "Work calendars will be recompiled on next use",
+            "project_id": project_id
+        })
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
 @app.route('/api/reschedule/event', methods=['POST'])
 def reschedule_event():
     """
@@ -970,7 +1128,7 @@ def reschedule_event():
             details=details
         )
         
-        print(f"Event result: {result}")
+        logger.debug("Event result: %s", result)
         
         # Fetch updated schedules
         conn = get_db_connection()
@@ -1012,7 +1170,7 @@ def reschedule_event():
         pause_log = cur.fetchall()
         
         cur.close()
-        conn.close()
+        release_db_connection(conn)
         
         # Include any rescheduled tasks in the response
         response_data = {
@@ -1067,13 +1225,61 @@ def get_schedules():
                 schedule['delay_or_ahead'] = "0h"
         
         cur.close()
-        conn.close()
+        release_db_connection(conn)
         
         return jsonify(schedules)
     
     except Exception as e:
         return jsonify({"error": str(e), "traceback": str(sys.exc_info())}), 500
 
+@app.route('/api/critical-path', methods=['GET'])
+def get_critical_path():
+    """
+    Get the critical path from task durations, dependency lags and phase order.
+    Resource and employee limits are not considered.
+    
+    Query parameters:
+    - project_id: Optional project to analyse (default: all projects)
+    """
+    db = None
+    try:
+        project_id = request.args.get('project_id', type=int)
+        db = DatabaseManager()
+        calendar = get_work_calendar(project_id, db)
+        snapshot = db.load_problem_snapshot(project_id=project_id, calendar=calendar)
+        tasks = [t for t in snapshot['tasks'] if t['phase'] is not None]
+        cpm = compute_cpm_bounds(tasks, lags=LagCalendar(calendar))
+        critical = set(cpm['critical'])
+        
+        task_list = []
+        for task in tasks:
+            bounds = cpm['bounds'][task['task_id']]
+            task_list.append({
+                "task_id": task['task_id'],
+                "task_name": task['name'],
+                "phase": task['phase'],
+                "duration_hours": task['duration'] / SCALE_FACTOR,
+                "earliest_start": calendar.to_datetime(bounds['earliest_start']).isoformat(),
+                "earliest_finish": calendar.to_datetime(bounds['earliest_finish']).isoformat(),
+                "latest_start": calendar.to_datetime(bounds['latest_start']).isoformat(),
+                "latest_finish": calendar.to_datetime(bounds['latest_finish']).isoformat(),
+                "total_float_hours": bounds['total_float'] / SCALE_FACTOR,
+                "critical": task['task_id'] in critical
+            })
+        task_by_id = {t['task_id']: t for t in task_list}
+        
+        return jsonify({
+            "length_hours": cpm['length'] / SCALE_FACTOR,
+            "critical_path": [task_by_id[tid] for tid in cpm['critical']],
+            "infeasible_tasks": cpm['infeasible'],
+            "tasks": task_list
+        })
+    except Exception as e:
+        return jsonify({"error": str(e), "traceback": str(sys.exc_info())}), 500
+    finally:
+        if db is not None:
+            db.close()
+
 @app.route('/api/schedules/log', methods=['GET'])
 def get_schedule_logs():
     """
@@ -1084,15 +1290,7 @@ def get_schedule_logs():
         cur = conn.cursor(cursor_factory=RealDictCursor)
         
         # Check if schedule_change_log table exists
-        cur.execute("""
-            SELECT EXISTS (
-                SELECT FROM information_schema.tables 
-                WHERE table_name = 'schedule_change_log'
-            ) as exists
-        """)
-        
-        result = cur.fetchone()
-        change_log_exists = result['exists'] if result else False
+        change_log_exists = get_schema(cur.connection).has_table('schedule_change_log')
         
         if change_log_exists:
             # Fetch recent change log entries
@@ -1121,15 +1319,7 @@ def get_schedule_logs():
                 log['change_time_iso'] = log['change_time'].isoformat() if log['change_time'] else None
         
         # Check if task_pause_log table exists
-        cur.execute("""
-            SELECT EXISTS (
-                SELECT FROM information_schema.tables 
-                WHERE table_name = 'task_pause_log'
-            ) as exists
-        """)
-        
-        result = cur.fetchone()
-        pause_log_exists = result['exists'] if result else False
+        pause_log_exists = get_schema(cur.connection).has_table('task_pause_log')
         
         if pause_log_exists:
             # Fetch recent pause log entries
@@ -1154,15 +1344,7 @@ def get_schedule_logs():
                 log['end_time_iso'] = log['end_time'].isoformat() if log['end_time'] else None
         
         # Check if task_progress table exists
-        cur.execute("""
-            SELECT EXISTS (
-                SELECT FROM information_schema.tables 
-                WHERE table_name = 'task_progress'
-            ) as exists
-        """)
-        
-        result = cur.fetchone()
-        task_progress_exists = result['exists'] if result else False
+        task_progress_exists = get_schema(cur.connection).has_table('task_progress')
         
         if task_progress_exists:
             # Fetch task progress logs
@@ -1233,7 +1415,7 @@ def get_schedule_logs():
         combined_logs.sort(key=lambda x: x['time'], reverse=True)
         
         cur.close()
-        conn.close()
+        release_db_connection(conn)
         
         response_data = {
             'combined_logs': combined_logs[:20]  # Return top 20 most recent logs
@@ -1259,8 +1441,7 @@ def get_schedule_logs():
     except Exception as e:
         import traceback
         error_traceback = traceback.format_exc()
-        print(f"Error in get_schedule_logs: {str(e)}")
-        print(f"Traceback: {error_traceback}")
+        logger.exception("Error in get_schedule_logs: %s", e)
         return jsonify({"error": str(e), "traceback": error_traceback}), 500
 
 @app.route('/api/resources', methods=['GET'])
@@ -1273,25 +1454,13 @@ def get_resources():
         cur = conn.cursor(cursor_factory=RealDictCursor)
         
         # Check if the resources table exists
-        cur.execute("""
-            SELECT EXISTS (
-                SELECT FROM information_schema.tables 
-                WHERE table_name = 'resources'
-            ) as exists
-        """)
-        
-        if not cur.fetchone()['exists']:
+        schema = get_schema(cur.connection)
+        if not schema.has_table('resources'):
             # If resources table doesn't exist, return empty list
             return jsonify([])
         
         # Check which columns exist in the resources table
-        cur.execute("""
-            SELECT column_name 
-            FROM information_schema.columns 
-            WHERE table_name = 'resources'
-        """)
-        
-        columns = [row['column_name'] for row in cur.fetchall()]
+        columns = schema.columns('resources')
         
         # Build a dynamic query based on existing columns
         select_columns = ['resource_id', 'name']
@@ -1324,12 +1493,12 @@ def get_resources():
             resource['last_maintenance_iso'] = resource['last_maintenance'].isoformat() if resource['last_maintenance'] else None
         
         cur.close()
-        conn.close()
+        release_db_connection(conn)
         
         return jsonify(resources)
     
     except Exception as e:
-        print(f"Error in get_resources: {e}")
+        logger.exception("Error in get_resources: %s", e)
         return jsonify({"error": str(e), "traceback": str(sys.exc_info())}), 500
 
 @app.route('/api/employees', methods=['GET'])
@@ -1342,20 +1511,9 @@ def get_employees():
         cur = conn.cursor(cursor_factory=RealDictCursor)
         
         # First check if roles table exists and if employees has role_id column
-        cur.execute("""
-            SELECT EXISTS (
-                SELECT FROM information_schema.tables 
-                WHERE table_name = 'roles'
-            ) as roles_exist,
-            EXISTS (
-                SELECT FROM information_schema.columns 
-                WHERE table_name = 'employees' AND column_name = 'role_id'
-            ) as role_id_exists
-        """)
-        
-        result = cur.fetchone()
-        roles_exist = result['roles_exist']
-        role_id_exists = result['role_id_exists']
+        schema = get_schema(cur.connection)
+        roles_exist = schema.has_table('roles')
+        role_id_exists = schema.has_column('employees', 'role_id')
         
         # If both roles table and role_id column exist, use the join query
         if roles_exist and role_id_exists:
@@ -1369,7 +1527,7 @@ def get_employees():
                 """)
                 employees = cur.fetchall()
             except Exception as join_error:
-                print(f"Error joining with roles table: {join_error}")
+                logger.warning("Error joining with roles table: %s", join_error)
                 # Fallback to basic query without join
                 cur.execute("""
                     SELECT employee_id, name, contact, skill_set, 
@@ -1382,14 +1540,7 @@ def get_employees():
         else:
             # Use a query that works with the existing schema
             # Check if role_name column exists directly in employees table
-            cur.execute("""
-                SELECT EXISTS (
-                    SELECT FROM information_schema.columns 
-                    WHERE table_name = 'employees' AND column_name = 'role_name'
-                ) as role_name_exists
-            """)
-            
-            role_name_exists = cur.fetchone()['role_name_exists']
+            role_name_exists = schema.has_column('employees', 'role_name')
             
             if role_name_exists:
                 # If role_name exists directly in employees table, use it
@@ -1411,12 +1562,12 @@ def get_employees():
             employees = cur.fetchall()
         
         cur.close()
-        conn.close()
+        release_db_connection(conn)
         
         return jsonify(employees)
     
     except Exception as e:
-        print(f"Error in get_employees: {e}")
+        logger.exception("Error in get_employees: %s", e)
         return jsonify({"error": str(e), "traceback": str(sys.exc_info())}), 500
 
 @app.route('/api/tasks', methods=['GET'])
@@ -1483,7 +1634,7 @@ def get_tasks():
                 task['status'] = schedule['status']
         
         cur.close()
-        conn.close()
+        release_db_connection(conn)
         
         return jsonify(tasks)
     
@@ -1592,7 +1743,7 @@ def update_task(task_id):
                             VALUES (%s, %s, %s, %s, %s)
                         """, (next_id, task_id, depends_on_task_id, lag_hours, dependency_type))
                     except Exception as e:
-                        print(f"Error inserting dependency: {e}")
+                        logger.warning("Error inserting dependency: %s", e)
                         # Try a more basic approach as a last resort
                         try:
                             # Get the next available dependency_id again (in case of concurrent updates)
@@ -1607,7 +1758,7 @@ def update_task(task_id):
                                 VALUES (%s, %s, %s)
                             """, (next_id + 1, task_id, depends_on_task_id))
                         except Exception as e2:
-                            print(f"Final attempt to insert dependency failed: {e2}")
+                            logger.exception("Final attempt to insert dependency failed: %s", e2)
         
         # Determine if we need to reschedule
         needs_reschedule = False
@@ -1635,7 +1786,7 @@ def update_task(task_id):
             # Close the current connection before running the scheduler
             conn.commit()
             cur.close()
-            conn.close()
+            release_db_connection(conn)
             
             # Run a full reschedule (like the FullRescheduleButton does)
             try:
@@ -1659,7 +1810,7 @@ def update_task(task_id):
         if 'cur' in locals() and not cur.closed:
             cur.close()
         if 'conn' in locals() and not conn.closed:
-            conn.close()
+            release_db_connection(conn)
         
         return jsonify({
             "message": f"Task {task_id} updated successfully",
@@ -1693,12 +1844,12 @@ def update_task_schedule(task_id):
     check_only = request.args.get('check_only', 'false').lower() == 'true'
     
     # Debug information
-    print(f"=== Schedule Update Request ===")
-    print(f"Task ID: {task_id}")
-    print(f"Check only: {check_only}")
-    print(f"Request args: {request.args}")
-    print(f"Request data: {request.json}")
-    print(f"===============================")
+    logger.debug("=== Schedule Update Request ===")
+    logger.debug("Task ID: %s", task_id)
+    logger.debug("Check only: %s", check_only)
+    logger.debug("Request args: %s", request.args)
+    logger.debug("Request data: %s", request.json)
+    logger.debug("===============================")
     try:
         data = request.json
         
@@ -1731,34 +1882,34 @@ def update_task_schedule(task_id):
         new_planned_start = data.get('planned_start')
         new_planned_end = data.get('planned_end')
         
-        print(f"Raw planned start: {new_planned_start}")
-        print(f"Raw planned end: {new_planned_end}")
+        logger.debug("Raw planned start: %s", new_planned_start)
+        logger.debug("Raw planned end: %s", new_planned_end)
         
         if new_planned_start:
             try:
                 # Check if the format is our custom YYYY-MM-DD HH:MM:SS format
                 if ' ' in new_planned_start:
-                    print(f"Parsing planned start as local time: {new_planned_start}")
+                    logger.debug("Parsing planned start as local time: %s", new_planned_start)
                     new_planned_start = datetime.strptime(new_planned_start, "%Y-%m-%d %H:%M:%S")
-                    print(f"Parsed local time: {new_planned_start}")
+                    logger.debug("Parsed local time: %s", new_planned_start)
                 else:
                     # Try ISO format with timezone handling
-                    print(f"Parsing planned start as ISO: {new_planned_start}")
+                    logger.debug("Parsing planned start as ISO: %s", new_planned_start)
                     new_planned_start = datetime.fromisoformat(new_planned_start.replace('Z', '+00:00'))
-                    print(f"After fromisoformat: {new_planned_start}")
+                    logger.debug("After fromisoformat: %s", new_planned_start)
                     new_planned_start = new_planned_start.replace(tzinfo=None)
-                    print(f"After removing tzinfo: {new_planned_start}")
+                    logger.debug("After removing tzinfo: %s", new_planned_start)
             except Exception as e:
-                print(f"Error parsing planned start: {e}")
+                logger.debug("Error parsing planned start: %s", e)
                 # Try alternative parsing methods
                 try:
                     new_planned_start = datetime.strptime(new_planned_start, "%Y-%m-%dT%H:%M:%S.%fZ")
-                    print(f"Parsed with strptime: {new_planned_start}")
+                    logger.debug("Parsed with strptime: %s", new_planned_start)
                 except Exception as e2:
-                    print(f"Second parsing attempt failed: {e2}")
+                    logger.debug("Second parsing attempt failed: %s", e2)
                     try:
                         # Last resort - try to extract time components from the string
-                        print(f"Attempting to extract time components from: {new_planned_start}")
+                        logger.debug("Attempting to extract time components from: %s", new_planned_start)
                         # This is a very basic extraction - adjust as needed
                         if ":" in new_planned_start:
                             time_parts = new_planned_start.split(":")
@@ -1768,35 +1919,35 @@ def update_task_schedule(task_id):
                                 # Use today's date with the specified time
                                 today = datetime.now().replace(hour=hour, minute=minute, second=0, microsecond=0)
                                 new_planned_start = today
-                                print(f"Created time from components: {new_planned_start}")
+                                logger.debug("Created time from components: %s", new_planned_start)
                     except Exception as e3:
-                        print(f"Final parsing attempt failed: {e3}")
+                        logger.warning("Final parsing attempt failed: %s", e3)
         
         if new_planned_end:
             try:
                 # Check if the format is our custom YYYY-MM-DD HH:MM:SS format
                 if ' ' in new_planned_end:
-                    print(f"Parsing planned end as local time: {new_planned_end}")
+                    logger.debug("Parsing planned end as local time: %s", new_planned_end)
                     new_planned_end = datetime.strptime(new_planned_end, "%Y-%m-%d %H:%M:%S")
-                    print(f"Parsed local time: {new_planned_end}")
+                    logger.debug("Parsed local time: %s", new_planned_end)
                 else:
                     # Try ISO format with timezone handling
-                    print(f"Parsing planned end as ISO: {new_planned_end}")
+                    logger.debug("Parsing planned end as ISO: %s", new_planned_end)
                     new_planned_end = datetime.fromisoformat(new_planned_end.replace('Z', '+00:00'))
-                    print(f"After fromisoformat: {new_planned_end}")
+                    logger.debug("After fromisoformat: %s", new_planned_end)
                     new_planned_end = new_planned_end.replace(tzinfo=None)
-                    print(f"After removing tzinfo: {new_planned_end}")
+                    logger.debug("After removing tzinfo: %s", new_planned_end)
             except Exception as e:
-                print(f"Error parsing planned end: {e}")
+                logger.debug("Error parsing planned end: %s", e)
                 # Try alternative parsing methods
                 try:
                     new_planned_end = datetime.strptime(new_planned_end, "%Y-%m-%dT%H:%M:%S.%fZ")
-                    print(f"Parsed with strptime: {new_planned_end}")
+                    logger.debug("Parsed with strptime: %s", new_planned_end)
                 except Exception as e2:
-                    print(f"Second parsing attempt failed: {e2}")
+                    logger.debug("Second parsing attempt failed: %s", e2)
                     try:
                         # Last resort - try to extract time components from the string
-                        print(f"Attempting to extract time components from: {new_planned_end}")
+                        logger.debug("Attempting to extract time components from: %s", new_planned_end)
                         # This is a very basic extraction - adjust as needed
                         if ":" in new_planned_end:
                             time_parts = new_planned_end.split(":")
@@ -1806,9 +1957,9 @@ def update_task_schedule(task_id):
                                 # Use today's date with the specified time
                                 today = datetime.now().replace(hour=hour, minute=minute, second=0, microsecond=0)
                                 new_planned_end = today
-                                print(f"Created time from components: {new_planned_end}")
+                                logger.debug("Created time from components: %s", new_planned_end)
                     except Exception as e3:
-                        print(f"Final parsing attempt failed: {e3}")
+                        logger.warning("Final parsing attempt failed: %s", e3)
             
         # Validate dependencies - check if all dependencies will be completed before this task starts
         if new_planned_start:
@@ -2041,7 +2192,7 @@ def update_task_schedule(task_id):
         if check_only:
             conn.commit()
             cur.close()
-            conn.close()
+            release_db_connection(conn)
             
             return jsonify({
                 "message": "Schedule validation completed",
@@ -2065,20 +2216,21 @@ def update_task_schedule(task_id):
         
         current_schedule = cur.fetchone()
         
-        print(f"Original schedule: {original_schedule}")
-        print(f"Updated schedule: {current_schedule}")
+        logger.debug("Original schedule: %s", original_schedule)
+        logger.debug("Updated schedule: %s", current_schedule)
         
         # Close the database connection before calling the rescheduler
         conn.commit()
         cur.close()
-        conn.close()
+        release_db_connection(conn)
         
         # Now update dependent tasks based on the new schedule with a fresh connection
+        rm = None
         try:
             # Import the rescheduler function and class
             from rescheduler import ReschedulingManager
             
-            # Create a rescheduling manager (this creates its own connection)
+            # Create a rescheduling manager (this checks out its own pooled connection)
             rm = ReschedulingManager()
             
             # Get the original and new schedule times
@@ -2087,8 +2239,8 @@ def update_task_schedule(task_id):
             new_start = current_schedule['planned_start'] if current_schedule else None
             new_end = current_schedule['planned_end'] if current_schedule else None
             
-            print(f"Original schedule: {original_start} to {original_end}")
-            print(f"New schedule: {new_start} to {new_end}")
+            logger.debug("Original schedule: %s to %s", original_start, original_end)
+            logger.debug("New schedule: %s to %s", new_start, new_end)
             
             # Make sure we have valid datetime objects
             if isinstance(new_start, str):
@@ -2098,7 +2250,7 @@ def update_task_schedule(task_id):
                     else:  # ISO format
                         new_start = datetime.fromisoformat(new_start.replace('Z', '+00:00')).replace(tzinfo=None)
                 except Exception as e:
-                    print(f"Error parsing new_start: {e}")
+                    logger.warning("Error parsing new_start: %s", e)
                     return jsonify({"error": f"Invalid start date format: {new_start}"}), 400
                     
             if isinstance(new_end, str):
@@ -2108,12 +2260,12 @@ def update_task_schedule(task_id):
                     else:  # ISO format
                         new_end = datetime.fromisoformat(new_end.replace('Z', '+00:00')).replace(tzinfo=None)
                 except Exception as e:
-                    print(f"Error parsing new_end: {e}")
+                    logger.warning("Error parsing new_end: %s", e)
                     return jsonify({"error": f"Invalid end date format: {new_end}"}), 400
                 
-            print(f"Calling manually_reschedule_task with: task_id={task_id}, new_start={new_start}, new_end={new_end}")
-            print(f"Start hour: {new_start.hour}, minute: {new_start.minute}")
-            print(f"End hour: {new_end.hour}, minute: {new_end.minute}")
+            logger.debug("Calling manually_reschedule_task with: task_id=%s, new_start=%s, new_end=%s", task_id, new_start, new_end)
+            logger.debug("Start hour: %s, minute: %s", new_start.hour, new_start.minute)
+            logger.debug("End hour: %s, minute: %s", new_end.hour, new_end.minute)
             
             # Call the manual reschedule function directly
             rescheduling_result = rm.manually_reschedule_task(
@@ -2123,7 +2275,7 @@ def update_task_schedule(task_id):
                 "Manual schedule update from UI"
             )
             
-            print(f"Rescheduling result: {rescheduling_result}")
+            logger.debug("Rescheduling result: %s", rescheduling_result)
             
             # Close the rescheduling manager
             rm.close()
@@ -2139,10 +2291,10 @@ def update_task_schedule(task_id):
             """, (task_id,))
             
             final_schedule = fresh_cur.fetchone()
-            print(f"Final schedule after rescheduling: {final_schedule}")
+            logger.debug("Final schedule after rescheduling: %s", final_schedule)
             
             fresh_cur.close()
-            fresh_conn.close()
+            release_db_connection(fresh_conn)
             
             # We already have the final_schedule from the fresh connection
             
@@ -2198,8 +2350,10 @@ def update_task_schedule(task_id):
             
             return jsonify(response_data)
         except Exception as e:
-            # The connection should already be closed at this point
-            print(f"Error during rescheduling: {e}")
+            # Hand the rescheduling manager's connection back if it was not closed yet
+            if rm is not None:
+                rm.close()
+            logger.exception("Error during rescheduling: %s", e)
             
             # Get a fresh connection to get the current schedule
             try:
@@ -2213,12 +2367,12 @@ def update_task_schedule(task_id):
                 """, (task_id,))
                 
                 final_schedule = fresh_cur.fetchone()
-                print(f"Current schedule in error handler: {final_schedule}")
+                logger.debug("Current schedule in error handler: %s", final_schedule)
                 
                 fresh_cur.close()
-                fresh_conn.close()
+                release_db_connection(fresh_conn)
             except Exception as query_error:
-                print(f"Error getting current schedule in error handler: {query_error}")
+                logger.exception("Error getting current schedule in error handler: %s", query_error)
                 # Use the schedule we already have
                 final_schedule = current_schedule
             
@@ -2313,7 +2467,7 @@ def get_task(task_id):
             task['schedule']['actual_end_iso'] = task['schedule']['actual_end'].isoformat() if task['schedule']['actual_end'] else None
         
         cur.close()
-        conn.close()
+        release_db_connection(conn)
         
         return jsonify(task)
     
@@ -2413,15 +2567,7 @@ def create_assignment():
             return jsonify({"error": f"{assignment_type.capitalize()} with ID {entity_id} not found"}), 404
         
         # Check if the table exists, create it if it doesn't
-        cur.execute(f"""
-            SELECT EXISTS (
-                SELECT FROM information_schema.tables 
-                WHERE table_name = '{table_name}'
-            ) as exists
-        """)
-        
-        result = cur.fetchone()
-        table_exists = result['exists'] if result else False
+        table_exists = get_schema(cur.connection).has_table(table_name)
         
         if not table_exists:
             # Create the table
@@ -2438,6 +2584,7 @@ def create_assignment():
                 )
             """)
             conn.commit()
+            refresh_schema(conn)
         
         # Check if the assignment already exists
         cur.execute(f"""
@@ -2491,7 +2638,7 @@ def create_assignment():
                     'status': assignment['status']
                 }
                 conflicts.append(conflict)
-                print(f"Found conflict: {assignment_type} {entity_id} is already assigned to task {assignment['task_id']} ({assignment['task_name']}) during overlapping time")
+                logger.debug("Found conflict: %s %s is already assigned to task %s (%s) during overlapping time", assignment_type, entity_id, assignment['task_id'], assignment['task_name'])
         
         # If there are conflicts, include them as warnings but still create the assignment
         warning_message = None
@@ -2499,7 +2646,7 @@ def create_assignment():
             # Format conflict warning
             conflict_count = len(conflicts)
             warning_message = f"Warning: {assignment_type.capitalize()} is already assigned to {conflict_count} other task(s) during this time period. You may need to reschedule those tasks."
-            print(warning_message)
+            logger.warning("%s", warning_message)
         
         # Check if this is an initial assignment (from scheduler) or a user modification
         is_initial = data.get('is_initial', False)
@@ -2517,7 +2664,7 @@ def create_assignment():
         
         conn.commit()
         cur.close()
-        conn.close()
+        release_db_connection(conn)
         
         response_data = {
             "success": True,
@@ -2693,7 +2840,7 @@ def set_task_requirements():
         
         conn.commit()
         cur.close()
-        conn.close()
+        release_db_connection(conn)
         
         return jsonify({
             "success": True, 
@@ -2723,15 +2870,7 @@ def auto_assign_resources():
         cur = conn.cursor(cursor_factory=RealDictCursor)
         
         # Check if employee_assignments table exists
-        cur.execute("""
-            SELECT EXISTS (
-                SELECT FROM information_schema.tables 
-                WHERE table_name = 'employee_assignments'
-            ) as exists
-        """)
-        
-        result = cur.fetchone()
-        employee_table_exists = result['exists'] if result else False
+        employee_table_exists = get_schema(cur.connection).has_table('employee_assignments')
         
         if not employee_table_exists:
             # Create the employee_assignments table
@@ -2748,17 +2887,10 @@ def auto_assign_resources():
                 )
             """)
             conn.commit()
+            refresh_schema(conn)
         
         # Check if resource_assignments table exists
-        cur.execute("""
-            SELECT EXISTS (
-                SELECT FROM information_schema.tables 
-                WHERE table_name = 'resource_assignments'
-            ) as exists
-        """)
-        
-        result = cur.fetchone()
-        resource_table_exists = result['exists'] if result else False
+        resource_table_exists = get_schema(cur.connection).has_table('resource_assignments')
         
         if not resource_table_exists:
             # Create the resource_assignments table
@@ -2775,6 +2907,7 @@ def auto_assign_resources():
                 )
             """)
             conn.commit()
+            refresh_schema(conn)
         
         # Get tasks to assign resources to
         if task_id:
@@ -2795,15 +2928,7 @@ def auto_assign_resources():
         tasks = cur.fetchall()
         
         # Check if employees table exists
-        cur.execute("""
-            SELECT EXISTS (
-                SELECT FROM information_schema.tables 
-                WHERE table_name = 'employees'
-            ) as exists
-        """)
-        
-        result = cur.fetchone()
-        employees_table_exists = result['exists'] if result else False
+        employees_table_exists = get_schema(cur.connection).has_table('employees')
         
         if not employees_table_exists:
             # Create the employees table
@@ -2827,17 +2952,10 @@ def auto_assign_resources():
                 ('Alice Brown', 'Designer', 'design', TRUE)
             """)
             conn.commit()
+            refresh_schema(conn)
         
         # Check if resources table exists
-        cur.execute("""
-            SELECT EXISTS (
-                SELECT FROM information_schema.tables 
-                WHERE table_name = 'resources'
-            ) as exists
-        """)
-        
-        result = cur.fetchone()
-        resources_table_exists = result['exists'] if result else False
+        resources_table_exists = get_schema(cur.connection).has_table('resources')
         
         if not resources_table_exists:
             # Create the resources table
@@ -2861,6 +2979,7 @@ def auto_assign_resources():
                 ('Delivery Truck', 'vehicle', TRUE)
             """)
             conn.commit()
+            refresh_schema(conn)
         
         # Get all employees and resources
         cur.execute("SELECT employee_id, name, role_name FROM employees")
@@ -2924,7 +3043,7 @@ def auto_assign_resources():
         
         conn.commit()
         cur.close()
-        conn.close()
+        release_db_connection(conn)
         
         return jsonify({
             'success': True,
@@ -2943,7 +3062,10 @@ def reschedule_after_assignment_change():
     Required JSON body:
     {
         "task_id": 123,
-        "full_reschedule": false  # Optional, if true will reschedule all incomplete tasks
+        "full_reschedule": false,  # Optional, if true will reschedule all incomplete tasks
+        "solver_profile": "interactive",  # Optional, with full_reschedule: or "nightly" / "exhaustive"
+        "stop_criteria": {...},    # Optional, with full_reschedule: see /api/schedule
+        "async": false             # Optional, with full_reschedule queue the solve and return a job id
     }
     """
     try:
@@ -2956,8 +3078,17 @@ def reschedule_after_assignment_change():
         full_reschedule = data.get('full_reschedule', False)
         
         if full_reschedule:
+            solver_profile = data.get('solver_profile')
+            if solver_profile is not None and solver_profile not in SOLVER_PROFILES:
+                return jsonify({"error": f"Unknown solver profile: {solver_profile}"}), 400
+            try:
+                stop_criteria = parse_stop_criteria(data)
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
+            if data.get('async'):
+                return submit_partial_reschedule_job(solver_profile, stop_criteria)
             # Use the CP-SAT scheduler to reschedule all incomplete tasks
-            return run_partial_reschedule()
+            return run_partial_reschedule(solver_profile, stop_criteria)
         
         # If not a full reschedule, we need a task_id
         if 'task_id' not in data:
@@ -3026,7 +3157,7 @@ def reschedule_after_assignment_change():
         
         conn.commit()
         cur.close()
-        conn.close()
+        release_db_connection(conn)
         
         return jsonify({
             "success": True,
@@ -3041,7 +3172,33 @@ def reschedule_after_assignment_change():
     except Exception as e:
         return jsonify({"error": str(e), "traceback": str(sys.exc_info())}), 500
 
-def run_partial_reschedule():
+def get_preserved_task_ids(cur):
+    """Return the ids of tasks that are completed or in progress and must keep their schedule."""
+    cur.execute("""
+        SELECT t.task_id
+        FROM tasks t
+        JOIN schedules s ON t.task_id = s.task_id
+        WHERE s.status IN ('Completed', 'In Progress', 'Clocked In')
+    """)
+    return [row[0] for row in cur.fetchall()]
+
+def submit_partial_reschedule_job(solver_profile=None, stop_criteria=None):
+    """
+    Queue a background CP-SAT run for incomplete tasks, preserving tasks that
+    are completed or in progress, and return the 202 job response.
+    """
+    conn = get_db_connection()
+    cur = conn.cursor()
+    preserved_task_ids = get_preserved_task_ids(cur)
+    cur.close()
+    release_db_connection(conn)
+    
+    job = get_job_manager().submit('partial_reschedule', cp_sat_scheduler,
+                                   preserve_task_ids=preserved_task_ids, solver_profile=solver_profile,
+                                   stop_criteria=stop_criteria)
+    return job_accepted_response(job)
+
+def run_partial_reschedule(solver_profile=None, stop_criteria=None):
     """
     Run the CP-SAT scheduler but only for incomplete and unstarted tasks.
     Preserves tasks that are already completed or in progress.
@@ -3062,7 +3219,7 @@ def run_partial_reschedule():
         preserved_tasks = cur.fetchall()
         preserved_task_ids = [t['task_id'] for t in preserved_tasks]
         
-        print(f"Preserving {len(preserved_tasks)} tasks that are completed or in progress")
+        logger.info("Preserving %s tasks that are completed or in progress", len(preserved_tasks))
         
         # 2. Get all tasks that need to be rescheduled
         cur.execute("""
@@ -3075,7 +3232,7 @@ def run_partial_reschedule():
         
         tasks_to_reschedule = cur.fetchall()
         
-        print(f"Rescheduling {len(tasks_to_reschedule)} incomplete tasks")
+        logger.info("Rescheduling %s incomplete tasks", len(tasks_to_reschedule))
         
         if not tasks_to_reschedule:
             return jsonify({
@@ -3091,7 +3248,11 @@ def run_partial_reschedule():
             from initial_scheduler import cp_sat_scheduler
             
             # Run the scheduler with the list of tasks to preserve
-            cp_sat_scheduler(preserve_task_ids=preserved_task_ids)
+            result = cp_sat_scheduler(preserve_task_ids=preserved_task_ids, solver_profile=solver_profile,
+                                      stop_criteria=stop_criteria)
+            failed = solve_failed_response(result)
+            if failed is not None:
+                return failed
             
             # Get the updated schedule
             cur.execute("""
@@ -3118,12 +3279,10 @@ def run_partial_reschedule():
             })
             
         except Exception as scheduler_error:
-            print(f"Error in CP-SAT scheduler: {scheduler_error}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Error in CP-SAT scheduler: %s", scheduler_error)
             
             # Fall back to a simpler approach if the CP-SAT scheduler fails
-            print("Falling back to simple sequential rescheduling")
+            logger.warning("Falling back to simple sequential rescheduling")
             
             # Clear existing schedules for tasks that need to be rescheduled
             task_ids_to_reschedule = [t['task_id'] for t in tasks_to_reschedule]
@@ -3194,7 +3353,7 @@ def run_partial_reschedule():
             })
     
     except Exception as e:
-        print(f"Error in run_partial_reschedule: {e}")
+        logger.exception("Error in run_partial_reschedule: %s", e)
         import traceback
         traceback.print_exc()
         return jsonify({"error": str(e), "traceback": traceback.format_exc()}), 500
@@ -3203,7 +3362,7 @@ def run_partial_reschedule():
         if 'cur' in locals():
             cur.close()
         if 'conn' in locals():
-            conn.close()
+            release_db_connection(conn)
 
 @app.route('/api/assignments/delete', methods=['POST'])
 def delete_assignment():
@@ -3241,15 +3400,7 @@ def delete_assignment():
         cur = conn.cursor(cursor_factory=RealDictCursor)
         
         # Check if the table exists
-        cur.execute(f"""
-            SELECT EXISTS (
-                SELECT FROM information_schema.tables 
-                WHERE table_name = '{table_name}'
-            ) as exists
-        """)
-        
-        result = cur.fetchone()
-        table_exists = result['exists'] if result else False
+        table_exists = get_schema(cur.connection).has_table(table_name)
         
         if not table_exists:
             return jsonify({"error": f"No {assignment_type} assignments exist"}), 404
@@ -3303,7 +3454,7 @@ def delete_assignment():
         
         conn.commit()
         cur.close()
-        conn.close()
+        release_db_connection(conn)
         
         return jsonify({
             "success": True,
@@ -3400,4 +3551,5 @@ def check_resource_conflicts(conn, task_id, resource_id=None, employee_id=None):
         cur.close()
 
 if __name__ == '__main__':
+    configure_logging()
     app.run(debug=True, port=5000)
\ No newline at end of file
@@ -0,0 +1,351 @@
+#!/usr/bin/env python
+"""
+Compiled work calendars.
+
+A work calendar says which dates are working days and when each working day
+starts. It is compiled from a project's rows in working_hours (per day of the
+week) and its tenant's holidays. A project without working_hours rows of its
+own uses its tenant's rows (project_id NULL), and a tenant without rows uses
+Monday to Friday, 9 AM to 5 PM.
+
+Working time is counted in units of 1/units_per_hour hours from the start of
+the calendar's start date; every working day holds hours_per_day working
+hours from its start time. A weekday with several rows (split shifts) starts
+at the earliest of them; rows adding up to a different length are logged, as
+the scheduling model counts fixed-length working days.
+
+WorkCalendar keeps prefix counts of working days per calendar day offset and
+the list of working dates, so converting between working units and datetimes
+is a constant-time lookup; the arrays grow on demand for dates beyond them.
+CalendarRegistry keeps the most recently used compiled calendars and drops
+them on invalidate() after working_hours or holidays change.
+"""
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime, time, timedelta
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DAY_START = time(9, 0)
+DEFAULT_WORK_WEEK = {weekday: DEFAULT_DAY_START for weekday in range(5)}  # Monday=0 ... Friday=4
+CALENDAR_CACHE_SIZE = 64
+INITIAL_CALENDAR_DAYS = 180
+
+
+def _weekday(day_of_week):
+    """Map working_hours.day_of_week to datetime.weekday(); 0 and 7 are both Sunday."""
+    return (int(day_of_week) - 1) % 7
+
+
+class WorkCalendar:
+    """
+    Working days and day start times, with constant-time conversions between
+    working time units and datetimes.
+    """
+
+    def __init__(self, start_date, work_week=None, holidays=(), hours_per_day=8, units_per_hour=100, name=None):
+        """
+        Args:
+            start_date: Date of working time unit 0 (working day 0, even if it is not a working day)
+            work_week: Map weekday (Monday=0) -> day start time; missing weekdays
+                       are not worked. Defaults to DEFAULT_WORK_WEEK.
+            holidays: Dates that are not worked
+            hours_per_day: Working hours per working day
+            units_per_hour: Working time units per hour
+            name: Label for logs
+        """
+        self.start_date = start_date
+        self.work_week = dict(DEFAULT_WORK_WEEK if work_week is None else work_week)
+        self.holidays = frozenset(holidays)
+        self.hours_per_day = hours_per_day
+        self.units_per_hour = units_per_hour
+        self.units_per_day = hours_per_day * units_per_hour
+        self.name = name or 'default'
+        # Seconds after midnight each weekday starts, None when not worked
+        self._day_starts = tuple(self.work_week[weekday].hour * 3600 + self.work_week[weekday].minute * 60 +
+                                 self.work_week[weekday].second if weekday in self.work_week else None
+                                 for weekday in range(7))
+        # _working_days_before[i] = number of working days in [start, start + i)
+        self._working_days_before = [0]
+        # Working dates strictly after the start date; entry k-1 is working day k
+        self._working_dates = []
+        self._extend(INITIAL_CALENDAR_DAYS)
+
+    def key(self):
+        """Hashable description of the calendar, e.g. for model cache fingerprints."""
+        return (self.start_date.isoformat(), self._day_starts, tuple(sorted(d.isoformat() for d in self.holidays)),
+                self.hours_per_day, self.units_per_hour)
+
+    @property
+    def num_days(self):
+        return len(self._working_days_before) - 1
+
+    def _extend(self, num_days):
+        """
+        Extend the index so that it covers at least num_days calendar days.
+        The arrays are extended on copies and swapped in, so threads sharing a
+        calendar never see them half-extended.
+        """
+        working_days_before = list(self._working_days_before)
+        working_dates = list(self._working_dates)
+        current = len(working_days_before) - 1
+        while current < num_days:
+            day = self.start_date + timedelta(days=current)
+            is_working = self.is_working_date(day)
+            working_days_before.append(working_days_before[-1] + (1 if is_working else 0))
+            if is_working and current > 0:
+                working_dates.append(day)
+            current += 1
+        self._working_dates = working_dates
+        self._working_days_before = working_days_before
+
+    def is_working_date(self, day):
+        """Return True if the date is a working day."""
+        return self._day_starts[day.weekday()] is not None and day not in self.holidays
+
+    def day_start_seconds(self, day):
+        """Seconds after midnight the date's working day starts (the first start time for non-working dates)."""
+        start = self._day_starts[day.weekday()]
+        if start is None:
+            start = next((s for s in self._day_starts if s is not None), DEFAULT_DAY_START.hour * 3600)
+        return start
+
+    def day_start(self, day):
+        """Return the datetime the date's working day starts."""
+        return datetime.combine(day, datetime.min.time()) + timedelta(seconds=self.day_start_seconds(day))
+
+    def day_end(self, day):
+        """Return the datetime the date's working day ends."""
+        return self.day_start(day) + timedelta(hours=self.hours_per_day)
+
+    def next_working_date(self, day):
+        """Return the first working date after `day`."""
+        if day >= self.start_date:
+            return self.working_day_date(self.working_day_index(day) + 1)
+        day += timedelta(days=1)
+        while not self.is_working_date(day):
+            day += timedelta(days=1)
+        return day
+
+    def working_days_before(self, day):
+        """Return the number of working days in [start_date, day)."""
+        offset = (day - self.start_date).days
+        if offset <= 0:
+            return 0
+        if offset > self.num_days:
+            self._extend(max(offset, self.num_days * 2))
+        return self._working_days_before[offset]
+
+    def working_day_index(self, day):
+        """
+        Return the working day number of `day`, the inverse of working_day_date.
+        Dates on or before the start date map to day 0.
+        """
+        if day <= self.start_date:
+            return 0
+        # Working days in (start_date, day]
+        return self.working_days_before(day + timedelta(days=1)) - self._working_days_before[1]
+
+    def working_day_date(self, day_index):
+        """
+        Return the calendar date of working day `day_index`.
+        Day 0 is the start date itself; day k is the k-th working day after it.
+        """
+        if day_index <= 0:
+            return self.start_date
+        while len(self._working_dates) < day_index:
+            self._extend(max(self.num_days * 2, day_index * 2))
+        return self._working_dates[day_index - 1]
+
+    def to_datetime(self, unit):
+        """Convert a working time unit into a datetime."""
+        full_working_days, rem_units = divmod(unit, self.units_per_day)
+        day = self.working_day_date(full_working_days)
+        return self.day_start(day) + timedelta(hours=rem_units / self.units_per_hour)
+
+    def to_units(self, dt):
+        """
+        Convert a datetime produced by to_datetime back to its working time
+        unit. Unlike from_calendar_time this is the exact inverse even when the
+        calendar starts on a non-working day (working day 0 is always the start
+        date). Times outside working hours are clamped to the working day; later
+        non-working days snap to the start of the next working day.
+        """
+        if dt.date() < self.start_date:
+            return 0
+        day = dt.date()
+        if day > self.start_date and not self.is_working_date(day):
+            day = self.next_working_date(day)
+            dt = self.day_start(day)
+        seconds = min(max((dt - self.day_start(day)).total_seconds(), 0), self.hours_per_day * 3600)
+        return self.working_day_index(day) * self.units_per_day + int(round(seconds * self.units_per_hour / 3600))
+
+    def from_calendar_time(self, dt):
+        """
+        Convert a calendar datetime to working time units since the start date.
+        Non-working days move to the start of the next working day; times
+        before a day's start count from the end of the previous working day,
+        times after its end are capped at the end.
+        """
+        if not self.is_working_date(dt.date()):
+            dt = self.day_start(self.next_working_date(dt.date()))
+
+        working_days = self.working_days_before(dt.date())
+        hours_diff = (dt - self.day_start(dt.date())).total_seconds() / 3600
+        units = working_days * self.units_per_day
+
+        if hours_diff < 0:
+            # Before work starts, use previous working day's end.
+            # A previous working day on or after the start date exists exactly
+            # when at least one working day precedes dt.
+            if working_days > 0:
+                units -= self.units_per_day - (abs(hours_diff) * self.units_per_hour)
+            else:
+                units = 0
+        elif hours_diff < self.hours_per_day:
+            units += hours_diff * self.units_per_hour
+        else:
+            units += self.units_per_day
+
+        return max(0, int(units))
+
+    def next_working_time(self, dt):
+        """
+        Return dt if it falls within working hours on a working day, otherwise
+        the start of the next working period.
+        """
+        day = dt.date()
+        if self.is_working_date(day):
+            if dt < self.day_start(day):
+                return self.day_start(day)
+            if dt < self.day_end(day):
+                return dt
+        return self.day_start(self.next_working_date(day))
+
+
+def compile_calendar(start_date, working_hours=None, holidays=None, hours_per_day=8, units_per_hour=100, name=None):
+    """
+    Compile working_hours and holidays rows into a WorkCalendar.
+
+    Args:
+        start_date: Date of working time unit 0
+        working_hours: Rows (day_of_week, start_time, end_time, is_working_day);
+                       day_of_week 1 is Monday and 0 or 7 Sunday. None or no
+                       rows gives DEFAULT_WORK_WEEK.
+        holidays: Iterable of dates
+        hours_per_day: Working hours per working day
+        units_per_hour: Working time units per hour
+        name: Label for logs
+
+    Returns:
+        WorkCalendar: The compiled calendar
+    """
+    work_week = None
+    if working_hours:
+        work_week = {}
+        lengths = {}
+        for day_of_week, start_time, end_time, is_working in working_hours:
+            if is_working is False:
+                continue
+            weekday = _weekday(day_of_week)
+            # Several rows for one weekday (split shifts) start the day at the earliest of them
+            if weekday not in work_week or start_time < work_week[weekday]:
+                work_week[weekday] = start_time
+            if end_time is not None:
+                lengths[weekday] = lengths.get(weekday, 0) + (
+                    datetime.combine(start_date, end_time) -
+                    datetime.combine(start_date, start_time)).total_seconds() / 3600
+        for weekday, length in sorted(lengths.items()):
+            if weekday in work_week and abs(length - hours_per_day) > 1e-6:
+                logger.warning("Calendar %s: working hours on weekday %s last %.2f hours; counting %s hours "
+                               "from %s", name, weekday, length, hours_per_day, work_week[weekday])
+        if not work_week:
+            logger.warning("Calendar %s has no working days; using the default week", name)
+            work_week = None
+    return WorkCalendar(start_date, work_week, holidays or (), hours_per_day, units_per_hour, name)
+
+
+class CalendarRegistry:
+    """
+    Least-recently-used cache of compiled calendars, keyed by source, project
+    and start date.
+    """
+
+    def __init__(self, max_size=CALENDAR_CACHE_SIZE):
+        self.max_size = max(1, max_size)
+        self._calendars = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, source_key, project_id, start_date, load_rules, hours_per_day=8, units_per_hour=100):
+        """
+        Return the compiled calendar of a project, compiling it on first use.
+
+        Args:
+            source_key: Hashable identifying where the rules come from
+            project_id: Project ID, or None for the tenant calendar
+            start_date: Date of working time unit 0
+            load_rules: Callable(project_id) returning {'working_hours', 'holidays'}
+                        or None for the default week; called on a cache miss
+            hours_per_day: Working hours per working day
+            units_per_hour: Working time units per hour
+
+        Returns:
+            WorkCalendar: The compiled calendar
+        """
+        key = (source_key, project_id, start_date, hours_per_day, units_per_hour)
+        with self._lock:
+            calendar = self._calendars.get(key)
+            if calendar is not None:
+                self._calendars.move_to_end(key)
+                return calendar
+
+        # Compile outside the lock; loading the rules may query the database
+        name = f"project {project_id}" if project_id is not None else 'tenant'
+        try:
+            rules = load_rules(project_id)
+        except Exception as e:
+            # Not cached, so the real calendar is compiled once the rules load again
+            logger.warning("Could not load calendar of %s: %s; using the default week for this call", name, e)
+            return compile_calendar(start_date, hours_per_day=hours_per_day, units_per_hour=units_per_hour,
+                                    name=name)
+        rules = rules or {}
+        calendar = compile_calendar(start_date, rules.get('working_hours'), rules.get('holidays'),
+                                    hours_per_day, units_per_hour, name=name)
+
+        with self._lock:
+            self._calendars[key] = calendar
+            self._calendars.move_to_end(key)
+            while len(self._calendars) > self.max_size:
+                self._calendars.popitem(last=False)
+        logger.info("Compiled work calendar for %s", calendar.name)
+        return calendar
+
+    def invalidate(self, project_id=None):
+        """
+        Drop compiled calendars after their working hours or holidays changed.
+
+        Args:
+            project_id: Only drop this project's calendars; None drops all of them
+                        (holidays and tenant hours affect every project)
+        """
+        with self._lock:
+            if project_id is None:
+                self._calendars.clear()
+            else:
+                for key in [key for key in self._calendars if key[1] == project_id]:
+                    del self._calendars[key]
+
+
+_calendar_registry = None
+_calendar_registry_lock = threading.Lock()
+
+
+def get_calendar_registry():
+    """Return the process-wide CalendarRegistry."""
+    global _calendar_registry
+    if _calendar_registry is None:
+        with _calendar_registry_lock:
+            if _calendar_registry is None:
+                _calendar_registry = CalendarRegistry()
+    return _calendar_registry
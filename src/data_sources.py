@@ -0,0 +1,296 @@
+#!/usr/bin/env python
+"""
+In-memory data source for running the scheduler without a database.
+
+SnapshotDataSource implements DataSource (initial_scheduler.py) on a problem
+snapshot in the format of DatabaseManager.load_problem_snapshot, plus the
+stored schedules and assignments. It can be loaded from and saved to a JSON
+file, so a snapshot taken on a machine with database access can be solved on
+a worker without one:
+
+    source = SnapshotDataSource.from_database()       # on a machine with the database
+    source.to_json('snapshot.json')
+    ...
+    source = SnapshotDataSource.from_json('snapshot.json')
+    result = cp_sat_scheduler(data_source=source)      # no database needed
+    source.to_json('solved.json')
+
+Writes only change the in-memory copy. What-if solves can work on a copy of a
+loaded snapshot without touching the stored plan.
+
+Differences to the database: every resource marked available counts, whatever
+its last maintenance date, and there are no auto-assignment flags on
+employee assignments. Working hours and holidays are copied per project when
+the snapshot is taken; a snapshot without them uses the default work week.
+"""
+import copy
+import json
+import logging
+from datetime import date, datetime, time
+
+from initial_scheduler import (
+    WORKING_HORIZON, DataSource, DatabaseManager, build_dependency_index, get_work_calendar, schedule_rows
+)
+
+logger = logging.getLogger(__name__)
+
+# Statuses update_schedule leaves in place, as the upsert in DatabaseManager.update_schedule does
+KEPT_STATUSES = ('In Progress', 'Clocked In', 'Paused', 'On Hold', 'Completed', 'Skipped')
+SNAPSHOT_FORMAT_VERSION = 2  # 2 added 'calendars'
+
+
+def _rules_to_json(rules):
+    return {'working_hours': [[day_of_week, start.isoformat(), end.isoformat() if end else None, is_working]
+                              for day_of_week, start, end, is_working in rules.get('working_hours') or []],
+            'holidays': [day.isoformat() for day in rules.get('holidays') or []]}
+
+
+def _rules_from_json(data):
+    return {'working_hours': [(day_of_week, time.fromisoformat(start), time.fromisoformat(end) if end else None,
+                               is_working)
+                              for day_of_week, start, end, is_working in data.get('working_hours') or []],
+            'holidays': [date.fromisoformat(day) for day in data.get('holidays') or []]}
+
+
+class SnapshotDataSource(DataSource):
+    """
+    DataSource holding everything in memory.
+
+    Attributes:
+        tasks: Map task_id -> task dict (see DatabaseManager.get_tasks, plus 'project_id')
+        resources: List of {'resource_id', 'name', 'type', 'availability'}
+        employees: List of {'employee_id', 'name', 'skill_set'}
+        schedules: Map task_id -> {'start', 'end', 'status'} with datetimes
+        resource_assignments: List of (task_id, resource_id)
+        employee_assignments: List of (task_id, employee_id)
+        calendars: Map project_id (None for the tenant) -> calendar rules as
+                   returned by DatabaseManager.load_calendar_rules
+        change_log: Moves recorded by apply_schedule_changes
+        optimization_history: Runs recorded by log_optimization
+    """
+
+    def __init__(self, snapshot, schedules=None, resource_assignments=None, employee_assignments=None,
+                 calendars=None):
+        """
+        Args:
+            snapshot: Dict with 'tasks', 'resources' and 'employees'
+            schedules: Optional map task_id -> {'start', 'end', 'status'}
+            resource_assignments: Optional (task_id, resource_id) pairs
+            employee_assignments: Optional (task_id, employee_id) pairs
+            calendars: Optional map project_id (None for the tenant) -> calendar rules
+        """
+        self.tasks = {}
+        for task in snapshot['tasks']:
+            task = dict(task, dependencies=[tuple(dep) for dep in task['dependencies']],
+                        employees=dict(task.get('employees') or {}), resources=dict(task.get('resources') or {}))
+            self.tasks[task['task_id']] = task
+        self.resources = [dict(resource) for resource in snapshot['resources']]
+        self.employees = [dict(employee) for employee in snapshot['employees']]
+        self.schedules = {tid: dict(entry) for tid, entry in (schedules or {}).items()}
+        self.resource_assignments = [tuple(pair) for pair in resource_assignments or []]
+        self.employee_assignments = [tuple(pair) for pair in employee_assignments or []]
+        self.calendars = dict(calendars or {})
+        self.change_log = []
+        self.optimization_history = []
+
+    @classmethod
+    def from_database(cls, db=None):
+        """
+        Copy the scheduling inputs, schedules and assignments out of the database.
+
+        Args:
+            db: Optional DatabaseManager; a new one is opened (and closed) otherwise
+        """
+        own_db = db is None
+        db = db or DatabaseManager()
+        try:
+            snapshot = db.load_problem_snapshot()
+            cur = db.conn.cursor()
+            try:
+                cur.execute("SELECT task_id, planned_start, planned_end, status FROM schedules "
+                            "WHERE planned_start IS NOT NULL AND planned_end IS NOT NULL")
+                schedules = {task_id: {'start': start, 'end': end, 'status': status}
+                             for task_id, start, end, status in cur.fetchall()}
+                cur.execute("SELECT task_id, resource_id FROM resource_assignments")
+                resource_assignments = cur.fetchall()
+                cur.execute("SELECT task_id, employee_id FROM employee_assignments")
+                employee_assignments = cur.fetchall()
+                calendars = {}
+                for project_id in [None] + sorted({t['project_id'] for t in snapshot['tasks']
+                                                   if t.get('project_id') is not None}):
+                    rules = db.load_calendar_rules(project_id)
+                    if rules is not None:
+                        calendars[project_id] = rules
+            finally:
+                cur.close()
+                db.conn.rollback()  # End the read-only transaction
+        finally:
+            if own_db:
+                db.close()
+        return cls(snapshot, schedules, resource_assignments, employee_assignments, calendars)
+
+    @classmethod
+    def from_json(cls, path):
+        """
+        Load a data source saved with to_json. A bare problem snapshot (as written
+        by benchmarks/synthetic_projects.py) loads with no schedules.
+
+        Args:
+            path: JSON file path
+        """
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        schedules = {int(tid): {'start': datetime.fromisoformat(entry['start']),
+                                'end': datetime.fromisoformat(entry['end']),
+                                'status': entry.get('status')}
+                     for tid, entry in (data.get('schedules') or {}).items()}
+        calendars = {int(pid) if pid != 'tenant' else None: _rules_from_json(rules)
+                     for pid, rules in (data.get('calendars') or {}).items()}
+        return cls(data, schedules, data.get('resource_assignments'), data.get('employee_assignments'), calendars)
+
+    def to_json(self, path):
+        """
+        Save the inputs, schedules and assignments to a JSON file.
+
+        Args:
+            path: JSON file path
+        """
+        data = {
+            'format_version': SNAPSHOT_FORMAT_VERSION,
+            'tasks': list(self.tasks.values()),
+            'resources': self.resources,
+            'employees': self.employees,
+            'schedules': {str(tid): {'start': entry['start'].isoformat(), 'end': entry['end'].isoformat(),
+                                     'status': entry.get('status')}
+                          for tid, entry in self.schedules.items()},
+            'resource_assignments': self.resource_assignments,
+            'employee_assignments': self.employee_assignments,
+            'calendars': {str(pid) if pid is not None else 'tenant': _rules_to_json(rules)
+                          for pid, rules in self.calendars.items()}
+        }
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+
+    def copy(self):
+        """Return an independent copy, e.g. for a what-if solve."""
+        return copy.deepcopy(self)
+
+    def load_problem_snapshot(self, project_id=None, calendar=None):
+        """
+        Return the scheduling inputs, as DatabaseManager.load_problem_snapshot does.
+
+        Args:
+            project_id: Optional project to load; dependencies on other projects'
+                        tasks are dropped and their bookings become reservations
+        """
+        tasks = []
+        for task in self.tasks.values():
+            if project_id is not None and task.get('project_id') != project_id:
+                continue
+            tasks.append(dict(task, employees=dict(task['employees']), resources=dict(task['resources'])))
+        loaded = {task['task_id'] for task in tasks}
+        for task in tasks:
+            task['dependencies'] = [dep for dep in task['dependencies'] if dep[0] in loaded]
+
+        snapshot = {
+            'tasks': tasks,
+            'resources': [dict(resource) for resource in self.resources],
+            'employees': [dict(employee) for employee in self.employees]
+        }
+        if project_id is not None:
+            snapshot['reservations'] = self.load_reservations(exclude_project_id=project_id, calendar=calendar)
+        logger.info("Loaded problem snapshot: %s tasks, %s resources, %s employees",
+                    len(tasks), len(self.resources), len(self.employees))
+        return snapshot
+
+    def load_reservations(self, exclude_project_id=None, calendar=None):
+        """
+        Return the bookings of scheduled tasks, as DatabaseManager.load_reservations does.
+
+        Args:
+            exclude_project_id: Skip bookings of this project's tasks
+            calendar: WorkCalendar to convert with; defaults to the tenant calendar
+        """
+        reservations = {'resources': [], 'employees': []}
+        calendar = calendar or get_work_calendar(source=self)
+        for key, pairs in (('resources', self.resource_assignments), ('employees', self.employee_assignments)):
+            for task_id, member_id in pairs:
+                entry = self.schedules.get(task_id)
+                task = self.tasks.get(task_id)
+                if entry is None or task is None or entry.get('status') in ('Completed', 'Skipped'):
+                    continue
+                if exclude_project_id is not None and task.get('project_id') == exclude_project_id:
+                    continue
+                start = min(calendar.to_units(entry['start']), WORKING_HORIZON)
+                end = min(calendar.to_units(entry['end']), WORKING_HORIZON)
+                if end > start:
+                    reservations[key].append([member_id, start, end])
+        return reservations
+
+    def load_current_plan(self, calendar=None):
+        """Return the stored schedule and assignments, as DatabaseManager.load_current_plan does."""
+        calendar = calendar or get_work_calendar(source=self)
+        plan = {tid: {'start': calendar.to_units(entry['start']), 'resources': set(), 'employees': set()}
+                for tid, entry in self.schedules.items()}
+        for key, pairs in (('resources', self.resource_assignments), ('employees', self.employee_assignments)):
+            for task_id, member_id in pairs:
+                if task_id in plan:
+                    plan[task_id][key].add(member_id)
+        return plan
+
+    def load_resources_and_employees(self):
+        return [dict(resource) for resource in self.resources], [dict(employee) for employee in self.employees]
+
+    def load_task_schedules(self, task_ids):
+        return {tid: dict(self.schedules[tid], name=self.tasks[tid]['name'], project_id=self.tasks[tid].get('project_id'))
+                for tid in task_ids if tid in self.schedules and tid in self.tasks}
+
+    def calendar_key(self):
+        # By content: snapshots with the same rules share compiled calendars
+        return ('snapshot', json.dumps({str(pid): _rules_to_json(rules) for pid, rules in self.calendars.items()},
+                                       sort_keys=True))
+
+    def load_calendar_rules(self, project_id=None):
+        """Return the copied rules of the project, else the tenant's, else None (default week)."""
+        return self.calendars.get(project_id) or self.calendars.get(None)
+
+    def get_dependency_index(self):
+        return build_dependency_index(
+            (tid, dep[0], float(dep[1]), dep[2] if len(dep) > 2 else 'FS')
+            for tid, task in self.tasks.items() for dep in task['dependencies']
+        )
+
+    def get_resource_availability(self, resource_category):
+        return sum(1 for resource in self.resources
+                   if resource['type'] == resource_category and resource['availability'])
+
+    def get_employee_availability(self, group):
+        group = (group or '').lower()
+        return sum(1 for employee in self.employees if (employee['skill_set'] or '').lower() == group)
+
+    def update_schedule(self, schedule_results, preserve_task_ids=None, calendar=None):
+        """Store solver results; tasks under way or finished keep their status."""
+        calendar = calendar or get_work_calendar(source=self)
+        for task_id, planned_start, planned_end, status in schedule_rows(schedule_results, preserve_task_ids,
+                                                                         calendar):
+            previous = self.schedules.get(task_id, {}).get('status')
+            self.schedules[task_id] = {'start': planned_start, 'end': planned_end,
+                                       'status': previous if previous in KEPT_STATUSES else status}
+
+    def save_assignments(self, resource_assignments, employee_assignments, preserve_task_ids=None):
+        preserve_task_ids = set(preserve_task_ids or [])
+        for attribute, assignments, member_key in (('resource_assignments', resource_assignments, 'resource_id'),
+                                                   ('employee_assignments', employee_assignments, 'employee_id')):
+            kept = [pair for pair in getattr(self, attribute) if pair[0] in preserve_task_ids]
+            new = [(a['task_id'], a[member_key]) for a in assignments if a['task_id'] not in preserve_task_ids]
+            setattr(self, attribute, list(dict.fromkeys(kept + new)))
+
+    def apply_schedule_changes(self, changes, change_type):
+        for change in changes:
+            entry = self.schedules.setdefault(change['task_id'], {'status': 'Scheduled'})
+            entry['start'], entry['end'] = change['new_start'], change['new_end']
+            self.change_log.append(dict(change, change_type=change_type))
+
+    def log_optimization(self, project_id, optimization_type, status, details):
+        self.optimization_history.append({'project_id': project_id, 'optimization_type': optimization_type,
+                                          'status': status, 'details': details, 'time': datetime.now()})
@@ -0,0 +1,191 @@
+#!/usr/bin/env python
+"""
+Versioned database migrations for the indexes behind the hot query shapes.
+
+setup.sql only defines primary keys and foreign keys, so the conflict checks
+(check_resource_conflicts, handle_resource_conflict), the dependency lookups
+and the clock-in/out progress lookups scan whole tables. The migrations below
+add the supporting indexes. Applied versions are recorded in the
+schema_migrations table, so running the module again only applies new ones.
+
+The assignment overlap exclusion constraint is optional and only applied when
+requested. It rejects two assignments of the same employee (or resource) whose
+start_date/end_date ranges overlap. Rows without both dates are not checked.
+Creating it fails if the existing data already overlaps. It uses
+int4range(id, id, '[]') for the equality part, so the btree_gist extension is
+not needed.
+
+Usage:
+    python src/db_migrations.py                       # apply pending migrations
+    python src/db_migrations.py --status              # list migrations and whether they are applied
+    python src/db_migrations.py --with-overlap-exclusion
+"""
+import argparse
+import logging
+
+import psycopg2
+
+from db_pool import get_connection, release_connection
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS = [
+    {
+        'version': 1,
+        'name': 'schedule_status_and_range_indexes',
+        'optional': False,
+        'statements': [
+            # Status filters ('Scheduled', 'Blocked', 'In Progress', ...)
+            "CREATE INDEX IF NOT EXISTS idx_schedules_status ON schedules (status)",
+            # planned_start < x AND planned_end > y overlap checks
+            "CREATE INDEX IF NOT EXISTS idx_schedules_planned_range ON schedules (planned_start, planned_end)",
+        ]
+    },
+    {
+        'version': 2,
+        'name': 'dependency_and_assignment_lookup_indexes',
+        'optional': False,
+        'statements': [
+            # Successor lookups (WHERE depends_on_task_id = %s)
+            "CREATE INDEX IF NOT EXISTS idx_dependencies_depends_on ON dependencies (depends_on_task_id, task_id)",
+            # Conflict checks join assignments of one employee/resource to their schedules
+            "CREATE INDEX IF NOT EXISTS idx_employee_assignments_employee ON employee_assignments (employee_id, task_id)",
+            "CREATE INDEX IF NOT EXISTS idx_resource_assignments_resource ON resource_assignments (resource_id, task_id)",
+            "CREATE INDEX IF NOT EXISTS idx_employee_assignments_task ON employee_assignments (task_id)",
+            "CREATE INDEX IF NOT EXISTS idx_resource_assignments_task ON resource_assignments (task_id)",
+        ]
+    },
+    {
+        'version': 3,
+        'name': 'task_progress_latest_index',
+        'optional': False,
+        'statements': [
+            # WHERE task_id = %s ORDER BY progress_id DESC LIMIT 1
+            "CREATE INDEX IF NOT EXISTS idx_task_progress_task_latest ON task_progress (task_id, progress_id DESC)",
+        ]
+    },
+    {
+        'version': 4,
+        'name': 'assignment_overlap_exclusion',
+        'optional': True,
+        'statements': [
+            """
+            ALTER TABLE employee_assignments
+            ADD CONSTRAINT employee_assignments_no_overlap EXCLUDE USING gist (
+                int4range(employee_id, employee_id, '[]') WITH &&,
+                tsrange(start_date, end_date) WITH &&
+            ) WHERE (start_date IS NOT NULL AND end_date IS NOT NULL)
+            """,
+            """
+            ALTER TABLE resource_assignments
+            ADD CONSTRAINT resource_assignments_no_overlap EXCLUDE USING gist (
+                int4range(resource_id, resource_id, '[]') WITH &&,
+                tsrange(start_date, end_date) WITH &&
+            ) WHERE (start_date IS NOT NULL AND end_date IS NOT NULL)
+            """,
+        ]
+    },
+]
+
+
+def _ensure_migrations_table(cur):
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INTEGER PRIMARY KEY,
+            name VARCHAR(100) NOT NULL,
+            applied_at TIMESTAMP WITHOUT TIME ZONE DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+
+def get_applied_versions(conn):
+    """
+    Return the migration versions already applied to the database.
+
+    Args:
+        conn: psycopg2 connection
+
+    Returns:
+        set: Applied version numbers
+    """
+    cur = conn.cursor()
+    try:
+        _ensure_migrations_table(cur)
+        cur.execute("SELECT version FROM schema_migrations")
+        versions = {row[0] for row in cur.fetchall()}
+        conn.commit()
+        return versions
+    finally:
+        cur.close()
+
+
+def apply_migrations(conn, include_optional=False, target_version=None):
+    """
+    Apply pending migrations in version order, each in its own transaction.
+
+    Args:
+        conn: psycopg2 connection
+        include_optional: Also apply optional migrations (the overlap exclusion)
+        target_version: Stop after this version (default: apply all)
+
+    Returns:
+        list: Versions applied by this call
+    """
+    applied = get_applied_versions(conn)
+    newly_applied = []
+    for migration in sorted(MIGRATIONS, key=lambda m: m['version']):
+        version = migration['version']
+        if target_version is not None and version > target_version:
+            break
+        if version in applied or (migration['optional'] and not include_optional):
+            continue
+
+        cur = conn.cursor()
+        try:
+            for statement in migration['statements']:
+                cur.execute(statement)
+            cur.execute("INSERT INTO schema_migrations (version, name) VALUES (%s, %s)",
+                        (version, migration['name']))
+            conn.commit()
+        except psycopg2.Error as e:
+            conn.rollback()
+            logger.error("Migration %s (%s) failed: %s", version, migration['name'], e)
+            raise
+        finally:
+            cur.close()
+        logger.info("Applied migration %s (%s)", version, migration['name'])
+        newly_applied.append(version)
+    return newly_applied
+
+
+def main():
+    from initial_scheduler import DB_PARAMS
+    from logging_config import configure_logging
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--status', action='store_true', help='Only list migrations and whether they are applied')
+    parser.add_argument('--with-overlap-exclusion', action='store_true',
+                        help='Also add the optional assignment overlap exclusion constraints')
+    parser.add_argument('--target', type=int, default=None, help='Apply migrations up to this version only')
+    args = parser.parse_args()
+
+    configure_logging()
+    conn = get_connection(DB_PARAMS)
+    try:
+        if args.status:
+            applied = get_applied_versions(conn)
+            for migration in MIGRATIONS:
+                state = 'applied' if migration['version'] in applied else 'pending'
+                if migration['optional'] and state == 'pending':
+                    state = 'pending (optional)'
+                print(f"{migration['version']:>3}  {migration['name']:<45} {state}")
+            return
+        versions = apply_migrations(conn, include_optional=args.with_overlap_exclusion,
+                                    target_version=args.target)
+        print(f"Applied {len(versions)} migration(s): {versions}" if versions else "Database is up to date")
+    finally:
+        release_connection(DB_PARAMS, conn)
+
+
+if __name__ == '__main__':
+    main()
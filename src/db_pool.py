@@ -0,0 +1,241 @@
+#!/usr/bin/env python
+"""
+Shared PostgreSQL connection pools for the scheduler, rescheduler and API.
+
+Connections are checked out per request (or per DatabaseManager) and
+returned when the caller is done, so the connection setup cost is paid once
+per pooled connection and not once per request. One pool is kept per set of
+connection parameters. Pool sizes and health-check behaviour come from
+environment variables, or from configure_pool() before the first checkout:
+
+    RSO_DB_POOL_MIN              Connections opened up front (default 1)
+    RSO_DB_POOL_MAX              Maximum open connections (default 10)
+    RSO_DB_POOL_TIMEOUT          Seconds to wait for a free connection (default 30)
+    RSO_DB_POOL_HEALTH_CHECK     Idle seconds after which a connection is pinged
+                                 with SELECT 1 before reuse (default 30, 0 = always)
+"""
+import atexit
+import logging
+import os
+import threading
+import time
+
+import psycopg2
+from psycopg2 import pool as pg_pool
+from psycopg2 import extensions as pg_extensions
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POOL_MIN = 1
+DEFAULT_POOL_MAX = 10
+DEFAULT_CHECKOUT_TIMEOUT = 30
+DEFAULT_HEALTH_CHECK_INTERVAL = 30
+
+_pools = {}
+_pools_lock = threading.Lock()
+_pool_settings = {}
+
+
+def _env_number(name, default, cast=int):
+    """Read a numeric setting from the environment, falling back to the default."""
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    try:
+        return cast(value)
+    except ValueError:
+        logger.warning("Ignoring invalid %s=%r, using %s", name, value, default)
+        return default
+
+
+def _pool_key(params):
+    return tuple(sorted(params.items()))
+
+
+def configure_pool(minconn=None, maxconn=None, checkout_timeout=None, health_check_interval=None):
+    """
+    Override the pool settings for pools created after this call.
+
+    Args:
+        minconn: Connections opened when a pool is created
+        maxconn: Maximum number of open connections per pool
+        checkout_timeout: Seconds to wait for a free connection before failing
+        health_check_interval: Idle seconds after which a connection is pinged before reuse
+    """
+    for name, value in (('minconn', minconn), ('maxconn', maxconn),
+                        ('checkout_timeout', checkout_timeout),
+                        ('health_check_interval', health_check_interval)):
+        if value is not None:
+            _pool_settings[name] = value
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of connections for one set of connection parameters.
+
+    Wraps psycopg2's ThreadedConnectionPool with a blocking checkout (instead
+    of failing as soon as the pool is exhausted) and a health check that
+    discards broken connections before they are handed out.
+    """
+
+    def __init__(self, params, minconn, maxconn, checkout_timeout, health_check_interval):
+        self.params = dict(params)
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.checkout_timeout = checkout_timeout
+        self.health_check_interval = health_check_interval
+        self._pool = pg_pool.ThreadedConnectionPool(minconn, maxconn, **self.params)
+        self._slots = threading.BoundedSemaphore(maxconn)
+        self._last_used = {}  # id(conn) -> time the connection was returned
+        logger.info("Created connection pool for %s on %s (min=%s, max=%s)",
+                    self.params.get('dbname'), self.params.get('host'), minconn, maxconn)
+
+    def _is_healthy(self, conn):
+        """Return True if the connection can be handed out."""
+        if conn.closed:
+            return False
+        if conn.info.transaction_status == pg_extensions.TRANSACTION_STATUS_UNKNOWN:
+            return False
+        last_used = self._last_used.get(id(conn))
+        if last_used is None or time.monotonic() - last_used < self.health_check_interval:
+            # Freshly opened, or used recently enough to trust
+            return True
+        try:
+            cur = conn.cursor()
+            cur.execute("SELECT 1")
+            cur.close()
+            conn.rollback()
+            return True
+        except psycopg2.Error as e:
+            logger.warning("Discarding unhealthy pooled connection: %s", e)
+            return False
+
+    def getconn(self, autocommit=False):
+        """
+        Check out a connection, waiting up to checkout_timeout for a free one.
+
+        Args:
+            autocommit: Autocommit mode to set on the returned connection
+
+        Returns:
+            connection: A healthy psycopg2 connection
+        """
+        if not self._slots.acquire(timeout=self.checkout_timeout):
+            raise pg_pool.PoolError(
+                f"No database connection available after {self.checkout_timeout}s (max={self.maxconn})")
+        try:
+            # A pool of maxconn connections can hold at most maxconn broken ones
+            for _ in range(self.maxconn + 1):
+                conn = self._pool.getconn()
+                if self._is_healthy(conn):
+                    conn.autocommit = autocommit
+                    return conn
+                self._last_used.pop(id(conn), None)
+                self._pool.putconn(conn, close=True)
+            raise pg_pool.PoolError("Could not obtain a healthy database connection")
+        except Exception:
+            self._slots.release()
+            raise
+
+    def putconn(self, conn, close=False):
+        """
+        Return a connection to the pool.
+
+        Args:
+            conn: Connection previously returned by getconn
+            close: Close the connection instead of keeping it for reuse
+        """
+        try:
+            if not conn.closed and not close:
+                # Leave no open transaction behind for the next borrower
+                if conn.info.transaction_status != pg_extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+                conn.autocommit = False
+                self._last_used[id(conn)] = time.monotonic()
+            else:
+                self._last_used.pop(id(conn), None)
+            self._pool.putconn(conn, close=close or conn.closed)
+        except Exception as e:
+            logger.warning("Error returning connection to pool: %s", e)
+            try:
+                self._pool.putconn(conn, close=True)
+            except Exception:
+                pass
+        finally:
+            self._slots.release()
+
+    def closeall(self):
+        """Close every connection held by the pool."""
+        if not self._pool.closed:
+            self._pool.closeall()
+        self._last_used.clear()
+
+
+def get_pool(params):
+    """
+    Return the shared pool for the given connection parameters, creating it on first use.
+
+    Args:
+        params: psycopg2.connect keyword arguments
+
+    Returns:
+        ConnectionPool: The pool for these parameters
+    """
+    key = _pool_key(params)
+    pool = _pools.get(key)
+    if pool is not None:
+        return pool
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            minconn = _pool_settings.get('minconn', _env_number('RSO_DB_POOL_MIN', DEFAULT_POOL_MIN))
+            maxconn = _pool_settings.get('maxconn', _env_number('RSO_DB_POOL_MAX', DEFAULT_POOL_MAX))
+            pool = ConnectionPool(
+                params,
+                minconn=min(minconn, maxconn),
+                maxconn=maxconn,
+                checkout_timeout=_pool_settings.get(
+                    'checkout_timeout', _env_number('RSO_DB_POOL_TIMEOUT', DEFAULT_CHECKOUT_TIMEOUT, float)),
+                health_check_interval=_pool_settings.get(
+                    'health_check_interval',
+                    _env_number('RSO_DB_POOL_HEALTH_CHECK', DEFAULT_HEALTH_CHECK_INTERVAL, float))
+            )
+            _pools[key] = pool
+    return pool
+
+
+def get_connection(params, autocommit=False):
+    """
+    Check out a connection from the shared pool for these parameters.
+
+    Args:
+        params: psycopg2.connect keyword arguments
+        autocommit: Autocommit mode to set on the returned connection
+
+    Returns:
+        connection: A pooled psycopg2 connection; hand it back with release_connection
+    """
+    return get_pool(params).getconn(autocommit=autocommit)
+
+
+def release_connection(params, conn, close=False):
+    """
+    Return a connection obtained from get_connection to its pool.
+
+    Args:
+        params: The parameters the connection was checked out with
+        conn: The connection to return
+        close: Close the connection instead of keeping it for reuse
+    """
+    get_pool(params).putconn(conn, close=close)
+
+
+def close_all_pools():
+    """Close every pool created in this process."""
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.closeall()
+        _pools.clear()
+
+
+atexit.register(close_all_pools)
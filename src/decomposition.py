@@ -0,0 +1,412 @@
+#!/usr/bin/env python
+"""
+Split a scheduling problem into independent subproblems and solve them in parallel.
+
+One CP-SAT model over every project grows with the number of projects. The
+search gets slower even when projects never compete for the same people or
+equipment. Two decompositions are supported:
+
+  'project'   - one subproblem per project. Employee groups and resource
+                categories needed by several projects are split between them
+                before solving (capacity reservation). Each project gets at
+                least the largest count one of its tasks needs, and the rest
+                goes by workload (duration x count). If a pool is too small for
+                that, the two projects with the least workload on it are solved
+                together. This repeats until every shared pool can be split.
+  'component' - one subproblem per group of projects that are linked,
+                directly or transitively, by a shared employee group or
+                resource category. Subproblems share nothing, so no
+                reservation is needed.
+
+Tasks linked by a dependency always stay in the same subproblem. Phase ordering
+applies within each subproblem. With 'project' this means per project. The
+monolithic model orders phases across every project.
+
+Subproblems are solved in separate processes. Each one builds its own
+ConstructionScheduler from plain snapshot data and never touches the database.
+The caller merges the results and writes them once.
+"""
+import logging
+import multiprocessing
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from ortools.sat.python import cp_model
+
+from initial_scheduler import (
+    ConstructionScheduler, DECOMPOSITION_PROJECT, DECOMPOSITION_COMPONENT, SCALE_FACTOR, SOLVER_PROFILE,
+    get_work_calendar
+)
+from model_cache import get_model_cache
+from early_stopping import EarlyStoppingCallback, watch_search
+from solver_profiles import available_cores, get_solve_history, search_workers, solver_time_limit, stop_criteria
+
+logger = logging.getLogger(__name__)
+
+# Stop flag shared with worker processes (set by _init_worker)
+_stop_flag = None
+
+
+def _task_pools(task):
+    """Yield (pool key, count) for each resource category and employee group a task needs."""
+    for category, count in (task.get('resources') or {}).items():
+        yield ('resource', category), count
+    for group, count in (task.get('employees') or {}).items():
+        yield ('employee', group.lower() if group else None), count
+
+
+def _pool_members(snapshot):
+    """
+    Group the snapshot's available resources and employees into pools, keyed the
+    way ConstructionScheduler keys them.
+
+    Returns:
+        dict: (kind, category or lower-case skill set) -> list of member rows
+    """
+    pools = {}
+    for resource in snapshot['resources']:
+        if resource['availability']:
+            pools.setdefault(('resource', resource['type']), []).append(resource)
+    for employee in snapshot['employees']:
+        skill_set = employee['skill_set']
+        pools.setdefault(('employee', skill_set.lower() if skill_set else None), []).append(employee)
+    return pools
+
+
+class _DisjointSet:
+    """Union-find over hashable items."""
+
+    def __init__(self, items):
+        self.parent = {item: item for item in items}
+
+    def find(self, item):
+        root = item
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[item] != root:
+            self.parent[item], item = root, self.parent[item]
+        return root
+
+    def union(self, a, b):
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a != root_b:
+            self.parent[root_b] = root_a
+
+
+def find_subproblems(tasks, mode):
+    """
+    Partition tasks into subproblems.
+
+    Args:
+        tasks: Task dicts as returned by DatabaseManager.load_problem_snapshot
+        mode: 'project' or 'component'
+
+    Returns:
+        list: Lists of task dicts, largest subproblem first
+    """
+    if mode not in (DECOMPOSITION_PROJECT, DECOMPOSITION_COMPONENT):
+        raise ValueError(f"Unknown decomposition: {mode}")
+
+    sets = _DisjointSet(task['task_id'] for task in tasks)
+    first_task = {}  # Linking key -> first task seen with it
+    for task in tasks:
+        tid = task['task_id']
+        for dep in task['dependencies']:
+            if dep[0] in sets.parent:
+                sets.union(tid, dep[0])
+        keys = [('project', task.get('project_id'))]
+        if mode == DECOMPOSITION_COMPONENT:
+            keys.extend(key for key, _ in _task_pools(task))
+        for key in keys:
+            sets.union(first_task.setdefault(key, tid), tid)
+
+    groups = {}
+    for task in tasks:
+        groups.setdefault(sets.find(task['task_id']), []).append(task)
+    return sorted(groups.values(), key=len, reverse=True)
+
+
+def _pool_usage(groups, pools):
+    """
+    Return, per pool, each group's peak single-task need and total workload.
+
+    Returns:
+        dict: pool key -> {group index: [need, workload]}
+    """
+    usage = {}
+    for index, group in enumerate(groups):
+        for task in group:
+            for key, count in _task_pools(task):
+                size = len(pools.get(key, []))
+                if not size:
+                    continue
+                count = min(count, size)  # The scheduler caps demand at the pool size too
+                entry = usage.setdefault(key, {}).setdefault(index, [0, 0])
+                entry[0] = max(entry[0], count)
+                entry[1] += task['duration'] * count
+    return usage
+
+
+def reserve_capacity(snapshot, groups):
+    """
+    Give each subproblem its own share of every employee group and resource
+    category, merging subproblems where a pool cannot be shared.
+
+    Args:
+        snapshot: Full problem snapshot
+        groups: Lists of task dicts from find_subproblems
+
+    Returns:
+        list: One snapshot per subproblem with its tasks and only the members reserved for it
+    """
+    pools = _pool_members(snapshot)
+    groups = list(groups)
+
+    while True:
+        usage = _pool_usage(groups, pools)
+        short = next((key for key, users in usage.items()
+                      if len(users) > 1 and sum(need for need, _ in users.values()) > len(pools[key])), None)
+        if short is None:
+            break
+        # Merge the two users with the least workload on the pool and try again
+        first, second = sorted(usage[short], key=lambda index: usage[short][index][1])[:2]
+        logger.info("Pool %s (%s members) cannot be split; solving subproblems of %s and %s tasks together",
+                    short, len(pools[short]), len(groups[first]), len(groups[second]))
+        merged = groups[first] + groups[second]
+        groups = [group for index, group in enumerate(groups) if index not in (first, second)] + [merged]
+
+    # Split each pool: the peak need first, then the spare members by workload
+    reserved = [{} for _ in groups]  # group index -> pool key -> members
+    for key, users in usage.items():
+        members = pools[key]
+        shares = {index: need for index, (need, _) in users.items()}
+        spare = len(members) - sum(shares.values())
+        total_load = sum(load for _, load in users.values()) or 1
+        quotas = {index: spare * load / total_load for index, (_, load) in users.items()}
+        for index in quotas:
+            shares[index] += int(quotas[index])
+        # Largest remainder for what integer division left over
+        leftover = len(members) - sum(shares.values())
+        for index in sorted(quotas, key=lambda i: quotas[i] - int(quotas[i]), reverse=True)[:leftover]:
+            shares[index] += 1
+
+        offset = 0
+        for index in sorted(shares):
+            reserved[index][key] = members[offset:offset + shares[index]]
+            offset += shares[index]
+        if len(users) > 1:
+            logger.info("Split pool %s between subproblems: %s", key, shares)
+
+    subproblems = []
+    for index, group in enumerate(groups):
+        resources = [member for (kind, _), members in reserved[index].items() if kind == 'resource'
+                     for member in members]
+        employees = [member for (kind, _), members in reserved[index].items() if kind == 'employee'
+                     for member in members]
+        subproblem = {'tasks': group, 'resources': resources, 'employees': employees}
+        if snapshot.get('reservations'):
+            subproblem['reservations'] = snapshot['reservations']
+        subproblems.append(subproblem)
+    return subproblems
+
+
+def _init_worker(stop_flag):
+    global _stop_flag
+    _stop_flag = stop_flag
+
+
+def solve_subproblem(subproblem, stop_event=None):
+    """
+    Build and solve one subproblem. Runs in a worker process, so it takes and
+    returns plain data only.
+
+    Args:
+        subproblem: Dict with 'index', 'snapshot', 'resource_mode', 'symmetry_breaking',
+                    'plan' (warm-start hints or None), 'use_model_cache', 'repair_hints',
+                    'solver_profile' (time limit) and 'num_workers', and optionally
+                    'stop_criteria' overrides, and 'horizon', 'min_starts' and the
+                    WorkCalendar 'calendar' for the ConstructionScheduler
+        stop_event: Event that cancels the solve; defaults to the stop flag
+                    shared with the worker process
+
+    Returns:
+        dict: 'index', 'status', 'makespan', 'schedule', 'resource_assignments',
+              'employee_assignments', 'solution_count', 'task_count', 'elapsed',
+              'model_from_cache' and 'stop_reason'
+    """
+    stop_event = stop_event or _stop_flag
+    started = time.time()
+    snapshot = subproblem['snapshot']
+    scheduler = ConstructionScheduler(snapshot['tasks'], None,
+                                      resource_mode=subproblem['resource_mode'],
+                                      symmetry_breaking=subproblem['symmetry_breaking'],
+                                      snapshot=snapshot,
+                                      model_cache=get_model_cache() if subproblem['use_model_cache'] else None,
+                                      horizon=subproblem.get('horizon'),
+                                      min_starts=subproblem.get('min_starts'),
+                                      calendar=subproblem.get('calendar'))
+    if subproblem['plan']:
+        scheduler.add_solution_hints(subproblem['plan'])
+
+    stats = scheduler.model_statistics()
+    solver = cp_model.CpSolver()
+    solver.parameters.max_time_in_seconds = solver_time_limit(subproblem['solver_profile'], stats)
+    solver.parameters.num_search_workers = subproblem['num_workers']
+    solver.parameters.random_seed = 42
+    if subproblem['repair_hints']:
+        solver.parameters.repair_hint = True
+    callback = EarlyStoppingCallback(stop_criteria(subproblem['solver_profile'],
+                                                  solver.parameters.max_time_in_seconds,
+                                                  subproblem.get('stop_criteria')))
+    callback.configure(solver)
+
+    # Same cancellation and stagnation watch as cp_sat_scheduler
+    solve_done = watch_search(callback, stop_event)
+    try:
+        status = solver.Solve(scheduler.model, callback)
+    finally:
+        solve_done.set()
+    stop_reason = callback.finish(solver, status)
+    status_name = callback.status_name(solver, status)
+    if stop_reason != 'cancelled':
+        get_solve_history().record(stats, subproblem['solver_profile'], subproblem['num_workers'],
+                                   status_name, solver.WallTime(), callback.solution_time, stop_reason)
+
+    result = {
+        'index': subproblem['index'],
+        'status': status_name,
+        'makespan': None,
+        'schedule': [],
+        'resource_assignments': [],
+        'employee_assignments': [],
+        'solution_count': callback.solution_count,
+        'task_count': len(snapshot['tasks']),
+        'model_from_cache': scheduler.model_from_cache,
+        'stop_reason': stop_reason
+    }
+    if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        result['schedule'], result['resource_assignments'], result['employee_assignments'] = \
+            scheduler.extract_solution(solver)
+        result['makespan'] = solver.Value(scheduler.makespan)
+    result['elapsed'] = round(time.time() - started, 2)
+    return result
+
+
+def solve_decomposed(snapshot, mode, resource_mode=None, symmetry_breaking=None, plan=None,
+                     use_model_cache=False, repair_hints=False, max_processes=None,
+                     progress_callback=None, stop_event=None, solver_profile=None, stop_criteria=None,
+                     calendar=None):
+    """
+    Decompose the problem, solve the subproblems in parallel and merge the results.
+
+    Args:
+        snapshot: Problem snapshot (tasks to schedule, resources, employees)
+        mode: 'project' or 'component'
+        resource_mode: Resource model mode passed to each ConstructionScheduler
+        symmetry_breaking: Symmetry breaking mode passed to each ConstructionScheduler
+        plan: Optional result of DatabaseManager.load_current_plan used as hints
+        use_model_cache: Reuse cached models of unchanged subproblems
+        repair_hints: Let the solver repair infeasible hints
+        max_processes: Maximum worker processes (default: available cores)
+        progress_callback: Optional callable invoked with a progress dict after each subproblem
+        stop_event: Optional threading.Event that cancels every subproblem
+        solver_profile: Solver profile of every subproblem; defaults to SOLVER_PROFILE
+        stop_criteria: Optional early stopping criteria replacing the profile's
+        calendar: WorkCalendar of every subproblem; defaults to the default working week
+
+    Returns:
+        dict: 'status' (OPTIMAL only if every subproblem is, otherwise FEASIBLE,
+              or the status of the first subproblem without a solution),
+              'makespan' (latest subproblem makespan), 'solution_count', the
+              merged 'schedule', 'resource_assignments' and 'employee_assignments',
+              and a 'subproblems' summary
+    """
+    started = time.time()
+    subproblems = reserve_capacity(snapshot, find_subproblems(snapshot['tasks'], mode))
+    processes = max(1, min(len(subproblems), max_processes or available_cores()))
+    solver_profile = solver_profile or SOLVER_PROFILE
+    # Share the cores between the processes that run at the same time
+    num_workers = search_workers(solver_profile, processes)
+    # Passed to every worker, so that worker processes need no data source for it
+    calendar = calendar or get_work_calendar()
+    logger.info("Decomposed %s tasks by %s into %s subproblems %s; solving with %s processes x %s workers",
+                len(snapshot['tasks']), mode, len(subproblems),
+                [len(sub['tasks']) for sub in subproblems], processes, num_workers)
+
+    payloads = [{
+        'index': index,
+        'snapshot': sub,
+        'resource_mode': resource_mode,
+        'symmetry_breaking': symmetry_breaking,
+        'plan': {task['task_id']: plan[task['task_id']] for task in sub['tasks'] if task['task_id'] in plan}
+                if plan else None,
+        'use_model_cache': use_model_cache,
+        'repair_hints': repair_hints,
+        'solver_profile': solver_profile,
+        'stop_criteria': stop_criteria,
+        'num_workers': num_workers,
+        'calendar': calendar
+    } for index, sub in enumerate(subproblems)]
+
+    results = []
+
+    def _collect(result):
+        results.append(result)
+        logger.info("Subproblem %s (%s tasks): %s, makespan %s, %.2fs", result['index'], result['task_count'],
+                    result['status'], result['makespan'], result['elapsed'])
+        if progress_callback is not None:
+            makespans = [r['makespan'] for r in results if r['makespan'] is not None]
+            best = max(makespans) if makespans else None
+            progress_callback({
+                'solution_count': sum(r['solution_count'] for r in results),
+                'best_makespan': best,
+                'best_makespan_hours': best / SCALE_FACTOR if best is not None else None,
+                'elapsed': round(time.time() - started, 2),
+                'subproblems_done': len(results),
+                'subproblems': len(payloads)
+            })
+
+    if processes == 1:
+        for payload in payloads:
+            if stop_event is not None and stop_event.is_set():
+                break
+            _collect(solve_subproblem(payload, stop_event=stop_event))
+    else:
+        # Spawned workers do not inherit the API's threads, locks or pooled connections
+        context = multiprocessing.get_context('spawn')
+        stop_flag = context.Event()
+        with ProcessPoolExecutor(max_workers=processes, mp_context=context,
+                                 initializer=_init_worker, initargs=(stop_flag,)) as executor:
+            pending = {executor.submit(solve_subproblem, payload) for payload in payloads}
+            while pending:
+                done, pending = wait(pending, timeout=0.2, return_when=FIRST_COMPLETED)
+                if stop_event is not None and stop_event.is_set():
+                    stop_flag.set()
+                    for future in pending:
+                        future.cancel()  # Queued subproblems never start
+                for future in done:
+                    if future.cancelled():
+                        continue  # Never started; counted as missing below
+                    _collect(future.result())
+
+    results.sort(key=lambda r: r['index'])
+    failed = [r for r in results if r['status'] not in ('OPTIMAL', 'FEASIBLE')]
+    if failed:
+        status = failed[0]['status']
+    elif len(results) < len(payloads):
+        status = 'UNKNOWN'  # Cancelled before every subproblem ran
+    else:
+        status = 'OPTIMAL' if all(r['status'] == 'OPTIMAL' for r in results) else 'FEASIBLE'
+
+    makespans = [r['makespan'] for r in results if r['makespan'] is not None]
+    return {
+        'status': status,
+        'makespan': max(makespans) if makespans else None,
+        'solution_count': sum(r['solution_count'] for r in results),
+        'schedule': [entry for r in results for entry in r['schedule']],
+        'resource_assignments': [entry for r in results for entry in r['resource_assignments']],
+        'employee_assignments': [entry for r in results for entry in r['employee_assignments']],
+        'subproblems': [{key: r[key] for key in ('index', 'task_count', 'status', 'makespan', 'elapsed',
+                                                 'model_from_cache', 'stop_reason')}
+                        for r in results]
+    }
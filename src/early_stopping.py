@@ -0,0 +1,165 @@
+#!/usr/bin/env python
+"""
+Early termination of CP-SAT searches.
+
+Most solves find their final makespan within seconds and then spend the rest
+of the time limit trying to prove it optimal. EarlyStoppingCallback ends the
+search as soon as one of these criteria holds:
+
+  relative_gap         - (best makespan - best bound) / best makespan is at or
+                         below this fraction
+  stagnation_seconds   - no better makespan for this many seconds
+  stagnation_solutions - this many solutions in a row without a better makespan
+  target_makespan      - the best makespan is at or below this (working time units)
+  solution_timeout     - a solution is found after this many seconds
+
+Each run ends with a stop_reason: the criterion that held, 'optimal',
+'infeasible', 'time_limit' or 'cancelled'.
+"""
+import logging
+import threading
+import time
+
+from ortools.sat.python import cp_model
+
+logger = logging.getLogger(__name__)
+
+STOP_CRITERIA = ('relative_gap', 'stagnation_seconds', 'stagnation_solutions', 'target_makespan', 'solution_timeout')
+
+
+class EarlyStoppingCallback(cp_model.CpSolverSolutionCallback):
+    """
+    Solution callback that tracks the best makespan and stops the search on
+    the configured criteria. Subclasses extending on_solution_callback call
+    the base method first.
+    """
+
+    def __init__(self, criteria=None):
+        cp_model.CpSolverSolutionCallback.__init__(self)
+        self.criteria = {key: value for key, value in (criteria or {}).items() if value is not None}
+        unknown = set(self.criteria) - set(STOP_CRITERIA)
+        if unknown:
+            raise ValueError(f"Unknown stop criteria: {sorted(unknown)}")
+        self.start_time = time.time()
+        self.solution_count = 0
+        self.best_objective = None
+        self.solution_time = None  # Seconds until the best solution
+        self.last_improvement = None
+        self.solutions_since_improvement = 0
+        self.stop_reason = None
+
+    def on_solution_callback(self):
+        now = time.time()
+        self.solution_count += 1
+        objective = self.ObjectiveValue()
+        if self.best_objective is None or objective < self.best_objective:
+            self.best_objective = objective
+            self.solution_time = now - self.start_time
+            self.last_improvement = now
+            self.solutions_since_improvement = 0
+        else:
+            self.solutions_since_improvement += 1
+
+        criteria = self.criteria
+        if 'target_makespan' in criteria and self.best_objective <= criteria['target_makespan']:
+            self.stop('target_makespan')
+        elif 'relative_gap' in criteria and \
+                self.best_objective - self.BestObjectiveBound() <= criteria['relative_gap'] * max(abs(self.best_objective), 1):
+            self.stop('relative_gap')
+        elif 'stagnation_solutions' in criteria and self.solutions_since_improvement >= criteria['stagnation_solutions']:
+            self.stop('stagnation_solutions')
+        elif 'solution_timeout' in criteria and now - self.start_time > criteria['solution_timeout']:
+            self.stop('solution_timeout')
+        else:
+            self.poll()
+
+    def configure(self, solver):
+        """
+        Hand the gap criterion to the solver as well: the callback only sees the
+        bound when a solution arrives, while most of the bound's progress comes
+        between solutions.
+
+        Args:
+            solver: CpSolver about to run with this callback
+        """
+        if 'relative_gap' in self.criteria:
+            solver.parameters.relative_gap_limit = self.criteria['relative_gap']
+
+    def poll(self):
+        """
+        Check the time-based criteria; also called between solutions.
+
+        Returns:
+            bool: True once the search has been stopped
+        """
+        if self.stop_reason is None and 'stagnation_seconds' in self.criteria and self.last_improvement is not None \
+                and time.time() - self.last_improvement >= self.criteria['stagnation_seconds']:
+            self.stop('stagnation_seconds')
+        return self.stop_reason is not None
+
+    def stop(self, reason):
+        """Stop the search, keeping the first reason given."""
+        if self.stop_reason is None:
+            self.stop_reason = reason
+            logger.info("Stopping search (%s) after %.1fs, best makespan %s",
+                        reason, time.time() - self.start_time, self.best_objective)
+            self.StopSearch()
+
+    def finish(self, solver, status):
+        """
+        Settle the stop reason once Solve has returned.
+
+        Args:
+            solver: CpSolver that ran the search
+            status: CP-SAT status code returned by Solve
+
+        Returns:
+            str: The stop reason
+        """
+        if status == cp_model.OPTIMAL:
+            # CP-SAT also reports OPTIMAL when it stops at relative_gap_limit
+            if 'relative_gap' in self.criteria and solver.BestObjectiveBound() < solver.ObjectiveValue():
+                self.stop_reason = 'relative_gap'
+            else:
+                self.stop_reason = 'optimal'
+        elif self.stop_reason is None:
+            if status == cp_model.INFEASIBLE:
+                self.stop_reason = 'infeasible'
+            elif status == cp_model.MODEL_INVALID:
+                self.stop_reason = 'model_invalid'
+            else:
+                self.stop_reason = 'time_limit'
+        return self.stop_reason
+
+    def status_name(self, solver, status):
+        """Return the solver status name, with FEASIBLE for a search that stopped at the gap limit."""
+        if status == cp_model.OPTIMAL and self.stop_reason == 'relative_gap':
+            return 'FEASIBLE'
+        return solver.StatusName(status)
+
+
+def watch_search(callback, stop_event=None, interval=0.2):
+    """
+    Poll a stop event and the callback's time-based criteria from a helper
+    thread while Solve runs. Stops go through the callback: CpSolver.StopSearch
+    is a no-op while Solve runs in OR-Tools 9.6.
+
+    Args:
+        callback: EarlyStoppingCallback passed to Solve
+        stop_event: Optional threading.Event that cancels the search
+        interval: Seconds between checks
+
+    Returns:
+        threading.Event: Set it once Solve has returned to end the thread
+    """
+    solve_done = threading.Event()
+
+    def _watch():
+        while not solve_done.wait(interval):
+            if stop_event is not None and stop_event.is_set():
+                callback.stop('cancelled')
+                return
+            if callback.poll():
+                return
+    threading.Thread(target=_watch, daemon=True).start()
+    return solve_done
@@ -1,22 +1,88 @@
 #!/usr/bin/env python
 import psycopg2
 import psycopg2.extras
+import ortools
 from ortools.sat.python import cp_model
 from datetime import datetime, timedelta, date
 import sys
+import json
 import math
 import time
+import heapq
+import bisect
+import logging
+
+from db_pool import get_connection, release_connection
+from schema_registry import get_schema, refresh_schema
+from model_cache import get_model_cache, problem_fingerprint
+from solver_profiles import (
+    SOLVER_PROFILE_INTERACTIVE, get_solve_history, get_solver_profile, search_workers, solver_time_limit,
+    stop_criteria as get_stop_criteria
+)
+from early_stopping import EarlyStoppingCallback, watch_search
+from calendars import get_calendar_registry
+
+logger = logging.getLogger(__name__)
 
 # ---------------------------
 # Configuration
 # ---------------------------
 SCALE_FACTOR = 100    # 1 unit = 0.01 hours (36 seconds)
-WORK_HOURS_PER_DAY = 8  # Working day = 8 hours (9 AM to 5 PM)
+WORK_HOURS_PER_DAY = 8  # Working day = 8 hours from its start time (9 AM to 5 PM by default)
 UNITS_PER_DAY = WORK_HOURS_PER_DAY * SCALE_FACTOR  # 8 * 100 = 800
 HORIZON_DAYS = 60
 # Our working horizon covers only working hours over NUM_DAYS.
 WORKING_HORIZON = HORIZON_DAYS * UNITS_PER_DAY
 
+# Resource model modes:
+#   'individual' - one Boolean and optional interval per (task, eligible resource/employee)
+#   'aggregate'  - one cumulative per resource category / skill group with capacity equal
+#                  to the pool size; individuals are assigned after solving
+RESOURCE_MODE_INDIVIDUAL = 'individual'
+RESOURCE_MODE_AGGREGATE = 'aggregate'
+RESOURCE_MODE = RESOURCE_MODE_INDIVIDUAL
+
+# Symmetry breaking between interchangeable employees/resources of one pool
+# (individual resource mode only):
+#   None   - off
+#   'load' - members ordered by total assigned duration
+#   'lex'  - members ordered lexicographically by their assignment literals
+SYMMETRY_BREAKING_LOAD = 'load'
+SYMMETRY_BREAKING_LEX = 'lex'
+SYMMETRY_BREAKING = None
+
+# Warm start: feed the persisted schedule and assignments to CP-SAT as solution hints.
+# With REPAIR_HINTS the solver also tries to repair hints that are no longer feasible.
+WARM_START = True
+REPAIR_HINTS = False
+
+# Model cache: reuse the built CP-SAT model from disk when the problem is unchanged
+# (see model_cache.py). Preserved-task pins and hints are applied on top.
+MODEL_CACHE = True
+
+# Decomposition into independent subproblems solved in parallel (see decomposition.py):
+#   None        - one model for every project
+#   'project'   - one subproblem per project; shared employees/resources are split between them
+#   'component' - one subproblem per group of projects linked by shared employee groups or
+#                 resource categories
+DECOMPOSITION_PROJECT = 'project'
+DECOMPOSITION_COMPONENT = 'component'
+DECOMPOSITION = None
+
+# Rolling horizon: solve ROLLING_WINDOW_DAYS working days at a time and re-solve the last
+# ROLLING_OVERLAP_DAYS of each window with the next one (see rolling_horizon.py), so
+# projects longer than HORIZON_DAYS can be scheduled
+ROLLING_HORIZON = False
+ROLLING_WINDOW_DAYS = 20
+ROLLING_OVERLAP_DAYS = 5
+
+# Solver profile when none is given: 'interactive', 'nightly' or 'exhaustive' (see solver_profiles.py)
+SOLVER_PROFILE = SOLVER_PROFILE_INTERACTIVE
+
+# CPM bounds: give each task's start/end variables the earliest start and latest finish
+# that durations, dependency lags and phase order allow, instead of [0, horizon]
+CPM_BOUNDS = True
+
 # Database connection parameters
 DB_PARAMS = {
     'dbname': 'og1',
@@ -28,7 +94,8 @@ DB_PARAMS = {
 # ---------------------------
 # Global Settings
 # ---------------------------
-PROJECT_START_DATE = date.today()    # Project starts today at 9 AM
+PROJECT_START_DATE = date.today()    # Working time unit 0 is the start of today's working day
+DEFAULT_TENANT_ID = 1    # Tenant whose calendar applies to projects without a tenant
 # Phase Order Mapping (lower number means earlier phase)
 PHASE_ORDER = {
     "sales": 1,
@@ -40,80 +107,54 @@ PHASE_ORDER = {
 # ---------------------------
 # Helper Functions
 # ---------------------------
-def working_time_to_datetime(unit):
-    """
-    Convert a working time unit (integer) into a datetime.
-    Each working day is 8 hours. The project day 1 starts at 9 AM on PROJECT_START_DATE.
-    Accounts for weekends by skipping Saturday and Sunday.
+def _no_calendar_rules(project_id):
+    """Rules loader of the default calendar: no rows, so the default working week."""
+    return None
+
+def get_work_calendar(project_id=None, source=None):
     """
-    # Calculate how many full working days and remaining hours
-    full_working_days = unit // UNITS_PER_DAY
-    rem_units = unit % UNITS_PER_DAY
-    hours = rem_units / SCALE_FACTOR  # in hours
-    
-    # Start from the project start date
-    current_date = PROJECT_START_DATE
-    working_days_counted = 0
-    
-    # Advance date until we've counted enough working days
-    while working_days_counted < full_working_days:
-        current_date += timedelta(days=1)
-        if is_working_day(datetime.combine(current_date, datetime.min.time())):
-            working_days_counted += 1
+    Return the compiled work calendar of a project, anchored at PROJECT_START_DATE.
     
-    # Create the datetime with the correct time
-    dt = datetime.combine(current_date, datetime.min.time()) + timedelta(hours=9 + hours)
+    Args:
+        project_id: Project ID, or None for the tenant calendar
+        source: DataSource to read working_hours and holidays from; None gives
+                the default working week without reading any rules
     
-    return dt
+    Returns:
+        WorkCalendar: Cached until the registry is invalidated
+    """
+    if source is None:
+        key, load_rules = ('default',), _no_calendar_rules
+    else:
+        key, load_rules = source.calendar_key(), source.load_calendar_rules
+    return get_calendar_registry().get(key, project_id, PROJECT_START_DATE, load_rules,
+                                       WORK_HOURS_PER_DAY, SCALE_FACTOR)
+
+def working_time_to_datetime(unit, calendar=None):
+    """
+    Convert a working time unit (integer) into a datetime.
+    Each working day is 8 hours. Working day 0 starts on PROJECT_START_DATE at
+    the calendar's day start (9 AM by default); non-working days are skipped.
+    """
+    return (calendar or get_work_calendar()).to_datetime(unit)
 
-def calendar_time_to_working_time(dt):
+def calendar_time_to_working_time(dt, calendar=None):
     """
     Convert a calendar datetime to working time units.
-    Working hours are 9 AM to 5 PM on each working day (Monday-Friday).
-    Returns the number of working time units since project start.
-    """
-    # If weekend, shift to next Monday 9AM
-    if not is_working_day(dt):
-        # Move to the next working day (Monday) at 9 AM
-        while not is_working_day(dt):
-            dt += timedelta(days=1)
-        dt = dt.replace(hour=9, minute=0, second=0, microsecond=0)
-    
-    # Count working days (excluding weekends) between project start and dt
-    working_days = 0
-    current_date = PROJECT_START_DATE
-    while current_date < dt.date():
-        if is_working_day(datetime.combine(current_date, datetime.min.time())):
-            working_days += 1
-        current_date += timedelta(days=1)
-    
-    # Get hours since 9 AM (start of working day)
-    hours_diff = dt.hour - 9 + dt.minute / 60 + dt.second / 3600
-    
-    # Calculate units based on working days
-    units = working_days * UNITS_PER_DAY
-    
-    if hours_diff < 0:
-        # Before work starts, use previous working day's end
-        # Find the previous working day
-        prev_date = dt.date() - timedelta(days=1)
-        while prev_date >= PROJECT_START_DATE and not is_working_day(datetime.combine(prev_date, datetime.min.time())):
-            prev_date -= timedelta(days=1)
-        
-        if prev_date >= PROJECT_START_DATE:
-            # If there is a previous working day, use its end
-            units -= UNITS_PER_DAY - (abs(hours_diff) * SCALE_FACTOR)
-        else:
-            # If no previous working day, use start of project
-            units = 0
-    elif 0 <= hours_diff < WORK_HOURS_PER_DAY:
-        # During working hours
-        units += hours_diff * SCALE_FACTOR
-    elif hours_diff >= WORK_HOURS_PER_DAY:
-        # After working hours, cap at day's end
-        units += WORK_HOURS_PER_DAY * SCALE_FACTOR
-    
-    return max(0, int(units))
+    Returns the number of working time units since project start; see
+    WorkCalendar.from_calendar_time for times outside working hours.
+    """
+    return (calendar or get_work_calendar()).from_calendar_time(dt)
+
+def datetime_to_working_time(dt, calendar=None):
+    """
+    Convert a datetime produced by working_time_to_datetime back to its working
+    time unit. Unlike calendar_time_to_working_time this is the exact inverse
+    even when the project starts on a non-working day (working day 0 is always
+    the start date). Times outside working hours are clamped to the working
+    day; later non-working days snap to the next working day's start.
+    """
+    return (calendar or get_work_calendar()).to_units(dt)
 
 def add_lag_time(base_datetime, lag_hours):
     """
@@ -122,93 +163,457 @@ def add_lag_time(base_datetime, lag_hours):
     """
     return base_datetime + timedelta(hours=lag_hours)
 
-def is_working_day(dt: datetime) -> bool:
+def is_working_day(dt, calendar=None) -> bool:
     """
-    Check if the given datetime falls on a working day (Monday-Friday).
-    Returns True for weekdays, False for weekends.
+    Check if the given datetime or date falls on a working day of the calendar
+    (Monday-Friday without holidays by default).
     """
-    return dt.weekday() < 5  # Monday=0 ... Friday=4
+    day = dt.date() if isinstance(dt, datetime) else dt
+    return (calendar or get_work_calendar()).is_working_date(day)
 
-def get_next_working_time(dt):
+def get_next_working_time(dt, calendar=None):
     """
     Given a datetime, return the next valid working time.
-    If dt falls within working hours (9 AM - 5 PM) on a working day, return dt unchanged.
-    Otherwise, move to the next valid working time, skipping weekends.
-    """
-    # First, ensure we're on a working day
-    while not is_working_day(dt):
-        dt = dt.replace(hour=9, minute=0, second=0, microsecond=0)
-        dt += timedelta(days=1)
-    
-    # Now check if it's within working hours (9 AM - 5 PM)
-    hour = dt.hour
-    if 9 <= hour < 17:
-        # Already within working hours on a working day
-        return dt
-    elif hour < 9:
-        # Before work starts, move to 9 AM same day
-        return dt.replace(hour=9, minute=0, second=0, microsecond=0)
-    else:
-        # After work ends, move to 9 AM next working day
-        next_day = dt.date() + timedelta(days=1)
-        next_dt = datetime.combine(next_day, datetime.min.time()).replace(hour=9)
-        
-        # If next_day is weekend, skip ahead to Monday
-        while not is_working_day(next_dt):
-            next_dt += timedelta(days=1)
-        
-        return next_dt
+    If dt falls within working hours on a working day, return dt unchanged.
+    Otherwise, move to the start of the next working period.
+    """
+    return (calendar or get_work_calendar()).next_working_time(dt)
 
-def add_lag_and_convert_to_working_time(end_working_unit, lag_hours):
+def add_lag_and_convert_to_working_time(end_working_unit, lag_hours, calendar=None):
     """
     Takes an end time in working units, adds lag_hours (in calendar hours),
     and returns the next valid working time after the lag.
-    Properly handles weekends and non-working hours.
+    Properly handles non-working days and hours.
     """
     # Convert end working unit to calendar datetime
-    end_dt = working_time_to_datetime(end_working_unit)
+    end_dt = working_time_to_datetime(end_working_unit, calendar)
     
     # Add lag in calendar hours
     with_lag_dt = add_lag_time(end_dt, lag_hours)
     
-    # Get the next valid working time (skipping weekends and non-working hours)
-    next_working_dt = get_next_working_time(with_lag_dt)
+    # Get the next valid working time (skipping non-working days and hours)
+    next_working_dt = get_next_working_time(with_lag_dt, calendar)
     
     # Convert back to working time units
-    return calendar_time_to_working_time(next_working_dt)
+    return calendar_time_to_working_time(next_working_dt, calendar)
 
-def calculate_lag_in_working_units(dep_end_unit, lag_hours):
+def calculate_lag_in_working_units(dep_end_unit, lag_hours, calendar=None):
     """
     Calculate how many working units are needed to represent the given
     lag_hours when added to the dependency end time unit.
-    Properly handles weekends and non-working hours.
+    Properly handles non-working days and hours.
     """
     # Get the datetime at the end of dependency
-    dep_end_dt = working_time_to_datetime(dep_end_unit)
+    dep_end_dt = working_time_to_datetime(dep_end_unit, calendar)
     
     # Add the lag in calendar hours
     with_lag_dt = add_lag_time(dep_end_dt, lag_hours)
     
-    # Get the next valid working time (skipping weekends and non-working hours)
-    next_working_dt = get_next_working_time(with_lag_dt)
+    # Get the next valid working time (skipping non-working days and hours)
+    next_working_dt = get_next_working_time(with_lag_dt, calendar)
     
     # Convert both to working units
     dep_end_working_units = dep_end_unit
-    next_working_units = calendar_time_to_working_time(next_working_dt)
+    next_working_units = calendar_time_to_working_time(next_working_dt, calendar)
     
     # The difference is the lag in working units
     return max(0, next_working_units - dep_end_working_units)
 
-def unit_to_day(unit):
+def build_lag_offset_segments(lag_hours, horizon, calendar=None):
+    """
+    Build the exact mapping from a dependency time to the earliest working time
+    after a calendar-hour lag, for every working unit in [0, horizon].
+
+    Follows the same steps as add_lag_and_convert_to_working_time (convert to
+    calendar time, add the lag, snap to the next working time, convert back)
+    but in whole seconds, so the result carries no floating point noise, and
+    converts back through the exact inverse of working_time_to_datetime. The
+    mapping is compressed into contiguous segments on which it is either
+    unit + constant or constant.
+
+    Args:
+        lag_hours: Lag in calendar hours
+        horizon: Last working unit to cover
+        calendar: WorkCalendar; defaults to the default working week
+
+    Returns:
+        tuple: (seg_starts, seg_ends, seg_shifts, seg_floors). For any unit e in
+        [seg_starts[i], seg_ends[i]] the earliest working time after the lag is
+        max(e + seg_shifts[i], seg_floors[i]).
+    """
+    calendar = calendar or get_work_calendar()
+    unit_seconds = 3600 // SCALE_FACTOR
+    day_seconds = WORK_HOURS_PER_DAY * 3600
+    lag_seconds = int(round(lag_hours * 3600))
+
+    # Per calendar landing date: (day start in seconds or None if not worked,
+    # working day number of the same day, of the next working day)
+    snapped_days = {}
+
+    values = []
+    for day_index in range(horizon // UNITS_PER_DAY + 1):
+        base_date = calendar.working_day_date(day_index)
+        base_start = calendar.day_start_seconds(base_date)
+        for rem_units in range(UNITS_PER_DAY):
+            if len(values) > horizon:
+                break
+            day_offset, seconds = divmod(base_start + rem_units * unit_seconds + lag_seconds, 86400)
+            landing = base_date + timedelta(days=day_offset)
+
+            if landing not in snapped_days:
+                next_day = calendar.working_day_index(calendar.next_working_date(landing))
+                if calendar.is_working_date(landing):
+                    snapped_days[landing] = (calendar.day_start_seconds(landing),
+                                             calendar.working_day_index(landing), next_day)
+                else:
+                    snapped_days[landing] = (None, next_day, next_day)
+            landing_start, same_day, next_day = snapped_days[landing]
+
+            if landing_start is None:
+                units = next_day * UNITS_PER_DAY
+            elif seconds < landing_start:
+                units = same_day * UNITS_PER_DAY
+            elif seconds >= landing_start + day_seconds:
+                units = next_day * UNITS_PER_DAY
+            else:
+                units = same_day * UNITS_PER_DAY + (seconds - landing_start) // unit_seconds
+            values.append(max(0, units))
+
+    # Compress into runs with slope 1 (shifted) or slope 0 (flat)
+    seg_starts, seg_ends, seg_shifts, seg_floors = [], [], [], []
+    seg_start = 0
+    seg_slope = None
+    for unit in range(1, len(values) + 1):
+        if unit < len(values):
+            step = values[unit] - values[unit - 1]
+            if seg_slope is None and step in (0, 1):
+                seg_slope = step
+                continue
+            if step == seg_slope:
+                continue
+        seg_starts.append(seg_start)
+        seg_ends.append(unit - 1)
+        seg_shifts.append(values[unit - 1] - (unit - 1))
+        seg_floors.append(values[seg_start])
+        seg_start = unit
+        seg_slope = None
+
+    return seg_starts, seg_ends, seg_shifts, seg_floors
+
+def build_dependency_index(dependencies):
+    """
+    Build predecessor and successor adjacency lists from dependency rows.
+
+    Args:
+        dependencies: Iterable of (task_id, depends_on_task_id, lag_hours, dependency_type)
+
+    Returns:
+        tuple: (predecessors, successors), each a dict mapping a task ID to a
+        list of (other_task_id, lag_hours, dependency_type)
+    """
+    predecessors = {}
+    successors = {}
+    for task_id, dep_task_id, lag_hours, dep_type in dependencies:
+        predecessors.setdefault(task_id, []).append((dep_task_id, lag_hours, dep_type))
+        successors.setdefault(dep_task_id, []).append((task_id, lag_hours, dep_type))
+    return predecessors, successors
+
+class LagCalendar:
+    """
+    Point lookups of the lag offset function ConstructionScheduler encodes for
+    each dependency lag. Segment tables are built on first use per lag and
+    extended when a later unit is asked for.
+    """
+
+    def __init__(self, calendar=None):
+        self.calendar = calendar or get_work_calendar()
+        self.tables = {}  # lag_hours -> (covered horizon, segment tables)
+
+    def after(self, unit, lag_hours):
+        """Return the earliest working unit a successor may use after unit plus lag_hours."""
+        if lag_hours % 24 == 0:
+            # Same whole-day rule as ConstructionScheduler._add_dependency_constraints
+            return unit + int(lag_hours / 24.0 * UNITS_PER_DAY)
+        covered, table = self.tables.get(lag_hours, (-1, None))
+        if unit > covered:
+            covered = max(unit * 2, WORKING_HORIZON)
+            table = build_lag_offset_segments(lag_hours, covered, self.calendar)
+            self.tables[lag_hours] = (covered, table)
+        seg_starts, _, seg_shifts, seg_floors = table
+        i = bisect.bisect_right(seg_starts, max(unit, 0)) - 1
+        return max(unit + seg_shifts[i], seg_floors[i])
+
+    def before(self, unit, lag_hours):
+        """
+        Return the latest working unit e with after(e, lag_hours) <= unit, or -1
+        when even unit 0 is too late. after is non-decreasing, so this is a
+        binary search.
+        """
+        if lag_hours % 24 == 0:
+            return unit - int(lag_hours / 24.0 * UNITS_PER_DAY)
+        if unit < 0 or self.after(0, lag_hours) > unit:
+            return -1
+        low, high = 0, max(unit, 1)
+        while self.after(high, lag_hours) <= unit:
+            low, high = high, high * 2
+        while high - low > 1:
+            middle = (low + high) // 2
+            if self.after(middle, lag_hours) <= unit:
+                low = middle
+            else:
+                high = middle
+        return low
+
+def dependency_start_bound(dep_type, dep_start, dep_end, duration, lag_hours, after):
+    """
+    Earliest start a dependency allows, given the predecessor's start and end.
+
+    Args:
+        after: Callable (unit, lag_hours) -> earliest working unit after the lag
+    """
+    if dep_type == 'SS':
+        return after(dep_start, lag_hours)
+    if dep_type == 'FF':
+        return after(dep_end, lag_hours) - duration
+    if dep_type == 'SF':
+        return after(dep_start, lag_hours) - duration
+    return after(dep_end, lag_hours)  # FS, and unknown types like the model
+
+def dependency_finish_bound(dep_type, succ_start, succ_end, duration, lag_hours, before):
+    """
+    Latest finish a dependency allows the predecessor, given the successor's
+    latest start and finish.
+
+    Args:
+        before: Callable (unit, lag_hours) -> latest working unit whose lag ends by unit
+    """
+    if dep_type == 'SS':
+        return before(succ_start, lag_hours) + duration
+    if dep_type == 'FF':
+        return before(succ_end, lag_hours)
+    if dep_type == 'SF':
+        return before(succ_end, lag_hours) + duration
+    return before(succ_start, lag_hours)  # FS, and unknown types like the model
+
+def phase_rank(task):
+    """Return the position of a task's phase in PHASE_ORDER (unknown phases last)."""
+    return PHASE_ORDER.get(task['phase'], 99)
+
+def phase_topological_order(tasks):
+    """
+    Order tasks by phase, and topologically within a phase, so that a task's
+    predecessors and earlier phases come first.
+
+    Args:
+        tasks: Dict mapping task ID to task
+
+    Returns:
+        list: Task IDs; tasks on a dependency cycle are left out
+    """
+    indegree = {tid: 0 for tid in tasks}
+    successors = {tid: [] for tid in tasks}
+    for tid, task in tasks.items():
+        for dep in task['dependencies']:
+            if dep[0] in tasks:
+                indegree[tid] += 1
+                successors[dep[0]].append(tid)
+    ready = [(phase_rank(tasks[tid]), tid) for tid, count in indegree.items() if count == 0]
+    heapq.heapify(ready)
+    order = []
+    while ready:
+        _, tid = heapq.heappop(ready)
+        order.append(tid)
+        for succ in successors[tid]:
+            indegree[succ] -= 1
+            if indegree[succ] == 0:
+                heapq.heappush(ready, (phase_rank(tasks[succ]), succ))
+    position = {tid: i for i, tid in enumerate(order)}
+    return sorted(order, key=lambda tid: (phase_rank(tasks[tid]), position[tid]))
+
+def compute_cpm_bounds(tasks, horizon=None, min_starts=None, lags=None):
+    """
+    Critical path pass over durations, dependency lags and phase order.
+
+    The forward pass gives every task the earliest start its predecessors,
+    earlier phases and min_starts allow; the backward pass the latest finish
+    its successors, later phases and the horizon allow. Dependencies, lags and
+    phases follow the same rules as ConstructionScheduler and resources are
+    ignored, so every schedule the model accepts lies within the bounds.
+
+    Args:
+        tasks: List of task dicts ('task_id', 'duration', 'phase', 'dependencies')
+        horizon: Latest allowed finish; defaults to the critical path length,
+                 so that the critical tasks have zero float
+        min_starts: Optional dict mapping task ID to its earliest allowed start
+        lags: Optional LagCalendar, to share lag tables between calls
+
+    Returns:
+        dict: 'bounds' ({task_id: {'earliest_start', 'earliest_finish', 'latest_start',
+              'latest_finish', 'total_float'}} in working time units), 'length'
+              (shortest possible makespan), 'infeasible' (IDs of tasks that cannot
+              finish by the horizon or sit on a cycle of positive lags) and 'critical'
+              (IDs of the tasks with the least float, by earliest start)
+    """
+    min_starts = min_starts or {}
+    lags = lags or LagCalendar()
+    task_map = {task['task_id']: task for task in tasks}
+    durations = {tid: task['duration'] for tid, task in task_map.items()}
+
+    # Keyed like ConstructionScheduler.dependency_map: a repeated dependency keeps its last lag
+    dependency_map = {}
+    for tid, task in task_map.items():
+        for dep in task['dependencies']:
+            if dep[0] in task_map:
+                dependency_map[(tid, dep[0])] = (dep[1], dep[2] if len(dep) > 2 else 'FS')
+    predecessors, successors = build_dependency_index(
+        (tid, dep_tid, lag_hours, dep_type) for (tid, dep_tid), (lag_hours, dep_type) in dependency_map.items()
+    )
+
+    # Same phase chain as ConstructionScheduler._add_phase_constraints
+    phases = sorted(dict.fromkeys(task['phase'] for task in tasks), key=lambda p: PHASE_ORDER.get(p, 99))
+    previous_phase = dict(zip(phases[1:], phases))
+    next_phase = dict(zip(phases, phases[1:]))
+
+    # Visiting predecessors first makes one pass enough on acyclic data; tasks on
+    # dependency cycles (feasible with zero or negative lags) go last
+    order = phase_topological_order(task_map)
+    ordered = set(order)
+    order += sorted((tid for tid in task_map if tid not in ordered), key=lambda tid: phase_rank(task_map[tid]))
+    max_passes = len(order) + len(phases) + 1
+    infeasible = set()
+
+    # Forward pass: earliest starts only grow, so phase finishes are kept as running maxima
+    earliest = {tid: max(min_starts.get(tid, 0), 0) for tid in order}
+    phase_finish = {}
+    for tid in order:
+        phase = task_map[tid]['phase']
+        phase_finish[phase] = max(phase_finish.get(phase, 0), earliest[tid] + durations[tid])
+    for _ in range(max_passes):
+        moved = []
+        for tid in order:
+            phase = task_map[tid]['phase']
+            start = earliest[tid]
+            if phase in previous_phase:
+                start = max(start, phase_finish[previous_phase[phase]])
+            for dep_tid, lag_hours, dep_type in predecessors.get(tid, []):
+                start = max(start, dependency_start_bound(dep_type, earliest[dep_tid],
+                                                          earliest[dep_tid] + durations[dep_tid],
+                                                          durations[tid], lag_hours, lags.after))
+            if start > earliest[tid]:
+                earliest[tid] = start
+                phase_finish[phase] = max(phase_finish[phase], start + durations[tid])
+                moved.append(tid)
+        if not moved:
+            break
+        if horizon is not None and any(earliest[tid] + durations[tid] > horizon for tid in moved):
+            break
+    else:
+        infeasible.update(moved)  # Still moving: a cycle of positive lags
+
+    length = max((earliest[tid] + durations[tid] for tid in order), default=0)
+    end_limit = length if horizon is None else horizon
+    infeasible.update(tid for tid in order if earliest[tid] + durations[tid] > end_limit)
+
+    # Backward pass, mirrored: latest finishes only shrink
+    latest = {tid: end_limit for tid in order}
+    phase_start = {}
+    for tid in order:
+        phase = task_map[tid]['phase']
+        phase_start[phase] = min(phase_start.get(phase, end_limit), latest[tid] - durations[tid])
+    if not infeasible:
+        for _ in range(max_passes):
+            moved = []
+            for tid in reversed(order):
+                phase = task_map[tid]['phase']
+                finish = latest[tid]
+                if phase in next_phase:
+                    finish = min(finish, phase_start[next_phase[phase]])
+                for succ_tid, lag_hours, dep_type in successors.get(tid, []):
+                    finish = min(finish, dependency_finish_bound(dep_type, latest[succ_tid] - durations[succ_tid],
+                                                                 latest[succ_tid], durations[tid], lag_hours,
+                                                                 lags.before))
+                if finish < latest[tid]:
+                    latest[tid] = finish
+                    phase_start[phase] = min(phase_start[phase], finish - durations[tid])
+                    moved.append(tid)
+            if not moved or any(latest[tid] < earliest[tid] + durations[tid] for tid in moved):
+                break
+        infeasible.update(tid for tid in order if latest[tid] < earliest[tid] + durations[tid])
+
+    bounds = {}
+    for tid in order:
+        bounds[tid] = {
+            'earliest_start': earliest[tid],
+            'earliest_finish': earliest[tid] + durations[tid],
+            'latest_start': latest[tid] - durations[tid],
+            'latest_finish': latest[tid],
+            'total_float': latest[tid] - durations[tid] - earliest[tid]
+        }
+    least_float = min((b['total_float'] for b in bounds.values()), default=0)
+    critical = sorted((tid for tid, b in bounds.items() if b['total_float'] == least_float and tid not in infeasible),
+                      key=lambda tid: (earliest[tid], phase_rank(task_map[tid])))
+    return {
+        'bounds': bounds,
+        'length': length,
+        'infeasible': sorted(infeasible),
+        'critical': critical
+    }
+
+def schedule_rows(schedule_results, preserve_task_ids=None, calendar=None):
+    """
+    Convert solver results into schedules rows.
+
+    Args:
+        schedule_results: List of dictionaries with task_id, start, and duration
+        preserve_task_ids: Optional list of task IDs to leave out
+        calendar: WorkCalendar to convert with; defaults to the default working week
+
+    Returns:
+        list: (task_id, planned_start, planned_end, status) tuples
+    """
+    preserve_task_ids = set(preserve_task_ids or [])
+    calendar = calendar or get_work_calendar()
+    
+    rows = []
+    for entry in schedule_results:
+        task_id = entry['task_id']
+        
+        # Skip tasks that should be preserved
+        if task_id in preserve_task_ids:
+            logger.debug("Preserving existing schedule for Task %s", task_id)
+            continue
+            
+        start_unit = entry['start']
+        duration = entry['duration']
+        planned_start = calendar.to_datetime(start_unit)
+        planned_end = calendar.to_datetime(start_unit + duration)
+        rows.append((task_id, planned_start, planned_end, 'Scheduled'))
+        logger.debug("Scheduling Task %s: Start %s, End %s", task_id, planned_start, planned_end)
+    return rows
+
+def assignment_rows(assignments, member_key, preserve_task_ids=None):
+    """
+    Convert assignment dicts into (task_id, member_id) rows for bulk_insert_assignments.
+
+    Args:
+        assignments: Resource or employee assignment dicts
+        member_key: 'resource_id' or 'employee_id'
+        preserve_task_ids: Optional set of task IDs to leave out
+    """
+    preserve_task_ids = preserve_task_ids or set()
+    return [(a['task_id'], a[member_key]) for a in assignments if a['task_id'] not in preserve_task_ids]
+
+def unit_to_day(unit, calendar=None):
     """
     Return the day number (starting at 1) corresponding to a working time unit.
     This counts calendar days, not just working days.
     """
+    calendar = calendar or get_work_calendar()
     # Convert the unit to a datetime
-    dt = working_time_to_datetime(unit)
+    dt = calendar.to_datetime(unit)
     
     # Calculate the number of calendar days since project start
-    days_diff = (dt.date() - PROJECT_START_DATE).days
+    days_diff = (dt.date() - calendar.start_date).days
     
     # Add 1 to start counting from day 1
     return days_diff + 1
@@ -220,10 +625,131 @@ def unit_to_time(unit):
 # ---------------------------
 # Database Functions
 # ---------------------------
-class DatabaseManager:
-    def __init__(self):
-        self.conn = psycopg2.connect(**DB_PARAMS)
-        # We'll use actual database values instead of overrides
+class DataSource:
+    """
+    Where the scheduler reads its inputs and writes its results.
+
+    ConstructionScheduler, validate_schedule, persist_solution, cp_sat_scheduler
+    and the rescheduler's full_reoptimization and dependency propagation only
+    use these methods. DatabaseManager implements them on Postgres and
+    SnapshotDataSource (data_sources.py) on an in-memory or JSON snapshot.
+    Times are working time units unless a method says otherwise.
+    """
+
+    def load_problem_snapshot(self, project_id=None, calendar=None):
+        """Return the scheduling inputs; see DatabaseManager.load_problem_snapshot."""
+        raise NotImplementedError
+
+    def load_reservations(self, exclude_project_id=None, calendar=None):
+        """Return the employee and resource bookings of scheduled tasks; see DatabaseManager.load_reservations."""
+        raise NotImplementedError
+
+    def load_current_plan(self, calendar=None):
+        """Return the persisted schedule and assignments; see DatabaseManager.load_current_plan."""
+        raise NotImplementedError
+
+    def calendar_key(self):
+        """Return a hashable naming this source's calendar rules in the calendar registry."""
+        return ('source', id(self))
+
+    def load_calendar_rules(self, project_id=None):
+        """
+        Return the working time rules of a project.
+
+        Args:
+            project_id: Project ID, or None for the tenant calendar
+
+        Returns:
+            dict: {'working_hours': [(day_of_week, start_time, end_time, is_working_day)],
+                  'holidays': [date]}, or None for the default week
+        """
+        return None
+
+    def load_resources_and_employees(self):
+        """Return (resources, employees) as lists of dicts in the snapshot format."""
+        raise NotImplementedError
+
+    def load_task_schedules(self, task_ids):
+        """
+        Return the stored schedules of some tasks.
+
+        Args:
+            task_ids: Iterable of task IDs
+
+        Returns:
+            dict: Map task_id -> {'name', 'project_id', 'start', 'end', 'status'} with
+                  start/end as datetimes; tasks without a schedule are left out
+        """
+        raise NotImplementedError
+
+    def get_dependency_index(self):
+        """Return (predecessors, successors) of every task as built by build_dependency_index."""
+        raise NotImplementedError
+
+    def get_resource_availability(self, resource_category):
+        """Return the number of available resources of a category."""
+        raise NotImplementedError
+
+    def get_employee_availability(self, group):
+        """Return the number of employees in a skill group."""
+        raise NotImplementedError
+
+    def update_schedule(self, schedule_results, preserve_task_ids=None, calendar=None):
+        """Store solver results; see DatabaseManager.update_schedule."""
+        raise NotImplementedError
+
+    def save_assignments(self, resource_assignments, employee_assignments, preserve_task_ids=None):
+        """
+        Replace the stored assignments of every task that is not preserved.
+
+        Args:
+            resource_assignments: Resource assignment dicts
+            employee_assignments: Employee assignment dicts
+            preserve_task_ids: Optional task IDs whose assignments are kept
+        """
+        raise NotImplementedError
+
+    def apply_schedule_changes(self, changes, change_type):
+        """
+        Move tasks and log the moves. The caller commits.
+
+        Args:
+            changes: List of {'task_id', 'original_start', 'original_end',
+                     'new_start', 'new_end', 'reason'} with datetimes
+            change_type: Change type recorded in the log
+        """
+        raise NotImplementedError
+
+    def log_optimization(self, project_id, optimization_type, status, details):
+        """
+        Record an optimization run.
+
+        Args:
+            project_id: Project the run covered, or None
+            optimization_type: Kind of run, e.g. 'Full reoptimization'
+            status: Outcome, e.g. 'Completed'
+            details: JSON-serializable dict
+        """
+        raise NotImplementedError
+
+    def commit(self):
+        """Make the writes since the last commit permanent."""
+
+    def close(self):
+        """Release whatever the data source holds."""
+
+
+class DatabaseManager(DataSource):
+    """DataSource on the Postgres database described by DB_PARAMS."""
+
+    def __init__(self, db_params=None):
+        """
+        Args:
+            db_params: psycopg2.connect keyword arguments; defaults to DB_PARAMS
+        """
+        self.db_params = db_params or DB_PARAMS
+        # Checked out from the shared pool and handed back by close()
+        self.conn = get_connection(self.db_params)
     
     def get_tasks(self):
         """
@@ -231,132 +757,259 @@ class DatabaseManager:
         Exclude rows where WBS is one of ('1.1','1.2','1.3','1.4').
         Returns a list of dictionaries with keys:
           task_id, name, duration (in scaled units), priority, phase,
-          dependencies (list of (dep_task_id, lag in hours)),
+          dependencies (list of (dep_task_id, lag in hours, dependency type)),
           employees (dict), resources (dict)
         """
+        return self.load_problem_snapshot()['tasks']
+
+    def load_problem_snapshot(self, project_id=None, calendar=None):
+        """
+        Load every scheduling input in a single query.
+
+        Dependencies and employee/resource requirements are aggregated per task
+        on the server, and the resource and employee pools come back in the
+        same row, so a cold model build needs one round trip.
+
+        Args:
+            project_id: Optional project to load. Dependencies on tasks of other
+                        projects are dropped, and the employees and resources
+                        those projects have booked are returned as reservations.
+            calendar: WorkCalendar to convert the reservations with; defaults to
+                      the tenant calendar
+
+        Returns:
+            dict: Snapshot with keys:
+              tasks - list in the format documented on get_tasks, plus 'project_id'
+              resources - list of {'resource_id', 'name', 'type', 'availability'}
+              employees - list of {'employee_id', 'name', 'skill_set'}
+              reservations - {'resources': [[resource_id, start, end]],
+                              'employees': [[employee_id, start, end]]} in working
+                             time units (only with project_id)
+        """
+        # Pool columns missing from older schemas come back as NULL, like load_resources_and_employees
+        schema = get_schema(self.conn)
+        resource_type = 'type' if schema.has_column('resources', 'type') else 'NULL'
+        skill_set = 'skill_set' if schema.has_column('employees', 'skill_set') else 'NULL'
+        if resource_type == 'NULL':
+            logger.warning("'type' column does not exist in resources table")
+        if skill_set == 'NULL':
+            logger.warning("'skill_set' column does not exist in employees table")
         cur = self.conn.cursor()
-        cur.execute("""
-            SELECT task_id, task_name, estimated_hours, phase, priority
-            FROM tasks
-            WHERE wbs NOT IN ('1.1', '1.2', '1.3', '1.4')
-            ORDER BY task_id;
-        """)
+        try:
+            cur.execute("""
+                WITH task_rows AS (
+                    SELECT task_id, task_name, estimated_hours, phase, priority, project_id
+                    FROM tasks
+                    WHERE wbs NOT IN ('1.1', '1.2', '1.3', '1.4')
+                      AND (%(project_id)s::integer IS NULL OR project_id = %(project_id)s::integer)
+                ),
+                task_dependencies AS (
+                    SELECT task_id,
+                           json_agg(json_build_array(
+                               depends_on_task_id,
+                               COALESCE(lag_hours, 0),
+                               COALESCE(dependency_type, 'FS')
+                           ) ORDER BY dependency_id) AS dependencies
+                    FROM dependencies
+                    GROUP BY task_id
+                ),
+                task_employees AS (
+                    SELECT task_id, json_object_agg(resource_group, resource_count) AS employees
+                    FROM task_required_employees
+                    GROUP BY task_id
+                ),
+                task_resources AS (
+                    SELECT task_id, json_object_agg(resource_category, resource_count) AS resources
+                    FROM task_required_resources
+                    GROUP BY task_id
+                )
+                SELECT
+                    (SELECT COALESCE(json_agg(json_build_object(
+                                'task_id', t.task_id,
+                                'name', t.task_name,
+                                'estimated_hours', t.estimated_hours,
+                                'phase', t.phase,
+                                'priority', t.priority,
+                                'project_id', t.project_id,
+                                'dependencies', COALESCE(d.dependencies, '[]'::json),
+                                'employees', COALESCE(e.employees, '{}'::json),
+                                'resources', COALESCE(r.resources, '{}'::json)
+                            ) ORDER BY t.task_id), '[]'::json)
+                     FROM task_rows t
+                     LEFT JOIN task_dependencies d ON d.task_id = t.task_id
+                     LEFT JOIN task_employees e ON e.task_id = t.task_id
+                     LEFT JOIN task_resources r ON r.task_id = t.task_id) AS tasks,
+            """ + f"""
+                    (SELECT COALESCE(json_agg(json_build_object(
+                                'resource_id', resource_id,
+                                'name', name,
+                                'type', {resource_type},
+                                'availability', availability
+                            ) ORDER BY resource_id), '[]'::json)
+                     FROM resources) AS resources,
+                    (SELECT COALESCE(json_agg(json_build_object(
+                                'employee_id', employee_id,
+                                'name', name,
+                                'skill_set', {skill_set}
+                            ) ORDER BY employee_id), '[]'::json)
+                     FROM employees) AS employees
+            """, {'project_id': project_id})
+            task_rows, resources, employees = cur.fetchone()
+        finally:
+            cur.close()
+
         tasks = {}
-        for row in cur.fetchall():
-            task_id, name, est_hours, phase, priority = row
-            duration = int(round(float(est_hours) * SCALE_FACTOR))
-            tasks[int(task_id)] = {
-                'task_id': int(task_id),
-                'name': name,
-                'duration': duration,
-                'phase': phase,
-                'priority': priority,
+        for row in task_rows:
+            task_id = int(row['task_id'])
+            tasks[task_id] = {
+                'task_id': task_id,
+                'name': row['name'],
+                'duration': int(round(float(row['estimated_hours']) * SCALE_FACTOR)),
+                'phase': row['phase'],
+                'priority': row['priority'],
+                'project_id': row['project_id'],
                 'dependencies': [],
-                'employees': {},
-                'resources': {}
+                'employees': row['employees'],
+                'resources': row['resources']
             }
-        
-        # Create dependencies table if it doesn't exist
-        print("Creating dependencies table if it doesn't exist...")
-        try:
-            cur.execute("""
-                CREATE TABLE IF NOT EXISTS dependencies (
-                    dependency_id SERIAL PRIMARY KEY,
-                    task_id INTEGER NOT NULL REFERENCES tasks(task_id),
-                    depends_on_task_id INTEGER NOT NULL REFERENCES tasks(task_id),
-                    lag_hours NUMERIC(10,2),
-                    dependency_type VARCHAR(10) DEFAULT 'FS'
-                );
-            """)
-            self.conn.commit()
-        except Exception as e:
-            print(f"Error creating dependencies table: {e}", file=sys.stderr)
-        
-        # Get dependencies (with lag_hours and dependency_type)
-        # Store lag_hours directly (not scaled), we'll apply them differently
-        print("Fetching dependencies from database...")
-        try:
-            cur.execute("""
-                SELECT task_id, depends_on_task_id, 
-                       COALESCE(lag_hours, 0) as lag_hours, 
-                       COALESCE(dependency_type, 'FS') as dependency_type 
-                FROM dependencies;
-            """)
-            
-            dependencies = cur.fetchall()
-            print(f"Found {len(dependencies)} dependencies in the database")
-            
-            for tid, dep_tid, lag, dep_type in dependencies:
-                tid = int(tid)
+
+        # Keep only dependencies between loaded tasks
+        for row in task_rows:
+            tid = int(row['task_id'])
+            for dep_tid, lag, dep_type in row['dependencies']:
                 dep_tid = int(dep_tid)
-                print(f"Dependency: Task {tid} -> Task {dep_tid}, Lag: {lag} hours, Type: {dep_type}")
-                
-                if tid in tasks and dep_tid in tasks:
+                if dep_tid in tasks:
                     # Store lag in hours directly, not scaled units, along with dependency type
                     tasks[tid]['dependencies'].append((dep_tid, float(lag), dep_type))
-                    print(f"Added dependency to task {tid}: depends on {dep_tid} with lag {lag} hours")
+                    logger.debug("Added dependency to task %s: depends on %s with lag %s hours, type %s", tid, dep_tid, lag, dep_type)
+                elif project_id is None:
+                    logger.warning("Invalid dependency: Task %s -> %s", tid, dep_tid)
                 else:
-                    print(f"Invalid dependency: Task {tid} -> {dep_tid}", file=sys.stderr)
-        except Exception as e:
-            print(f"Error fetching dependencies: {e}", file=sys.stderr)
-            # Continue without dependencies if there's an error
-        
-        # Get required employees
-        print("Fetching employee requirements from database...")
+                    logger.debug("Dropping dependency of task %s on task %s outside project %s", tid, dep_tid, project_id)
+
+        tasks_list = list(tasks.values())
+        logger.info("Loaded problem snapshot: %s tasks (%s with resource requirements, %s with employee requirements), "
+                    "%s dependencies, %s resources, %s employees",
+                    len(tasks_list),
+                    sum(1 for t in tasks_list if t['resources']),
+                    sum(1 for t in tasks_list if t['employees']),
+                    sum(len(t['dependencies']) for t in tasks_list),
+                    len(resources), len(employees))
+
+        snapshot = {
+            'tasks': tasks_list,
+            'resources': resources,
+            'employees': employees
+        }
+        if project_id is not None:
+            snapshot['reservations'] = self.load_reservations(exclude_project_id=project_id, calendar=calendar)
+        return snapshot
+
+    def load_reservations(self, exclude_project_id=None, calendar=None):
+        """
+        Load the time each employee and resource is booked by scheduled tasks,
+        so a partial solve does not double-book them.
+
+        Args:
+            exclude_project_id: Skip bookings of this project's tasks (the ones being re-solved)
+            calendar: WorkCalendar to convert with; defaults to the tenant calendar
+
+        Returns:
+            dict: {'resources': [[resource_id, start, end]], 'employees': [[employee_id, start, end]]}
+                  with start/end in working time units, clipped to the horizon
+        """
+        reservations = {'resources': [], 'employees': []}
+        calendar = calendar or get_work_calendar(source=self)
+        cur = self.conn.cursor()
         try:
-            cur.execute("SELECT task_id, resource_group, resource_count FROM task_required_employees;")
-            employee_reqs = cur.fetchall()
-            print(f"Found {len(employee_reqs)} employee requirements in the database")
-            
-            # Get all unique employee groups
-            cur.execute("SELECT DISTINCT resource_group FROM task_required_employees;")
-            unique_groups = [row[0] for row in cur.fetchall()]
-            print(f"Unique employee groups in requirements: {unique_groups}")
-            
-            # Count requirements by group
-            for group in unique_groups:
-                cur.execute("SELECT COUNT(*) FROM task_required_employees WHERE resource_group = %s;", (group,))
-                count = cur.fetchone()[0]
-                print(f"  Group '{group}' is required by {count} tasks")
-            
-            for tid, group, count in employee_reqs:
-                tid = int(tid)
-                if tid in tasks:
-                    tasks[tid]['employees'][group] = count
-                    print(f"Added employee requirement to task {tid}: {group} x {count}")
-                else:
-                    print(f"Warning: Employee requirement for non-existent task {tid}", file=sys.stderr)
+            for key, table, column in (('resources', 'resource_assignments', 'resource_id'),
+                                       ('employees', 'employee_assignments', 'employee_id')):
+                cur.execute(f"""
+                    SELECT a.{column}, s.planned_start, s.planned_end
+                    FROM {table} a
+                    JOIN schedules s ON s.task_id = a.task_id
+                    JOIN tasks t ON t.task_id = a.task_id
+                    WHERE s.planned_start IS NOT NULL AND s.planned_end IS NOT NULL
+                      AND s.status NOT IN ('Completed', 'Skipped')
+                      AND (%s::integer IS NULL OR t.project_id IS DISTINCT FROM %s::integer)
+                """, (exclude_project_id, exclude_project_id))
+                for member_id, planned_start, planned_end in cur.fetchall():
+                    start = min(calendar.to_units(planned_start), WORKING_HORIZON)
+                    end = min(calendar.to_units(planned_end), WORKING_HORIZON)
+                    if end > start:
+                        reservations[key].append([member_id, start, end])
         except Exception as e:
-            print(f"Error fetching employee requirements: {e}", file=sys.stderr)
-            traceback.print_exc()
-        
-        # Get required resources
-        print("Fetching resource requirements from database...")
-        cur.execute("SELECT task_id, resource_category, resource_count FROM task_required_resources;")
-        resource_reqs = cur.fetchall()
-        print(f"Found {len(resource_reqs)} resource requirements in the database")
-        
-        for tid, category, count in resource_reqs:
-            tid = int(tid)
-            if tid in tasks:
-                tasks[tid]['resources'][category] = count
-                print(f"Added resource requirement to task {tid}: {category} x {count}")
-            else:
-                print(f"Warning: Resource requirement for non-existent task {tid}", file=sys.stderr)
-        
-        # Print summary of tasks with resource and employee requirements
-        tasks_list = list(tasks.values())
-        tasks_with_resources = sum(1 for t in tasks_list if t['resources'])
-        tasks_with_employees = sum(1 for t in tasks_list if t['employees'])
+            logger.error("Error loading reservations: %s", e)
+            self.conn.rollback()
+        finally:
+            cur.close()
+        logger.info("Loaded reservations: %s resource bookings, %s employee bookings",
+                    len(reservations['resources']), len(reservations['employees']))
+        return reservations
+    
+    def load_current_plan(self, calendar=None):
+        """
+        Load the persisted schedule and assignments as solution hints for a warm start.
         
-        print(f"\nTask requirements summary:")
-        print(f"  Total tasks: {len(tasks_list)}")
-        print(f"  Tasks with resource requirements: {tasks_with_resources}")
-        print(f"  Tasks with employee requirements: {tasks_with_employees}")
+        Args:
+            calendar: WorkCalendar the schedule was stored with; defaults to the tenant calendar
         
-        cur.close()
-        return tasks_list
-    
+        Returns:
+            dict: Map task_id -> {'start': working time unit,
+                                  'resources': set of resource IDs,
+                                  'employees': set of employee IDs}
+        """
+        plan = {}
+        calendar = calendar or get_work_calendar(source=self)
+        cur = self.conn.cursor()
+        try:
+            cur.execute("""
+                SELECT s.task_id, s.planned_start,
+                       COALESCE((SELECT array_agg(ra.resource_id) FROM resource_assignments ra
+                                 WHERE ra.task_id = s.task_id), '{}'),
+                       COALESCE((SELECT array_agg(ea.employee_id) FROM employee_assignments ea
+                                 WHERE ea.task_id = s.task_id), '{}')
+                FROM schedules s
+                WHERE s.planned_start IS NOT NULL
+            """)
+            for task_id, planned_start, resource_ids, employee_ids in cur.fetchall():
+                plan[task_id] = {
+                    # Exact inverse of the conversion update_schedule used to store it
+                    'start': calendar.to_units(planned_start),
+                    'resources': set(resource_ids),
+                    'employees': set(employee_ids)
+                }
+            logger.info("Loaded current plan for %s tasks", len(plan))
+        except Exception as e:
+            logger.error("Error loading current plan: %s", e)
+            self.conn.rollback()
+            plan = {}
+        finally:
+            cur.close()
+        return plan
+
+    def get_dependency_index(self):
+        """
+        Load every dependency in one query and index it by task.
+
+        Returns:
+            tuple: (predecessors, successors) as returned by build_dependency_index
+        """
+        cur = self.conn.cursor()
+        try:
+            cur.execute("""
+                SELECT task_id, depends_on_task_id,
+                       COALESCE(lag_hours, 0) as lag_hours,
+                       COALESCE(dependency_type, 'FS') as dependency_type
+                FROM dependencies
+            """)
+            return build_dependency_index(
+                (tid, dep_tid, float(lag), dep_type)
+                for tid, dep_tid, lag, dep_type in cur.fetchall()
+            )
+        finally:
+            cur.close()
+
     def get_resource_availability(self, resource_category):
         cur = self.conn.cursor()
         cur.execute("""
@@ -378,105 +1031,319 @@ class DatabaseManager:
             """, (group,))
             avail = cur.fetchone()[0]
             
-            # For debugging, let's also print all employees in this group
-            cur.execute("""
-                SELECT employee_id, name, skill_set FROM employees 
-                WHERE LOWER(skill_set) = LOWER(%s)
-            """, (group,))
-            employees = cur.fetchall()
-            print(f"Found {avail} employees for group {group}:", file=sys.stderr)
-            for emp in employees:
-                print(f"  - ID: {emp[0]}, Name: {emp[1]}, Skill: {emp[2]}", file=sys.stderr)
+            # For debugging, also list all employees in this group
+            if logger.isEnabledFor(logging.DEBUG):
+                cur.execute("""
+                    SELECT employee_id, name, skill_set FROM employees 
+                    WHERE LOWER(skill_set) = LOWER(%s)
+                """, (group,))
+                employees = cur.fetchall()
+                logger.debug("Found %s employees for group %s:", avail, group)
+                for emp in employees:
+                    logger.debug("  - ID: %s, Name: %s, Skill: %s", emp[0], emp[1], emp[2])
                 
             return avail
         except Exception as e:
-            print(f"ERROR in get_employee_availability: {e}", file=sys.stderr)
+            logger.error("Error in get_employee_availability: %s", e)
             # Default to 1 if there's an error
             return 1
         finally:
             cur.close()
 
-    def update_schedule(self, schedule_results, preserve_task_ids=None):
+    def update_schedule(self, schedule_results, preserve_task_ids=None, calendar=None):
+        """
+        Update the schedule in the database based on the solver results.
+        
+        Args:
+            schedule_results: List of dictionaries with task_id, start, and duration
+            preserve_task_ids: Optional list of task IDs to preserve (not update)
+            calendar: WorkCalendar the results were solved on; defaults to the tenant calendar
+        """
+        rows = schedule_rows(schedule_results, preserve_task_ids, calendar or get_work_calendar(source=self))
+        if not rows:
+            return
+        
+        # One statement for the whole schedule; tasks that are already under way
+        # or finished keep their existing status
+        cur = self.conn.cursor()
+        try:
+            psycopg2.extras.execute_values(cur, """
+                INSERT INTO schedules (task_id, planned_start, planned_end, status)
+                VALUES %s
+                ON CONFLICT (task_id) DO UPDATE SET
+                    planned_start = EXCLUDED.planned_start,
+                    planned_end = EXCLUDED.planned_end,
+                    status = CASE
+                        WHEN schedules.status IN ('In Progress', 'Clocked In', 'Paused', 'On Hold', 'Completed', 'Skipped')
+                        THEN schedules.status
+                        ELSE EXCLUDED.status
+                    END
+            """, rows, page_size=len(rows))
+            self.conn.commit()
+            logger.info("Updated schedule for %s tasks", len(rows))
+        except Exception:
+            self.conn.rollback()
+            raise
+        finally:
+            cur.close()
+
+    def load_resources_and_employees(self):
+        """
+        Read the resource and employee pools.
+
+        Returns:
+            tuple: (resources, employees) as lists of dicts in the snapshot format
+        """
+        logger.info("Loading resources and employees from database...")
+        cur = self.conn.cursor()
+        resources = []
+        employees = []
+        
+        # Load resources
+        try:
+            # Check if type column exists in resources table
+            if get_schema(cur.connection).has_column('resources', 'type'):
+                cur.execute("SELECT resource_id, name, type, availability FROM resources")
+                resources = [
+                    {'resource_id': resource_id, 'name': name, 'type': resource_type, 'availability': availability}
+                    for resource_id, name, resource_type, availability in cur.fetchall()
+                ]
+            else:
+                logger.warning("'type' column does not exist in resources table")
+        except Exception as e:
+            logger.error("Error loading resources: %s", e)
+        
+        # Load employees
+        try:
+            # Check if skill_set column exists in employees table
+            if get_schema(cur.connection).has_column('employees', 'skill_set'):
+                cur.execute("SELECT employee_id, name, skill_set FROM employees")
+                employees = [
+                    {'employee_id': employee_id, 'name': name, 'skill_set': skill_set}
+                    for employee_id, name, skill_set in cur.fetchall()
+                ]
+            else:
+                logger.warning("'skill_set' column does not exist in employees table")
+        except Exception as e:
+            logger.error("Error loading employees: %s", e)
+        
+        cur.close()
+        return resources, employees
+
+    def load_task_schedules(self, task_ids):
+        """
+        Read the stored schedules of some tasks.
+
+        Args:
+            task_ids: Iterable of task IDs
+
+        Returns:
+            dict: Map task_id -> {'name', 'project_id', 'start', 'end', 'status'}
+        """
+        cur = self.conn.cursor()
+        try:
+            cur.execute("""
+                SELECT t.task_id, t.task_name, t.project_id, s.planned_start, s.planned_end, s.status
+                FROM tasks t
+                JOIN schedules s ON t.task_id = s.task_id
+                WHERE t.task_id = ANY(%s)
+            """, (list(task_ids),))
+            return {task_id: {'name': name, 'project_id': project_id, 'start': start, 'end': end, 'status': status}
+                    for task_id, name, project_id, start, end, status in cur.fetchall()}
+        finally:
+            cur.close()
+
+    def calendar_key(self):
+        return ('postgres', self.db_params.get('host'), self.db_params.get('dbname'))
+
+    def load_calendar_rules(self, project_id=None):
+        """
+        Read the working time rules of a project: its own working_hours rows, or
+        its tenant's rows without a project when it has none, and the tenant's
+        holidays.
+
+        Args:
+            project_id: Project ID, or None for the calendar of DEFAULT_TENANT_ID
+
+        Returns:
+            dict: {'working_hours': [(day_of_week, start_time, end_time, is_working_day)],
+                  'holidays': [date]}, or None when the tables do not exist
+        """
+        schema = get_schema(self.conn)
+        if not (schema.has_table('working_hours') and schema.has_table('holidays')):
+            logger.info("No working_hours/holidays tables; using the default work week")
+            return None
+
+        cur = self.conn.cursor()
+        try:
+            tenant_id = DEFAULT_TENANT_ID
+            if project_id is not None:
+                cur.execute("SELECT tenant_id FROM projects WHERE project_id = %s", (project_id,))
+                row = cur.fetchone()
+                if row is not None and row[0] is not None:
+                    tenant_id = row[0]
+
+            # Project rows win over the tenant's default rows
+            cur.execute("""
+                SELECT day_of_week, start_time, end_time, is_working_day, project_id
+                FROM working_hours
+                WHERE tenant_id = %s AND (project_id IS NULL OR project_id = %s)
+                ORDER BY day_of_week, working_hours_id
+            """, (tenant_id, project_id))
+            rows = cur.fetchall()
+            project_rows = [row[:4] for row in rows if project_id is not None and row[4] == project_id]
+            working_hours = project_rows or [row[:4] for row in rows if row[4] is None]
+
+            cur.execute("SELECT holiday_date FROM holidays WHERE tenant_id = %s ORDER BY holiday_date", (tenant_id,))
+            holidays = [row[0] for row in cur.fetchall()]
+            return {'working_hours': working_hours, 'holidays': holidays}
+        finally:
+            cur.close()
+
+    def save_assignments(self, resource_assignments, employee_assignments, preserve_task_ids=None):
+        """
+        Replace the assignments of every task that is not preserved.
+        
+        Clearing and inserting happen in one transaction, so a failure leaves the
+        previous assignments in place.
+        
+        Args:
+            resource_assignments: Resource assignment dicts
+            employee_assignments: Employee assignment dicts
+            preserve_task_ids: Optional task IDs whose assignments are kept
+        """
+        preserve_task_ids = set(preserve_task_ids or [])
+        cur = self.conn.cursor()
+        try:
+            # Clear existing assignments (except for preserved tasks)
+            if preserve_task_ids:
+                cur.execute("DELETE FROM employee_assignments WHERE NOT (task_id = ANY(%s))", (list(preserve_task_ids),))
+                logger.debug("Deleted %s employee assignments for non-preserved tasks", cur.rowcount)
+                cur.execute("DELETE FROM resource_assignments WHERE NOT (task_id = ANY(%s))", (list(preserve_task_ids),))
+                logger.debug("Deleted %s resource assignments for non-preserved tasks", cur.rowcount)
+            else:
+                cur.execute("DELETE FROM employee_assignments")
+                logger.debug("Deleted %s employee assignments", cur.rowcount)
+                cur.execute("DELETE FROM resource_assignments")
+                logger.debug("Deleted %s resource assignments", cur.rowcount)
+            
+            flag_support = get_assignment_flag_support(cur)
+            
+            resource_rows = assignment_rows(resource_assignments, 'resource_id', preserve_task_ids)
+            inserted_resources = bulk_insert_assignments(cur, 'resource_assignments', resource_rows)
+            logger.info("Successfully inserted %s resource assignments", inserted_resources)
+            
+            employee_rows = assignment_rows(employee_assignments, 'employee_id', preserve_task_ids)
+            inserted_employees = bulk_insert_assignments(cur, 'employee_assignments', employee_rows,
+                                                         mark_initial=flag_support['employee_assignments'])
+            logger.info("Successfully inserted %s employee assignments", inserted_employees)
+            
+            self.conn.commit()
+            logger.info("Successfully saved all assignments to database")
+            
+        except Exception as e:
+            logger.exception("Error saving assignments to database: %s", e)
+            self.conn.rollback()
+        finally:
+            cur.close()
+
+    def apply_schedule_changes(self, changes, change_type):
+        """
+        Move tasks with one batched UPDATE and log the moves with one batched
+        INSERT into schedule_change_log. The caller commits.
+
+        Args:
+            changes: List of {'task_id', 'original_start', 'original_end',
+                     'new_start', 'new_end', 'reason'} with datetimes
+            change_type: Change type recorded in the log
+        """
+        if not changes:
+            return
+        cur = self.conn.cursor()
+        try:
+            psycopg2.extras.execute_values(cur, """
+                UPDATE schedules AS s
+                SET planned_start = v.new_start, planned_end = v.new_end
+                FROM (VALUES %s) AS v(task_id, new_start, new_end)
+                WHERE s.task_id = v.task_id
+            """, [(c['task_id'], c['new_start'], c['new_end']) for c in changes],
+                template="(%s, %s::timestamp, %s::timestamp)")
+            
+            psycopg2.extras.execute_values(cur, """
+                INSERT INTO schedule_change_log
+                (task_id, previous_start, previous_end, new_start, new_end, 
+                 change_type, reason)
+                VALUES %s
+            """, [(c['task_id'], c['original_start'], c['original_end'],
+                   c['new_start'], c['new_end'], change_type, c['reason'])
+                  for c in changes])
+        finally:
+            cur.close()
+
+    def log_optimization(self, project_id, optimization_type, status, details):
         """
-        Update the schedule in the database based on the solver results.
-        
+        Insert a row into optimization_history. The caller commits.
+
         Args:
-            schedule_results: List of dictionaries with task_id, start, and duration
-            preserve_task_ids: Optional list of task IDs to preserve (not update)
+            project_id: Project the run covered, or None
+            optimization_type: Kind of run, e.g. 'Full reoptimization'
+            status: Outcome, e.g. 'Completed'
+            details: JSON-serializable dict stored as affected_tasks
         """
-        preserve_task_ids = preserve_task_ids or []
-        
+        current_time = datetime.now()
         cur = self.conn.cursor()
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS schedules (
-                schedule_id SERIAL PRIMARY KEY,
-                task_id INTEGER NOT NULL,
-                planned_start TIMESTAMP NOT NULL,
-                planned_end TIMESTAMP NOT NULL,
-                actual_start TIMESTAMP,
-                actual_end TIMESTAMP,
-                status VARCHAR(50) DEFAULT 'Scheduled',
-                remarks TEXT,
-                FOREIGN KEY (task_id) REFERENCES tasks(task_id)
-            );
-        """)
-        self.conn.commit()
-        
-        # First, get the current status of all tasks to preserve status for in-progress tasks
-        task_statuses = {}
-        cur.execute("SELECT task_id, status FROM schedules")
-        for row in cur.fetchall():
-            task_statuses[row[0]] = row[1]
-        
-        for entry in schedule_results:
-            task_id = entry['task_id']
-            
-            # Skip tasks that should be preserved
-            if task_id in preserve_task_ids:
-                print(f"Preserving existing schedule for Task {task_id}")
-                continue
-                
-            start_unit = entry['start']
-            duration = entry['duration']
-            planned_start = working_time_to_datetime(start_unit)
-            planned_end = working_time_to_datetime(start_unit + duration)
-            
-            # Determine the status - preserve existing status if it's in progress
-            status = 'Scheduled'
-            if task_id in task_statuses:
-                current_status = task_statuses[task_id]
-                if current_status in ('In Progress', 'Clocked In', 'Paused', 'On Hold', 'Completed', 'Skipped'):
-                    status = current_status
-            
-            print(f"Scheduling Task {task_id}: Start {planned_start}, End {planned_end}, Status: {status}")
-            
-            # Update the schedule
+        try:
             cur.execute("""
-                INSERT INTO schedules (task_id, planned_start, planned_end, status)
-                VALUES (%s, %s, %s, %s)
-                ON CONFLICT (task_id) DO UPDATE SET
-                    planned_start = EXCLUDED.planned_start,
-                    planned_end = EXCLUDED.planned_end,
-                    status = EXCLUDED.status
-            """, (task_id, planned_start, planned_end, status))
-        
+                INSERT INTO optimization_history
+                (tenant_id, project_id, optimization_type, start_time, end_time, status, affected_tasks)
+                VALUES (%s, %s, %s, %s, %s, %s, %s)
+            """, (
+                1,  # Default tenant_id
+                project_id,
+                optimization_type,
+                current_time,
+                current_time,
+                status,
+                json.dumps(details)
+            ))
+        finally:
+            cur.close()
+
+    def commit(self):
         self.conn.commit()
-        cur.close()
 
     def close(self):
-        self.conn.close()
+        if self.conn is not None:
+            release_connection(self.db_params, self.conn)
+            self.conn = None
 
 # ---------------------------
 # CP-SAT Scheduler Class
 # ---------------------------
 class ConstructionScheduler:
-    def __init__(self, tasks, db, preserve_task_ids=None):
+    def __init__(self, tasks, db, preserve_task_ids=None, resource_mode=None, symmetry_breaking=None, snapshot=None,
+                 model_cache=None, horizon=None, min_starts=None, calendar=None):
+        self.resource_mode = resource_mode or RESOURCE_MODE
+        if self.resource_mode not in (RESOURCE_MODE_INDIVIDUAL, RESOURCE_MODE_AGGREGATE):
+            raise ValueError(f"Unknown resource mode: {self.resource_mode}")
+        self.symmetry_breaking = symmetry_breaking or SYMMETRY_BREAKING
+        if self.symmetry_breaking not in (None, SYMMETRY_BREAKING_LOAD, SYMMETRY_BREAKING_LEX):
+            raise ValueError(f"Unknown symmetry breaking mode: {self.symmetry_breaking}")
+
         self.model = cp_model.CpModel()
         self.tasks = tasks
         self.db = db
-        self.horizon = WORKING_HORIZON
+        self.snapshot = snapshot  # Optional result of DatabaseManager.load_problem_snapshot
+        # WorkCalendar for every conversion between working time units and datetimes
+        # (db's tenant calendar by default, the default working week without db)
+        self.calendar = calendar or get_work_calendar(source=db)
+        self.horizon = horizon or WORKING_HORIZON
+        self.min_starts = min_starts or {}  # Map: task_id -> earliest allowed start (working time units)
         self.task_vars = {}  # Map: task_id -> {'start', 'end', 'interval', 'phase', 'priority'}
         self.dependency_map = {}  # Map: (task_id, dep_task_id) -> {'lag_hours': lag, 'type': dep_type}
+        self.lag_encodings = {}  # Map: lag_hours -> segment tables from build_lag_offset_segments
+        self.predecessors = {}  # Map: task_id -> [(dep_task_id, lag_hours, dep_type)]
+        self.successors = {}  # Map: dep_task_id -> [(task_id, lag_hours, dep_type)]
         self.preserve_task_ids = preserve_task_ids or []
         
         # For integrated resource assignment
@@ -484,6 +1351,17 @@ class ConstructionScheduler:
         self.employee_assignments = {}  # Map: task_id -> {employee_group: [employee_ids]}
         self.resource_availability = {}  # Map: resource_id -> list of interval vars (when resource is used)
         self.employee_availability = {}  # Map: employee_id -> list of interval vars (when employee is used)
+        self.resource_pools = {}  # Aggregate mode: resource_category -> {'members', 'tasks': [(task_id, count)]}
+        self.employee_pools = {}  # Aggregate mode: employee_group -> {'members', 'tasks': [(task_id, count)]}
+        self.model_fingerprint = None  # Problem hash when a model cache is used
+        self.model_from_cache = False
+        
+        # Time other solves have booked members for: (kind, member_id) -> [(start, end)]
+        self.reservations = (snapshot or {}).get('reservations') or {'resources': [], 'employees': []}
+        self.reserved = {}
+        for kind, key in (('resource', 'resources'), ('employee', 'employees')):
+            for member_id, start, end in self.reservations.get(key, []):
+                self.reserved.setdefault((kind, member_id), []).append((start, end))
         
         # Load available resources and employees from database
         self._load_resources_and_employees()
@@ -503,33 +1381,185 @@ class ConstructionScheduler:
                 else:  # Old format for backward compatibility
                     dep_tid, lag_hours = dep
                     self.dependency_map[(tid, dep_tid)] = {'lag_hours': lag_hours, 'type': 'FS'}
+
+        # Per-task adjacency lists so dependency lookups don't scan the whole map
+        self.predecessors, self.successors = build_dependency_index(
+            (tid, dep_tid, dep_data['lag_hours'], dep_data['type'])
+            for (tid, dep_tid), dep_data in self.dependency_map.items()
+        )
+        
+        # Earliest start / latest finish per task, used as variable domains
+        self.cpm = compute_cpm_bounds(self.tasks, self.horizon, self.min_starts,
+                                      LagCalendar(self.calendar)) if CPM_BOUNDS else None
+        self.infeasible_tasks = self.cpm['infeasible'] if self.cpm else []
+        if self.infeasible_tasks:
+            # No schedule exists; leave the model trivially infeasible instead of building it
+            logger.error("%s tasks cannot finish within %s working days (e.g. %s)", len(self.infeasible_tasks),
+                         self.horizon // UNITS_PER_DAY, self.infeasible_tasks[:10])
+            self.makespan = self.model.NewIntVar(0, self.horizon, 'makespan')
+            self.model.AddBoolOr([])
+            return
+        
+        cached = None
+        if model_cache is not None:
+            self.model_fingerprint = self._problem_fingerprint()
+            cached = model_cache.load(self.model_fingerprint)
+        if cached is not None:
+            self._restore_model(*cached)
+            self.model_from_cache = True
+            logger.info("Reusing cached model %s", self.model_fingerprint[:12])
+        else:
+            self._build_model()
+            if model_cache is not None:
+                model_cache.store(self.model_fingerprint, self.model.Proto(), self._model_index())
         
+        # Pins for preserved tasks are not part of the cached model
+        if self.preserve_task_ids:
+            self._add_preserved_task_constraints()
+
+    def _build_model(self):
+        """Create the variables, constraints and objective of the scheduling model."""
         self._create_task_vars()
         self._add_dependency_constraints()
         self._add_phase_constraints()
         
-        # Use integrated resource and employee constraints
-        self._add_integrated_resource_constraints()
-        self._add_integrated_employee_constraints()
-        
-        # Add constraints for preserved tasks if any
-        if self.preserve_task_ids:
-            self._add_preserved_task_constraints()
+        if self.resource_mode == RESOURCE_MODE_AGGREGATE:
+            # One cumulative per pool; individuals are assigned after solving
+            self._add_aggregate_resource_constraints()
+        else:
+            # Use integrated resource and employee constraints
+            self._add_integrated_resource_constraints()
+            self._add_integrated_employee_constraints()
+            if self.symmetry_breaking:
+                self._add_symmetry_breaking_constraints()
 
         # Define makespan (project completion time) as the max end time
-        self.makespan = self.model.NewIntVar(0, self.horizon, 'makespan')
+        self.makespan = self.model.NewIntVar(self.cpm['length'] if self.cpm else 0, self.horizon, 'makespan')
         self.model.AddMaxEquality(self.makespan, [v['end'] for v in self.task_vars.values()])
         
         # Create priority-weighted completion times
         self._add_priority_objective()
 
+    def _problem_fingerprint(self):
+        """
+        Hash every input the model is built from, in build order, so that equal
+        fingerprints mean identical models.
+        """
+        return problem_fingerprint({
+            'tasks': [[t['task_id'], t['duration'], t['phase'], t.get('priority', 1),
+                       [list(dep) for dep in t['dependencies']],
+                       list((t.get('resources') or {}).items()),
+                       list((t.get('employees') or {}).items())]
+                      for t in self.tasks],
+            'resources': [[category, [member['id'] for member in members]]
+                          for category, members in self.resource_availability.items()],
+            'employees': [[group, [member['id'] for member in members]]
+                          for group, members in self.employee_availability.items()],
+            'resource_mode': self.resource_mode,
+            'symmetry_breaking': self.symmetry_breaking,
+            'horizon': self.horizon,
+            'min_starts': sorted(self.min_starts.items()),
+            'units_per_day': UNITS_PER_DAY,
+            'start_date': PROJECT_START_DATE.isoformat(),
+            'calendar': self.calendar.key(),
+            'phase_order': PHASE_ORDER,
+            'reservations': self.reservations,
+            'cpm_bounds': CPM_BOUNDS,
+            'ortools': getattr(ortools, '__version__', None)
+        })
+
+    def _model_index(self):
+        """
+        Return the proto indices of every variable used after solving, as stored
+        next to a cached model.
+        """
+        def members(assignment_vars):
+            return [[member['id'], var.Index()] for member, var in assignment_vars]
+
+        return {
+            'task_vars': [[tid, v['start'].Index(), v['end'].Index(), v['interval'].Index()]
+                          for tid, v in self.task_vars.items()],
+            'makespan': self.makespan.Index(),
+            'resource_assignments': [[tid, category, data['count'], members(data['assignment_vars'])]
+                                     for tid, requirements in self.resource_assignments.items()
+                                     for category, data in requirements.items()],
+            'employee_assignments': [[tid, group, data['original_group'], data['count'],
+                                      members(data['assignment_vars'])]
+                                     for tid, requirements in self.employee_assignments.items()
+                                     for group, data in requirements.items()],
+            'resource_pools': [[category, pool['tasks']] for category, pool in self.resource_pools.items()],
+            'employee_pools': [[group, pool['tasks']] for group, pool in self.employee_pools.items()]
+        }
+
+    def _restore_model(self, proto, index):
+        """
+        Load a cached model and rebind task, makespan and assignment variables
+        to their proto indices.
+
+        Args:
+            proto: Cached CpModelProto
+            index: Variable index map written by _model_index
+        """
+        self.model = cp_model.CpModel()
+        self.model.Proto().CopyFrom(proto)
+        task_map = {task['task_id']: task for task in self.tasks}
+
+        for tid, start, end, interval in index['task_vars']:
+            task = task_map[tid]
+            self.task_vars[tid] = {
+                'start': self.model.GetIntVarFromProtoIndex(start),
+                'end': self.model.GetIntVarFromProtoIndex(end),
+                'interval': self.model.GetIntervalVarFromProtoIndex(interval),
+                'phase': task['phase'],
+                'priority': task.get('priority', 1),
+                'duration': task['duration']
+            }
+        self.makespan = self.model.GetIntVarFromProtoIndex(index['makespan'])
+
+        for tid in task_map:
+            self.resource_assignments[tid] = {}
+            self.employee_assignments[tid] = {}
+        resources = {category: {member['id']: member for member in members}
+                     for category, members in self.resource_availability.items()}
+        employees = {group: {member['id']: member for member in members}
+                     for group, members in self.employee_availability.items()}
+        for tid, category, count, assignment_vars in index['resource_assignments']:
+            self.resource_assignments[tid][category] = {
+                'count': count,
+                'assignment_vars': [(resources[category][member_id], self.model.GetBoolVarFromProtoIndex(var))
+                                    for member_id, var in assignment_vars]
+            }
+        for tid, group, original_group, count, assignment_vars in index['employee_assignments']:
+            self.employee_assignments[tid][group] = {
+                'count': count,
+                'original_group': original_group,
+                'assignment_vars': [(employees[group][member_id], self.model.GetBoolVarFromProtoIndex(var))
+                                    for member_id, var in assignment_vars]
+            }
+
+        for category, pool_tasks in index['resource_pools']:
+            self.resource_pools[category] = {'members': self.resource_availability[category],
+                                             'tasks': [tuple(entry) for entry in pool_tasks]}
+        for group, pool_tasks in index['employee_pools']:
+            self.employee_pools[group] = {'members': self.employee_availability[group],
+                                          'tasks': [tuple(entry) for entry in pool_tasks]}
+
+    def _start_bounds(self, tid, duration):
+        """Return the earliest and latest start of a task from its CPM bounds, or from min_starts and the horizon."""
+        if self.cpm is not None:
+            bounds = self.cpm['bounds'][tid]
+            return bounds['earliest_start'], bounds['latest_start']
+        earliest = min(self.min_starts.get(tid, 0), self.horizon)
+        return earliest, max(self.horizon - duration, earliest)
+
     def _create_task_vars(self):
         # For each task, create start and end variables (in working time units) and an interval.
         for task in self.tasks:
             tid = task['task_id']
             duration = task['duration']
-            start = self.model.NewIntVar(0, self.horizon, f'start_{tid}')
-            end = self.model.NewIntVar(0, self.horizon, f'end_{tid}')
+            earliest, latest = self._start_bounds(tid, duration)
+            start = self.model.NewIntVar(earliest, latest, f'start_{tid}')
+            end = self.model.NewIntVar(earliest + duration, latest + duration, f'end_{tid}')
             self.model.Add(end == start + duration)
             interval = self.model.NewIntervalVar(start, duration, end, f'interval_{tid}')
             
@@ -599,40 +1629,18 @@ class ConstructionScheduler:
         Add constraints for dependencies between tasks.
         Handles different dependency types (FS, SS, FF, SF) and lag times.
         """
-        print(f"Adding dependency constraints. Found {len(self.dependency_map)} dependencies.")
+        logger.info("Adding dependency constraints. Found %s dependencies.", len(self.dependency_map))
         
         # For tasks with dependencies
         for task in self.tasks:
             tid = task['task_id']
             
             # For each dependency of this task
-            for dep_info in self.dependency_map:
-                if dep_info[0] != tid:  # Only process dependencies for current task
-                    continue
-                    
-                dep_tid = dep_info[1]
-                dep_data = self.dependency_map[dep_info]
-                lag_hours = dep_data['lag_hours']
-                dep_type = dep_data['type']
-                
-                print(f"Processing dependency: Task {tid} -> Task {dep_tid}, Lag: {lag_hours} hours, Type: {dep_type}")
-                
+            for dep_tid, lag_hours, dep_type in self.predecessors.get(tid, []):
                 if dep_tid not in self.task_vars:
-                    print(f"Warning: Dependency for Task {tid} on Task {dep_tid} not in model.", file=sys.stderr)
+                    logger.warning("Dependency for Task %s on Task %s not in model.", tid, dep_tid)
                     continue
                 
-                # Sample points across the horizon to build our piecewise function
-                sample_points = 24  # Sample 24 points across the horizon
-                sample_interval = self.horizon // sample_points
-                
-                # Create lag mapping table: dependency end time -> min start time after lag
-                lag_map = {}
-                for i in range(0, self.horizon, sample_interval):
-                    lag_map[i] = add_lag_and_convert_to_working_time(i, lag_hours)
-                
-                # Calculate the average working time units per calendar hour
-                avg_working_units_per_cal_hour = SCALE_FACTOR * (WORK_HOURS_PER_DAY / 24.0)
-                
                 # Get task variables based on dependency type
                 if dep_type == 'FS':  # Finish-to-Start (default)
                     # Dependent task must finish before this task can start
@@ -652,7 +1660,7 @@ class ConstructionScheduler:
                     task_var = self.task_vars[tid]['end']
                 else:
                     # Default to FS if unknown type
-                    print(f"Warning: Unknown dependency type {dep_type} for Task {tid} -> {dep_tid}. Using FS.", file=sys.stderr)
+                    logger.warning("Unknown dependency type %s for Task %s -> %s. Using FS.", dep_type, tid, dep_tid)
                     dep_var = self.task_vars[dep_tid]['end']
                     task_var = self.task_vars[tid]['start']
                 
@@ -664,28 +1672,43 @@ class ConstructionScheduler:
                     lag_units = int(calendar_days * UNITS_PER_DAY)
                     self.model.Add(task_var >= dep_var + lag_units)
                 else:
-                    # For non-24-hour aligned lags, we need to be more precise
-                    
-                    # First approach: Create a set of conditional constraints
-                    # For each sample point, add: IF dep_var is close to this sample THEN task_var >= calculated_min_time
-                    
-                    # For each sample point
-                    for sample_time, min_time in lag_map.items():
-                        # Create a boolean variable for this condition
-                        is_close = self.model.NewBoolVar(f'is_close_{tid}_{dep_tid}_{sample_time}')
-                        
-                        # Define "closeness" - dependency time is within half sample interval of this point
-                        half_interval = sample_interval // 2
-                        self.model.Add(dep_var >= sample_time - half_interval).OnlyEnforceIf(is_close)
-                        self.model.Add(dep_var < sample_time + half_interval).OnlyEnforceIf(is_close)
-                        
-                        # If close to this sample point, enforce minimum time
-                        self.model.Add(task_var >= min_time).OnlyEnforceIf(is_close)
-                    
-                    # Fallback constraint as a safety measure
-                    # Use an average approximation of lag_hours in working units
-                    approx_lag_units = int(lag_hours * avg_working_units_per_cal_hour)
-                    self.model.Add(task_var >= dep_var + approx_lag_units)
+                    # For non-24-hour aligned lags, look up the exact offset
+                    # function shared by every dependency with this lag
+                    self._add_lag_constraint(dep_var, task_var, lag_hours, f'{tid}_{dep_tid}')
+
+    def _get_lag_encoding(self, lag_hours):
+        """
+        Return the segment tables of the exact lag offset function for lag_hours,
+        building them on first use. Dependencies with the same lag share one table.
+        """
+        if lag_hours not in self.lag_encodings:
+            self.lag_encodings[lag_hours] = build_lag_offset_segments(lag_hours, self.horizon, self.calendar)
+        return self.lag_encodings[lag_hours]
+
+    def _add_lag_constraint(self, dep_var, task_var, lag_hours, name):
+        """
+        Enforce task_var >= earliest working time after dep_var plus lag_hours.
+
+        A segment index selects the piece of the offset function containing
+        dep_var; element constraints then read that piece's shift and floor.
+        """
+        seg_starts, seg_ends, seg_shifts, seg_floors = self._get_lag_encoding(lag_hours)
+
+        segment = self.model.NewIntVar(0, len(seg_starts) - 1, f'lag_seg_{name}')
+        seg_start = self.model.NewIntVar(min(seg_starts), max(seg_starts), f'lag_seg_start_{name}')
+        seg_end = self.model.NewIntVar(min(seg_ends), max(seg_ends), f'lag_seg_end_{name}')
+        shift = self.model.NewIntVar(min(seg_shifts), max(seg_shifts), f'lag_shift_{name}')
+        floor = self.model.NewIntVar(min(seg_floors), max(seg_floors), f'lag_floor_{name}')
+
+        self.model.AddElement(segment, seg_starts, seg_start)
+        self.model.AddElement(segment, seg_ends, seg_end)
+        self.model.AddElement(segment, seg_shifts, shift)
+        self.model.AddElement(segment, seg_floors, floor)
+
+        self.model.Add(dep_var >= seg_start)
+        self.model.Add(dep_var <= seg_end)
+        self.model.Add(task_var >= dep_var + shift)
+        self.model.Add(task_var >= floor)
 
     def _add_phase_constraints(self):
         # For phase ordering: tasks in a later phase must start after all tasks in an earlier phase finish.
@@ -724,7 +1747,7 @@ class ConstructionScheduler:
             self.resource_assignments[tid] = {}
         
         # First pass: collect resource requirements and check availability
-        print(f"Processing {len(self.tasks)} tasks for resource assignment")
+        logger.debug("Processing %s tasks for resource assignment", len(self.tasks))
         processed_tasks = 0
         tasks_with_resources = 0
         
@@ -733,22 +1756,22 @@ class ConstructionScheduler:
             if 'resources' in task and task['resources']:
                 tasks_with_resources += 1
         
-        print(f"Found {tasks_with_resources} tasks with resource requirements")
+        logger.info("Found %s tasks with resource requirements", tasks_with_resources)
         
         for task in self.tasks:
             tid = task['task_id']
             if 'resources' not in task or not task['resources']:
-                print(f"Task {tid} has no resource requirements, skipping resource assignment")
+                logger.debug("Task %s has no resource requirements, skipping resource assignment", tid)
                 continue
                 
             processed_tasks += 1
-            print(f"Processing resource requirements for Task {tid}: {task['resources']} ({processed_tasks}/{tasks_with_resources})")
+            logger.debug("Processing resource requirements for Task %s: %s (%s/%s)", tid, task['resources'], processed_tasks, tasks_with_resources)
             
             for res_cat, count in task['resources'].items():
                 # Skip if no resources of this type are available
                 if res_cat not in self.resource_availability or not self.resource_availability[res_cat]:
                     resource_warnings.add(res_cat)
-                    print(f"Warning: No available resources for {res_cat} for task {tid}.", file=sys.stderr)
+                    logger.warning("No available resources for %s for task %s.", res_cat, tid)
                     continue
                 
                 # Get available resources of this type
@@ -756,11 +1779,11 @@ class ConstructionScheduler:
                 
                 # Check if we have enough resources of this type
                 if count > len(available_resources):
-                    print(f"Warning: Task {tid} requires {count} of resource {res_cat}, but only {len(available_resources)} available.", file=sys.stderr)
+                    logger.warning("Task %s requires %s of resource %s, but only %s available.", tid, count, res_cat, len(available_resources))
                     # Adjust the demand to the maximum available to ensure feasibility
                     count = len(available_resources)
                     if count == 0:
-                        print(f"Skipping resource assignment for Task {tid}, resource type {res_cat} due to no available resources")
+                        logger.debug("Skipping resource assignment for Task %s, resource type %s due to no available resources", tid, res_cat)
                         continue
                 
                 # Initialize resource tracking for this category if needed
@@ -798,18 +1821,19 @@ class ConstructionScheduler:
                     'assignment_vars': list(zip(available_resources, task_resources))
                 }
                 
-                print(f"  Added constraint: Task {tid} must use exactly {count} resources of type {res_cat}")
-                print(f"  Stored {len(task_resources)} resource assignment variables for Task {tid}, type {res_cat}")
+                logger.debug("  Added constraint: Task %s must use exactly %s resources of type %s", tid, count, res_cat)
+                logger.debug("  Stored %s resource assignment variables for Task %s, type %s", len(task_resources), tid, res_cat)
         
         # Second pass: ensure no resource is double-booked
         for res_cat, data in resource_dict.items():
             for resource in data['resources']:
                 # If this resource has multiple intervals, ensure they don't overlap
-                if len(resource['intervals']) > 1:
-                    self.model.AddNoOverlap(resource['intervals'])
+                intervals = resource['intervals'] + self._reserved_intervals('resource', resource['id'])
+                if len(intervals) > 1:
+                    self.model.AddNoOverlap(intervals)
             
             status = " (WARNING: insufficient resources available)" if res_cat in resource_warnings else ""
-            print(f"Added integrated resource constraints for {res_cat}: capacity = {data['capacity']}{status}", file=sys.stderr)
+            logger.info("Added integrated resource constraints for %s: capacity = %s%s", res_cat, data['capacity'], status)
 
     def _add_integrated_employee_constraints(self):
         """
@@ -825,32 +1849,32 @@ class ConstructionScheduler:
             self.employee_assignments[tid] = {}
         
         # First pass: collect employee requirements and check availability
-        print(f"Processing {len(self.tasks)} tasks for employee assignment")
+        logger.debug("Processing %s tasks for employee assignment", len(self.tasks))
         processed_tasks = 0
         tasks_with_employees = 0
         
         # Count tasks with employee requirements and print details
-        print("\nDetailed employee requirements by task:")
+        logger.debug("Detailed employee requirements by task:")
         for task in self.tasks:
             tid = task['task_id']
             if 'employees' in task and task['employees']:
                 tasks_with_employees += 1
-                print(f"  Task {tid} ({task['name']}) requires:")
+                logger.debug("  Task %s (%s) requires:", tid, task['name'])
                 for group, count in task['employees'].items():
-                    print(f"    - {count} employees of group '{group}'")
+                    logger.debug("    - %s employees of group '%s'", count, group)
             else:
-                print(f"  Task {tid} ({task['name']}) has no employee requirements")
+                logger.debug("  Task %s (%s) has no employee requirements", tid, task['name'])
         
-        print(f"\nFound {tasks_with_employees} tasks with employee requirements")
+        logger.info("Found %s tasks with employee requirements", tasks_with_employees)
         
         for task in self.tasks:
             tid = task['task_id']
             if 'employees' not in task or not task['employees']:
-                print(f"Task {tid} has no employee requirements, skipping employee assignment")
+                logger.debug("Task %s has no employee requirements, skipping employee assignment", tid)
                 continue
                 
             processed_tasks += 1
-            print(f"Processing employee requirements for Task {tid}: {task['employees']} ({processed_tasks}/{tasks_with_employees})")
+            logger.debug("Processing employee requirements for Task %s: %s (%s/%s)", tid, task['employees'], processed_tasks, tasks_with_employees)
             
             for group, count in task['employees'].items():
                 # Convert group to lowercase for case-insensitive matching
@@ -859,7 +1883,7 @@ class ConstructionScheduler:
                 # Skip if no employees of this group are available
                 if group_lower not in self.employee_availability or not self.employee_availability[group_lower]:
                     employee_warnings.add(group)
-                    print(f"Warning: No available employees for group {group} (as '{group_lower}') for task {tid}.", file=sys.stderr)
+                    logger.warning("No available employees for group %s (as '%s') for task %s.", group, group_lower, tid)
                     continue
                 
                 # Get available employees of this group
@@ -867,11 +1891,11 @@ class ConstructionScheduler:
                 
                 # Check if we have enough employees of this group
                 if count > len(available_employees):
-                    print(f"Warning: Task {tid} requires {count} employees of group {group}, but only {len(available_employees)} available.", file=sys.stderr)
+                    logger.warning("Task %s requires %s employees of group %s, but only %s available.", tid, count, group, len(available_employees))
                     # Adjust the demand to the maximum available to ensure feasibility
                     count = len(available_employees)
                     if count == 0:
-                        print(f"Skipping employee assignment for Task {tid}, group {group} due to no available employees")
+                        logger.debug("Skipping employee assignment for Task %s, group %s due to no available employees", tid, group)
                         continue
                 
                 # Initialize employee tracking for this group if needed
@@ -911,20 +1935,21 @@ class ConstructionScheduler:
                     'constraint': constraint
                 }
                 
-                print(f"  Added constraint: Task {tid} must use exactly {count} employees of group {group}")
-                print(f"  Stored {len(task_employees)} employee assignment variables for Task {tid}, group {group}")
+                logger.debug("  Added constraint: Task %s must use exactly %s employees of group %s", tid, count, group)
+                logger.debug("  Stored %s employee assignment variables for Task %s, group %s", len(task_employees), tid, group)
                 
                 # Print the available employees for this group
-                print(f"  Available employees for group {group}:")
+                logger.debug("  Available employees for group %s:", group)
                 for i, employee in enumerate(available_employees):
-                    print(f"    {i+1}. {employee['name']} (ID: {employee['id']})")
+                    logger.debug("    %s. %s (ID: %s)", i+1, employee['name'], employee['id'])
         
         # Second pass: ensure no employee is double-booked
         for group, data in employee_dict.items():
             for employee in data['employees']:
                 # If this employee has multiple intervals, ensure they don't overlap
-                if len(employee['intervals']) > 1:
-                    self.model.AddNoOverlap(employee['intervals'])
+                intervals = employee['intervals'] + self._reserved_intervals('employee', employee['id'])
+                if len(intervals) > 1:
+                    self.model.AddNoOverlap(intervals)
             
             # Use the original group name for display if available
             try:
@@ -942,187 +1967,508 @@ class ConstructionScheduler:
                     original_group = group
                 
                 status = " (WARNING: insufficient employees available)" if group in employee_warnings else ""
-                print(f"Added integrated employee constraints for {original_group} (as '{group}'): capacity = {data['capacity']}{status}", file=sys.stderr)
+                logger.info("Added integrated employee constraints for %s (as '%s'): capacity = %s%s", original_group, group, data['capacity'], status)
             except Exception as e:
-                print(f"Error displaying employee constraints: {e}", file=sys.stderr)
-                print(f"Added integrated employee constraints for {group}: capacity = {data['capacity']}", file=sys.stderr)
+                logger.error("Error displaying employee constraints: %s", e)
+                logger.info("Added integrated employee constraints for %s: capacity = %s", group, data['capacity'])
                 
-    def _load_resources_and_employees(self):
+    def _reserved_intervals(self, kind, member_id):
         """
-        Load all available resources and employees from the database.
-        This information will be used for integrated resource assignment during scheduling.
+        Return fixed intervals covering the time another solve has booked a member.
+
+        Args:
+            kind: 'resource' or 'employee'
+            member_id: Resource or employee ID
+
+        Returns:
+            list: Fixed-size interval variables (empty when the member is not booked)
         """
-        print("Loading resources and employees from database...")
-        conn = self.db.conn
-        cur = conn.cursor()
-        
-        # Load resources
-        try:
-            # Check if type column exists in resources table
-            cur.execute("""
-                SELECT EXISTS (
-                    SELECT column_name 
-                    FROM information_schema.columns 
-                    WHERE table_name = 'resources' AND column_name = 'type'
-                ) as exists
-            """)
-            has_type = cur.fetchone()[0]
-            
-            # Get all resources with appropriate columns
-            if has_type:
-                # First, get all unique resource types from task requirements
-                resource_types_needed = set()
-                for task in self.tasks:
-                    if 'resources' in task:
-                        resource_types_needed.update(task['resources'].keys())
-                
-                print(f"Resource types needed by tasks: {resource_types_needed}")
-                
-                # Get all resources
-                cur.execute("SELECT resource_id, name, type, availability FROM resources")
-                resources = cur.fetchall()
-                print(f"Found {len(resources)} resources in the database")
-                
-                # Process resources
-                for resource in resources:
-                    resource_id, name, resource_type, availability = resource
-                    # Only include available resources
-                    if availability:
-                        if resource_type not in self.resource_availability:
-                            self.resource_availability[resource_type] = []
-                        self.resource_availability[resource_type].append({
-                            'id': resource_id,
-                            'name': name,
-                            'intervals': []  # Will store interval variables when this resource is used
-                        })
-                        print(f"Loaded resource: {name} (ID: {resource_id}, Type: {resource_type})")
-                
-                # Check if we have resources for all needed types
-                for res_type in resource_types_needed:
-                    if res_type not in self.resource_availability or not self.resource_availability[res_type]:
-                        print(f"WARNING: No available resources found for type '{res_type}' which is needed by tasks")
+        return [self.model.NewFixedSizeIntervalVar(start, end - start, f'reserved_{kind}_{member_id}_{start}')
+                for start, end in self.reserved.get((kind, member_id), [])]
+
+    def _add_symmetry_breaking_constraints(self):
+        """
+        Break symmetry between interchangeable members of each resource category
+        and employee skill group.
+
+        Members of a pool share the same eligibility and no-overlap structure, so
+        any permutation of them maps a solution to an equivalent one. Ordering
+        adjacent members removes those duplicates from the search:
+          'load' - member i carries at least as much assigned duration as member i+1
+          'lex'  - member i's assignment literals (in task order) are
+                   lexicographically >= member i+1's; stronger, but adds one
+                   Boolean per (task, member)
+        """
+        # Collect per pool: member ID -> [(task duration, assignment var)] in task order
+        pools = {}
+        for kind, assignments in (('resource', self.resource_assignments), ('employee', self.employee_assignments)):
+            for task in self.tasks:
+                tid = task['task_id']
+                for name, assignment_data in assignments.get(tid, {}).items():
+                    pool = pools.setdefault((kind, name), {})
+                    for member, var in assignment_data['assignment_vars']:
+                        pool.setdefault(member['id'], []).append((task['duration'], var))
+
+        for (kind, name), members in pools.items():
+            # Members booked elsewhere are no longer interchangeable with the rest
+            columns = [column for member_id, column in members.items() if (kind, member_id) not in self.reserved]
+            for upper, lower in zip(columns, columns[1:]):
+                if self.symmetry_breaking == SYMMETRY_BREAKING_LOAD:
+                    self.model.Add(
+                        sum(duration * var for duration, var in upper) >=
+                        sum(duration * var for duration, var in lower)
+                    )
+                else:
+                    self._add_lex_greater_equal([var for _, var in upper], [var for _, var in lower])
+            logger.info("Added %s symmetry breaking for %s pool %s: %s members", self.symmetry_breaking, kind, name, len(columns))
+
+    def _add_lex_greater_equal(self, upper, lower):
+        """Constrain the Boolean vector upper to be lexicographically >= lower."""
+        prefix_equal = None  # True while all earlier positions are equal
+        for x_upper, x_lower in zip(upper, lower):
+            if prefix_equal is None:
+                self.model.Add(x_upper >= x_lower)
             else:
-                print("Warning: 'type' column does not exist in resources table")
-        except Exception as e:
-            print(f"Error loading resources: {e}", file=sys.stderr)
+                self.model.Add(x_upper >= x_lower).OnlyEnforceIf(prefix_equal)
+
+            equal = self.model.NewBoolVar('')
+            self.model.Add(x_upper == x_lower).OnlyEnforceIf(equal)
+            if prefix_equal is None:
+                self.model.AddBoolOr([x_upper.Not(), x_lower.Not(), equal])
+                self.model.AddBoolOr([x_upper, x_lower, equal])
+            else:
+                self.model.AddImplication(equal, prefix_equal)
+                self.model.AddBoolOr([prefix_equal.Not(), x_upper.Not(), x_lower.Not(), equal])
+                self.model.AddBoolOr([prefix_equal.Not(), x_upper, x_lower, equal])
+            prefix_equal = equal
+
+    def _add_aggregate_resource_constraints(self):
+        """
+        Build resource and employee constraints in aggregate mode.
+        Each resource category and employee skill group is modelled as a single
+        cumulative constraint with capacity equal to its pool size, instead of
+        one optional interval per eligible resource or employee. Specific
+        resources and employees are picked after solving by assign_pooled_units.
+
+        Members another solve has booked are modelled individually, like in
+        individual mode: a member-level booking cannot be expressed as pool
+        capacity, since a task needs one member free for its whole duration.
+        The cumulative covers the unbooked members and takes the part of each
+        task's demand the booked members do not cover.
+        """
+        for task in self.tasks:
+            tid = task['task_id']
+            self.resource_assignments[tid] = {}
+            self.employee_assignments[tid] = {}
+
+            for res_cat, count in (task.get('resources') or {}).items():
+                available_resources = self.resource_availability.get(res_cat) or []
+                if not available_resources:
+                    logger.warning("No available resources for %s for task %s.", res_cat, tid)
+                    continue
+                if count > len(available_resources):
+                    logger.warning("Task %s requires %s of resource %s, but only %s available.", tid, count, res_cat, len(available_resources))
+                    count = len(available_resources)
+
+                pool = self.resource_pools.setdefault(res_cat, {'members': available_resources, 'tasks': []})
+                pool['tasks'].append((tid, count))
+                self.resource_assignments[tid][res_cat] = {'count': count, 'assignment_vars': []}
+
+            for group, count in (task.get('employees') or {}).items():
+                group_lower = group.lower() if group else None
+                available_employees = self.employee_availability.get(group_lower) or []
+                if not available_employees:
+                    logger.warning("No available employees for group %s (as '%s') for task %s.", group, group_lower, tid)
+                    continue
+                if count > len(available_employees):
+                    logger.warning("Task %s requires %s employees of group %s, but only %s available.", tid, count, group, len(available_employees))
+                    count = len(available_employees)
+
+                pool = self.employee_pools.setdefault(group_lower, {'members': available_employees, 'tasks': []})
+                pool['tasks'].append((tid, count))
+                self.employee_assignments[tid][group_lower] = {
+                    'count': count,
+                    'original_group': group,
+                    'assignment_vars': []
+                }
+
+        for kind, pools, assignments in (('resource', self.resource_pools, self.resource_assignments),
+                                         ('employee', self.employee_pools, self.employee_assignments)):
+            for name, pool in pools.items():
+                booked = [member for member in pool['members'] if (kind, member['id']) in self.reserved]
+                capacity = len(pool['members']) - len(booked)
+                member_intervals = {member['id']: self._reserved_intervals(kind, member['id']) for member in booked}
+                intervals = []
+                demands = []
+                for tid, count in pool['tasks']:
+                    task_var = self.task_vars[tid]
+                    assignment_vars = []
+                    for member in booked:
+                        var = self.model.NewBoolVar(f'{kind}_{member["id"]}_task_{tid}')
+                        member_intervals[member['id']].append(self.model.NewOptionalIntervalVar(
+                            task_var['start'], task_var['duration'], task_var['end'], var,
+                            f'{kind}_{member["id"]}_task_{tid}_interval'))
+                        assignment_vars.append((member, var))
+                    assignments[tid][name]['assignment_vars'] = assignment_vars
+                    if not assignment_vars:
+                        intervals.append(task_var['interval'])
+                        demands.append(count)
+                        continue
+                    self.model.Add(sum(var for _, var in assignment_vars) <= count)
+                    if capacity == 0:
+                        self.model.Add(sum(var for _, var in assignment_vars) == count)
+                        continue
+                    # Members the pool still has to provide
+                    pooled = self.model.NewIntVar(0, count, f'{kind}_{name}_task_{tid}_pooled')
+                    self.model.Add(pooled + sum(var for _, var in assignment_vars) == count)
+                    intervals.append(task_var['interval'])
+                    demands.append(pooled)
+                for booked_intervals in member_intervals.values():
+                    self.model.AddNoOverlap(booked_intervals)
+                if intervals:
+                    self.model.AddCumulative(intervals, demands, capacity)
+                logger.info("Added aggregate %s constraint for %s: capacity = %s, tasks = %s, booked members = %s",
+                            kind, name, capacity, len(intervals), len(booked))
+
+    def assign_pooled_units(self, solver):
+        """
+        Assign specific resources and employees to tasks after an aggregate-mode solve.
+
+        Members booked by another solve were chosen by the model. For the rest
+        of each task's demand, tasks of each pool are visited in start order and
+        take the lowest-ID unbooked members that are free at their start. The
+        cumulative constraint keeps that demand within the unbooked members, so
+        a free member always exists.
+
+        Args:
+            solver: CpSolver holding a feasible solution of this model
+
+        Returns:
+            tuple: (resource_assignments, employee_assignments) lists in the format
+            used by save_assignments_to_database
+
+        Raises:
+            RuntimeError: If a task cannot get enough members; nothing should be
+                          persisted from such a solution
+        """
+        resource_assignments = []
+        employee_assignments = []
+
+        for kind, pools, requirements in (('resource', self.resource_pools, self.resource_assignments),
+                                          ('employee', self.employee_pools, self.employee_assignments)):
+            for name, pool in pools.items():
+                members = {member['id']: member for member in pool['members']
+                           if (kind, member['id']) not in self.reserved}
+                free = sorted(members)  # Member IDs free right now (min-heap)
+                busy = []  # (release time, member ID) min-heap
+
+                timed_tasks = sorted(
+                    (solver.Value(self.task_vars[tid]['start']), solver.Value(self.task_vars[tid]['end']), tid, count)
+                    for tid, count in pool['tasks']
+                )
+                for start, end, tid, count in timed_tasks:
+                    chosen = [member for member, var in requirements[tid][name]['assignment_vars']
+                              if solver.Value(var) == 1]
+
+                    # Release members whose previous task has finished
+                    while busy and busy[0][0] <= start:
+                        heapq.heappush(free, heapq.heappop(busy)[1])
+
+                    pooled = count - len(chosen)
+                    if len(free) < pooled:
+                        raise RuntimeError(f"Only {len(free)} of {pooled} {kind}s of {name} free for Task {tid}")
+                    for _ in range(pooled):
+                        member_id = heapq.heappop(free)
+                        heapq.heappush(busy, (end, member_id))
+                        chosen.append(members[member_id])
+
+                    for member in chosen:
+                        if kind == 'resource':
+                            resource_assignments.append({
+                                'task_id': tid,
+                                'resource_id': member['id'],
+                                'resource_name': member['name'],
+                                'resource_type': name
+                            })
+                        else:
+                            employee_assignments.append({
+                                'task_id': tid,
+                                'employee_id': member['id'],
+                                'employee_name': member['name'],
+                                'skill_set': name
+                            })
+
+        return resource_assignments, employee_assignments
+
+    def find_reservation_conflicts(self, schedule, resource_assignments, employee_assignments):
+        """
+        Check assignments against the bookings of other solves.
+
+        Args:
+            schedule: List of {'task_id', 'start', 'duration'}
+            resource_assignments: Resource assignment dicts
+            employee_assignments: Employee assignment dicts
+
+        Returns:
+            list: (kind, member_id, task_id) for every assignment overlapping a booking
+        """
+        times = {entry['task_id']: (entry['start'], entry['start'] + entry['duration']) for entry in schedule}
+        conflicts = []
+        for kind, assignments, member_key in (('resource', resource_assignments, 'resource_id'),
+                                              ('employee', employee_assignments, 'employee_id')):
+            for assignment in assignments:
+                start, end = times[assignment['task_id']]
+                if any(start < booked_end and booked_start < end
+                       for booked_start, booked_end in self.reserved.get((kind, assignment[member_key]), [])):
+                    conflicts.append((kind, assignment[member_key], assignment['task_id']))
+        return conflicts
+
+    def model_statistics(self):
+        """
+        Return the counts the solver time limit is predicted from.
         
-        # Load employees
-        try:
-            # Check if skill_set column exists in employees table
-            cur.execute("""
-                SELECT EXISTS (
-                    SELECT column_name 
-                    FROM information_schema.columns 
-                    WHERE table_name = 'employees' AND column_name = 'skill_set'
-                ) as exists
-            """)
-            has_skill_set = cur.fetchone()[0]
+        Returns:
+            dict: 'tasks', 'intervals', 'dependencies', 'variables' and 'constraints'
+        """
+        proto = self.model.Proto()
+        return {
+            'tasks': len(self.task_vars),
+            'intervals': sum(1 for constraint in proto.constraints if constraint.HasField('interval')),
+            'dependencies': len(self.dependency_map),
+            'variables': len(proto.variables),
+            'constraints': len(proto.constraints)
+        }
+
+    def extract_solution(self, solver):
+        """
+        Read the schedule and the resource/employee assignments from a solved model.
+
+        Args:
+            solver: CpSolver that returned OPTIMAL or FEASIBLE for self.model
+
+        Returns:
+            tuple: (schedule, resource_assignments, employee_assignments) where
+                   schedule is a list of {'task_id', 'start', 'duration'} and the
+                   assignments are lists of dicts as saved by save_assignments_to_database
+
+        Raises:
+            RuntimeError: If the assignments would double-book a member reserved
+                          by another solve
+        """
+        schedule = []
+        resource_assignments = []
+        employee_assignments = []
+        
+        for task in self.tasks:
+            tid = task['task_id']
+            start_val = solver.Value(self.task_vars[tid]['start'])
+            end_val = solver.Value(self.task_vars[tid]['end'])
             
-            # Get all employees with appropriate columns
-            if has_skill_set:
-                # First, get all unique employee groups from task requirements
-                employee_groups_needed = set()
-                for task in self.tasks:
-                    if 'employees' in task:
-                        employee_groups_needed.update(task['employees'].keys())
-                
-                print(f"Employee groups needed by tasks: {employee_groups_needed}")
-                
-                # Get all employees
-                cur.execute("SELECT employee_id, name, skill_set FROM employees")
-                employees = cur.fetchall()
-                print(f"Found {len(employees)} employees in the database")
+            # Add task to schedule
+            schedule.append({
+                'task_id': tid,
+                'start': start_val,
+                'duration': end_val - start_val
+            })
+            
+            # Individual mode: read the assignment Booleans for this task
+            if self.resource_mode == RESOURCE_MODE_INDIVIDUAL:
+                # Extract resource assignments for this task
+                if tid in self.resource_assignments:
+                    logger.debug("Checking resource assignments for Task %s", tid)
+                    if not self.resource_assignments[tid]:
+                        logger.debug("  No resource categories found for Task %s", tid)
                 
-                # Process employees
-                for employee in employees:
-                    employee_id, name, skill_set = employee
-                    # Convert skill_set to lowercase for case-insensitive matching
-                    skill_set_lower = skill_set.lower() if skill_set else None
+                    for res_cat, assignment_data in self.resource_assignments[tid].items():
+                        logger.debug("  Resource category: %s, required count: %s", res_cat, assignment_data['count'])
+                        assigned_count = 0
                     
-                    if skill_set_lower not in self.employee_availability:
-                        self.employee_availability[skill_set_lower] = []
-                    self.employee_availability[skill_set_lower].append({
-                        'id': employee_id,
-                        'name': name,
-                        'skill_set_original': skill_set,  # Keep original for display
-                        'intervals': []  # Will store interval variables when this employee is used
-                    })
-                    print(f"Loaded employee: {name} (ID: {employee_id}, Skill: {skill_set} (stored as '{skill_set_lower}')")
+                        for resource, assignment_var in assignment_data['assignment_vars']:
+                            # Check if this resource is assigned to this task
+                            is_assigned = solver.Value(assignment_var) == 1
+                            if is_assigned:
+                                assigned_count += 1
+                                resource_assignments.append({
+                                    'task_id': tid,
+                                    'resource_id': resource['id'],
+                                    'resource_name': resource['name'],
+                                    'resource_type': res_cat
+                                })
+                                logger.debug("  Resource assigned: %s (ID: %s, Type: %s) to Task %s", resource['name'], resource['id'], res_cat, tid)
+                    
+                        logger.debug("  Total resources assigned for %s: %s of %s required", res_cat, assigned_count, assignment_data['count'])
+                else:
+                    logger.debug("Task %s not found in resource_assignments dictionary", tid)
+            
+                # Extract employee assignments for this task
+                if tid in self.employee_assignments:
+                    logger.debug("Checking employee assignments for Task %s", tid)
+                    if not self.employee_assignments[tid]:
+                        logger.debug("  No employee groups found for Task %s", tid)
                 
-                # Check if we have employees for all needed groups
-                for group in employee_groups_needed:
-                    # Convert group to lowercase for case-insensitive matching
-                    group_lower = group.lower() if group else None
-                    if group_lower not in self.employee_availability:
-                        print(f"WARNING: No available employees found for group '{group}' (as '{group_lower}') which is needed by tasks")
-                    elif not self.employee_availability[group_lower]:
-                        print(f"WARNING: Group '{group}' (as '{group_lower}') exists but has no available employees")
-                    else:
-                        print(f"Group '{group}' (as '{group_lower}') has {len(self.employee_availability[group_lower])} available employees:")
-                        for emp in self.employee_availability[group_lower]:
-                            print(f"  - {emp['name']} (ID: {emp['id']}) - Original skill: {emp.get('skill_set_original', 'Unknown')}")
-            else:
-                print("Warning: 'skill_set' column does not exist in employees table")
-        except Exception as e:
-            print(f"Error loading employees: {e}", file=sys.stderr)
-        
-        # Print summary of loaded resources and employees
-        print("\nResource availability summary:")
-        for res_type, resources in self.resource_availability.items():
-            print(f"  {res_type}: {len(resources)} resources available")
-        
-        print("\nEmployee availability summary:")
-        for skill, employees in self.employee_availability.items():
-            print(f"  {skill}: {len(employees)} employees available")
+                    for group, assignment_data in self.employee_assignments[tid].items():
+                        logger.debug("  Employee group: %s, required count: %s", group, assignment_data['count'])
+                        assigned_count = 0
+                    
+                        # Print all assignment variables for debugging
+                        logger.debug("  Checking %s employee assignment variables", len(assignment_data['assignment_vars']))
+                    
+                        for i, (employee, assignment_var) in enumerate(assignment_data['assignment_vars']):
+                            # Check if this employee is assigned to this task
+                            var_value = solver.Value(assignment_var)
+                            is_assigned = var_value == 1
+                        
+                            logger.debug("    Employee %s (ID: %s): Assignment var = %s", employee['name'], employee['id'], var_value)
+                        
+                            if is_assigned:
+                                assigned_count += 1
+                                employee_assignments.append({
+                                    'task_id': tid,
+                                    'employee_id': employee['id'],
+                                    'employee_name': employee['name'],
+                                    'skill_set': group
+                                })
+                                logger.debug("  Employee assigned: %s (ID: %s, Skill: %s) to Task %s", employee['name'], employee['id'], group, tid)
+                    
+                        logger.debug("  Total employees assigned for %s: %s of %s required", group, assigned_count, assignment_data['count'])
+                else:
+                    logger.debug("Task %s not found in employee_assignments dictionary", tid)
+            
+            logger.debug("Task %s (%s): Start at %s, End at %s", tid, task['name'], self.calendar.to_datetime(start_val), self.calendar.to_datetime(end_val))
         
-        cur.close()
+        # Aggregate mode: pick specific resources and employees from each pool
+        if self.resource_mode == RESOURCE_MODE_AGGREGATE:
+            resource_assignments, employee_assignments = self.assign_pooled_units(solver)
+
+        # Never hand back a double booking of a member another solve holds
+        conflicts = self.find_reservation_conflicts(schedule, resource_assignments, employee_assignments)
+        if conflicts:
+            raise RuntimeError(f"{len(conflicts)} assignments overlap reserved bookings, e.g. {conflicts[:5]}")
+
+        return schedule, resource_assignments, employee_assignments
+
+    def _load_resources_and_employees(self):
+        """
+        Load all available resources and employees.
+        Uses the problem snapshot passed to the scheduler when there is one and
+        asks the data source otherwise.
+        This information will be used for integrated resource assignment during scheduling.
+        """
+        if self.snapshot is not None:
+            resources = self.snapshot['resources']
+            employees = self.snapshot['employees']
+        else:
+            resources, employees = self.db.load_resources_and_employees()
+
+        # Only include available resources
+        for resource in resources:
+            if not resource['availability']:
+                continue
+            self.resource_availability.setdefault(resource['type'], []).append({
+                'id': resource['resource_id'],
+                'name': resource['name'],
+                'intervals': []  # Will store interval variables when this resource is used
+            })
+            logger.debug("Loaded resource: %s (ID: %s, Type: %s)", resource['name'], resource['resource_id'], resource['type'])
+
+        for employee in employees:
+            skill_set = employee['skill_set']
+            # Convert skill_set to lowercase for case-insensitive matching
+            skill_set_lower = skill_set.lower() if skill_set else None
+            self.employee_availability.setdefault(skill_set_lower, []).append({
+                'id': employee['employee_id'],
+                'name': employee['name'],
+                'skill_set_original': skill_set,  # Keep original for display
+                'intervals': []  # Will store interval variables when this employee is used
+            })
+            logger.debug("Loaded employee: %s (ID: %s, Skill: %s (stored as '%s')", employee['name'], employee['employee_id'], skill_set, skill_set_lower)
+
+        # Check if we have resources and employees for all needed types and groups
+        resource_types_needed = set()
+        employee_groups_needed = set()
+        for task in self.tasks:
+            resource_types_needed.update((task.get('resources') or {}).keys())
+            employee_groups_needed.update((task.get('employees') or {}).keys())
+
+        for res_type in resource_types_needed:
+            if not self.resource_availability.get(res_type):
+                logger.warning("No available resources found for type '%s' which is needed by tasks", res_type)
+        for group in employee_groups_needed:
+            group_lower = group.lower() if group else None
+            if not self.employee_availability.get(group_lower):
+                logger.warning("No available employees found for group '%s' (as '%s') which is needed by tasks", group, group_lower)
+
+        # Log summary of loaded resources and employees
+        logger.info("Resource availability: %s",
+                    {res_type: len(resources) for res_type, resources in self.resource_availability.items()})
+        logger.info("Employee availability: %s",
+                    {skill: len(employees) for skill, employees in self.employee_availability.items()})
+
+    def add_solution_hints(self, plan):
+        """
+        Hint the persisted plan to the solver: start/end times for every task
+        in the plan and assignment literals for individual resources and
+        employees. Hints outside a variable's domain are clamped; anything
+        still inconsistent is ignored by CP-SAT or repaired when repair_hint is set.
         
+        Args:
+            plan: Result of DatabaseManager.load_current_plan
+            
+        Returns:
+            int: Number of tasks that received hints
+        """
+        hinted = 0
+        latest_end = 0
+        for tid, task_var in self.task_vars.items():
+            planned = plan.get(tid)
+            if planned is None or tid in self.preserved_tasks:
+                # Preserved tasks are already pinned by constraints
+                continue
+            duration = task_var['duration']
+            earliest, latest = self._start_bounds(tid, duration)
+            start = min(max(planned['start'], earliest), latest)
+            self.model.AddHint(task_var['start'], start)
+            self.model.AddHint(task_var['end'], start + duration)
+            latest_end = max(latest_end, start + duration)
+            hinted += 1
+            
+            # Assignment literals exist in individual mode and, for booked members, in aggregate mode
+            for requirements, assigned_ids in ((self.resource_assignments.get(tid, {}), planned['resources']),
+                                               (self.employee_assignments.get(tid, {}), planned['employees'])):
+                if not assigned_ids:
+                    continue
+                for assignment_data in requirements.values():
+                    for member, assignment_var in assignment_data['assignment_vars']:
+                        self.model.AddHint(assignment_var, 1 if member['id'] in assigned_ids else 0)
+        
+        if hinted and hinted + len(self.preserved_tasks) >= len(self.task_vars):
+            latest_end = max([latest_end] + [p['end'] for p in self.preserved_tasks.values()])
+            self.model.AddHint(self.makespan, latest_end)
+        logger.info("Added solution hints for %s of %s tasks", hinted, len(self.task_vars))
+        return hinted
+
     def _load_preserved_tasks(self):
         """
-        Load the current schedule for preserved tasks from the database.
+        Load the current schedule for preserved tasks from the data source.
         These tasks will keep their current schedule in the new solution.
         """
         if not self.preserve_task_ids:
             return
-            
-        conn = self.db.conn
-        cur = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
-        
-        # Get the current schedule for preserved tasks
-        task_ids_str = ','.join(str(tid) for tid in self.preserve_task_ids)
         
-        if task_ids_str:
-            cur.execute(f"""
-                SELECT t.task_id, t.task_name, t.estimated_hours, t.priority, t.phase,
-                       s.planned_start, s.planned_end, s.status
-                FROM tasks t
-                JOIN schedules s ON t.task_id = s.task_id
-                WHERE t.task_id IN ({task_ids_str})
-            """)
+        for tid, task in self.db.load_task_schedules(self.preserve_task_ids).items():
+            # Convert datetime to working time units (exact inverse of how the schedule was stored)
+            start_unit = self.calendar.to_units(task['start'])
+            end_unit = self.calendar.to_units(task['end'])
             
-            preserved_tasks = cur.fetchall()
+            # Store the preserved task schedule
+            self.preserved_tasks[tid] = {
+                'start': start_unit,
+                'end': end_unit,
+                'duration': end_unit - start_unit,
+                'status': task['status']
+            }
             
-            for task in preserved_tasks:
-                tid = task['task_id']
-                
-                # Convert datetime to working time units
-                start_dt = task['planned_start']
-                end_dt = task['planned_end']
-                
-                start_unit = calendar_time_to_working_time(start_dt)
-                end_unit = calendar_time_to_working_time(end_dt)
-                
-                # Store the preserved task schedule
-                self.preserved_tasks[tid] = {
-                    'start': start_unit,
-                    'end': end_unit,
-                    'duration': end_unit - start_unit,
-                    'status': task['status']
-                }
-                
-                print(f"Preserving task {tid} ({task['task_name']}): {start_dt} to {end_dt} (units: {start_unit} to {end_unit})")
-        
-        cur.close()
+            logger.debug("Preserving task %s (%s): %s to %s (units: %s to %s)", tid, task['name'], task['start'], task['end'], start_unit, end_unit)
         
     def _add_preserved_task_constraints(self):
         """
@@ -1141,171 +2487,177 @@ class ConstructionScheduler:
             self.model.Add(self.task_vars[tid]['start'] == preserved['start'])
             self.model.Add(self.task_vars[tid]['end'] == preserved['end'])
             
-            print(f"Added constraints to preserve task {tid} schedule: start={preserved['start']}, end={preserved['end']}")
+            logger.debug("Added constraints to preserve task %s schedule: start=%s, end=%s", tid, preserved['start'], preserved['end'])
 
 # ---------------------------
 # Pretty Output Function
 # ---------------------------
-def validate_schedule(schedule, tasks, db):
+def build_usage_profiles(schedule, tasks, kind):
     """
-    Validate that the schedule respects all resource and employee constraints.
-    Returns True if valid, False otherwise.
+    Build the step function of concurrent usage per resource category or employee group.
+
+    Each scheduled task contributes +count at its start and -count at its end,
+    so the events are sorted once and swept, instead of walking every time
+    unit. Intervals are half-open like the solver's: a task ending exactly
+    when another starts does not overlap it.
+
+    Args:
+        schedule: Schedule entries with task_id, start and duration (working units)
+        tasks: Task dicts with 'resources' and 'employees' requirement maps
+        kind: 'resources' or 'employees'
+
+    Returns:
+        dict: category -> (times, levels, active), three parallel lists.
+              levels[i] is the usage on [times[i], times[i + 1]), and active[i]
+              is the frozenset of task ids running in that span.
     """
-    # Build mapping of task_id to task details
     task_map = {t['task_id']: t for t in tasks}
-    
-    # Track resource and employee usage at each time point
-    resource_usage = {}  # {resource_category: {time_unit: [task_ids]}}
-    employee_usage = {}  # {employee_group: {time_unit: [task_ids]}}
-    
-    # Get resource and employee availability
-    resource_availability = {}
-    employee_availability = {}
-    
-    # Check each task's resource and employee usage
+    events = {}  # category -> [(time, delta, task_id)]
     for entry in schedule:
         tid = entry['task_id']
-        task = task_map[tid]
-        start_unit = entry['start']
-        duration_units = entry['duration']
-        end_unit = start_unit + duration_units
-        
-        # For each time unit this task runs
-        for time_unit in range(int(start_unit), int(end_unit) + 1):
-            # Check resource usage
-            for res_cat, count in task['resources'].items():
-                if res_cat not in resource_availability:
-                    resource_availability[res_cat] = db.get_resource_availability(res_cat)
-                
-                if res_cat not in resource_usage:
-                    resource_usage[res_cat] = {}
-                resource_usage[res_cat].setdefault(time_unit, [])
-                resource_usage[res_cat][time_unit].append(tid)
-                
-                # Calculate total usage at this time point
-                total_usage = sum(task_map[t_id]['resources'].get(res_cat, 0) for t_id in resource_usage[res_cat][time_unit])
-                
-                # Validate resource constraint
-                if total_usage > resource_availability[res_cat]:
-                    # Check if this is an edge case where tasks are scheduled back-to-back
-                    # and the end time of one task equals the start time of another
-                    is_edge_case = False
-                    task_entries = []
-                    
-                    # Get all task entries for tasks using this resource at this time
-                    for t_id in resource_usage[res_cat][time_unit]:
-                        task_entry = next((e for e in schedule if e['task_id'] == t_id), None)
-                        if task_entry:
-                            task_entries.append((t_id, task_entry))
-                    
-                    # Check if any pair of tasks have one ending exactly when the other starts
-                    for i in range(len(task_entries)):
-                        for j in range(i+1, len(task_entries)):
-                            t1_id, t1_entry = task_entries[i]
-                            t2_id, t2_entry = task_entries[j]
-                            
-                            t1_start = t1_entry['start']
-                            t1_end = t1_start + t1_entry['duration']
-                            t2_start = t2_entry['start']
-                            t2_end = t2_start + t2_entry['duration']
-                            
-                            # If one task ends exactly when the other starts, this is an edge case
-                            if t1_end == t2_start or t2_end == t1_start:
-                                is_edge_case = True
-                                break
-                    
-                    # If this is an edge case, don't report it as an error
-                    if is_edge_case:
-                        continue
-                    
-                    # Otherwise, report the error
-                    print(f"ERROR: Resource constraint violated for {res_cat} at time {time_unit}")
-                    print(f"  Usage: {total_usage}, Available: {resource_availability[res_cat]}")
-                    print(f"  Tasks using this resource at this time:")
-                    for t_id in resource_usage[res_cat][time_unit]:
-                        task_name = task_map[t_id]['name']
-                        task_usage = task_map[t_id]['resources'].get(res_cat, 0)
-                        # Find the entry for this task
-                        task_entry = next((e for e in schedule if e['task_id'] == t_id), None)
-                        if task_entry:
-                            start_time = working_time_to_datetime(task_entry['start'])
-                            end_time = working_time_to_datetime(task_entry['start'] + task_entry['duration'])
-                            print(f"    - Task {t_id} ({task_name}): Using {task_usage} units")
-                            print(f"      Start: {start_time}, End: {end_time}")
-                    return False
-            
-            # Check employee usage
-            for group, count in task['employees'].items():
-                if group not in employee_availability:
-                    employee_availability[group] = db.get_employee_availability(group)
-                
-                if group not in employee_usage:
-                    employee_usage[group] = {}
-                employee_usage[group].setdefault(time_unit, [])
-                employee_usage[group][time_unit].append(tid)
-                
-                # Calculate total usage at this time point
-                total_usage = sum(task_map[t_id]['employees'].get(group, 0) for t_id in employee_usage[group][time_unit])
-                
-                # Validate employee constraint
-                if total_usage > employee_availability[group]:
-                    # Check if this is an edge case where tasks are scheduled back-to-back
-                    # and the end time of one task equals the start time of another
-                    is_edge_case = False
-                    task_entries = []
-                    
-                    # Get all task entries for tasks using this employee group at this time
-                    for t_id in employee_usage[group][time_unit]:
-                        task_entry = next((e for e in schedule if e['task_id'] == t_id), None)
-                        if task_entry:
-                            task_entries.append((t_id, task_entry))
-                    
-                    # Check if any pair of tasks have one ending exactly when the other starts
-                    for i in range(len(task_entries)):
-                        for j in range(i+1, len(task_entries)):
-                            t1_id, t1_entry = task_entries[i]
-                            t2_id, t2_entry = task_entries[j]
-                            
-                            t1_start = t1_entry['start']
-                            t1_end = t1_start + t1_entry['duration']
-                            t2_start = t2_entry['start']
-                            t2_end = t2_start + t2_entry['duration']
-                            
-                            # If one task ends exactly when the other starts, this is an edge case
-                            if t1_end == t2_start or t2_end == t1_start:
-                                is_edge_case = True
-                                break
-                    
-                    # If this is an edge case, don't report it as an error
-                    if is_edge_case:
-                        continue
-                    
-                    # Otherwise, report the error
-                    print(f"ERROR: Employee constraint violated for {group} at time {time_unit}")
-                    print(f"  Usage: {total_usage}, Available: {employee_availability[group]}")
-                    print(f"  Tasks using this employee group at this time:")
-                    for t_id in employee_usage[group][time_unit]:
-                        task_name = task_map[t_id]['name']
-                        task_usage = task_map[t_id]['employees'].get(group, 0)
-                        # Find the entry for this task
-                        task_entry = next((e for e in schedule if e['task_id'] == t_id), None)
-                        if task_entry:
-                            start_time = working_time_to_datetime(task_entry['start'])
-                            end_time = working_time_to_datetime(task_entry['start'] + task_entry['duration'])
-                            print(f"    - Task {t_id} ({task_name}): Using {task_usage} workers")
-                            print(f"      Start: {start_time}, End: {end_time}")
-                    return False
-    
-    return True
-
-def print_schedule(schedule, tasks, db):
+        start = entry['start']
+        end = start + entry['duration']
+        if end <= start:
+            continue
+        for category, count in task_map[tid][kind].items():
+            if count:
+                category_events = events.setdefault(category, [])
+                category_events.append((start, count, tid))
+                category_events.append((end, -count, tid))
+
+    profiles = {}
+    for category, category_events in events.items():
+        category_events.sort(key=lambda event: event[0])
+        times, levels, active = [], [], []
+        level = 0
+        running = set()
+        i = 0
+        while i < len(category_events):
+            time_point = category_events[i][0]
+            # Apply every event at this time point before recording the level
+            while i < len(category_events) and category_events[i][0] == time_point:
+                _, delta, tid = category_events[i]
+                level += delta
+                if delta > 0:
+                    running.add(tid)
+                else:
+                    running.discard(tid)
+                i += 1
+            times.append(time_point)
+            levels.append(level)
+            active.append(frozenset(running))
+        profiles[category] = (times, levels, active)
+    return profiles
+
+def peak_usage_between(profile, start, end):
+    """
+    Return the highest usage of a profile on [start, end).
+
+    Args:
+        profile: (times, levels, active) from build_usage_profiles, or None
+        start: Window start (working units)
+        end: Window end (working units)
+
+    Returns:
+        int: Peak concurrent usage in the window
+    """
+    if not profile:
+        return 0
+    times, levels, _ = profile
+    # The step in force at `start` is the last one at or before it
+    i = max(bisect.bisect_right(times, start) - 1, 0)
+    peak = 0
+    while i < len(times) and times[i] < end:
+        peak = max(peak, levels[i])
+        i += 1
+    return peak
+
+def find_capacity_violations(profiles, availability):
+    """
+    Find every span where concurrent usage exceeds what is available.
+
+    Consecutive over-capacity steps are merged into one violation.
+
+    Args:
+        profiles: Usage profiles from build_usage_profiles
+        availability: Map category -> available units
+
+    Returns:
+        list: Violations as dicts with category, start, end (working units),
+              peak usage, available units and the ids of the tasks involved
+    """
+    violations = []
+    for category, (times, levels, active) in profiles.items():
+        available = availability.get(category, 0)
+        current = None
+        for i, level in enumerate(levels):
+            if level > available:
+                if current is None:
+                    current = {'category': category, 'start': times[i], 'end': None,
+                               'usage': level, 'available': available, 'task_ids': set()}
+                    violations.append(current)
+                current['usage'] = max(current['usage'], level)
+                current['task_ids'].update(active[i])
+            elif current is not None:
+                current['end'] = times[i]
+                current = None
+        if current is not None:
+            current['end'] = times[-1]
+    return violations
+
+def validate_schedule(schedule, tasks, db, calendar=None):
+    """
+    Validate that the schedule respects all resource and employee constraints.
+
+    Usage is computed with a sweep over task start/end events (see
+    build_usage_profiles), and every violation is reported, not just the first.
+
+    Args:
+        schedule: Schedule entries with task_id, start and duration
+        tasks: Task dicts as returned by DatabaseManager.get_tasks
+        db: DataSource used to look up availability
+        calendar: WorkCalendar for the printed times; defaults to db's tenant calendar
+
+    Returns:
+        bool: True if valid, False otherwise
+    """
+    calendar = calendar or get_work_calendar(source=db)
+    task_map = {t['task_id']: t for t in tasks}
+    violations = []
+    for kind, get_availability, label, unit_label in (
+            ('resources', db.get_resource_availability, 'Resource', 'units'),
+            ('employees', db.get_employee_availability, 'Employee', 'workers')):
+        profiles = build_usage_profiles(schedule, tasks, kind)
+        availability = {category: get_availability(category) for category in profiles}
+        for violation in find_capacity_violations(profiles, availability):
+            violations.append((label, unit_label, kind, violation))
+
+    entry_map = {entry['task_id']: entry for entry in schedule}
+    for label, unit_label, kind, violation in violations:
+        category = violation['category']
+        print(f"ERROR: {label} constraint violated for {category} "
+              f"from {calendar.to_datetime(violation['start'])} to {calendar.to_datetime(violation['end'])}")
+        print(f"  Peak usage: {violation['usage']}, Available: {violation['available']}")
+        print(f"  Tasks involved:")
+        for t_id in sorted(violation['task_ids']):
+            entry = entry_map[t_id]
+            start_time = calendar.to_datetime(entry['start'])
+            end_time = calendar.to_datetime(entry['start'] + entry['duration'])
+            print(f"    - Task {t_id} ({task_map[t_id]['name']}): Using {task_map[t_id][kind].get(category, 0)} {unit_label}")
+            print(f"      Start: {start_time}, End: {end_time}")
+    if violations:
+        print(f"Found {len(violations)} capacity violation(s)")
+    return not violations
+
+def print_schedule(schedule, tasks, db, calendar=None):
     """
     Print the schedule in a friendly format with enhanced details.
     Includes dependencies, lag hours, resource allocations, and availability information.
     First validates that the schedule respects all constraints.
     """
+    calendar = calendar or get_work_calendar(source=db)
     # Validate the schedule
-    is_valid = validate_schedule(schedule, tasks, db)
+    is_valid = validate_schedule(schedule, tasks, db, calendar)
     if not is_valid:
         print("WARNING: Schedule validation failed! Resource or employee constraints are violated.")
         print("This indicates a bug in the scheduler or constraint enforcement.")
@@ -1314,108 +2666,20 @@ def print_schedule(schedule, tasks, db):
     # Build mapping of task_id to task details
     task_map = {t['task_id']: t for t in tasks}
     
+    # Concurrent usage over time per resource category and employee group
+    resource_profiles = build_usage_profiles(schedule, tasks, 'resources')
+    employee_profiles = build_usage_profiles(schedule, tasks, 'employees')
+    
     # Get current resource and employee availability
     resource_availability = {}
     employee_availability = {}
-    
-    # Track allocations for each time period - using hourly intervals for more accurate tracking
-    resource_allocations = {}  # {resource_category: {day: count}}
-    resource_time_allocations = {}  # {resource_category: {time_unit: count}}
-    employee_allocations = {}  # {resource_group: {day: count}}
-    
-    # First pass: build a timeline of resource usage
-    # We'll track exactly which tasks are using resources at each time point
-    resource_timeline = {}  # {resource_category: {time_unit: [task_ids]}}
-    
-    for entry in schedule:
-        tid = entry['task_id']
-        task = task_map[tid]
-        start_unit = entry['start']
-        duration_units = entry['duration']
-        end_unit = start_unit + duration_units
-        start_day = unit_to_day(start_unit)
-        end_day = unit_to_day(end_unit)
-        
-        # For each time unit this task runs (hourly tracking)
-        for time_unit in range(int(start_unit), int(end_unit) + 1):
-            # Allocate resources by time unit
-            for res_cat, count in task['resources'].items():
-                if res_cat not in resource_timeline:
-                    resource_timeline[res_cat] = {}
-                resource_timeline[res_cat].setdefault(time_unit, [])
-                # Add this task to the timeline at this time point
-                resource_timeline[res_cat][time_unit].append(tid)
-                
-                # Also track total availability
-                if res_cat not in resource_availability:
-                    resource_availability[res_cat] = db.get_resource_availability(res_cat)
-    
-    # Now calculate the actual resource usage at each time point
-    for res_cat, timeline in resource_timeline.items():
-        if res_cat not in resource_time_allocations:
-            resource_time_allocations[res_cat] = {}
-            
-        for time_unit, task_ids in timeline.items():
-            # Calculate total resource usage at this time point
-            total_usage = sum(task_map[tid]['resources'].get(res_cat, 0) for tid in task_ids)
-            resource_time_allocations[res_cat][time_unit] = total_usage
-            
-            # Also track by day for backward compatibility
-            day = unit_to_day(time_unit)
-            if res_cat not in resource_allocations:
-                resource_allocations[res_cat] = {}
-            resource_allocations[res_cat].setdefault(day, 0)
-            # Track maximum usage on this day
-            resource_allocations[res_cat][day] = max(
-                resource_allocations[res_cat][day], 
-                total_usage
-            )
-            
-    # Now do the same for employees - build a timeline
-    employee_timeline = {}  # {employee_group: {time_unit: [task_ids]}}
-    employee_time_allocations = {}  # {employee_group: {time_unit: count}}
-    
-    for entry in schedule:
-        tid = entry['task_id']
-        task = task_map[tid]
-        start_unit = entry['start']
-        duration_units = entry['duration']
-        end_unit = start_unit + duration_units
-        
-        # For each time unit this task runs
-        for time_unit in range(int(start_unit), int(end_unit) + 1):
-            # Allocate employees by time unit
-            for group, count in task['employees'].items():
-                if group not in employee_timeline:
-                    employee_timeline[group] = {}
-                employee_timeline[group].setdefault(time_unit, [])
-                # Add this task to the timeline
-                employee_timeline[group][time_unit].append(tid)
-                
-                # Also track total availability
-                if group not in employee_availability:
-                    employee_availability[group] = db.get_employee_availability(group)
-    
-    # Calculate actual employee usage at each time point
-    for group, timeline in employee_timeline.items():
-        if group not in employee_time_allocations:
-            employee_time_allocations[group] = {}
-            
-        for time_unit, task_ids in timeline.items():
-            # Calculate total employee usage at this time point
-            total_usage = sum(task_map[tid]['employees'].get(group, 0) for tid in task_ids)
-            employee_time_allocations[group][time_unit] = total_usage
-            
-            # Track by day for backward compatibility
-            day = unit_to_day(time_unit)
-            if group not in employee_allocations:
-                employee_allocations[group] = {}
-            employee_allocations[group].setdefault(day, 0)
-            # Track maximum usage on this day
-            employee_allocations[group][day] = max(
-                employee_allocations[group][day],
-                total_usage
-            )
+    for t in tasks:
+        for res_cat in t['resources']:
+            if res_cat not in resource_availability:
+                resource_availability[res_cat] = db.get_resource_availability(res_cat)
+        for group in t['employees']:
+            if group not in employee_availability:
+                employee_availability[group] = db.get_employee_availability(group)
     
     # Convert each schedule entry
     output_entries = []
@@ -1425,12 +2689,12 @@ def print_schedule(schedule, tasks, db):
         start_unit = entry['start']
         duration_units = entry['duration']
         finish_unit = start_unit + duration_units
-        start_dt = working_time_to_datetime(start_unit)
-        finish_dt = working_time_to_datetime(finish_unit)
+        start_dt = calendar.to_datetime(start_unit)
+        finish_dt = calendar.to_datetime(finish_unit)
         
         # Compute day numbers
-        start_day = unit_to_day(start_unit)
-        finish_day = unit_to_day(finish_unit)
+        start_day = unit_to_day(start_unit, calendar)
+        finish_day = unit_to_day(finish_unit, calendar)
         
         # Duration in working days
         duration_days = duration_units / UNITS_PER_DAY
@@ -1456,25 +2720,12 @@ def print_schedule(schedule, tasks, db):
         # Employee details
         employee_details = []
         for group, count in task['employees'].items():
-            # Get max allocation for this group during task duration using time-based tracking
-            max_allocated = 0
-            
-            # Calculate the exact time range for this task
-            task_start_unit = unit_to_time(entry['start'])
-            task_end_unit = unit_to_time(entry['start'] + entry['duration'])
-            
-            # Find the maximum concurrent usage during this task's execution
-            for time_unit in range(int(task_start_unit), int(task_end_unit) + 1):
-                if time_unit in employee_time_allocations.get(group, {}):
-                    time_allocation = employee_time_allocations[group][time_unit]
-                    max_allocated = max(max_allocated, time_allocation)
+            # Maximum concurrent usage of this group during the task's execution
+            max_allocated = peak_usage_between(employee_profiles.get(group), start_unit, finish_unit)
             
             available = employee_availability[group]
             
-            # Ensure max_allocated doesn't exceed available employees
-            # This is critical - it should never exceed availability if AddCumulative is working
-            max_allocated = min(max_allocated, available)
-            
+            # Reported uncapped, so an over-allocation shows up here
             remaining = max(0, available - max_allocated)  # Ensure remaining is never negative
             
             employee_details.append({
@@ -1488,25 +2739,12 @@ def print_schedule(schedule, tasks, db):
         # Resource details
         resource_details = []
         for res_cat, count in task['resources'].items():
-            # Get max allocation for this resource during task duration using time-based tracking
-            max_allocated = 0
-            
-            # Calculate the exact time range for this task
-            task_start_unit = unit_to_time(entry['start'])
-            task_end_unit = unit_to_time(entry['start'] + entry['duration'])
-            
-            # Find the maximum concurrent usage during this task's execution
-            for time_unit in range(int(task_start_unit), int(task_end_unit) + 1):
-                if time_unit in resource_time_allocations[res_cat]:
-                    time_allocation = resource_time_allocations[res_cat][time_unit]
-                    max_allocated = max(max_allocated, time_allocation)
+            # Maximum concurrent usage of this resource during the task's execution
+            max_allocated = peak_usage_between(resource_profiles.get(res_cat), start_unit, finish_unit)
             
             available = resource_availability[res_cat]
             
-            # Ensure max_allocated doesn't exceed available resources
-            # This is critical - it should never exceed availability if AddCumulative is working
-            max_allocated = min(max_allocated, available)
-            
+            # Reported uncapped, so an over-allocation shows up here
             remaining = max(0, available - max_allocated)  # Ensure remaining is never negative
             
             resource_details.append({
@@ -1539,7 +2777,7 @@ def print_schedule(schedule, tasks, db):
             phases.setdefault(phase, []).append(t['task_id'])
     
     print("\n====== CONSTRUCTION PROJECT SCHEDULE ======")
-    print(f"Project Start Date: {PROJECT_START_DATE}")
+    print(f"Project Start Date: {calendar.start_date}")
     print(f"Schedule Horizon: {HORIZON_DAYS} days")
     
     # Resource and employee summary
@@ -1571,13 +2809,9 @@ def print_schedule(schedule, tasks, db):
         phase_start_date = min(e['start_date'].date() for e in phase_entries)
         phase_end_date = max(e['finish_date'].date() for e in phase_entries)
         
-        # Calculate working days between start and end dates (excluding weekends)
-        working_days = 0
-        current_date = phase_start_date
-        while current_date <= phase_end_date:
-            if is_working_day(datetime.combine(current_date, datetime.min.time())):
-                working_days += 1
-            current_date += timedelta(days=1)
+        # Calculate working days between start and end dates (excluding non-working days)
+        working_days = (calendar.working_days_before(phase_end_date + timedelta(days=1)) -
+                        calendar.working_days_before(phase_start_date))
         
         print(f"\n--- PHASE {PHASE_ORDER.get(phase, '?')}: {phase} ---")
         print(f"  Start: Day {phase_start} ({phase_start_date})")
@@ -1628,573 +2862,531 @@ def print_schedule(schedule, tasks, db):
     print("\n==== RESOURCE UTILIZATION SUMMARY ====")
     max_day = max(entry['finish_day'] for entry in output_entries)
     
-    for resource_type, time_units in resource_time_allocations.items():
-        avail = resource_availability[resource_type]
+    for resource_type, avail in resource_availability.items():
         print(f"\nResource: {resource_type} (Available: {avail})")
-        
-        # Find peak usage by time unit (more accurate)
-        peak_usage = max(time_units.values()) if time_units else 0
-        
-        # Cap peak usage at availability - the solver should ensure this
-        # but we'll enforce it in the reporting to be safe
-        peak_usage = min(peak_usage, avail)
-        
-        # Ensure peak usage doesn't exceed availability (this is a sanity check)
-        if peak_usage > avail:
-            print(f"  WARNING: Peak usage ({peak_usage}) exceeds availability ({avail})!")
-            # This should never happen if AddCumulative is working correctly
-        
-        # Find the days when peak usage occurs
-        peak_time_units = [unit for unit, usage in time_units.items() if usage == peak_usage]
-        peak_days = sorted(set(unit_to_day(unit) for unit in peak_time_units))
-        
-        print(f"  Peak Usage: {peak_usage} units on Day(s) {', '.join(map(str, peak_days))}")
-        
-        # Add check for division by zero
-        if avail > 0:
-            print(f"  Utilization: {peak_usage/avail*100:.1f}% at peak")
-        else:
-            print("  Utilization: N/A (no available resources)")
+        print_peak_usage(resource_profiles.get(resource_type), avail, 'units', 'resources', calendar)
     
-    for group, time_units in employee_time_allocations.items():
-        avail = employee_availability[group]
+    for group, avail in employee_availability.items():
         print(f"\nEmployee Group: {group} (Available: {avail})")
-        
-        # Find peak usage by time unit (more accurate)
-        peak_usage = max(time_units.values()) if time_units else 0
-        
-        # Cap peak usage at availability - the solver should ensure this
-        # but we'll enforce it in the reporting to be safe
-        peak_usage = min(peak_usage, avail)
-        
-        # Ensure peak usage doesn't exceed availability (this is a sanity check)
-        if peak_usage > avail:
-            print(f"  WARNING: Peak usage ({peak_usage}) exceeds availability ({avail})!")
-            # This should never happen if AddCumulative is working correctly
-        
-        # Find the days when peak usage occurs
-        peak_time_units = [unit for unit, usage in time_units.items() if usage == peak_usage]
-        peak_days = sorted(set(unit_to_day(unit) for unit in peak_time_units))
-        
-        print(f"  Peak Usage: {peak_usage} workers on Day(s) {', '.join(map(str, peak_days))}")
-        
-        # Add check for division by zero
-        if avail > 0:
-            print(f"  Utilization: {peak_usage/avail*100:.1f}% at peak")
-        else:
-            print("  Utilization: N/A (no available employees)")
+        print_peak_usage(employee_profiles.get(group), avail, 'workers', 'employees', calendar)
+
+def print_peak_usage(profile, avail, unit_label, entity_label, calendar=None):
+    """
+    Print the peak usage of one resource category or employee group and the days it occurs on.
+
+    Args:
+        profile: (times, levels, active) from build_usage_profiles, or None if unused
+        avail: Available units
+        unit_label: 'units' or 'workers'
+        entity_label: 'resources' or 'employees', for the no-availability message
+        calendar: WorkCalendar for the day numbers; defaults to the default working week
+    """
+    times, levels, _ = profile or ([], [], [])
+    peak_usage = max(levels) if levels else 0
+    if peak_usage > avail:
+        print(f"  WARNING: Peak usage ({peak_usage}) exceeds availability ({avail})!")
+        # This should never happen if AddCumulative is working correctly
+    
+    # Days covered by the spans at peak usage
+    peak_days = set()
+    for i, level in enumerate(levels):
+        if level == peak_usage and level > 0 and i + 1 < len(times):
+            peak_days.update(range(unit_to_day(times[i], calendar), unit_to_day(times[i + 1] - 1, calendar) + 1))
+    
+    print(f"  Peak Usage: {peak_usage} {unit_label} on Day(s) {', '.join(map(str, sorted(peak_days)))}")
+    
+    # Add check for division by zero
+    if avail > 0:
+        print(f"  Utilization: {peak_usage/avail*100:.1f}% at peak")
+    else:
+        print(f"  Utilization: N/A (no available {entity_label})")
 
 # ---------------------------
 # Main CP-SAT Scheduler Function
 # ---------------------------
-def cp_sat_scheduler(preserve_task_ids=None):
+def persist_solution(db, tasks, schedule, resource_assignments, employee_assignments, preserve_task_ids=None,
+                     calendar=None):
+    """
+    Print the schedule report, then write the schedule and the resource and
+    employee assignments of a solved run to the data source.
+
+    Args:
+        db: DataSource, usually a DatabaseManager
+        tasks: Scheduled tasks
+        schedule: List of {'task_id', 'start', 'duration'}
+        resource_assignments: Resource assignment dicts
+        employee_assignments: Employee assignment dicts
+        preserve_task_ids: Optional task IDs whose stored schedule is kept
+        calendar: WorkCalendar the schedule was solved on; defaults to db's tenant calendar
+    """
+    calendar = calendar or get_work_calendar(source=db)
+    # The console report is only worth its cost when progress output is enabled
+    if logger.isEnabledFor(logging.INFO):
+        print_schedule(schedule, tasks, db, calendar)
+    
+    logger.info("Updating schedule in database...")
+    db.update_schedule(schedule, preserve_task_ids, calendar)
+    
+    # Save resource and employee assignments to database
+    logger.info("Saving resource and employee assignments to database...")
+    
+    # Check if we have assignments for all tasks with requirements
+    tasks_with_resources = sum(1 for t in tasks if t['resources'])
+    tasks_with_employees = sum(1 for t in tasks if t['employees'])
+    
+    resource_task_ids = set(a['task_id'] for a in resource_assignments)
+    employee_task_ids = set(a['task_id'] for a in employee_assignments)
+    
+    logger.info("Assignment coverage: resources %s/%s tasks, employees %s/%s tasks",
+                len(resource_task_ids), tasks_with_resources, len(employee_task_ids), tasks_with_employees)
+    
+    # Find tasks with requirements but no assignments
+    tasks_missing_resources = [t['task_id'] for t in tasks if t['resources'] and t['task_id'] not in resource_task_ids]
+    tasks_missing_employees = [t['task_id'] for t in tasks if t['employees'] and t['task_id'] not in employee_task_ids]
+    
+    if tasks_missing_resources:
+        logger.warning("%s tasks have resource requirements but no assignments: %s",
+                       len(tasks_missing_resources), tasks_missing_resources)
+    
+    if tasks_missing_employees:
+        logger.warning("%s tasks have employee requirements but no assignments: %s",
+                       len(tasks_missing_employees), tasks_missing_employees)
+    
+    save_assignments_to_database(db, resource_assignments, employee_assignments, preserve_task_ids, tasks)
+
+def cp_sat_scheduler(preserve_task_ids=None, resource_mode=None, symmetry_breaking=None,
+                     progress_callback=None, stop_event=None, warm_start=None, repair_hints=None,
+                     use_model_cache=None, decomposition=None, rolling_horizon=None, window_days=None,
+                     overlap_days=None, solver_profile=None, stop_criteria=None, data_source=None):
     """
     Run the CP-SAT scheduler to generate an optimal schedule
     
     Args:
         preserve_task_ids: Optional list of task IDs to preserve (not reschedule)
                           These tasks will keep their current schedule
+        resource_mode: Optional resource model mode ('individual' or 'aggregate');
+                       defaults to RESOURCE_MODE
+        symmetry_breaking: Optional symmetry breaking between interchangeable
+                           employees/resources ('load' or 'lex'); defaults to SYMMETRY_BREAKING
+        progress_callback: Optional callable invoked with a progress dict
+                           ({'solution_count', 'best_makespan', 'best_makespan_hours', 'elapsed'})
+                           for every solution found
+        stop_event: Optional threading.Event; setting it stops the search and
+                    skips persisting the result
+        warm_start: Hint the persisted schedule and assignments to the solver;
+                    defaults to WARM_START
+        repair_hints: Let the solver repair infeasible hints; defaults to REPAIR_HINTS
+        use_model_cache: Reuse a cached model when the problem is unchanged;
+                         defaults to MODEL_CACHE
+        decomposition: Split the problem into subproblems solved in parallel
+                       ('project' or 'component'); defaults to DECOMPOSITION
+        rolling_horizon: Solve window by window; defaults to ROLLING_HORIZON
+        window_days: Rolling horizon window in working days; defaults to ROLLING_WINDOW_DAYS
+        overlap_days: Working days re-solved by the next window; defaults to ROLLING_OVERLAP_DAYS
+        solver_profile: Time limit and search worker profile ('interactive', 'nightly'
+                        or 'exhaustive'); defaults to SOLVER_PROFILE
+        stop_criteria: Optional early stopping criteria replacing the profile's
+                       ('relative_gap', 'stagnation_seconds', 'stagnation_solutions',
+                       'target_makespan' in working-time units, 'solution_timeout');
+                       a None value turns a criterion off
+        data_source: DataSource to read the problem from and write the schedule to;
+                     defaults to a DatabaseManager on DB_PARAMS
+    
+    Returns:
+        dict: Run summary with 'status' (solver status name, 'CANCELLED' or 'ERROR'),
+              'makespan' (working-time units, or None), 'solution_count' and 'solver_profile';
+              monolithic runs also report the 'time_limit', 'num_workers' and why the search
+              ended ('stop_reason');
+              decomposed runs also report 'subproblems' and rolling-horizon runs 'windows',
+              and runs that are infeasible before solving list the 'infeasible_tasks'
     """
-    print(f"Connecting to database with parameters: {DB_PARAMS}")
-    db = DatabaseManager()
+    result = {'status': None, 'makespan': None, 'solution_count': 0,
+              'solver_profile': solver_profile or SOLVER_PROFILE}
+    decomposition = DECOMPOSITION if decomposition is None else decomposition
+    rolling_horizon = ROLLING_HORIZON if rolling_horizon is None else rolling_horizon
+    use_model_cache = MODEL_CACHE if use_model_cache is None else use_model_cache
+    if data_source is None:
+        logger.debug("Connecting to database %s on %s", DB_PARAMS['dbname'], DB_PARAMS['host'])
+    db = data_source or DatabaseManager()
     
     try:
-        # Check database connection and tables
-        conn = db.conn
-        cur = conn.cursor()
-        
-        # List all tables in the database
-        cur.execute("SELECT table_name FROM information_schema.tables WHERE table_schema = 'public';")
-        tables = [row[0] for row in cur.fetchall()]
-        print(f"Tables in database: {tables}")
-        
-        # Check employees table
-        if 'employees' in tables:
-            cur.execute("SELECT COUNT(*) FROM employees;")
-            employee_count = cur.fetchone()[0]
-            print(f"Found {employee_count} employees in the database")
-            
-            # Show employee data
-            cur.execute("SELECT * FROM employees;")
-            employees = cur.fetchall()
-            print("Employee data:")
-            for emp in employees:
-                print(f"  {emp}")
-        else:
-            print("WARNING: 'employees' table not found in database")
-            
-        # Check task_required_employees table
-        if 'task_required_employees' in tables:
-            cur.execute("SELECT COUNT(*) FROM task_required_employees;")
-            req_count = cur.fetchone()[0]
-            print(f"Found {req_count} employee requirements in the database")
-            
-            # Show requirement data
-            cur.execute("SELECT * FROM task_required_employees;")
-            requirements = cur.fetchall()
-            print("Employee requirements:")
-            for req in requirements:
-                print(f"  {req}")
-        else:
-            print("WARNING: 'task_required_employees' table not found in database")
-        
-        print("Loading tasks...")
-        tasks = db.get_tasks()
+        if decomposition not in (None, DECOMPOSITION_PROJECT, DECOMPOSITION_COMPONENT):
+            raise ValueError(f"Unknown decomposition: {decomposition}")
+        if decomposition and rolling_horizon:
+            raise ValueError("Decomposition and rolling horizon cannot be combined")
+        get_solver_profile(result['solver_profile'])
+        
+        # Load tasks, dependencies, requirements, resources and employees in one round trip
+        logger.info("Loading problem snapshot...")
+        snapshot = db.load_problem_snapshot()
+        tasks = snapshot['tasks']
         if not tasks:
-            print("No tasks retrieved.", file=sys.stderr)
-            sys.exit(1)
+            logger.error("No tasks retrieved.")
+            result['status'] = 'ERROR'
+            result['error'] = "No tasks retrieved"
+            return result
             
         # If we have tasks to preserve, filter them out
         if preserve_task_ids:
-            print(f"Preserving {len(preserve_task_ids)} tasks: {preserve_task_ids}")
+            logger.info("Preserving %s tasks: %s", len(preserve_task_ids), preserve_task_ids)
             tasks_to_schedule = [t for t in tasks if t['task_id'] not in preserve_task_ids]
             preserved_tasks = [t for t in tasks if t['task_id'] in preserve_task_ids]
             
-            print(f"Scheduling {len(tasks_to_schedule)} tasks, preserving {len(preserved_tasks)} tasks")
+            logger.info("Scheduling %s tasks, preserving %s tasks", len(tasks_to_schedule), len(preserved_tasks))
             tasks = tasks_to_schedule
             
         # Exclude tasks with missing phase
         tasks = [t for t in tasks if t['phase'] is not None]
-        print(f"Building scheduling model for {len(tasks)} tasks...")
+        logger.info("Building scheduling model for %s tasks...", len(tasks))
+        
+        # Projects share one time axis and employee pool, so a multi-project
+        # solve runs on the tenant calendar and a single project on its own
+        project_ids = {t.get('project_id') for t in tasks}
+        calendar = get_work_calendar(project_ids.pop() if len(project_ids) == 1 else None, db)
         
         # Print task IDs being processed
         task_ids = [t['task_id'] for t in tasks]
-        print(f"Task IDs being processed: {task_ids}")
+        logger.debug("Task IDs being processed: %s", task_ids)
         
         # Check if tasks have resource and employee requirements
         tasks_with_resources = sum(1 for t in tasks if t['resources'])
         tasks_with_employees = sum(1 for t in tasks if t['employees'])
-        print(f"Tasks with resource requirements: {tasks_with_resources} out of {len(tasks)}")
-        print(f"Tasks with employee requirements: {tasks_with_employees} out of {len(tasks)}")
+        logger.info("Tasks with resource requirements: %s out of %s", tasks_with_resources, len(tasks))
+        logger.info("Tasks with employee requirements: %s out of %s", tasks_with_employees, len(tasks))
         
         # Print details of tasks with requirements
-        print("\nTasks with resource requirements:")
+        logger.debug("Tasks with resource requirements:")
         for t in tasks:
             if t['resources']:
-                print(f"  Task {t['task_id']} ({t['name']}): {t['resources']}")
+                logger.debug("  Task %s (%s): %s", t['task_id'], t['name'], t['resources'])
         
-        print("\nTasks with employee requirements:")
+        logger.debug("Tasks with employee requirements:")
         for t in tasks:
             if t['employees']:
-                print(f"  Task {t['task_id']} ({t['name']}): {t['employees']}")
-        scheduler = ConstructionScheduler(tasks, db, preserve_task_ids=preserve_task_ids)
+                logger.debug("  Task %s (%s): %s", t['task_id'], t['name'], t['employees'])
+        if decomposition or rolling_horizon:
+            # Imported here because both modules build on this one
+            from decomposition import solve_decomposed
+            from rolling_horizon import solve_rolling_horizon
+            options = {
+                'resource_mode': resource_mode,
+                'symmetry_breaking': symmetry_breaking,
+                'plan': db.load_current_plan(calendar) if (WARM_START if warm_start is None else warm_start) else None,
+                'use_model_cache': use_model_cache,
+                'repair_hints': REPAIR_HINTS if repair_hints is None else repair_hints,
+                'progress_callback': progress_callback,
+                'stop_event': stop_event,
+                'solver_profile': result['solver_profile'],
+                'stop_criteria': stop_criteria,
+                'calendar': calendar
+            }
+            if rolling_horizon:
+                outcome = solve_rolling_horizon(dict(snapshot, tasks=tasks),
+                                                window_days or ROLLING_WINDOW_DAYS,
+                                                ROLLING_OVERLAP_DAYS if overlap_days is None else overlap_days,
+                                                **options)
+                result['windows'] = outcome['windows']
+            else:
+                outcome = solve_decomposed(dict(snapshot, tasks=tasks), decomposition, **options)
+                result['subproblems'] = outcome['subproblems']
+            result.update(status=outcome['status'], solution_count=outcome['solution_count'])
+            if stop_event is not None and stop_event.is_set():
+                logger.info("Scheduling cancelled; the stored schedule is left unchanged")
+                result['status'] = 'CANCELLED'
+            elif outcome['status'] in ('OPTIMAL', 'FEASIBLE'):
+                result['makespan'] = outcome['makespan']
+                logger.info("Total Project Completion Time: %.2f working hours", result['makespan'] / SCALE_FACTOR)
+                persist_solution(db, tasks, outcome['schedule'], outcome['resource_assignments'],
+                                 outcome['employee_assignments'], preserve_task_ids, calendar)
+            else:
+                logger.error("No feasible schedule found: %s",
+                             [(part['index'], part['status'])
+                              for part in outcome.get('subproblems') or outcome.get('windows')])
+            return result
+        
+        build_start = time.time()
+        scheduler = ConstructionScheduler(tasks, db, preserve_task_ids=preserve_task_ids,
+                                          resource_mode=resource_mode, symmetry_breaking=symmetry_breaking,
+                                          snapshot=snapshot,
+                                          model_cache=get_model_cache() if use_model_cache else None,
+                                          calendar=calendar)
+        logger.info("Model %s in %.2fs", "loaded from cache" if scheduler.model_from_cache else "built",
+                    time.time() - build_start)
+        if scheduler.infeasible_tasks:
+            # Dependencies and phases alone do not fit in the horizon; no need to search
+            result['status'] = 'INFEASIBLE'
+            result['infeasible_tasks'] = scheduler.infeasible_tasks
+            return result
+        
+        # Warm start from the plan currently stored in the database
+        if (WARM_START if warm_start is None else warm_start):
+            scheduler.add_solution_hints(db.load_current_plan(calendar))
+        
+        # Time limit predicted from the model size, workers from the available cores
+        stats = scheduler.model_statistics()
+        time_limit = solver_time_limit(result['solver_profile'], stats)
+        num_workers = search_workers(result['solver_profile'])
+        criteria = get_stop_criteria(result['solver_profile'], time_limit, stop_criteria)
+        result.update(time_limit=time_limit, num_workers=num_workers)
         
         # Create a solution callback to track progress and implement early stopping
-        class SolutionCallback(cp_model.CpSolverSolutionCallback):
-            def __init__(self, timeout_sec=60):
-                cp_model.CpSolverSolutionCallback.__init__(self)
-                self.start_time = time.time()
-                self.timeout_sec = timeout_sec
-                self.solution_count = 0
-                self.best_makespan = float('inf')
-                self.should_stop = False
-            
+        class SolutionCallback(EarlyStoppingCallback):
             def on_solution_callback(self):
-                current_time = time.time()
-                elapsed = current_time - self.start_time
-                self.solution_count += 1
+                EarlyStoppingCallback.on_solution_callback(self)
+                elapsed = time.time() - self.start_time
                 
                 # Get the current makespan value
                 makespan = self.Value(scheduler.makespan)
                 
-                # Update best makespan
-                if makespan < self.best_makespan:
-                    self.best_makespan = makespan
+                if progress_callback is not None:
+                    progress_callback({
+                        'solution_count': self.solution_count,
+                        'best_makespan': self.best_objective,
+                        'best_makespan_hours': self.best_objective / SCALE_FACTOR,
+                        'elapsed': round(elapsed, 2)
+                    })
                 
                 # Print progress
                 if self.solution_count % 10 == 0:
-                    print(f"Found solution #{self.solution_count} with makespan {makespan/SCALE_FACTOR:.2f} hours (elapsed: {elapsed:.1f}s)")
-                
-                # Check if we should stop (timeout or good enough solution)
-                if elapsed > self.timeout_sec:
-                    print(f"Timeout reached after {elapsed:.1f} seconds. Using best solution found.")
-                    self.StopSearch()
-                    self.should_stop = True
+                    logger.info("Found solution #%s with makespan %.2f hours (elapsed: %.1fs)", self.solution_count, makespan/SCALE_FACTOR, elapsed)
         
         # Create solver with callback
         solver = cp_model.CpSolver()
-        solver.parameters.max_time_in_seconds = 120  # 2 minutes max
-        solver.parameters.num_search_workers = 4
+        solver.parameters.max_time_in_seconds = time_limit
+        solver.parameters.num_search_workers = num_workers
         solver.parameters.random_seed = 42
+        if (REPAIR_HINTS if repair_hints is None else repair_hints):
+            solver.parameters.repair_hint = True
         
-        # Set up the callback
-        callback = SolutionCallback(timeout_sec=60)  # 1 minute timeout for early stopping
+        # Set up the callback with the profile's stop criteria and any overrides
+        callback = SolutionCallback(criteria)
+        callback.configure(solver)
         
-        print("Solving model...")
-        status = solver.Solve(scheduler.model, callback)
-        print("\n=== Final Result ===")
-        print(f"Status: {solver.StatusName(status)}")
-        if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
-            schedule = []
-            resource_assignments = []
-            employee_assignments = []
-            
-            for task in tasks:
-                tid = task['task_id']
-                start_val = solver.Value(scheduler.task_vars[tid]['start'])
-                end_val = solver.Value(scheduler.task_vars[tid]['end'])
-                
-                # Add task to schedule
-                schedule.append({
-                    'task_id': tid,
-                    'start': start_val,
-                    'duration': end_val - start_val
-                })
-                
-                # Extract resource assignments for this task
-                if tid in scheduler.resource_assignments:
-                    print(f"Checking resource assignments for Task {tid}")
-                    if not scheduler.resource_assignments[tid]:
-                        print(f"  No resource categories found for Task {tid}")
-                    
-                    for res_cat, assignment_data in scheduler.resource_assignments[tid].items():
-                        print(f"  Resource category: {res_cat}, required count: {assignment_data['count']}")
-                        assigned_count = 0
-                        
-                        for resource, assignment_var in assignment_data['assignment_vars']:
-                            # Check if this resource is assigned to this task
-                            is_assigned = solver.Value(assignment_var) == 1
-                            if is_assigned:
-                                assigned_count += 1
-                                resource_assignments.append({
-                                    'task_id': tid,
-                                    'resource_id': resource['id'],
-                                    'resource_name': resource['name'],
-                                    'resource_type': res_cat
-                                })
-                                print(f"  Resource assigned: {resource['name']} (ID: {resource['id']}, Type: {res_cat}) to Task {tid}")
-                        
-                        print(f"  Total resources assigned for {res_cat}: {assigned_count} of {assignment_data['count']} required")
-                else:
-                    print(f"Task {tid} not found in resource_assignments dictionary")
-                
-                # Extract employee assignments for this task
-                if tid in scheduler.employee_assignments:
-                    print(f"Checking employee assignments for Task {tid}")
-                    if not scheduler.employee_assignments[tid]:
-                        print(f"  No employee groups found for Task {tid}")
-                    
-                    for group, assignment_data in scheduler.employee_assignments[tid].items():
-                        print(f"  Employee group: {group}, required count: {assignment_data['count']}")
-                        assigned_count = 0
-                        
-                        # Print all assignment variables for debugging
-                        print(f"  Checking {len(assignment_data['assignment_vars'])} employee assignment variables")
-                        
-                        for i, (employee, assignment_var) in enumerate(assignment_data['assignment_vars']):
-                            # Check if this employee is assigned to this task
-                            var_value = solver.Value(assignment_var)
-                            is_assigned = var_value == 1
-                            
-                            print(f"    Employee {employee['name']} (ID: {employee['id']}): Assignment var = {var_value}")
-                            
-                            if is_assigned:
-                                assigned_count += 1
-                                employee_assignments.append({
-                                    'task_id': tid,
-                                    'employee_id': employee['id'],
-                                    'employee_name': employee['name'],
-                                    'skill_set': group
-                                })
-                                print(f"  Employee assigned: {employee['name']} (ID: {employee['id']}, Skill: {group}) to Task {tid}")
-                        
-                        print(f"  Total employees assigned for {group}: {assigned_count} of {assignment_data['count']} required")
-                else:
-                    print(f"Task {tid} not found in employee_assignments dictionary")
-                
-                print(f"Task {tid} ({task['name']}): Start at {working_time_to_datetime(start_val)}, End at {working_time_to_datetime(end_val)}")
-            
-            total_makespan = solver.Value(scheduler.makespan) / SCALE_FACTOR
-            print(f"\nTotal Project Completion Time: {total_makespan:.2f} working hours")
-            
-            # Update this line to pass the db parameter
-            print_schedule(schedule, tasks, db)
-            
-            print("Updating schedule in database...")
-            db.update_schedule(schedule, preserve_task_ids)
-            
-            # Save resource and employee assignments to database
-            print("Saving resource and employee assignments to database...")
-            
-            # Check if we have assignments for all tasks with requirements
-            tasks_with_resources = sum(1 for t in tasks if t['resources'])
-            tasks_with_employees = sum(1 for t in tasks if t['employees'])
-            
-            resource_task_ids = set(a['task_id'] for a in resource_assignments)
-            employee_task_ids = set(a['task_id'] for a in employee_assignments)
-            
-            print(f"\nAssignment coverage:")
-            print(f"  Tasks with resource requirements: {tasks_with_resources}")
-            print(f"  Tasks with resource assignments: {len(resource_task_ids)}")
-            print(f"  Tasks with employee requirements: {tasks_with_employees}")
-            print(f"  Tasks with employee assignments: {len(employee_task_ids)}")
-            
-            # Find tasks with requirements but no assignments
-            tasks_missing_resources = [t['task_id'] for t in tasks if t['resources'] and t['task_id'] not in resource_task_ids]
-            tasks_missing_employees = [t['task_id'] for t in tasks if t['employees'] and t['task_id'] not in employee_task_ids]
-            
-            if tasks_missing_resources:
-                print(f"\nWARNING: {len(tasks_missing_resources)} tasks have resource requirements but no assignments:")
-                print(f"  Task IDs: {tasks_missing_resources}")
+        if stop_event is not None and stop_event.is_set():
+            logger.info("Scheduling cancelled before solving")
+            result['status'] = 'CANCELLED'
+            result['stop_reason'] = 'cancelled'
+            return result
+        
+        # Cancellation and stagnation can happen between solutions, so a helper thread watches them
+        solve_done = watch_search(callback, stop_event)
+        
+        logger.info("Solving model...")
+        try:
+            status = solver.Solve(scheduler.model, callback)
+        finally:
+            solve_done.set()
+        result['stop_reason'] = callback.finish(solver, status)
+        result['status'] = callback.status_name(solver, status)
+        logger.info("Status: %s", result['status'])
+        result['solution_count'] = callback.solution_count
+        logger.info("Search ended: %s after %.2fs", result['stop_reason'], solver.WallTime())
+        if stop_event is not None and stop_event.is_set():
+            logger.info("Scheduling cancelled; the stored schedule is left unchanged")
+            result['status'] = 'CANCELLED'
+            result['stop_reason'] = 'cancelled'
+        elif status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            schedule, resource_assignments, employee_assignments = scheduler.extract_solution(solver)
             
-            if tasks_missing_employees:
-                print(f"\nWARNING: {len(tasks_missing_employees)} tasks have employee requirements but no assignments:")
-                print(f"  Task IDs: {tasks_missing_employees}")
+            result['makespan'] = solver.Value(scheduler.makespan)
+            total_makespan = result['makespan'] / SCALE_FACTOR
+            logger.info("Total Project Completion Time: %.2f working hours", total_makespan)
             
-            save_assignments_to_database(db, resource_assignments, employee_assignments, preserve_task_ids, tasks)
+            persist_solution(db, tasks, schedule, resource_assignments, employee_assignments, preserve_task_ids,
+                             calendar)
         else:
-            print("No feasible schedule found. Check constraints and resource/employee availability.", file=sys.stderr)
+            logger.error("No feasible schedule found. Check constraints and resource/employee availability.")
+        if result['status'] != 'CANCELLED':
+            get_solve_history().record(stats, result['solver_profile'], num_workers, result['status'],
+                                       solver.WallTime(), callback.solution_time, result['stop_reason'])
     except Exception as e:
-        print(f"Error: {e}", file=sys.stderr)
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error: %s", e)
+        result['status'] = 'ERROR'
+        result['error'] = str(e)
     finally:
-        db.close()
+        if data_source is None:
+            db.close()
+    return result
+
+# Assignment tables and the column holding the assigned employee/resource
+ASSIGNMENT_TABLES = {
+    'employee_assignments': 'employee_id',
+    'resource_assignments': 'resource_id'
+}
+
+def get_assignment_flag_support(cur):
+    """
+    Check which assignment tables have the is_initial and is_modified columns.
+    
+    Args:
+        cur: Database cursor
+        
+    Returns:
+        dict: Map table name -> True if both flag columns exist
+    """
+    schema = get_schema(cur.connection)
+    return {table: schema.has_columns(table, 'is_initial', 'is_modified') for table in ASSIGNMENT_TABLES}
+
+def bulk_insert_assignments(cur, table, rows, mark_initial=False):
+    """
+    Insert (task_id, member_id) pairs into an assignment table in one statement,
+    skipping pairs that already exist.
+    
+    Args:
+        cur: Database cursor
+        table: 'employee_assignments' or 'resource_assignments'
+        rows: Iterable of (task_id, employee_id/resource_id) tuples
+        mark_initial: Also set is_initial = TRUE, is_modified = FALSE
+        
+    Returns:
+        int: Number of rows inserted
+    """
+    member_column = ASSIGNMENT_TABLES[table]
+    rows = list(dict.fromkeys(rows))  # drop duplicates, keep order
+    if not rows:
+        return 0
+    
+    columns = f"task_id, {member_column}"
+    values = f"v.task_id, v.{member_column}"
+    if mark_initial:
+        columns += ", is_initial, is_modified"
+        values += ", TRUE, FALSE"
+    inserted = psycopg2.extras.execute_values(cur, f"""
+        INSERT INTO {table} ({columns})
+        SELECT {values}
+        FROM (VALUES %s) AS v(task_id, {member_column})
+        WHERE NOT EXISTS (
+            SELECT 1 FROM {table} a
+            WHERE a.task_id = v.task_id AND a.{member_column} = v.{member_column}
+        )
+        RETURNING 1
+    """, rows, page_size=len(rows), fetch=True)
+    return len(inserted)
 
 def save_assignments_to_database(db, resource_assignments, employee_assignments, preserve_task_ids=None, tasks=None):
     """
-    Save the resource and employee assignments to the database.
+    Save the resource and employee assignments to the data source.
     
     Args:
-        db: DatabaseManager instance
+        db: DataSource, usually a DatabaseManager
         resource_assignments: List of resource assignment dictionaries
         employee_assignments: List of employee assignment dictionaries
         preserve_task_ids: Optional list of task IDs to preserve (not reassign)
         tasks: List of task dictionaries (for debugging)
     """
-    print(f"\nSaving assignments to database:")
-    print(f"  Resource assignments: {len(resource_assignments)}")
-    print(f"  Employee assignments: {len(employee_assignments)}")
+    logger.info("Saving assignments to database: %s resource assignments, %s employee assignments",
+                len(resource_assignments), len(employee_assignments))
     
     # Print task IDs with assignments
     resource_task_ids = sorted(set(a['task_id'] for a in resource_assignments))
     employee_task_ids = sorted(set(a['task_id'] for a in employee_assignments))
     
-    print(f"  Tasks with resource assignments: {len(resource_task_ids)}")
-    print(f"  Tasks with employee assignments: {len(employee_task_ids)}")
-    
-    print(f"  Resource assignment task IDs: {resource_task_ids}")
-    print(f"  Employee assignment task IDs: {employee_task_ids}")
+    logger.debug("Resource assignment task IDs: %s", resource_task_ids)
+    logger.debug("Employee assignment task IDs: %s", employee_task_ids)
     
     # Check for tasks with requirements but no assignments
     if tasks:
         tasks_with_employee_reqs = [t for t in tasks if t['employees']]
         tasks_with_resource_reqs = [t for t in tasks if t['resources']]
         
-        print(f"\nTask requirement coverage:")
-        print(f"  Tasks with employee requirements: {len(tasks_with_employee_reqs)}")
-        print(f"  Tasks with resource requirements: {len(tasks_with_resource_reqs)}")
+        logger.info("Task requirement coverage: %s tasks with employee requirements, %s with resource requirements",
+                    len(tasks_with_employee_reqs), len(tasks_with_resource_reqs))
         
         missing_employee_assignments = [t['task_id'] for t in tasks_with_employee_reqs if t['task_id'] not in employee_task_ids]
         missing_resource_assignments = [t['task_id'] for t in tasks_with_resource_reqs if t['task_id'] not in resource_task_ids]
         
         if missing_employee_assignments:
-            print(f"  WARNING: {len(missing_employee_assignments)} tasks have employee requirements but no assignments:")
-            print(f"    Task IDs: {missing_employee_assignments}")
+            logger.warning("%s tasks have employee requirements but no assignments: %s",
+                           len(missing_employee_assignments), missing_employee_assignments)
             
             # Print details of missing employee assignments
-            print("\n  Details of tasks missing employee assignments:")
+            logger.debug("  Details of tasks missing employee assignments:")
             for tid in missing_employee_assignments:
                 task = next((t for t in tasks if t['task_id'] == tid), None)
                 if task:
-                    print(f"    Task {tid} ({task['name']}) requires:")
+                    logger.debug("    Task %s (%s) requires:", tid, task['name'])
                     for group, count in task['employees'].items():
-                        print(f"      - {count} employees of group '{group}'")
+                        logger.debug("      - %s employees of group '%s'", count, group)
         
         if missing_resource_assignments:
-            print(f"  WARNING: {len(missing_resource_assignments)} tasks have resource requirements but no assignments:")
-            print(f"    Task IDs: {missing_resource_assignments}")
-    
-    preserve_task_ids = preserve_task_ids or []
+            logger.warning("%s tasks have resource requirements but no assignments: %s",
+                           len(missing_resource_assignments), missing_resource_assignments)
     
-    try:
-        cur = db.conn.cursor()
-        
-        # Clear existing assignments if needed (except for preserved tasks)
-        if preserve_task_ids:
-            task_ids_str = ','.join(str(tid) for tid in preserve_task_ids)
-            if task_ids_str:
-                try:
-                    cur.execute(f"""
-                        DELETE FROM employee_assignments 
-                        WHERE task_id NOT IN ({task_ids_str})
-                    """)
-                    print(f"Deleted {cur.rowcount} employee assignments for non-preserved tasks")
-                    
-                    cur.execute(f"""
-                        DELETE FROM resource_assignments 
-                        WHERE task_id NOT IN ({task_ids_str})
-                    """)
-                    print(f"Deleted {cur.rowcount} resource assignments for non-preserved tasks")
-                    
-                    db.conn.commit()
-                    print("Cleared existing assignments for non-preserved tasks")
-                except Exception as e:
-                    print(f"Error clearing existing assignments: {e}")
-                    db.conn.rollback()
+    db.save_assignments(resource_assignments, employee_assignments, preserve_task_ids)
+
+class BusyIntervalIndex:
+    """
+    Busy windows of one employee or resource, kept as sorted disjoint intervals.
+
+    Overlapping or touching windows are merged on insert, so the starts and
+    ends stay sorted and an availability check only has to look at the two
+    neighbours of the requested start (a bisect instead of a scan). The exact
+    start and end times of the original windows are kept as well: a task that
+    starts or ends at the same moment as an existing window counts as a
+    conflict, as it always has.
+    """
+
+    def __init__(self):
+        self._starts = []
+        self._ends = []
+        self._window_starts = set()
+        self._window_ends = set()
+        self.load = 0  # Number of windows added, used to balance assignments
+
+    def add(self, start, end):
+        """Record a busy window [start, end)."""
+        self._window_starts.add(start)
+        self._window_ends.add(end)
+        self.load += 1
+        # Intervals [lo, hi) overlap or touch the new window and are merged into it
+        lo = bisect.bisect_left(self._ends, start)
+        hi = bisect.bisect_right(self._starts, end)
+        if lo < hi:
+            start = min(start, self._starts[lo])
+            end = max(end, self._ends[hi - 1])
+        self._starts[lo:hi] = [start]
+        self._ends[lo:hi] = [end]
+
+    def is_free(self, start, end):
+        """Return True if no busy window overlaps [start, end)."""
+        if start in self._window_starts or end in self._window_ends:
+            return False
+        i = bisect.bisect_right(self._starts, start)
+        if i > 0 and self._ends[i - 1] > start:
+            return False
+        return i >= len(self._starts) or self._starts[i] >= end
+
+
+def pick_least_loaded(candidates, availability, start, end, count):
+    """
+    Take up to `count` of the least-loaded candidates that are free during [start, end).
+
+    Args:
+        candidates: Min-heap of (load, order, entity_id) for one skill group or category
+        availability: Map entity_id -> BusyIntervalIndex
+        start: Window start
+        end: Window end
+        count: Number of entities wanted
+
+    Returns:
+        list: Chosen entity ids, least loaded first (ties in original order). The
+              heap is restored, with updated loads for the chosen entities.
+    """
+    chosen = []
+    skipped = []
+    while candidates and len(chosen) < count:
+        entry = heapq.heappop(candidates)
+        entity_id = entry[2]
+        if availability[entity_id].is_free(start, end):
+            chosen.append(entry)
         else:
-            # Clear all assignments
-            try:
-                cur.execute("DELETE FROM employee_assignments")
-                print(f"Deleted {cur.rowcount} employee assignments")
-                
-                cur.execute("DELETE FROM resource_assignments")
-                print(f"Deleted {cur.rowcount} resource assignments")
-                
-                db.conn.commit()
-                print("Cleared all existing assignments")
-            except Exception as e:
-                print(f"Error clearing all assignments: {e}")
-                db.conn.rollback()
-        
-        # Check if employee_assignments table exists
-        cur.execute("""
-            SELECT EXISTS (
-                SELECT FROM information_schema.tables 
-                WHERE table_name = 'employee_assignments'
-            ) as exists
-        """)
-        
-        result = cur.fetchone()
-        employee_table_exists = result[0]
-        
-        if not employee_table_exists:
-            # Create the employee_assignments table
-            cur.execute("""
-                CREATE TABLE employee_assignments (
-                    assignment_id SERIAL PRIMARY KEY,
-                    task_id INTEGER NOT NULL,
-                    employee_id INTEGER NOT NULL,
-                    created_at TIMESTAMP WITHOUT TIME ZONE DEFAULT NOW(),
-                    UNIQUE (task_id, employee_id),
-                    FOREIGN KEY (task_id) REFERENCES tasks(task_id)
-                )
-            """)
-            db.conn.commit()
-        
-        # Check if resource_assignments table exists
-        cur.execute("""
-            SELECT EXISTS (
-                SELECT FROM information_schema.tables 
-                WHERE table_name = 'resource_assignments'
-            ) as exists
-        """)
-        
-        result = cur.fetchone()
-        resource_table_exists = result[0]
-        
-        if not resource_table_exists:
-            # Create the resource_assignments table
-            cur.execute("""
-                CREATE TABLE resource_assignments (
-                    assignment_id SERIAL PRIMARY KEY,
-                    task_id INTEGER NOT NULL,
-                    resource_id INTEGER NOT NULL,
-                    created_at TIMESTAMP WITHOUT TIME ZONE DEFAULT NOW(),
-                    UNIQUE (task_id, resource_id),
-                    FOREIGN KEY (task_id) REFERENCES tasks(task_id)
-                )
-            """)
-            db.conn.commit()
-        
-        # Insert resource assignments
-        print("\nInserting resource assignments:")
-        successful_resource_assignments = 0
-        
-        for assignment in resource_assignments:
-            task_id = assignment['task_id']
-            resource_id = assignment['resource_id']
-            
-            # Skip if this task should be preserved
-            if task_id in preserve_task_ids:
-                print(f"  Skipping resource assignment for preserved task {task_id}")
-                continue
-                
-            # Check if assignment already exists
-            cur.execute("SELECT COUNT(*) FROM resource_assignments WHERE task_id = %s AND resource_id = %s", 
-                       (task_id, resource_id))
-            already_exists = cur.fetchone()[0] > 0
-            
-            if already_exists:
-                print(f"  Resource assignment already exists: Resource {assignment['resource_name']} (ID: {resource_id}) to task {task_id}")
-            else:
-                try:
-                    cur.execute("""
-                        INSERT INTO resource_assignments (task_id, resource_id)
-                        VALUES (%s, %s)
-                    """, (task_id, resource_id))
-                    successful_resource_assignments += 1
-                    print(f"  Assigned resource {assignment['resource_name']} (ID: {resource_id}) to task {task_id}")
-                except Exception as e:
-                    print(f"  Error inserting resource assignment: {e}")
-        
-        print(f"Successfully inserted {successful_resource_assignments} resource assignments")
-        
-        # Insert employee assignments
-        print("\nInserting employee assignments:")
-        successful_employee_assignments = 0
-        
-        for assignment in employee_assignments:
-            task_id = assignment['task_id']
-            employee_id = assignment['employee_id']
-            
-            # Skip if this task should be preserved
-            if task_id in preserve_task_ids:
-                print(f"  Skipping employee assignment for preserved task {task_id}")
-                continue
-                
-            # Check if assignment already exists
-            cur.execute("SELECT COUNT(*) FROM employee_assignments WHERE task_id = %s AND employee_id = %s", 
-                       (task_id, employee_id))
-            already_exists = cur.fetchone()[0] > 0
-            
-            if already_exists:
-                print(f"  Employee assignment already exists: Employee {assignment['employee_name']} (ID: {employee_id}) to task {task_id}")
-            else:
-                try:
-                    # Check if is_initial and is_modified columns exist
-                    cur.execute("""
-                        SELECT 
-                            COUNT(*) as count,
-                            SUM(CASE WHEN column_name = 'is_initial' THEN 1 ELSE 0 END) as has_is_initial,
-                            SUM(CASE WHEN column_name = 'is_modified' THEN 1 ELSE 0 END) as has_is_modified
-                        FROM information_schema.columns 
-                        WHERE table_name = 'employee_assignments'
-                    """)
-                    
-                    result = cur.fetchone()
-                    table_exists = result[0] > 0
-                    has_is_initial = result[1] > 0
-                    has_is_modified = result[2] > 0
-                    
-                    if table_exists and has_is_initial and has_is_modified:
-                        # Use full insert with all columns
-                        cur.execute("""
-                            INSERT INTO employee_assignments (task_id, employee_id, is_initial, is_modified)
-                            VALUES (%s, %s, TRUE, FALSE)
-                        """, (task_id, employee_id))
-                    else:
-                        # Use simplified insert with only required columns
-                        cur.execute("""
-                            INSERT INTO employee_assignments (task_id, employee_id)
-                            VALUES (%s, %s)
-                        """, (task_id, employee_id))
-                    
-                    successful_employee_assignments += 1
-                    print(f"  Assigned employee {assignment['employee_name']} (ID: {employee_id}) to task {task_id}")
-                except Exception as e:
-                    print(f"  Error inserting employee assignment: {e}")
-        
-        print(f"Successfully inserted {successful_employee_assignments} employee assignments")
-        
-        db.conn.commit()
-        print("Successfully saved all assignments to database")
-        
-    except Exception as e:
-        print(f"Error saving assignments to database: {e}")
-        db.conn.rollback()
-    finally:
-        cur.close()
+            skipped.append(entry)
+    for entry in skipped:
+        heapq.heappush(candidates, entry)
+    for load, order, entity_id in chosen:
+        availability[entity_id].add(start, end)
+        heapq.heappush(candidates, (availability[entity_id].load, order, entity_id))
+    return [entity_id for _, _, entity_id in chosen]
 
 def auto_assign_resources_to_tasks(preserve_task_ids=None, clear_existing=True):
     """
@@ -2206,20 +3398,9 @@ def auto_assign_resources_to_tasks(preserve_task_ids=None, clear_existing=True):
         preserve_task_ids: Optional list of task IDs to preserve (not reassign)
         clear_existing: Whether to clear existing assignments before making new ones
     """
-    # Define a function to check if a resource is available during the task's timeframe
-    def is_available_during_timeframe(availability_list, task_start, task_end):
-        for busy_start, busy_end in availability_list:
-            # Check if there's an overlap
-            # Even a 1-second overlap should be considered a conflict
-            if (busy_start < task_end and busy_end > task_start):
-                return False
-            # Also check for exact same start or end time to prevent edge case conflicts
-            if busy_start == task_start or busy_end == task_end:
-                return False
-        return True
-        
-    print("Auto-assigning resources and employees to tasks...")
+    logger.info("Auto-assigning resources and employees to tasks...")
     preserve_task_ids = preserve_task_ids or []
+    db = None
     
     try:
         # Connect to the database
@@ -2238,14 +3419,12 @@ def auto_assign_resources_to_tasks(preserve_task_ids=None, clear_existing=True):
                     DELETE FROM resource_assignments 
                     WHERE task_id NOT IN ({task_ids_str})
                 """)
-                db.conn.commit()
-                print("Cleared existing assignments for non-preserved tasks")
+                logger.info("Cleared existing assignments for non-preserved tasks")
         elif clear_existing:
             # Clear all assignments
             cur.execute("DELETE FROM employee_assignments")
             cur.execute("DELETE FROM resource_assignments")
-            db.conn.commit()
-            print("Cleared all existing assignments")
+            logger.info("Cleared all existing assignments")
         
         # Get all scheduled tasks with their time windows
         if preserve_task_ids:
@@ -2281,119 +3460,46 @@ def auto_assign_resources_to_tasks(preserve_task_ids=None, clear_existing=True):
         
         tasks = cur.fetchall()
         
-        # Check if employee_assignments table exists
-        cur.execute("""
-            SELECT EXISTS (
-                SELECT FROM information_schema.tables 
-                WHERE table_name = 'employee_assignments'
-            ) as exists
-        """)
-        
-        result = cur.fetchone()
-        employee_table_exists = result[0]
-        
-        if not employee_table_exists:
-            # Create the employee_assignments table
-            cur.execute("""
-                CREATE TABLE employee_assignments (
-                    assignment_id SERIAL PRIMARY KEY,
-                    task_id INTEGER NOT NULL,
-                    employee_id INTEGER NOT NULL,
-                    created_at TIMESTAMP WITHOUT TIME ZONE DEFAULT NOW(),
-                    UNIQUE (task_id, employee_id),
-                    FOREIGN KEY (task_id) REFERENCES tasks(task_id)
-                )
-            """)
-            db.conn.commit()
-        
-        # Check if resource_assignments table exists
-        cur.execute("""
-            SELECT EXISTS (
-                SELECT FROM information_schema.tables 
-                WHERE table_name = 'resource_assignments'
-            ) as exists
-        """)
-        
-        result = cur.fetchone()
-        resource_table_exists = result[0]
-        
-        if not resource_table_exists:
-            # Create the resource_assignments table
-            cur.execute("""
-                CREATE TABLE resource_assignments (
-                    assignment_id SERIAL PRIMARY KEY,
-                    task_id INTEGER NOT NULL,
-                    resource_id INTEGER NOT NULL,
-                    created_at TIMESTAMP WITHOUT TIME ZONE DEFAULT NOW(),
-                    UNIQUE (task_id, resource_id),
-                    FOREIGN KEY (task_id) REFERENCES tasks(task_id)
-                )
-            """)
-            db.conn.commit()
+        # Check once whether the assignment tables carry is_initial/is_modified
+        flag_support = get_assignment_flag_support(cur)
         
         # Check if role_name column exists in employees table
-        cur.execute("""
-            SELECT EXISTS (
-                SELECT column_name 
-                FROM information_schema.columns 
-                WHERE table_name = 'employees' AND column_name = 'role_name'
-            ) as exists
-        """)
-        has_role_name = cur.fetchone()[0]
+        has_role_name = get_schema(cur.connection).has_column('employees', 'role_name')
         
         # Check if skill_set column exists in employees table
-        cur.execute("""
-            SELECT EXISTS (
-                SELECT column_name 
-                FROM information_schema.columns 
-                WHERE table_name = 'employees' AND column_name = 'skill_set'
-            ) as exists
-        """)
-        has_skill_set = cur.fetchone()[0]
+        has_skill_set = get_schema(cur.connection).has_column('employees', 'skill_set')
         
         # Get all employees with appropriate columns
         if has_role_name and has_skill_set:
             cur.execute("SELECT employee_id, name, role_name, skill_set FROM employees")
         elif has_role_name:
-            print("skill_set column does not exist in employees table, using role_name")
+            logger.debug("skill_set column does not exist in employees table, using role_name")
             cur.execute("SELECT employee_id, name, role_name FROM employees")
         elif has_skill_set:
-            print("role_name column does not exist in employees table, using skill_set")
+            logger.debug("role_name column does not exist in employees table, using skill_set")
             cur.execute("SELECT employee_id, name, skill_set FROM employees")
         else:
-            print("role_name and skill_set columns do not exist in employees table, using basic query")
+            logger.debug("role_name and skill_set columns do not exist in employees table, using basic query")
             cur.execute("SELECT employee_id, name FROM employees")
         
         employees = cur.fetchall()
         
         # Check if type column exists in resources table
-        cur.execute("""
-            SELECT EXISTS (
-                SELECT column_name 
-                FROM information_schema.columns 
-                WHERE table_name = 'resources' AND column_name = 'type'
-            ) as exists
-        """)
-        has_type = cur.fetchone()[0]
+        has_type = get_schema(cur.connection).has_column('resources', 'type')
         
         # Get all resources with appropriate columns
         if has_type:
             cur.execute("SELECT resource_id, name, type FROM resources")
         else:
-            print("type column does not exist in resources table, using basic query")
+            logger.debug("type column does not exist in resources table, using basic query")
             cur.execute("SELECT resource_id, name FROM resources")
         
         resources = cur.fetchall()
         
-        # Create dictionaries to track employee and resource assignments and availability
+        # Track the busy windows of every employee and resource
         # This helps prevent double-booking and ensures resources aren't assigned to overlapping tasks
-        employee_availability = {}  # {employee_id: [(start_time, end_time), ...]}
-        for employee in employees:
-            employee_availability[employee[0]] = []
-            
-        resource_availability = {}  # {resource_id: [(start_time, end_time), ...]}
-        for resource in resources:
-            resource_availability[resource[0]] = []
+        employee_availability = {employee[0]: BusyIntervalIndex() for employee in employees}
+        resource_availability = {resource[0]: BusyIntervalIndex() for resource in resources}
             
         # Get existing assignments to track current resource usage
         cur.execute("""
@@ -2404,7 +3510,7 @@ def auto_assign_resources_to_tasks(preserve_task_ids=None, clear_existing=True):
         """)
         for resource_id, start_time, end_time in cur.fetchall():
             if resource_id in resource_availability:
-                resource_availability[resource_id].append((start_time, end_time))
+                resource_availability[resource_id].add(start_time, end_time)
                 
         cur.execute("""
             SELECT ea.employee_id, s.planned_start, s.planned_end
@@ -2414,65 +3520,74 @@ def auto_assign_resources_to_tasks(preserve_task_ids=None, clear_existing=True):
         """)
         for employee_id, start_time, end_time in cur.fetchall():
             if employee_id in employee_availability:
-                employee_availability[employee_id].append((start_time, end_time))
+                employee_availability[employee_id].add(start_time, end_time)
+        
+        # Least-loaded-first candidate heaps per skill group / resource category.
+        # Without a skill_set (or type) column every employee (or resource) matches
+        # every requirement and they share a single heap under the key None.
+        employees_by_id = {employee[0]: employee for employee in employees}
+        resources_by_id = {resource[0]: resource for resource in resources}
+        employee_candidates = {}
+        for order, employee in enumerate(employees):
+            if has_skill_set and len(employee) > 2:
+                if not employee[2]:
+                    continue
+                key = employee[2].lower()
+            else:
+                key = None
+            employee_candidates.setdefault(key, []).append(
+                (employee_availability[employee[0]].load, order, employee[0]))
+        resource_candidates = {}
+        for order, resource in enumerate(resources):
+            if has_type and len(resource) > 2:
+                if not resource[2]:
+                    continue
+                key = resource[2].lower()
+            else:
+                key = None
+            resource_candidates.setdefault(key, []).append(
+                (resource_availability[resource[0]].load, order, resource[0]))
+        for heap in list(employee_candidates.values()) + list(resource_candidates.values()):
+            heapq.heapify(heap)
+        
+        # Existing assignment counts and requirements for every task, loaded up front
+        cur.execute("SELECT task_id, COUNT(*) FROM employee_assignments GROUP BY task_id")
+        existing_employee_counts = dict(cur.fetchall())
+        cur.execute("SELECT task_id, COUNT(*) FROM resource_assignments GROUP BY task_id")
+        existing_resource_counts = dict(cur.fetchall())
+        
+        employee_requirements_by_task = {}
+        cur.execute("SELECT task_id, resource_group, resource_count FROM task_required_employees")
+        for req_task_id, group, count in cur.fetchall():
+            employee_requirements_by_task.setdefault(req_task_id, []).append((group, count))
+        
+        resource_requirements_by_task = {}
+        cur.execute("SELECT task_id, resource_category, resource_count FROM task_required_resources")
+        for req_task_id, category, count in cur.fetchall():
+            resource_requirements_by_task.setdefault(req_task_id, []).append((category, count))
+        
+        # New assignments are collected here and written in bulk after the loop
+        new_employee_rows = []
+        new_resource_rows = []
         
         # For each task, assign resources and employees
+        # (only 'Scheduled' tasks are loaded, so completed and skipped ones never get here)
         for task in tasks:
             task_id, task_name, planned_start, planned_end, phase, priority = task
             
             # Check if this task already has assignments
-            cur.execute("SELECT COUNT(*) FROM employee_assignments WHERE task_id = %s", (task_id,))
-            employee_count = cur.fetchone()[0]
-            
-            cur.execute("SELECT COUNT(*) FROM resource_assignments WHERE task_id = %s", (task_id,))
-            resource_count = cur.fetchone()[0]
-            
-            # Check if this task has any requirements defined
-            cur.execute("""
-                SELECT COUNT(*) 
-                FROM task_required_employees 
-                WHERE task_id = %s
-            """, (task_id,))
-            has_employee_requirements = cur.fetchone()[0] > 0
+            employee_count = existing_employee_counts.get(task_id, 0)
+            resource_count = existing_resource_counts.get(task_id, 0)
             
-            cur.execute("""
-                SELECT COUNT(*) 
-                FROM task_required_resources 
-                WHERE task_id = %s
-            """, (task_id,))
-            has_resource_requirements = cur.fetchone()[0] > 0
+            # Get task requirements
+            employee_requirements = employee_requirements_by_task.get(task_id, [])
+            resource_requirements = resource_requirements_by_task.get(task_id, [])
             
             # Only proceed with assignment if requirements are defined
-            if not has_employee_requirements and not has_resource_requirements:
-                print(f"Task {task_name} (ID: {task_id}) has no resource or employee requirements. Skipping assignment.")
-                continue
-                
-            # Check if this task is already scheduled
-            cur.execute("""
-                SELECT status FROM schedules WHERE task_id = %s
-            """, (task_id,))
-            schedule_status = cur.fetchone()
-            
-            # Skip tasks that are already completed or skipped
-            if schedule_status and schedule_status[0] in ('Completed', 'Skipped'):
-                print(f"Task {task_name} (ID: {task_id}) is already {schedule_status[0]}. Skipping assignment.")
+            if not employee_requirements and not resource_requirements:
+                logger.debug("Task %s (ID: %s) has no resource or employee requirements. Skipping assignment.", task_name, task_id)
                 continue
             
-            # Get task requirements
-            cur.execute("""
-                SELECT resource_group, resource_count 
-                FROM task_required_employees 
-                WHERE task_id = %s
-            """, (task_id,))
-            employee_requirements = cur.fetchall()
-            
-            cur.execute("""
-                SELECT resource_category, resource_count 
-                FROM task_required_resources 
-                WHERE task_id = %s
-            """, (task_id,))
-            resource_requirements = cur.fetchall()
-            
             # Only assign employees if no assignments exist and there are requirements
             if employee_count == 0 and employees and employee_requirements:
                 # For each employee requirement
@@ -2480,104 +3595,25 @@ def auto_assign_resources_to_tasks(preserve_task_ids=None, clear_existing=True):
                     group, count = req
                     count = int(count)  # Ensure count is an integer
                     
-                    # Find employees with matching skill set
-                    matching_employees = []
-                    for employee in employees:
-                        if has_skill_set and len(employee) > 2:
-                            employee_skill = employee[2]
-                            if employee_skill and employee_skill.lower() == group.lower():
-                                matching_employees.append(employee)
-                        else:
-                            # If no skill_set column, just use any employee
-                            matching_employees.append(employee)
-                    
-                    # Use the is_available_during_timeframe function defined at the beginning of this function
-                    
-                    # Filter employees by availability during this task's timeframe
-                    available_employees = []
-                    for employee in matching_employees:
-                        employee_id = employee[0]
-                        if is_available_during_timeframe(employee_availability[employee_id], planned_start, planned_end):
-                            available_employees.append(employee)
+                    # Take the least-loaded employees with matching skill set that are free
+                    # during this task's timeframe (any employee if there is no skill_set column)
+                    key = (group or '').lower() if has_skill_set else None
+                    chosen_ids = pick_least_loaded(employee_candidates.get(key, []), employee_availability,
+                                                   planned_start, planned_end, count)
                     
-                    if not available_employees:
-                        print(f"Warning: No available employees of type {group} for task {task_name} during {planned_start} to {planned_end}")
+                    if not chosen_ids:
+                        logger.warning("No available employees of type %s for task %s during %s to %s", group, task_name, planned_start, planned_end)
                         # Don't fall back to unavailable employees - this would cause conflicts
                         # Instead, we'll skip assignment for this requirement
                         continue
                     
-                    # Sort by number of assignments (ascending) to distribute work evenly
-                    # We'll count the number of existing assignments in the availability list
-                    sorted_employees = sorted(available_employees, key=lambda e: len(employee_availability.get(e[0], [])))
-                    
-                    # Assign up to the required count
-                    assigned_count = 0
-                    for employee in sorted_employees:
-                        if assigned_count >= count:
-                            break
-                            
-                        employee_id = employee[0]
-                        
-                        # Check if is_initial and is_modified columns exist
-                        cur.execute("""
-                            SELECT 
-                                COUNT(*) as count,
-                                SUM(CASE WHEN column_name = 'is_initial' THEN 1 ELSE 0 END) as has_is_initial,
-                                SUM(CASE WHEN column_name = 'is_modified' THEN 1 ELSE 0 END) as has_is_modified
-                            FROM information_schema.columns 
-                            WHERE table_name = 'employee_assignments'
-                        """)
+                    for employee_id in chosen_ids:
+                        employee = employees_by_id[employee_id]
+                        new_employee_rows.append((task_id, employee_id))
                         
-                        result = cur.fetchone()
-                        table_exists = result[0] > 0
-                        has_is_initial = result[1] > 0
-                        has_is_modified = result[2] > 0
-                        
-                        try:
-                            # First check if assignment already exists
-                            cur.execute("SELECT COUNT(*) FROM employee_assignments WHERE task_id = %s AND employee_id = %s", 
-                                       (task_id, employee_id))
-                            already_exists = cur.fetchone()[0] > 0
-                            
-                            if not already_exists:
-                                if table_exists and has_is_initial and has_is_modified:
-                                    # Use full insert with all columns
-                                    cur.execute("""
-                                        INSERT INTO employee_assignments (task_id, employee_id, is_initial, is_modified)
-                                        VALUES (%s, %s, TRUE, FALSE)
-                                    """, (task_id, employee_id))
-                                else:
-                                    # Use simplified insert with only required columns
-                                    cur.execute("""
-                                        INSERT INTO employee_assignments (task_id, employee_id)
-                                        VALUES (%s, %s)
-                                    """, (task_id, employee_id))
-                                
-                                # Update employee availability
-                                employee_availability[employee_id].append((planned_start, planned_end))
-                                assigned_count += 1
-                                
-                                employee_name = employee[1] if len(employee) > 1 else "Unknown"
-                                employee_role = employee[2] if len(employee) > 2 else "Unknown role"
-                                print(f"Assigned employee {employee_name} ({employee_role}) to task {task_name} for group {group} from {planned_start} to {planned_end}")
-                        except Exception as e:
-                            print(f"Error inserting employee assignment: {e}")
-                            # Try a simpler approach as a last resort
-                            try:
-                                cur.execute("""
-                                    INSERT INTO employee_assignments (task_id, employee_id)
-                                    SELECT %s, %s
-                                    WHERE NOT EXISTS (
-                                        SELECT 1 FROM employee_assignments 
-                                        WHERE task_id = %s AND employee_id = %s
-                                    )
-                                """, (task_id, employee_id, task_id, employee_id))
-                                
-                                # Increment assignment count
-                                employee_assignments_count[employee_id] = employee_assignments_count.get(employee_id, 0) + 1
-                                assigned_count += 1
-                            except Exception as e2:
-                                print(f"Final attempt to insert employee assignment failed: {e2}")
+                        employee_name = employee[1] if len(employee) > 1 else "Unknown"
+                        employee_role = employee[2] if len(employee) > 2 else "Unknown role"
+                        logger.debug("Assigned employee %s (%s) to task %s for group %s from %s to %s", employee_name, employee_role, task_name, group, planned_start, planned_end)
             
             # Only assign resources if no assignments exist and there are requirements
             if resource_count == 0 and resources and resource_requirements:
@@ -2586,101 +3622,32 @@ def auto_assign_resources_to_tasks(preserve_task_ids=None, clear_existing=True):
                     category, count = req
                     count = int(count)  # Ensure count is an integer
                     
-                    # Find resources with matching type
-                    matching_resources = []
-                    for resource in resources:
-                        if has_type and len(resource) > 2:
-                            resource_type = resource[2]
-                            if resource_type and resource_type.lower() == category.lower():
-                                matching_resources.append(resource)
-                        else:
-                            # If no type column, just use any resource
-                            matching_resources.append(resource)
+                    # Take the least-loaded resources of matching type that are free
+                    # during this task's timeframe (any resource if there is no type column)
+                    key = (category or '').lower() if has_type else None
+                    chosen_ids = pick_least_loaded(resource_candidates.get(key, []), resource_availability,
+                                                   planned_start, planned_end, count)
                     
-                    # Filter resources by availability during this task's timeframe
-                    available_resources = []
-                    for resource in matching_resources:
-                        resource_id = resource[0]
-                        if is_available_during_timeframe(resource_availability[resource_id], planned_start, planned_end):
-                            available_resources.append(resource)
-                    
-                    if not available_resources:
-                        print(f"Warning: No available resources of type {category} for task {task_name} during {planned_start} to {planned_end}")
+                    if not chosen_ids:
+                        logger.warning("No available resources of type %s for task %s during %s to %s", category, task_name, planned_start, planned_end)
                         # Don't fall back to unavailable resources - this would cause conflicts
                         # Instead, we'll skip assignment for this requirement
                         continue
                     
-                    # Sort by number of assignments (ascending) to distribute work evenly
-                    sorted_resources = sorted(available_resources, key=lambda r: len(resource_availability.get(r[0], [])))
-                    
-                    # Assign up to the required count
-                    assigned_count = 0
-                    for resource in sorted_resources:
-                        if assigned_count >= count:
-                            break
-                            
-                        resource_id = resource[0]
-                        
-                        # Check if is_initial and is_modified columns exist
-                        cur.execute("""
-                            SELECT 
-                                COUNT(*) as count,
-                                SUM(CASE WHEN column_name = 'is_initial' THEN 1 ELSE 0 END) as has_is_initial,
-                                SUM(CASE WHEN column_name = 'is_modified' THEN 1 ELSE 0 END) as has_is_modified
-                            FROM information_schema.columns 
-                            WHERE table_name = 'resource_assignments'
-                        """)
-                        
-                        result = cur.fetchone()
-                        table_exists = result[0] > 0
-                        has_is_initial = result[1] > 0
-                        has_is_modified = result[2] > 0
+                    for resource_id in chosen_ids:
+                        resource = resources_by_id[resource_id]
+                        new_resource_rows.append((task_id, resource_id))
                         
-                        try:
-                            # First check if assignment already exists
-                            cur.execute("SELECT COUNT(*) FROM resource_assignments WHERE task_id = %s AND resource_id = %s", 
-                                       (task_id, resource_id))
-                            already_exists = cur.fetchone()[0] > 0
-                            
-                            if not already_exists:
-                                if table_exists and has_is_initial and has_is_modified:
-                                    # Use full insert with all columns
-                                    cur.execute("""
-                                        INSERT INTO resource_assignments (task_id, resource_id, is_initial, is_modified)
-                                        VALUES (%s, %s, TRUE, FALSE)
-                                    """, (task_id, resource_id))
-                                else:
-                                    # Use simplified insert with only required columns
-                                    cur.execute("""
-                                        INSERT INTO resource_assignments (task_id, resource_id)
-                                        VALUES (%s, %s)
-                                    """, (task_id, resource_id))
-                                
-                                # Update resource availability
-                                resource_availability[resource_id].append((planned_start, planned_end))
-                                assigned_count += 1
-                                
-                                resource_name = resource[1] if len(resource) > 1 else "Unknown"
-                                resource_type = resource[2] if len(resource) > 2 else "Unknown type"
-                                print(f"Assigned resource {resource_name} ({resource_type}) to task {task_name} for category {category} from {planned_start} to {planned_end}")
-                        except Exception as e:
-                            print(f"Error inserting resource assignment: {e}")
-                            # Try a simpler approach as a last resort
-                            try:
-                                cur.execute("""
-                                    INSERT INTO resource_assignments (task_id, resource_id)
-                                    SELECT %s, %s
-                                    WHERE NOT EXISTS (
-                                        SELECT 1 FROM resource_assignments 
-                                        WHERE task_id = %s AND resource_id = %s
-                                    )
-                                """, (task_id, resource_id, task_id, resource_id))
-                                
-                                # Increment assignment count
-                                resource_assignments_count[resource_id] = resource_assignments_count.get(resource_id, 0) + 1
-                                assigned_count += 1
-                            except Exception as e2:
-                                print(f"Final attempt to insert resource assignment failed: {e2}")
+                        resource_name = resource[1] if len(resource) > 1 else "Unknown"
+                        resource_type = resource[2] if len(resource) > 2 else "Unknown type"
+                        logger.debug("Assigned resource %s (%s) to task %s for category %s from %s to %s", resource_name, resource_type, task_name, category, planned_start, planned_end)
+        
+        # Write all new assignments in bulk
+        inserted_employees = bulk_insert_assignments(cur, 'employee_assignments', new_employee_rows,
+                                                     mark_initial=flag_support['employee_assignments'])
+        inserted_resources = bulk_insert_assignments(cur, 'resource_assignments', new_resource_rows,
+                                                     mark_initial=flag_support['resource_assignments'])
+        logger.info("Inserted %s employee and %s resource assignments", inserted_employees, inserted_resources)
         
         # Validate the assignments to ensure no resource conflicts
         validation_result = validate_resource_assignments(db)
@@ -2689,20 +3656,22 @@ def auto_assign_resources_to_tasks(preserve_task_ids=None, clear_existing=True):
         cur.close()
         
         if validation_result['success']:
-            print("Resource and employee assignments complete. No conflicts detected.")
+            logger.info("Resource and employee assignments complete. No conflicts detected.")
             return True
         else:
-            print("WARNING: Resource assignment completed with conflicts:")
+            logger.warning("Resource assignment completed with conflicts:")
             for conflict in validation_result['conflicts']:
-                print(f"  - {conflict}")
-            print("These conflicts should not occur with the improved assignment logic. If they persist, please check your task scheduling.")
+                logger.warning("  - %s", conflict)
+            logger.warning("These conflicts should not occur with the improved assignment logic. If they persist, please check your task scheduling.")
             return True  # Still return True as we've made the assignments
     
     except Exception as e:
-        print(f"Error auto-assigning resources: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error auto-assigning resources: %s", e)
         return False
+    finally:
+        # Uncommitted work is rolled back when the connection returns to the pool
+        if db:
+            db.close()
 
 def validate_resource_assignments(db):
     """
@@ -2770,13 +3739,13 @@ def validate_resource_assignments(db):
         }
         
     except Exception as e:
-        print(f"Error validating resource assignments: {e}")
+        logger.exception("Error validating resource assignments: %s", e)
         return {
             'success': False,
             'conflicts': [f"Validation error: {str(e)}"]
         }
 
-def assign_resources_to_tasks(db, schedule, preserve_task_ids=None):
+def assign_resources_to_tasks(db, schedule, preserve_task_ids=None, calendar=None):
     """
     Assign resources and employees to tasks based on task requirements.
     This is called after the initial schedule is created.
@@ -2792,28 +3761,22 @@ def assign_resources_to_tasks(db, schedule, preserve_task_ids=None):
         db: Database connection
         schedule: The schedule generated by the CP-SAT solver
         preserve_task_ids: Optional list of task IDs to preserve (not reassign)
+        calendar: WorkCalendar the schedule was solved on; defaults to db's tenant calendar
     """
     # Initialize preserve_task_ids if None
     preserve_task_ids = preserve_task_ids or []
+    calendar = calendar or get_work_calendar(source=db)
     # Use a new connection to avoid transaction issues
     conn = None
     try:
         # Get all employees and resources
-        conn = psycopg2.connect(**DB_PARAMS)
+        conn = get_connection(DB_PARAMS)
         cur = conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
         
         print("Assigning resources and employees to tasks...")
         
         # Check if employees table exists
-        cur.execute("""
-            SELECT EXISTS (
-                SELECT FROM information_schema.tables 
-                WHERE table_name = 'employees'
-            ) as exists
-        """)
-        
-        result = cur.fetchone()
-        employees_table_exists = result['exists'] if result else False
+        employees_table_exists = get_schema(cur.connection).has_table('employees')
         
         if not employees_table_exists:
             print("Employees table does not exist. Creating sample employees...")
@@ -2837,17 +3800,10 @@ def assign_resources_to_tasks(db, schedule, preserve_task_ids=None):
                 ON CONFLICT DO NOTHING
             """)
             db.conn.commit()
+            refresh_schema(conn)
         
         # Check if resources table exists
-        cur.execute("""
-            SELECT EXISTS (
-                SELECT FROM information_schema.tables 
-                WHERE table_name = 'resources'
-            ) as exists
-        """)
-        
-        result = cur.fetchone()
-        resources_table_exists = result['exists'] if result else False
+        resources_table_exists = get_schema(cur.connection).has_table('resources')
         
         if not resources_table_exists:
             print("Resources table does not exist. Creating sample resources...")
@@ -2872,16 +3828,10 @@ def assign_resources_to_tasks(db, schedule, preserve_task_ids=None):
                 ON CONFLICT DO NOTHING
             """)
             db.conn.commit()
+            refresh_schema(conn)
         
         # Check if skill_set column exists in employees table
-        cur.execute("""
-            SELECT EXISTS (
-                SELECT column_name 
-                FROM information_schema.columns 
-                WHERE table_name = 'employees' AND column_name = 'skill_set'
-            ) as exists
-        """)
-        has_skill_set = cur.fetchone()[0]
+        has_skill_set = get_schema(cur.connection).has_column('employees', 'skill_set')
         
         # Get all employees with appropriate columns
         if has_skill_set:
@@ -2892,14 +3842,7 @@ def assign_resources_to_tasks(db, schedule, preserve_task_ids=None):
         employees = cur.fetchall()
         
         # Check if type column exists in resources table
-        cur.execute("""
-            SELECT EXISTS (
-                SELECT column_name 
-                FROM information_schema.columns 
-                WHERE table_name = 'resources' AND column_name = 'type'
-            ) as exists
-        """)
-        has_type = cur.fetchone()[0]
+        has_type = get_schema(cur.connection).has_column('resources', 'type')
         
         # Get all resources with appropriate columns
         if has_type:
@@ -2910,15 +3853,7 @@ def assign_resources_to_tasks(db, schedule, preserve_task_ids=None):
         resources = cur.fetchall()
         
         # Check if employee_assignments table exists
-        cur.execute("""
-            SELECT EXISTS (
-                SELECT FROM information_schema.tables 
-                WHERE table_name = 'employee_assignments'
-            ) as exists
-        """)
-        
-        result = cur.fetchone()
-        employee_table_exists = result['exists'] if result else False
+        employee_table_exists = get_schema(cur.connection).has_table('employee_assignments')
         
         if not employee_table_exists:
             # Create the employee_assignments table
@@ -2935,17 +3870,10 @@ def assign_resources_to_tasks(db, schedule, preserve_task_ids=None):
                 )
             """)
             db.conn.commit()
+            refresh_schema(conn)
         
         # Check if resource_assignments table exists
-        cur.execute("""
-            SELECT EXISTS (
-                SELECT FROM information_schema.tables 
-                WHERE table_name = 'resource_assignments'
-            ) as exists
-        """)
-        
-        result = cur.fetchone()
-        resource_table_exists = result['exists'] if result else False
+        resource_table_exists = get_schema(cur.connection).has_table('resource_assignments')
         
         if not resource_table_exists:
             # Create the resource_assignments table
@@ -2962,36 +3890,19 @@ def assign_resources_to_tasks(db, schedule, preserve_task_ids=None):
                 )
             """)
             db.conn.commit()
+            refresh_schema(conn)
         
         # Check if is_initial and is_modified columns exist in employee_assignments
-        cur.execute("""
-            SELECT 
-                COUNT(*) as count,
-                SUM(CASE WHEN column_name = 'is_initial' THEN 1 ELSE 0 END) as has_is_initial,
-                SUM(CASE WHEN column_name = 'is_modified' THEN 1 ELSE 0 END) as has_is_modified
-            FROM information_schema.columns 
-            WHERE table_name = 'employee_assignments'
-        """)
-        
-        result = cur.fetchone()
-        employee_table_exists = result[0] > 0
-        has_is_initial_employee = result[1] > 0
-        has_is_modified_employee = result[2] > 0
+        schema = get_schema(cur.connection)
+        employee_table_exists = schema.has_table('employee_assignments')
+        has_is_initial_employee = schema.has_column('employee_assignments', 'is_initial')
+        has_is_modified_employee = schema.has_column('employee_assignments', 'is_modified')
         
         # Check if is_initial and is_modified columns exist in resource_assignments
-        cur.execute("""
-            SELECT 
-                COUNT(*) as count,
-                SUM(CASE WHEN column_name = 'is_initial' THEN 1 ELSE 0 END) as has_is_initial,
-                SUM(CASE WHEN column_name = 'is_modified' THEN 1 ELSE 0 END) as has_is_modified
-            FROM information_schema.columns 
-            WHERE table_name = 'resource_assignments'
-        """)
-        
-        result = cur.fetchone()
-        resource_table_exists = result[0] > 0
-        has_is_initial_resource = result[1] > 0
-        has_is_modified_resource = result[2] > 0
+        schema = get_schema(cur.connection)
+        resource_table_exists = schema.has_table('resource_assignments')
+        has_is_initial_resource = schema.has_column('resource_assignments', 'is_initial')
+        has_is_modified_resource = schema.has_column('resource_assignments', 'is_modified')
         
         # For each task in the schedule, assign resources and employees
         for entry in schedule:
@@ -3002,8 +3913,8 @@ def assign_resources_to_tasks(db, schedule, preserve_task_ids=None):
                 print(f"Preserving existing resource assignments for Task {task_id}")
                 continue
                 
-            planned_start = working_time_to_datetime(entry['start'])
-            planned_end = working_time_to_datetime(entry['start'] + entry['duration'])
+            planned_start = working_time_to_datetime(entry['start'], calendar)
+            planned_end = working_time_to_datetime(entry['start'] + entry['duration'], calendar)
             
             # Get task details
             cur.execute("SELECT task_name, phase FROM tasks WHERE task_id = %s", (task_id,))
@@ -3264,14 +4175,14 @@ def assign_resources_to_tasks(db, schedule, preserve_task_ids=None):
         if conn:
             conn.rollback()
     finally:
-        # Always close the connection
+        # Always return the connection to the pool
         if conn:
-            conn.close()
+            release_connection(DB_PARAMS, conn)
 
 # ---------------------------
 # Priority-Based Rescheduling Functions
 # ---------------------------
-def priority_based_reschedule(db, conflict_time, affected_tasks, reason="Resource Conflict"):
+def priority_based_reschedule(db, conflict_time, affected_tasks, reason="Resource Conflict", calendar=None):
     """
     Reschedule tasks based on priority when a conflict occurs.
     
@@ -3280,10 +4191,12 @@ def priority_based_reschedule(db, conflict_time, affected_tasks, reason="Resourc
         conflict_time: The time when the conflict occurs
         affected_tasks: List of task IDs affected by the conflict
         reason: Reason for rescheduling
+        calendar: WorkCalendar of the working hours; defaults to db's tenant calendar
     
     Returns:
         List of rescheduled tasks
     """
+    calendar = calendar or get_work_calendar(source=db)
     print(f"Performing priority-based rescheduling due to {reason} at {conflict_time}")
     
     # Get task details with priorities
@@ -3349,7 +4262,7 @@ def priority_based_reschedule(db, conflict_time, affected_tasks, reason="Resourc
                   task_start, conflict_time, completion_percentage))
             
             # Find next available time slot (after high priority tasks)
-            next_available = find_next_available_time(db, high_priority_tasks, conflict_time)
+            next_available = find_next_available_time(db, high_priority_tasks, conflict_time, calendar)
             remaining_hours = total_duration - work_done_hours
             new_end_time = next_available + timedelta(hours=remaining_hours)
             
@@ -3398,7 +4311,7 @@ def priority_based_reschedule(db, conflict_time, affected_tasks, reason="Resourc
         duration = (task_end - task_start).total_seconds() / 3600  # in hours
         
         # Find next available time slot (after high priority tasks and preemptable continuations)
-        next_available = find_next_available_time(db, high_priority_tasks + rescheduled, conflict_time)
+        next_available = find_next_available_time(db, high_priority_tasks + rescheduled, conflict_time, calendar)
         new_end_time = next_available + timedelta(hours=duration)
         
         # Update the schedule
@@ -3435,7 +4348,7 @@ def priority_based_reschedule(db, conflict_time, affected_tasks, reason="Resourc
     print(f"Rescheduled {len(rescheduled)} tasks based on priority")
     return rescheduled
 
-def find_next_available_time(db, scheduled_tasks, after_time):
+def find_next_available_time(db, scheduled_tasks, after_time, calendar=None):
     """
     Find the next available time slot after the given tasks.
     
@@ -3443,15 +4356,17 @@ def find_next_available_time(db, scheduled_tasks, after_time):
         db: Database connection
         scheduled_tasks: List of tasks that are already scheduled
         after_time: Time to start looking from
+        calendar: WorkCalendar of the working hours; defaults to db's tenant calendar
     
     Returns:
         Next available datetime
     """
+    calendar = calendar or get_work_calendar(source=db)
     # Start with the given time
     next_time = after_time
     
     # Ensure we're in working hours
-    next_time = adjust_to_working_hours(next_time)
+    next_time = adjust_to_working_hours(next_time, calendar)
     
     # Check if there's any overlap with scheduled tasks
     while True:
@@ -3474,41 +4389,21 @@ def find_next_available_time(db, scheduled_tasks, after_time):
         
         if not has_overlap:
             # Ensure we're in working hours again after potential adjustments
-            next_time = adjust_to_working_hours(next_time)
+            next_time = adjust_to_working_hours(next_time, calendar)
             return next_time
 
-def adjust_to_working_hours(time_dt):
+def adjust_to_working_hours(time_dt, calendar=None):
     """
-    Adjust a datetime to fall within working hours (9 AM - 5 PM, Monday-Friday).
+    Adjust a datetime to fall within working hours of the work calendar.
     
     Args:
         time_dt: Datetime to adjust
+        calendar: WorkCalendar; defaults to the default working week
     
     Returns:
         Adjusted datetime
     """
-    # Check if it's a weekend
-    if time_dt.weekday() >= 5:  # Saturday or Sunday
-        # Move to Monday 9 AM
-        days_to_add = 7 - time_dt.weekday()
-        return datetime.combine(time_dt.date() + timedelta(days=days_to_add), 
-                               datetime.min.time()).replace(hour=9)
-    
-    # Check if it's before 9 AM
-    if time_dt.hour < 9:
-        return datetime.combine(time_dt.date(), datetime.min.time()).replace(hour=9)
-    
-    # Check if it's after 5 PM
-    if time_dt.hour >= 17:
-        # Move to next day 9 AM
-        next_day = time_dt.date() + timedelta(days=1)
-        # Skip weekends
-        if next_day.weekday() >= 5:  # Saturday or Sunday
-            days_to_add = 7 - next_day.weekday() + 1  # Move to Monday
-            next_day = next_day + timedelta(days=days_to_add)
-        return datetime.combine(next_day, datetime.min.time()).replace(hour=9)
-    
-    return time_dt
+    return get_next_working_time(time_dt, calendar)
 
 
 # ---------------------------
@@ -3521,6 +4416,9 @@ def adjust_to_working_hours(time_dt):
 # Main Execution
 # ---------------------------
 if __name__ == '__main__':
-    print("Running integrated CP-SAT scheduler with resource assignment (working-hours only domain)...")
-    cp_sat_scheduler()
+    from logging_config import configure_logging
+    configure_logging('INFO')
+    logger.info("Running integrated CP-SAT scheduler with resource assignment (working-hours only domain)...")
+    if cp_sat_scheduler()['status'] == 'ERROR':
+        sys.exit(1)
     
@@ -0,0 +1,229 @@
+#!/usr/bin/env python
+"""
+Background job queue for long-running scheduler solves.
+
+The API submits a solve as a job and returns its id right away. The solve
+then runs on a small worker pool, so a two-minute CP-SAT run does not hold a
+Flask worker. Clients poll the job (or stream it) for status and for the best
+makespan found so far, and can cancel it. The worker count comes from
+RSO_JOB_WORKERS (default 1). Solves write the shared schedule, so running
+more than one at a time only makes sense for independent data.
+"""
+import itertools
+import logging
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+JOB_WORKERS_ENV = 'RSO_JOB_WORKERS'
+DEFAULT_JOB_WORKERS = 1
+MAX_FINISHED_JOBS = 100  # Finished jobs kept for polling before the oldest are dropped
+
+JOB_QUEUED = 'queued'
+JOB_RUNNING = 'running'
+JOB_COMPLETED = 'completed'
+JOB_FAILED = 'failed'
+JOB_CANCELLED = 'cancelled'
+FINISHED_STATES = (JOB_COMPLETED, JOB_FAILED, JOB_CANCELLED)
+
+
+class JobManager:
+    """
+    Runs submitted callables on a worker pool and tracks their status.
+
+    Each job function is called as func(progress_callback=..., stop_event=..., **kwargs),
+    matching cp_sat_scheduler's keyword arguments. Its return value becomes the
+    job result. If the result is a dict with 'status' 'ERROR' or 'CANCELLED'
+    (or 'stop_reason' 'cancelled'), the job is marked failed or cancelled
+    accordingly; an exception marks it failed.
+    """
+
+    def __init__(self, max_workers=None):
+        if max_workers is None:
+            try:
+                max_workers = int(os.environ.get(JOB_WORKERS_ENV, DEFAULT_JOB_WORKERS))
+            except ValueError:
+                max_workers = DEFAULT_JOB_WORKERS
+        self.max_workers = max(1, max_workers)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='rso-job')
+        self._jobs = {}
+        self._futures = {}
+        self._stop_events = {}
+        self._sequence = itertools.count(1)
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+
+    def submit(self, job_type, func, **kwargs):
+        """
+        Queue a job.
+
+        Args:
+            job_type: Short label stored with the job (e.g. 'schedule')
+            func: Callable to run
+            **kwargs: Keyword arguments passed to func
+
+        Returns:
+            dict: Snapshot of the new job
+        """
+        job_id = uuid.uuid4().hex
+        stop_event = threading.Event()
+        with self._lock:
+            self._jobs[job_id] = {
+                'job_id': job_id,
+                'type': job_type,
+                'status': JOB_QUEUED,
+                'sequence': next(self._sequence),
+                'version': 0,
+                'submitted_at': datetime.now().isoformat(),
+                'started_at': None,
+                'finished_at': None,
+                'progress': {'solution_count': 0, 'best_makespan': None,
+                             'best_makespan_hours': None, 'elapsed': 0.0},
+                'result': None,
+                'error': None
+            }
+            self._stop_events[job_id] = stop_event
+            self._futures[job_id] = self._executor.submit(self._run, job_id, func, stop_event, kwargs)
+            self._prune()
+            logger.info("Queued %s job %s", job_type, job_id)
+            return dict(self._jobs[job_id])
+
+    def _update(self, job_id, **fields):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            job.update(fields)
+            job['version'] += 1
+            self._changed.notify_all()
+
+    def _run(self, job_id, func, stop_event, kwargs):
+        if stop_event.is_set():
+            self._update(job_id, status=JOB_CANCELLED, finished_at=datetime.now().isoformat())
+            return
+        self._update(job_id, status=JOB_RUNNING, started_at=datetime.now().isoformat())
+
+        def on_progress(progress):
+            self._update(job_id, progress=dict(progress))
+
+        try:
+            result = func(progress_callback=on_progress, stop_event=stop_event, **kwargs)
+        except Exception as e:
+            logger.exception("Job %s failed: %s", job_id, e)
+            self._update(job_id, status=JOB_FAILED, error=str(e) or type(e).__name__,
+                         finished_at=datetime.now().isoformat())
+            return
+
+        # The result decides: a cancel that arrives after the solve finished
+        # and persisted its schedule leaves the job completed
+        status = JOB_COMPLETED
+        error = None
+        if isinstance(result, dict) and result.get('status') == 'ERROR':
+            status = JOB_FAILED
+            error = result.get('error')
+        elif isinstance(result, dict) and (result.get('status') == 'CANCELLED' or
+                                           result.get('stop_reason') == 'cancelled'):
+            status = JOB_CANCELLED
+        logger.info("Job %s finished with status %s", job_id, status)
+        self._update(job_id, status=status, result=result, error=error,
+                     finished_at=datetime.now().isoformat())
+
+    def _prune(self):
+        """Drop the oldest finished jobs beyond MAX_FINISHED_JOBS. Caller holds the lock."""
+        finished = sorted((job for job in self._jobs.values() if job['status'] in FINISHED_STATES),
+                          key=lambda job: job['sequence'])
+        for job in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            job_id = job['job_id']
+            self._jobs.pop(job_id, None)
+            self._futures.pop(job_id, None)
+            self._stop_events.pop(job_id, None)
+
+    def get(self, job_id):
+        """
+        Return a snapshot of a job.
+
+        Args:
+            job_id: Job id returned by submit
+
+        Returns:
+            dict or None: The job, or None if it is unknown
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def list(self):
+        """Return snapshots of all tracked jobs, newest first."""
+        with self._lock:
+            return [dict(job) for job in sorted(self._jobs.values(), key=lambda job: -job['sequence'])]
+
+    def wait_for_change(self, job_id, version, timeout=None):
+        """
+        Block until the job's version differs from the given one, or until timeout.
+
+        Args:
+            job_id: Job id
+            version: Last version seen by the caller
+            timeout: Seconds to wait at most
+
+        Returns:
+            dict or None: Current snapshot of the job, or None if it is unknown
+        """
+        with self._lock:
+            self._changed.wait_for(
+                lambda: self._jobs.get(job_id) is None or self._jobs[job_id]['version'] != version,
+                timeout=timeout)
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def cancel(self, job_id):
+        """
+        Cancel a queued or running job.
+
+        A queued job is removed from the queue. A running solve is asked to stop
+        and finishes without persisting its result.
+
+        Args:
+            job_id: Job id
+
+        Returns:
+            dict or None: Snapshot of the job after the request, or None if it is unknown
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            if job['status'] in FINISHED_STATES:
+                return dict(job)
+            self._stop_events[job_id].set()
+            queued = job['status'] == JOB_QUEUED and self._futures[job_id].cancel()
+        if queued:
+            self._update(job_id, status=JOB_CANCELLED, finished_at=datetime.now().isoformat())
+        logger.info("Cancellation requested for job %s", job_id)
+        return self.get(job_id)
+
+    def shutdown(self, wait=False):
+        """Cancel all unfinished jobs and stop the worker pool."""
+        with self._lock:
+            for job_id, job in self._jobs.items():
+                if job['status'] not in FINISHED_STATES:
+                    self._stop_events[job_id].set()
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+
+_job_manager = None
+_job_manager_lock = threading.Lock()
+
+
+def get_job_manager():
+    """Return the process-wide JobManager, creating it on first use."""
+    global _job_manager
+    if _job_manager is None:
+        with _job_manager_lock:
+            if _job_manager is None:
+                _job_manager = JobManager()
+    return _job_manager
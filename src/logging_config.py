@@ -0,0 +1,36 @@
+#!/usr/bin/env python
+"""
+Process-wide logging setup for the scheduler, rescheduler and API.
+
+Each module logs through its own logger (logging.getLogger(__name__)) and
+this module configures the root handler and level once per process. The
+level comes from the RSO_LOG_LEVEL environment variable, falling back to the
+caller's default. Production runs default to WARNING. INFO gives progress
+and summaries, and DEBUG adds per-task and per-variable tracing.
+"""
+import logging
+import os
+
+LOG_LEVEL_ENV = 'RSO_LOG_LEVEL'
+DEFAULT_LOG_LEVEL = 'WARNING'
+LOG_FORMAT = '%(asctime)s %(levelname)s [%(name)s] %(message)s'
+
+
+def configure_logging(default_level=DEFAULT_LOG_LEVEL):
+    """
+    Configure root logging for the current process.
+
+    Args:
+        default_level: Level name used when RSO_LOG_LEVEL is not set
+
+    Returns:
+        int: The effective logging level
+    """
+    level_name = os.environ.get(LOG_LEVEL_ENV, default_level).upper()
+    level = logging.getLevelName(level_name)
+    if not isinstance(level, int):
+        level = logging.getLevelName(DEFAULT_LOG_LEVEL)
+
+    logging.basicConfig(format=LOG_FORMAT)
+    logging.getLogger().setLevel(level)
+    return level
@@ -0,0 +1,166 @@
+#!/usr/bin/env python
+"""
+On-disk cache of built CP-SAT models, keyed by a fingerprint of the problem.
+
+Building ConstructionScheduler's model is the slow part of a run on a
+project that has not changed. The scheduler therefore hashes everything the
+model depends on (tasks, dependencies, requirements, resource/employee pools,
+resource mode, horizon and start date) and stores the serialized
+CpModelProto next to a JSON index of the proto variable indices it needs
+afterwards. A later run with the same fingerprint loads both and skips the
+build. Preserved-task pins and solution hints are not part of the cached
+model; the scheduler adds them to the loaded model on every run.
+
+The cache directory comes from RSO_MODEL_CACHE_DIR (default: rso_model_cache
+in the system temp directory). At most RSO_MODEL_CACHE_ENTRIES models
+(default 8) are kept; the least recently used ones are removed.
+"""
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+
+from ortools.sat import cp_model_pb2
+
+logger = logging.getLogger(__name__)
+
+MODEL_CACHE_DIR_ENV = 'RSO_MODEL_CACHE_DIR'
+MODEL_CACHE_ENTRIES_ENV = 'RSO_MODEL_CACHE_ENTRIES'
+DEFAULT_MAX_ENTRIES = 8
+CACHE_FORMAT_VERSION = 3  # Bump when the cached index layout or the model structure changes
+
+
+def problem_fingerprint(problem):
+    """
+    Return a stable content hash of a JSON-serializable problem description.
+
+    Args:
+        problem: Dict/list structure describing every model input
+
+    Returns:
+        str: Hex SHA-256 digest
+    """
+    payload = json.dumps([CACHE_FORMAT_VERSION, problem], sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class ModelCache:
+    """
+    Directory of cached models: <fingerprint>.pb holds the CpModelProto and
+    <fingerprint>.json the variable index map.
+    """
+
+    def __init__(self, directory, max_entries=DEFAULT_MAX_ENTRIES):
+        self.directory = directory
+        self.max_entries = max(1, max_entries)
+        self._lock = threading.Lock()
+
+    def _paths(self, key):
+        return os.path.join(self.directory, f'{key}.pb'), os.path.join(self.directory, f'{key}.json')
+
+    def load(self, key):
+        """
+        Load a cached model.
+
+        Args:
+            key: Problem fingerprint
+
+        Returns:
+            tuple or None: (CpModelProto, index dict), or None on a miss or unreadable entry
+        """
+        proto_path, index_path = self._paths(key)
+        try:
+            with open(index_path, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+            proto = cp_model_pb2.CpModelProto()
+            with open(proto_path, 'rb') as f:
+                proto.ParseFromString(f.read())
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning("Ignoring unreadable cached model %s: %s", key, e)
+            return None
+        # Mark as recently used for pruning
+        try:
+            os.utime(index_path)
+        except OSError:
+            pass
+        return proto, index
+
+    def store(self, key, proto, index):
+        """
+        Store a model. Failures are logged and otherwise ignored.
+
+        Args:
+            key: Problem fingerprint
+            proto: CpModelProto to store
+            index: JSON-serializable variable index map
+        """
+        proto_path, index_path = self._paths(key)
+        try:
+            with self._lock:
+                os.makedirs(self.directory, exist_ok=True)
+                # Write to temporary files and rename, so readers never see half a model.
+                # The index goes last: an entry only counts once its index exists.
+                for path, data, mode in ((proto_path, proto.SerializeToString(), 'wb'),
+                                         (index_path, json.dumps(index), 'w')):
+                    tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+                    with open(tmp_path, mode) as f:
+                        f.write(data)
+                    os.replace(tmp_path, path)
+                self._prune()
+            logger.info("Cached model %s (%s variables, %s constraints)",
+                        key[:12], len(proto.variables), len(proto.constraints))
+        except Exception as e:
+            logger.warning("Could not cache model %s: %s", key[:12], e)
+
+    def _prune(self):
+        """Remove the least recently used entries beyond max_entries. Caller holds the lock."""
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith('.json'):
+                path = os.path.join(self.directory, name)
+                try:
+                    entries.append((os.path.getmtime(path), name[:-len('.json')]))
+                except OSError:
+                    continue
+        entries.sort(reverse=True)
+        for _, key in entries[self.max_entries:]:
+            for path in self._paths(key):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def clear(self):
+        """Remove every cached model."""
+        with self._lock:
+            if not os.path.isdir(self.directory):
+                return
+            for name in os.listdir(self.directory):
+                if name.endswith(('.pb', '.json', '.tmp')):
+                    try:
+                        os.remove(os.path.join(self.directory, name))
+                    except OSError:
+                        pass
+
+
+_model_cache = None
+_model_cache_lock = threading.Lock()
+
+
+def get_model_cache():
+    """Return the process-wide ModelCache configured from the environment."""
+    global _model_cache
+    if _model_cache is None:
+        with _model_cache_lock:
+            if _model_cache is None:
+                directory = os.environ.get(MODEL_CACHE_DIR_ENV) or os.path.join(tempfile.gettempdir(), 'rso_model_cache')
+                try:
+                    max_entries = int(os.environ.get(MODEL_CACHE_ENTRIES_ENV, DEFAULT_MAX_ENTRIES))
+                except ValueError:
+                    max_entries = DEFAULT_MAX_ENTRIES
+                _model_cache = ModelCache(directory, max_entries)
+    return _model_cache
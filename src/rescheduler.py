@@ -4,6 +4,7 @@ from datetime import datetime, timedelta, date, time
 import sys
 import math
 import json
+import logging
 import time as time_module
 from ortools.sat.python import cp_model
 
@@ -11,34 +12,55 @@ from ortools.sat.python import cp_model
 from initial_scheduler import (
     DatabaseManager, 
     ConstructionScheduler,
-    working_time_to_datetime,
-    calendar_time_to_working_time,
-    is_working_day,
-    get_next_working_time,
+    get_work_calendar,
     SCALE_FACTOR,
     WORK_HOURS_PER_DAY,
     UNITS_PER_DAY,
-    WORKING_HORIZON
+    WORKING_HORIZON,
+    WARM_START,
+    REPAIR_HINTS,
+    MODEL_CACHE
 )
+from model_cache import get_model_cache
+from solver_profiles import (
+    SOLVER_PROFILE_NIGHTLY, get_solve_history, search_workers, solver_time_limit, stop_criteria
+)
+from early_stopping import EarlyStoppingCallback, watch_search
+
+logger = logging.getLogger(__name__)
 
 # ---------------------------
 # Rescheduling Constants
 # ---------------------------
 SHORT_BREAK_THRESHOLD = 30  # minutes
 CUMULATIVE_BREAK_THRESHOLD = 30  # minutes
-WORKING_DAY_START = time(9, 0)  # 9:00 AM
-WORKING_DAY_END = time(17, 0)  # 5:00 PM
 
 # ---------------------------
 # Rescheduling Manager Class
 # ---------------------------
 class ReschedulingManager:
     def __init__(self, db=None):
+        """
+        Args:
+            db: Optional DataSource; defaults to a DatabaseManager. Event handlers
+                need the database, while full_reoptimization and dependency
+                propagation also run on a SnapshotDataSource.
+        """
         self.db = db if db else DatabaseManager()
+        self._dependency_graph = None  # (predecessors, successors), loaded on first use
         
     def close(self):
         if self.db:
             self.db.close()
+
+    def _calendar_for_project(self, project_id):
+        """Return the work calendar of a project (the tenant calendar for None)."""
+        return get_work_calendar(project_id, self.db)
+
+    def _calendar_for_task(self, task_id):
+        """Return the work calendar of a scheduled task's project."""
+        entry = self.db.load_task_schedules([task_id]).get(task_id)
+        return self._calendar_for_project(entry['project_id'] if entry else None)
             
     # ---------------------------
     # Clock In/Out Management
@@ -55,7 +77,7 @@ class ReschedulingManager:
         Returns:
             dict: Result of the operation
         """
-        print(f"Handling clock-in for Task {task_id} at {timestamp}")
+        logger.info("Handling clock-in for Task %s at %s", task_id, timestamp)
         
         # Get task details
         cur = self.db.conn.cursor()
@@ -70,7 +92,7 @@ class ReschedulingManager:
         task = cur.fetchone()
         
         if not task:
-            print(f"Task {task_id} not found")
+            logger.warning("Task %s not found", task_id)
             return {"success": False, "message": f"Task {task_id} not found"}
         
         task_id, name, planned_start, planned_end, status, actual_start, actual_end = task
@@ -87,7 +109,7 @@ class ReschedulingManager:
         is_resuming = status == 'Paused' and actual_start is not None
         
         if is_resuming:
-            print(f"Resuming task {task_id} after a break. Keeping original start time: {actual_start}")
+            logger.debug("Resuming task %s after a break. Keeping original start time: %s", task_id, actual_start)
             # Just update the status to In Progress, but keep the original actual_start
             cur.execute("""
                 UPDATE schedules
@@ -118,7 +140,7 @@ class ReschedulingManager:
             current_percentage = row[0] or 0
             accumulated_minutes = row[1] or 0
             
-        print(f"Resuming with accumulated minutes: {accumulated_minutes}")
+        logger.debug("Resuming with accumulated minutes: %s", accumulated_minutes)
         
         # Get the total accumulated minutes from all previous sessions
         cur.execute("""
@@ -132,7 +154,7 @@ class ReschedulingManager:
         if acc_row and acc_row[0]:
             total_accumulated = acc_row[0]
             
-        print(f"Total accumulated minutes from previous sessions: {total_accumulated}")
+        logger.debug("Total accumulated minutes from previous sessions: %s", total_accumulated)
         
         # Calculate completion percentage based on planned duration
         # Get the planned duration
@@ -157,7 +179,7 @@ class ReschedulingManager:
             
             # Calculate completion percentage
             current_percentage = min(100, max(0, (total_accumulated / planned_duration_minutes) * 100))
-            print(f"Planned duration: {planned_duration_minutes} minutes, Completion: {current_percentage:.2f}%")
+            logger.debug("Planned duration: %s minutes, Completion: %.2f%%", planned_duration_minutes, current_percentage)
             
         # Log the progress
         try:
@@ -176,9 +198,9 @@ class ReschedulingManager:
             """, (task_id,))
             
             progress_row = cur.fetchone()
-            print(f"Inserted task_progress row: {progress_row}")
+            logger.debug("Inserted task_progress row: %s", progress_row)
         except Exception as e:
-            print(f"Error inserting task_progress: {e}")
+            logger.exception("Error inserting task_progress: %s", e)
             # Continue anyway - we don't want to fail the clock-in just because of the progress log
         
         self.db.conn.commit()
@@ -211,7 +233,7 @@ class ReschedulingManager:
         Returns:
             dict: Result of the operation
         """
-        print(f"Handling clock-out for Task {task_id} at {timestamp}")
+        logger.info("Handling clock-out for Task %s at %s", task_id, timestamp)
         
         reason = details.get('reason', 'Work completed for now')
         completed_percentage = details.get('completed_percentage', 0)
@@ -230,7 +252,7 @@ class ReschedulingManager:
         task = cur.fetchone()
         
         if not task:
-            print(f"Task {task_id} not found")
+            logger.warning("Task %s not found", task_id)
             return {"success": False, "message": f"Task {task_id} not found"}
         
         task_id, name, planned_start, planned_end, status, actual_start, actual_end, estimated_hours = task
@@ -254,9 +276,9 @@ class ReschedulingManager:
                 actual_start = actual_start.replace(tzinfo=timestamp.tzinfo)
                 
             work_duration = (timestamp - actual_start).total_seconds() / 3600  # in hours
-            print(f"Work duration: {work_duration} hours")
+            logger.debug("Work duration: %s hours", work_duration)
         except Exception as e:
-            print(f"Error calculating work duration: {e}")
+            logger.exception("Error calculating work duration: %s", e)
             # Use a default duration if calculation fails
             work_duration = 0.5  # Default to 30 minutes
         
@@ -289,7 +311,7 @@ class ReschedulingManager:
                 
                 # Calculate the duration of this session
                 duration_minutes = max(0, (timestamp_naive - start_time_naive).total_seconds() / 60)
-                print(f"Start time: {start_time_naive}, End time: {timestamp_naive}, Duration: {duration_minutes} minutes")
+                logger.debug("Start time: %s, End time: %s, Duration: %s minutes", start_time_naive, timestamp_naive, duration_minutes)
                 
                 # Get the total accumulated minutes from all previous sessions
                 cur.execute("""
@@ -305,7 +327,7 @@ class ReschedulingManager:
                 
                 # Add current session duration to previously accumulated time
                 accumulated_minutes = prev_accumulated + duration_minutes
-                print(f"Session duration: {duration_minutes} minutes, Total accumulated: {accumulated_minutes} minutes")
+                logger.debug("Session duration: %s minutes, Total accumulated: %s minutes", duration_minutes, accumulated_minutes)
                 
                 # Calculate completion percentage based on planned duration
                 # Get the planned duration
@@ -330,10 +352,10 @@ class ReschedulingManager:
                     
                     # Calculate completion percentage
                     completed_percentage = min(100, max(0, (accumulated_minutes / planned_duration_minutes) * 100))
-                    print(f"Planned duration: {planned_duration_minutes} minutes, Completion: {completed_percentage:.2f}%")
+                    logger.debug("Planned duration: %s minutes, Completion: %.2f%%", planned_duration_minutes, completed_percentage)
                 
         except Exception as e:
-            print(f"Error calculating duration: {e}")
+            logger.exception("Error calculating duration: %s", e)
         
         # Update the task progress - mark the current session as paused
         cur.execute("""
@@ -352,10 +374,11 @@ class ReschedulingManager:
         """, (task_id,))
         
         progress_row = cur.fetchone()
-        print(f"Updated task_progress row: {progress_row}")
+        logger.debug("Updated task_progress row: %s", progress_row)
         
         # Check if it's end of day or if carry-over is requested
-        is_end_of_day = timestamp.time() >= WORKING_DAY_END
+        calendar = self._calendar_for_task(task_id)
+        is_end_of_day = timestamp.time() >= calendar.day_end(timestamp.date()).time()
         
         if completed_percentage >= 100:
             # Task is complete
@@ -382,15 +405,12 @@ class ReschedulingManager:
                 # Fall back to percentage-based calculation if not provided
                 total_duration = float(estimated_hours)  # Convert Decimal to float
                 remaining_hours = total_duration * (1 - completed_percentage / 100)
-                print(f"No remaining_hours provided, calculated {remaining_hours} hours based on {completed_percentage}% completion")
+                logger.debug("No remaining_hours provided, calculated %s hours based on %s%% completion", remaining_hours, completed_percentage)
             
             if remaining_hours > 0:
-                # Find next working day at 9 AM
-                next_working_day = timestamp.date() + timedelta(days=1)
-                while not is_working_day(datetime.combine(next_working_day, datetime.min.time())):
-                    next_working_day += timedelta(days=1)
-                
-                next_day_start = datetime.combine(next_working_day, WORKING_DAY_START)
+                # Find the start of the next working day
+                next_working_day = calendar.next_working_date(timestamp.date())
+                next_day_start = calendar.day_start(next_working_day)
                 new_end_time = next_day_start + timedelta(hours=remaining_hours)
                 
                 # Update the schedule
@@ -527,7 +547,7 @@ class ReschedulingManager:
         Returns:
             dict: Result of the operation
         """
-        print(f"Handling completion for Task {task_id} at {timestamp}")
+        logger.info("Handling completion for Task %s at %s", task_id, timestamp)
         
         if details is None:
             details = {}
@@ -545,7 +565,7 @@ class ReschedulingManager:
         task = cur.fetchone()
         
         if not task:
-            print(f"Task {task_id} not found")
+            logger.warning("Task %s not found", task_id)
             return {"success": False, "message": f"Task {task_id} not found"}
         
         task_id, name, planned_start, planned_end, status, actual_start, actual_end, estimated_hours = task
@@ -583,7 +603,7 @@ class ReschedulingManager:
               actual_start or planned_start, timestamp))
         
         # Trigger a full reschedule when a task is completed
-        print(f"Task {task_id} completed. Triggering full reschedule...")
+        logger.info("Task %s completed. Triggering full reschedule...", task_id)
         
         try:
             # Normalize timestamps for comparison or after hours
@@ -593,13 +613,14 @@ class ReschedulingManager:
             # Check if the task was completed after working hours
             completion_time = timestamp_naive.time()
             completion_date = timestamp_naive.date()
-            is_after_hours = completion_time > WORKING_DAY_END
+            calendar = self._calendar_for_task(task_id)
+            is_after_hours = completion_time > calendar.day_end(completion_date).time()
             
-            print(f"After working hours: {is_after_hours}")
+            logger.debug("After working hours: %s", is_after_hours)
             
             # Always trigger a full reschedule when a task is completed
-            print(f"Task {task_id} completed at {timestamp}")
-            print(f"Triggering full reschedule...")
+            logger.debug("Task %s completed at %s", task_id, timestamp)
+            logger.info("Triggering full reschedule...")
             
             # Perform a full reschedule of all incomplete tasks
             try:
@@ -615,7 +636,7 @@ class ReschedulingManager:
                 """)
                 
                 preserved_tasks = [row[0] for row in cur.fetchall()]
-                print(f"Preserving {len(preserved_tasks)} tasks that are completed or skipped")
+                logger.info("Preserving %s tasks that are completed or skipped", len(preserved_tasks))
                 
                 # Add the current task to the preserved tasks
                 if task_id not in preserved_tasks:
@@ -654,7 +675,7 @@ class ReschedulingManager:
                         'reason': 'Full reschedule after task completion'
                     })
                 
-                print(f"Full reschedule completed. Rescheduled {len(rescheduled_tasks)} tasks.")
+                logger.info("Full reschedule completed. Rescheduled %s tasks.", len(rescheduled_tasks))
                 
                 # Skip the rest of the rescheduling logic since we've already done a full reschedule
                 self.db.conn.commit()
@@ -669,14 +690,14 @@ class ReschedulingManager:
                 }
                 
             except Exception as e:
-                print(f"Error in full reschedule: {e}")
+                logger.exception("Error in full reschedule: %s", e)
                 import traceback
                 traceback.print_exc()
-                print("Continuing with normal rescheduling logic...")
+                logger.info("Continuing with normal rescheduling logic...")
             
             # If task was completed after working hours, also reschedule all incomplete tasks for the current day
                 if is_after_hours:
-                    print(f"Task completed after working hours. Rescheduling all incomplete tasks for today...")
+                    logger.info("Task completed after working hours. Rescheduling all incomplete tasks for today...")
                     
                     # Get all incomplete tasks scheduled for today with their resource assignments
                     cur.execute("""
@@ -693,14 +714,11 @@ class ReschedulingManager:
                     incomplete_tasks = cur.fetchall()
                     
                     if incomplete_tasks:
-                        print(f"Found {len(incomplete_tasks)} incomplete tasks for today")
+                        logger.info("Found %s incomplete tasks for today", len(incomplete_tasks))
                         
                         # Get the next working day
-                        next_working_day = completion_date + timedelta(days=1)
-                        while not is_working_day(next_working_day):
-                            next_working_day += timedelta(days=1)
-                        
-                        next_day_start = datetime.combine(next_working_day, WORKING_DAY_START)
+                        next_working_day = calendar.next_working_date(completion_date)
+                        next_day_start = calendar.day_start(next_working_day)
                         
                         # Track resource and employee assignments to avoid conflicts
                         resource_assignments = {}  # resource_id -> [(start, end), ...]
@@ -769,17 +787,15 @@ class ReschedulingManager:
                                     current_slot_start += timedelta(minutes=15)
                                     
                                     # If we've reached the end of the day, move to the next working day
-                                    if current_slot_start.time() >= WORKING_DAY_END:
-                                        next_day = current_slot_start.date() + timedelta(days=1)
-                                        while not is_working_day(next_day):
-                                            next_day += timedelta(days=1)
-                                        current_slot_start = datetime.combine(next_day, WORKING_DAY_START)
+                                    if current_slot_start >= calendar.day_end(current_slot_start.date()):
+                                        next_day = calendar.next_working_date(current_slot_start.date())
+                                        current_slot_start = calendar.day_start(next_day)
                             
                             if not found_slot:
                                 # If we couldn't find a slot, just use the next available time
                                 new_task_start = current_slot_start
                                 new_task_end = new_task_start + timedelta(hours=duration)
-                                print(f"Warning: Could not find conflict-free slot for task {incomplete_task_id}. Using {new_task_start}.")
+                                logger.warning("Could not find conflict-free slot for task %s. Using %s.", incomplete_task_id, new_task_start)
                             
                             # Update resource and employee assignments
                             for assignment_type, assignment_id in assignments:
@@ -819,21 +835,21 @@ class ReschedulingManager:
                                 'reason': 'After-hours completion'
                             })
                     else:
-                        print("No incomplete tasks found for today")
+                        logger.info("No incomplete tasks found for today")
                 
                 # Reschedule dependent tasks
                 rescheduled_tasks = self._reschedule_dependent_tasks(task_id, planned_end, timestamp)
                 
                 if rescheduled_tasks:
-                    print(f"Rescheduled {len(rescheduled_tasks)} tasks")
+                    logger.info("Rescheduled %s tasks", len(rescheduled_tasks))
                     for task in rescheduled_tasks:
-                        print(f"  - Task {task['task_id']} ({task['name']}): {task['original_start']} -> {task['new_start']}")
+                        logger.debug("  - Task %s (%s): %s -> %s", task['task_id'], task['name'], task['original_start'], task['new_start'])
                 else:
-                    print("No tasks to reschedule")
+                    logger.info("No tasks to reschedule")
             else:
-                print(f"Task {task_id} completed close to planned end time. No rescheduling needed.")
+                logger.info("Task %s completed close to planned end time. No rescheduling needed.", task_id)
         except Exception as e:
-            print(f"Error in rescheduling: {e}")
+            logger.exception("Error in rescheduling: %s", e)
             import traceback
             traceback.print_exc()
             # Continue with task completion even if rescheduling fails
@@ -867,7 +883,7 @@ class ReschedulingManager:
         Returns:
             dict: Result of the operation
         """
-        print(f"Handling short break for Task {task_id} from {start_time} to {end_time}")
+        logger.info("Handling short break for Task %s from %s to %s", task_id, start_time, end_time)
         
         # Calculate break duration in minutes
         break_duration = (end_time - start_time).total_seconds() / 60
@@ -884,7 +900,7 @@ class ReschedulingManager:
         task = cur.fetchone()
         
         if not task:
-            print(f"Task {task_id} not found")
+            logger.warning("Task %s not found", task_id)
             return {"success": False, "message": f"Task {task_id} not found"}
         
         task_id, name, priority, planned_start, planned_end, status, actual_start = task
@@ -919,7 +935,7 @@ class ReschedulingManager:
         
         # Check if we need to reschedule
         if break_duration > SHORT_BREAK_THRESHOLD or cumulative_breaks > CUMULATIVE_BREAK_THRESHOLD:
-            print(f"Break duration ({break_duration} min) or cumulative breaks ({cumulative_breaks} min) exceed threshold. Rescheduling...")
+            logger.info("Break duration (%s min) or cumulative breaks (%s min) exceed threshold. Rescheduling...", break_duration, cumulative_breaks)
             
             # Get the actual work done so far
             cur.execute("""
@@ -936,7 +952,7 @@ class ReschedulingManager:
             
             if remaining_hours > 0:
                 # Reschedule the remaining work
-                new_start = get_next_working_time(end_time)
+                new_start = self._calendar_for_task(task_id).next_working_time(end_time)
                 new_end = new_start + timedelta(hours=remaining_hours)
                 
                 # Update the schedule
@@ -997,7 +1013,7 @@ class ReschedulingManager:
         Returns:
             dict: Result of the operation
         """
-        print(f"Handling end-of-day carry-over for Task {task_id}")
+        logger.info("Handling end-of-day carry-over for Task %s", task_id)
         
         # Get task details
         cur = self.db.conn.cursor()
@@ -1014,7 +1030,7 @@ class ReschedulingManager:
         task = cur.fetchone()
         
         if not task:
-            print(f"Task {task_id} not found")
+            logger.warning("Task %s not found", task_id)
             return {"success": False, "message": f"Task {task_id} not found"}
         
         task_id, name, priority, planned_start, planned_end, status, hours_worked = task
@@ -1029,8 +1045,9 @@ class ReschedulingManager:
             return {"success": True, "message": "Task already complete, no carry-over needed"}
         
         # Current time is end of working day
+        calendar = self._calendar_for_task(task_id)
         current_date = datetime.now().date()
-        end_of_day = datetime.combine(current_date, WORKING_DAY_END)
+        end_of_day = calendar.day_end(current_date)
         
         # Calculate completion percentage
         completion_percentage = min(100, (hours_worked / total_duration) * 100)
@@ -1062,12 +1079,9 @@ class ReschedulingManager:
             """, (task_id, planned_start, end_of_day, 
                   planned_start, end_of_day, completion_percentage))
         
-        # Find next working day at 9 AM
-        next_working_day = current_date + timedelta(days=1)
-        while not is_working_day(datetime.combine(next_working_day, datetime.min.time())):
-            next_working_day += timedelta(days=1)
-        
-        next_day_start = datetime.combine(next_working_day, WORKING_DAY_START)
+        # Find the start of the next working day
+        next_working_day = calendar.next_working_date(current_date)
+        next_day_start = calendar.day_start(next_working_day)
         new_end_time = next_day_start + timedelta(hours=remaining_hours)
         
         # Check if a segment already exists for the carry-over
@@ -1139,7 +1153,7 @@ class ReschedulingManager:
         Returns:
             dict: Result of the operation
         """
-        print(f"Handling overrun for Task {task_id}, actual end time: {actual_end_time}")
+        logger.info("Handling overrun for Task %s, actual end time: %s", task_id, actual_end_time)
         
         # Get task details
         cur = self.db.conn.cursor()
@@ -1153,7 +1167,7 @@ class ReschedulingManager:
         task = cur.fetchone()
         
         if not task:
-            print(f"Task {task_id} not found")
+            logger.warning("Task %s not found", task_id)
             return {"success": False, "message": f"Task {task_id} not found"}
         
         task_id, name, priority, planned_start, planned_end, status = task
@@ -1171,7 +1185,7 @@ class ReschedulingManager:
             if actual_end_time <= planned_end:
                 return {"success": True, "message": "Task completed on time or early, no overrun"}
         except Exception as e:
-            print(f"Error comparing timestamps: {e}")
+            logger.warning("Error comparing timestamps: %s", e)
             # If we can't compare, assume it's an overrun
             pass
         
@@ -1220,7 +1234,7 @@ class ReschedulingManager:
         Returns:
             dict: Result of the operation
         """
-        print(f"Putting Task {task_id} on hold due to: {reason}")
+        logger.info("Putting Task %s on hold due to: %s", task_id, reason)
         
         # Get task details
         cur = self.db.conn.cursor()
@@ -1234,7 +1248,7 @@ class ReschedulingManager:
         task = cur.fetchone()
         
         if not task:
-            print(f"Task {task_id} not found")
+            logger.warning("Task %s not found", task_id)
             return {"success": False, "message": f"Task {task_id} not found"}
         
         task_id, name, priority, planned_start, planned_end, status = task
@@ -1297,7 +1311,7 @@ class ReschedulingManager:
         if resume_time is None:
             resume_time = datetime.now()
             
-        print(f"Resuming Task {task_id} at {resume_time}")
+        logger.info("Resuming Task %s at %s", task_id, resume_time)
         
         # Get task details
         cur = self.db.conn.cursor()
@@ -1314,7 +1328,7 @@ class ReschedulingManager:
         task = cur.fetchone()
         
         if not task:
-            print(f"Task {task_id} not found")
+            logger.warning("Task %s not found", task_id)
             return {"success": False, "message": f"Task {task_id} not found"}
         
         task_id, name, priority, planned_start, planned_end, status, hours_worked = task
@@ -1335,7 +1349,7 @@ class ReschedulingManager:
         remaining_hours = max(0, total_duration - hours_worked)
         
         # Ensure resume time is during working hours
-        resume_time = get_next_working_time(resume_time)
+        resume_time = self._calendar_for_task(task_id).next_working_time(resume_time)
         new_end_time = resume_time + timedelta(hours=remaining_hours)
         
         # Update the schedule
@@ -1401,7 +1415,7 @@ class ReschedulingManager:
         Returns:
             dict: Result of the operation
         """
-        print(f"Handling {'employee' if is_employee else 'resource'} conflict for ID {resource_id} at {conflict_time}")
+        logger.info("Handling %s conflict for ID %s at %s", 'employee' if is_employee else 'resource', resource_id, conflict_time)
         
         # Find tasks using this resource at the conflict time
         cur = self.db.conn.cursor()
@@ -1485,7 +1499,7 @@ class ReschedulingManager:
                       start, conflict_time, completion_percentage))
                 
                 # Find next available time after the high priority task ends
-                next_available = get_next_working_time(hp_end)
+                next_available = self._calendar_for_project(project_id).next_working_time(hp_end)
                 remaining_hours = total_duration - hours_worked
                 new_end_time = next_available + timedelta(hours=remaining_hours)
                 
@@ -1533,7 +1547,7 @@ class ReschedulingManager:
             else:
                 # For non-preemptable tasks or scheduled tasks, reschedule entirely
                 # Find next available time after the high priority task ends
-                next_available = get_next_working_time(hp_end)
+                next_available = self._calendar_for_project(project_id).next_working_time(hp_end)
                 duration = (end - start).total_seconds() / 3600  # in hours
                 new_end_time = next_available + timedelta(hours=duration)
                 
@@ -1599,7 +1613,7 @@ class ReschedulingManager:
         Returns:
             dict: Result of the operation
         """
-        print(f"Manually skipping Task {task_id} due to: {reason}")
+        logger.info("Manually skipping Task %s due to: %s", task_id, reason)
         
         # Get task details
         cur = self.db.conn.cursor()
@@ -1613,7 +1627,7 @@ class ReschedulingManager:
         task = cur.fetchone()
         
         if not task:
-            print(f"Task {task_id} not found")
+            logger.warning("Task %s not found", task_id)
             return {"success": False, "message": f"Task {task_id} not found"}
         
         task_id, name, planned_start, planned_end, status = task
@@ -1634,7 +1648,7 @@ class ReschedulingManager:
         """, (task_id, current_time, reason))
         
         # Trigger a full reschedule when a task is skipped
-        print(f"Task {task_id} skipped. Triggering full reschedule...")
+        logger.info("Task %s skipped. Triggering full reschedule...", task_id)
         
         try:
             # Get the scheduler instance
@@ -1649,7 +1663,7 @@ class ReschedulingManager:
             """)
             
             preserved_tasks = [row[0] for row in cur.fetchall()]
-            print(f"Preserving {len(preserved_tasks)} tasks that are completed or skipped")
+            logger.info("Preserving %s tasks that are completed or skipped", len(preserved_tasks))
             
             # Add the current task to the preserved tasks if not already included
             if task_id not in preserved_tasks:
@@ -1688,14 +1702,14 @@ class ReschedulingManager:
                     'reason': 'Full reschedule after task skipped'
                 })
             
-            print(f"Full reschedule completed. Rescheduled {len(rescheduled)} tasks.")
+            logger.info("Full reschedule completed. Rescheduled %s tasks.", len(rescheduled))
         except Exception as e:
-            print(f"Error in full reschedule: {e}")
+            logger.exception("Error in full reschedule: %s", e)
             import traceback
             traceback.print_exc()
             
             # Fall back to just rescheduling dependent tasks
-            print("Falling back to rescheduling only dependent tasks...")
+            logger.warning("Falling back to rescheduling only dependent tasks...")
             rescheduled = self._reschedule_dependent_tasks(task_id, planned_end, current_time)
         
         self.db.conn.commit()
@@ -1719,7 +1733,7 @@ class ReschedulingManager:
         Returns:
             dict: Result of the operation
         """
-        print(f"Manually rescheduling Task {task_id} to {new_start_time} - {new_end_time} due to: {reason}")
+        logger.info("Manually rescheduling Task %s to %s - %s due to: %s", task_id, new_start_time, new_end_time, reason)
         
         # Get task details
         cur = self.db.conn.cursor()
@@ -1733,7 +1747,7 @@ class ReschedulingManager:
         task = cur.fetchone()
         
         if not task:
-            print(f"Task {task_id} not found")
+            logger.warning("Task %s not found", task_id)
             return {"success": False, "message": f"Task {task_id} not found"}
         
         task_id, name, planned_start, planned_end, status = task
@@ -1745,7 +1759,7 @@ class ReschedulingManager:
         # Calculate duration before adjusting times
         original_duration_hours = (new_end_time - new_start_time).total_seconds() / 3600
         if original_duration_hours <= 0:
-            print(f"Warning: Invalid duration {original_duration_hours} hours. Using 0.25 hours instead.")
+            logger.warning("Invalid duration %s hours. Using 0.25 hours instead.", original_duration_hours)
             original_duration_hours = 0.25  # Minimum 15 minutes
             
             # Only in case of invalid duration, adjust the end time
@@ -1753,19 +1767,19 @@ class ReschedulingManager:
         
         # For manual rescheduling, we respect the user's chosen times
         # We don't enforce working hours for manual changes
-        print(f"Using manually specified times: {new_start_time} - {new_end_time}")
+        logger.debug("Using manually specified times: %s - %s", new_start_time, new_end_time)
         
         # Update the estimated hours in the tasks table to match the new duration
         # Round to 2 decimal places for better display
         new_estimated_hours = round(original_duration_hours, 2)
-        print(f"Updating estimated hours to {new_estimated_hours} based on new duration")
+        logger.debug("Updating estimated hours to %s based on new duration", new_estimated_hours)
         
-        print(f"Adjusted schedule: {new_start_time} - {new_end_time} (duration: {original_duration_hours} hours)")
+        logger.debug("Adjusted schedule: %s - %s (duration: %s hours)", new_start_time, new_end_time, original_duration_hours)
         
         # Ensure end time is after start time
         if new_end_time <= new_start_time:
             new_end_time = new_start_time + timedelta(minutes=15)  # Minimum 15 minutes
-            print(f"Corrected invalid end time. New end time: {new_end_time}")
+            logger.warning("Corrected invalid end time. New end time: %s", new_end_time)
         
         # Update the estimated hours in the tasks table
         cur.execute("""
@@ -1808,50 +1822,72 @@ class ReschedulingManager:
     # ---------------------------
     # 7. Full Reoptimization
     # ---------------------------
-    def full_reoptimization(self, project_id=None):
+    def full_reoptimization(self, project_id=None, warm_start=None, repair_hints=None, use_model_cache=None,
+                            solver_profile=SOLVER_PROFILE_NIGHTLY):
         """
         Perform a full reoptimization of the schedule.
         
+        With a project ID only that project's tasks are re-solved. Employees and
+        resources booked by other projects stay reserved for those bookings.
+        
         Args:
             project_id: Optional project ID to limit reoptimization scope
+            warm_start: Hint the persisted schedule to the solver; defaults to WARM_START
+            repair_hints: Let the solver repair infeasible hints; defaults to REPAIR_HINTS
+            use_model_cache: Reuse a cached model when the problem is unchanged; defaults to MODEL_CACHE
+            solver_profile: Time limit and search worker profile; a full reoptimization
+                            is a batch job, so 'nightly' by default
             
         Returns:
             dict: Result of the operation
         """
-        print(f"Performing full reoptimization{' for Project ' + str(project_id) if project_id else ''}")
+        logger.info("Performing full reoptimization%s", ' for Project ' + str(project_id) if project_id else '')
         
-        # Get all tasks that need to be rescheduled
-        cur = self.db.conn.cursor()
-        
-        if project_id:
-            cur.execute("""
-                SELECT task_id FROM tasks 
-                WHERE project_id = %s AND wbs NOT IN ('1.1', '1.2', '1.3', '1.4')
-            """, (project_id,))
-        else:
-            cur.execute("""
-                SELECT task_id FROM tasks 
-                WHERE wbs NOT IN ('1.1', '1.2', '1.3', '1.4')
-            """)
+        # One project is solved on its own calendar, every project on the tenant's;
+        # other projects' bookings are converted onto the same time axis
+        calendar = self._calendar_for_project(project_id)
         
-        task_ids = [row[0] for row in cur.fetchall()]
+        # Get the tasks in scope with their details
+        snapshot = self.db.load_problem_snapshot(project_id=project_id, calendar=calendar)
+        tasks = snapshot['tasks']
+        task_ids = [task['task_id'] for task in tasks]
         
         if not task_ids:
             return {"success": False, "message": "No tasks found for reoptimization"}
         
-        # Get all tasks with their details
-        tasks = self.db.get_tasks()
-        
         # Create a new scheduler
-        scheduler = ConstructionScheduler(tasks, self.db)
+        use_model_cache = MODEL_CACHE if use_model_cache is None else use_model_cache
+        scheduler = ConstructionScheduler(tasks, self.db, snapshot=snapshot,
+                                          model_cache=get_model_cache() if use_model_cache else None,
+                                          calendar=calendar)
+        
+        # Start from the current plan instead of searching from scratch
+        if (WARM_START if warm_start is None else warm_start):
+            scheduler.add_solution_hints(self.db.load_current_plan(calendar))
         
         # Solve the model
+        stats = scheduler.model_statistics()
+        num_workers = search_workers(solver_profile)
         solver = cp_model.CpSolver()
-        solver.parameters.max_time_in_seconds = 300
-        solver.parameters.num_search_workers = 4
+        solver.parameters.max_time_in_seconds = solver_time_limit(solver_profile, stats)
+        solver.parameters.num_search_workers = num_workers
+        if (REPAIR_HINTS if repair_hints is None else repair_hints):
+            solver.parameters.repair_hint = True
         
-        print("Solving model...")
-        status = solver.Solve(scheduler.model)
+        callback = EarlyStoppingCallback(stop_criteria(solver_profile, solver.parameters.max_time_in_seconds))
+        callback.configure(solver)
+        
+        logger.info("Solving model...")
+        solve_done = watch_search(callback)
+        try:
+            status = solver.Solve(scheduler.model, callback)
+        finally:
+            solve_done.set()
+        stop_reason = callback.finish(solver, status)
+        status_name = callback.status_name(solver, status)
+        logger.info("Search ended: %s after %.2fs", stop_reason, solver.WallTime())
+        get_solve_history().record(stats, solver_profile, num_workers, status_name, solver.WallTime(),
+                                   callback.solution_time, stop_reason)
         
         if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
             # Extract the new schedule
@@ -1867,72 +1903,76 @@ class ReschedulingManager:
                 })
             
             # Update the database
-            self.db.update_schedule(schedule)
+            self.db.update_schedule(schedule, calendar=calendar)
             
             # Log the reoptimization
-            current_time = datetime.now()
-            cur.execute("""
-                INSERT INTO optimization_history
-                (tenant_id, project_id, optimization_type, start_time, end_time, status, affected_tasks)
-                VALUES (%s, %s, %s, %s, %s, %s, %s)
-            """, (
-                1,  # Default tenant_id
-                project_id, 
-                'Full reoptimization', 
-                current_time, 
-                current_time, 
-                'Completed', 
-                json.dumps({'task_count': len(task_ids)})
-            ))
+            self.db.log_optimization(project_id, 'Full reoptimization', 'Completed',
+                                     {'task_count': len(task_ids), 'stop_reason': stop_reason})
             
-            self.db.conn.commit()
+            self.db.commit()
             
             return {
                 "success": True, 
                 "message": f"Full reoptimization completed successfully for {len(task_ids)} tasks",
-                "status": solver.StatusName(status)
+                "status": status_name,
+                "stop_reason": stop_reason
             }
         else:
             return {
                 "success": False, 
-                "message": f"Reoptimization failed: {solver.StatusName(status)}",
-                "status": solver.StatusName(status)
+                "message": f"Reoptimization failed: {status_name}",
+                "status": status_name,
+                "stop_reason": stop_reason
             }
     
     # ---------------------------
     # Helper Methods
     # ---------------------------
     def _get_dependent_tasks(self, task_id):
-        """Get all tasks that depend on the given task."""
-        dependent_tasks = []
-        cur = self.db.conn.cursor()
-        
-        # Direct dependencies
-        cur.execute("""
-            SELECT task_id FROM dependencies
-            WHERE depends_on_task_id = %s
-        """, (task_id,))
-        
-        direct_deps = [row[0] for row in cur.fetchall()]
-        dependent_tasks.extend(direct_deps)
-        
-        # Recursive dependencies (tasks that depend on the direct dependencies)
-        for dep_id in direct_deps:
-            dependent_tasks.extend(self._get_dependent_tasks(dep_id))
-        
-        return list(set(dependent_tasks))  # Remove duplicates
+        """Get all tasks that depend on the given task, directly or transitively."""
+        _, successors = self._get_dependency_graph()
+
+        # Walk the successor lists depth-first, visiting each task once
+        dependent_tasks = set()
+        stack = [task_id]
+        while stack:
+            current = stack.pop()
+            for dep_id, _, _ in successors.get(current, []):
+                if dep_id not in dependent_tasks:
+                    dependent_tasks.add(dep_id)
+                    stack.append(dep_id)
+        # On a dependency cycle the task reaches itself; it is not its own dependent
+        dependent_tasks.discard(task_id)
+
+        return list(dependent_tasks)
     
+    def _get_dependency_graph(self):
+        """
+        Return the (predecessors, successors) index, loaded once per manager.
+        """
+        if self._dependency_graph is None:
+            self._dependency_graph = self.db.get_dependency_index()
+        return self._dependency_graph
+
     def _reschedule_dependent_tasks(self, task_id, old_end_time, new_end_time):
         """
         Reschedule all tasks that depend on the given task.
         
+        Propagates the change forward through the dependency graph in
+        topological order. Each affected task is visited once, and its earliest
+        start is computed from all of its predecessors according to the
+        dependency type (FS, SS, FF, SF) and lag. A task moves only when that
+        earliest start is later than its current planned start. Changed rows
+        are written with the data source's apply_schedule_changes (one batched
+        UPDATE and one log INSERT on the database); the caller commits.
+        
         Args:
             task_id: The ID of the task that changed
             old_end_time: The original end time
             new_end_time: The new end time
             
         Returns:
-            list: Rescheduled tasks
+            list: Rescheduled tasks in propagation order
         """
         # Ensure both datetimes are timezone-aware or timezone-naive
         # Convert to timezone-naive for comparison if needed
@@ -1947,73 +1987,95 @@ class ReschedulingManager:
                 # No need to reschedule if the task finished earlier
                 return []
         except TypeError as e:
-            print(f"Error comparing timestamps: {e}")
-            print(f"old_end_time: {old_end_time}, type: {type(old_end_time)}")
-            print(f"new_end_time: {new_end_time}, type: {type(new_end_time)}")
+            logger.warning("Error comparing timestamps: %s", e)
+            logger.debug("old_end_time: %s, type: %s", old_end_time, type(old_end_time))
+            logger.debug("new_end_time: %s, type: %s", new_end_time, type(new_end_time))
             # If comparison fails, assume we need to reschedule
             pass
         
-        rescheduled = []
-        cur = self.db.conn.cursor()
+        predecessors, successors = self._get_dependency_graph()
+        if not successors.get(task_id):
+            return []
         
-        # Get direct dependencies
-        cur.execute("""
-            SELECT d.task_id, t.task_name, s.planned_start, s.planned_end, 
-                   COALESCE(d.lag_hours, 0) as lag_hours
-            FROM dependencies d
-            JOIN tasks t ON d.task_id::INTEGER = t.task_id
-            JOIN schedules s ON d.task_id::INTEGER = s.task_id
-            WHERE d.depends_on_task_id::INTEGER = %s
-        """, (task_id,))
+        # Every task reachable from the changed one
+        affected = set(self._get_dependent_tasks(task_id))
         
-        direct_deps = cur.fetchall()
+        # Schedules of the affected tasks and of everything that constrains them, in one query
+        needed = set(affected)
+        needed.add(task_id)
+        for succ_id in affected:
+            needed.update(pred_id for pred_id, _, _ in predecessors.get(succ_id, []))
         
-        for dep_task_id, dep_name, dep_start, dep_end, lag_hours in direct_deps:
-            # Calculate the time shift
-            time_shift = (new_end_time - old_end_time).total_seconds() / 3600  # in hours
-            
-            # Apply lag (convert decimal.Decimal to float)
-            lag_hours_float = float(lag_hours) if lag_hours is not None else 0
-            with_lag_time = new_end_time + timedelta(hours=lag_hours_float)
-            
+        scheduled = self.db.load_task_schedules(needed)
+        
+        # Current times per task; the changed task ends at its new end time
+        times = {tid: (row['start'], row['end']) for tid, row in scheduled.items()}
+        times[task_id] = (times[task_id][0] if task_id in times else None, new_end_time)
+        
+        # Kahn's algorithm restricted to the affected subgraph
+        in_degree = {tid: 0 for tid in affected}
+        for tid in affected:
+            for pred_id, _, _ in predecessors.get(tid, []):
+                if pred_id in affected:
+                    in_degree[tid] += 1
+        ready = [tid for tid, degree in in_degree.items() if degree == 0]
+        
+        rescheduled = []
+        while ready:
+            current = ready.pop()
+            for succ_id, _, _ in successors.get(current, []):
+                if succ_id in in_degree:
+                    in_degree[succ_id] -= 1
+                    if in_degree[succ_id] == 0:
+                        ready.append(succ_id)
+            
+            row = scheduled.get(current)
+            if row is None:
+                continue
+            duration = row['end'] - row['start']
+            
+            # Earliest start allowed by all predecessors, and the one that binds it
+            earliest = None
+            binding_pred = None
+            for pred_id, lag_hours, dep_type in predecessors.get(current, []):
+                pred_start, pred_end = times.get(pred_id, (None, None))
+                lag = timedelta(hours=float(lag_hours) if lag_hours is not None else 0)
+                dep_type = (dep_type or 'FS').upper()
+                if dep_type == 'SS':
+                    bound = pred_start + lag if pred_start is not None else None
+                elif dep_type == 'FF':
+                    bound = pred_end + lag - duration if pred_end is not None else None
+                elif dep_type == 'SF':
+                    bound = pred_start + lag - duration if pred_start is not None else None
+                else:  # FS
+                    bound = pred_end + lag if pred_end is not None else None
+                if bound is not None and (earliest is None or bound > earliest):
+                    earliest, binding_pred = bound, pred_id
+            
+            if earliest is None:
+                continue
             # Ensure it's during working hours
-            next_working_time = get_next_working_time(with_lag_time)
-            
-            # Calculate new start and end times
-            duration = (dep_end - dep_start).total_seconds() / 3600  # in hours
-            new_dep_start = next_working_time
-            new_dep_end = new_dep_start + timedelta(hours=duration)
-            
-            # Update the schedule
-            cur.execute("""
-                UPDATE schedules 
-                SET planned_start = %s, planned_end = %s
-                WHERE task_id = %s
-            """, (new_dep_start, new_dep_end, dep_task_id))
-            
-            # Log the change
-            cur.execute("""
-                INSERT INTO schedule_change_log
-                (task_id, previous_start, previous_end, new_start, new_end, 
-                 change_type, reason)
-                VALUES (%s, %s, %s, %s, %s, 'Dependency', %s)
-            """, (dep_task_id, dep_start, dep_end, 
-                  new_dep_start, new_dep_end, 
-                  f"Rescheduled due to change in dependency Task {task_id}"))
-            
+            earliest = self._calendar_for_project(row.get('project_id')).next_working_time(earliest)
+            if earliest <= row['start']:
+                # Already constrained later by its own schedule or another predecessor
+                continue
+            
+            new_start = earliest
+            new_end = new_start + duration
+            times[current] = (new_start, new_end)
             rescheduled.append({
-                'task_id': dep_task_id,
-                'name': dep_name,
-                'original_start': dep_start,
-                'original_end': dep_end,
-                'new_start': new_dep_start,
-                'new_end': new_dep_end
+                'task_id': current,
+                'name': row['name'],
+                'original_start': row['start'],
+                'original_end': row['end'],
+                'new_start': new_start,
+                'new_end': new_end,
+                'reason': f"Rescheduled due to change in dependency Task {binding_pred}"
             })
-            
-            # Recursively reschedule tasks that depend on this one
-            nested_rescheduled = self._reschedule_dependent_tasks(dep_task_id, dep_end, new_dep_end)
-            rescheduled.extend(nested_rescheduled)
         
+        self.db.apply_schedule_changes(rescheduled, 'Dependency')
+        for t in rescheduled:
+            del t['reason']
         return rescheduled
 
 # ---------------------------
@@ -2038,17 +2100,17 @@ def test_short_break():
         now = datetime.now()
         break_end = now + timedelta(minutes=15)
         
-        print(f"\n=== Testing Short Break for Task {task_id} ===")
+        logger.info("=== Testing Short Break for Task %s ===", task_id)
         result = rm.handle_short_break(task_id, now, break_end, "Coffee break")
-        print(f"Result: {result}")
+        logger.info("Result: %s", result)
         
         # Test a long break (45 minutes)
         now = datetime.now()
         break_end = now + timedelta(minutes=45)
         
-        print(f"\n=== Testing Long Break for Task {task_id} ===")
+        logger.info("=== Testing Long Break for Task %s ===", task_id)
         result = rm.handle_short_break(task_id, now, break_end, "Extended lunch")
-        print(f"Result: {result}")
+        logger.info("Result: %s", result)
         
     finally:
         rm.close()
@@ -2068,9 +2130,9 @@ def test_end_of_day():
         task_id = cur.fetchone()[0]
         cur.close()
         
-        print(f"\n=== Testing End-of-Day Carry-Over for Task {task_id} ===")
+        logger.info("=== Testing End-of-Day Carry-Over for Task %s ===", task_id)
         result = rm.handle_end_of_day(task_id)
-        print(f"Result: {result}")
+        logger.info("Result: %s", result)
         
     finally:
         rm.close()
@@ -2095,9 +2157,9 @@ def test_overrun():
         # Simulate an overrun (1 hour later)
         overrun_end = planned_end + timedelta(hours=1)
         
-        print(f"\n=== Testing Overrun for Task {task_id} ===")
+        logger.info("=== Testing Overrun for Task %s ===", task_id)
         result = rm.handle_overrun(task_id, overrun_end)
-        print(f"Result: {result}")
+        logger.info("Result: %s", result)
         
     finally:
         rm.close()
@@ -2118,15 +2180,15 @@ def test_on_hold():
         cur.close()
         
         # Put the task on hold
-        print(f"\n=== Testing On Hold for Task {task_id} ===")
+        logger.info("=== Testing On Hold for Task %s ===", task_id)
         result = rm.handle_on_hold(task_id, "Machine breakdown")
-        print(f"Result: {result}")
+        logger.info("Result: %s", result)
         
         # Resume the task
-        print(f"\n=== Testing Resume for Task {task_id} ===")
+        logger.info("=== Testing Resume for Task %s ===", task_id)
         resume_time = datetime.now() + timedelta(hours=2)  # Resume in 2 hours
         result = rm.resume_on_hold_task(task_id, resume_time)
-        print(f"Result: {result}")
+        logger.info("Result: %s", result)
         
     finally:
         rm.close()
@@ -2162,9 +2224,9 @@ def test_resource_conflict():
             
             conflict_time = cur.fetchone()[0]
             
-            print(f"\n=== Testing Resource Conflict for Resource {resource_id} ({resource_name}) ===")
+            logger.info("=== Testing Resource Conflict for Resource %s (%s) ===", resource_id, resource_name)
             result = rm.handle_resource_conflict(resource_id, conflict_time, is_employee=False)
-            print(f"Result: {result}")
+            logger.info("Result: %s", result)
         else:
             # Try with an employee
             cur.execute("""
@@ -2192,11 +2254,11 @@ def test_resource_conflict():
                 
                 conflict_time = cur.fetchone()[0]
                 
-                print(f"\n=== Testing Resource Conflict for Employee {employee_id} ({employee_name}) ===")
+                logger.info("=== Testing Resource Conflict for Employee %s (%s) ===", employee_id, employee_name)
                 result = rm.handle_resource_conflict(employee_id, conflict_time, is_employee=True)
-                print(f"Result: {result}")
+                logger.info("Result: %s", result)
             else:
-                print("No suitable resource or employee found for conflict testing")
+                logger.info("No suitable resource or employee found for conflict testing")
         
         cur.close()
         
@@ -2218,9 +2280,9 @@ def test_skip_task():
         task_id = cur.fetchone()[0]
         cur.close()
         
-        print(f"\n=== Testing Skip Task for Task {task_id} ===")
+        logger.info("=== Testing Skip Task for Task %s ===", task_id)
         result = rm.skip_task(task_id, "Not needed for this project")
-        print(f"Result: {result}")
+        logger.info("Result: %s", result)
         
     finally:
         rm.close()
@@ -2248,9 +2310,9 @@ def test_manual_reschedule():
         duration = (planned_end - planned_start).total_seconds() / 3600
         new_end = new_start + timedelta(hours=duration)
         
-        print(f"\n=== Testing Manual Reschedule for Task {task_id} ===")
+        logger.info("=== Testing Manual Reschedule for Task %s ===", task_id)
         result = rm.manually_reschedule_task(task_id, new_start, new_end, "Material delivery delay")
-        print(f"Result: {result}")
+        logger.info("Result: %s", result)
         
     finally:
         rm.close()
@@ -2265,9 +2327,9 @@ def test_full_reoptimization():
         project_id = cur.fetchone()[0]
         cur.close()
         
-        print(f"\n=== Testing Full Reoptimization for Project {project_id} ===")
+        logger.info("=== Testing Full Reoptimization for Project %s ===", project_id)
         result = rm.full_reoptimization(project_id)
-        print(f"Result: {result}")
+        logger.info("Result: %s", result)
         
     finally:
         rm.close()
@@ -2376,8 +2438,7 @@ def handle_event(task_id, event_type, timestamp, details=None):
     except Exception as e:
         import traceback
         error_trace = traceback.format_exc()
-        print(f"Error handling event: {str(e)}")
-        print(error_trace)
+        logger.exception("Error handling event: %s", e)
         
         result = {
             "success": False, 
@@ -2394,7 +2455,9 @@ def handle_event(task_id, event_type, timestamp, details=None):
 # Main Execution
 # ---------------------------
 if __name__ == '__main__':
-    print("Running rescheduling tests...")
+    from logging_config import configure_logging
+    configure_logging('INFO')
+    logger.info("Running rescheduling tests...")
     
     # Create required tables if they don't exist
     db = DatabaseManager()
@@ -2502,4 +2565,4 @@ if __name__ == '__main__':
     test_manual_reschedule()
     test_full_reoptimization()
     
-    print("\nAll tests completed!")
\ No newline at end of file
+    logger.info("All tests completed!")
\ No newline at end of file
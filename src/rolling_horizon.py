@@ -0,0 +1,276 @@
+#!/usr/bin/env python
+"""
+Rolling-horizon scheduling for projects longer than the model horizon.
+
+The monolithic model has to finish every task within WORKING_HORIZON
+(HORIZON_DAYS working days). A longer project therefore has no solution, and
+raising HORIZON_DAYS widens every domain and lag table. The rolling horizon
+solves one window of window_days working days at a time:
+
+  1. A task joins the window model when its estimated earliest start falls
+     inside the window and its predecessors and earlier phases are already
+     frozen or also in the window. Later tasks are left out of the model.
+  2. Each task in the window gets a lower bound on its start. The bound comes
+     from the window start, from frozen predecessors (using the exact lag
+     calendar) and from frozen tasks of earlier phases. Employees and
+     resources booked by frozen tasks are reserved.
+  3. Tasks starting before the last overlap_days of the window are frozen
+     with their assignments. The rest are solved again in the next window,
+     which starts window_days - overlap_days later.
+
+Each window model only holds the window's tasks. Its horizon only reaches a
+little past the window, so memory and solve time depend on the window size,
+not the project length. The result is feasible but not globally optimal.
+"""
+import logging
+import time
+
+from decomposition import solve_subproblem
+from initial_scheduler import (
+    HORIZON_DAYS, SCALE_FACTOR, SOLVER_PROFILE, UNITS_PER_DAY, LagCalendar, dependency_start_bound,
+    get_work_calendar, phase_rank, phase_topological_order
+)
+from solver_profiles import search_workers
+
+logger = logging.getLogger(__name__)
+
+ROLLING_MAX_HORIZON_DAYS = HORIZON_DAYS * 20  # Stop widening a window model's horizon beyond this
+
+
+def _select_window(order, tasks, frozen, window_start, window_end, lags):
+    """
+    Pick the tasks for one window.
+
+    Returns:
+        tuple: (window task IDs in order, {task_id: exact lower bound on start},
+                earliest estimated start of any task that could join a window, or None)
+    """
+    # Frozen ends per phase rank give later phases a lower bound
+    frozen_phase_end = {}
+    for tid, (_, end) in frozen.items():
+        rank = phase_rank(tasks[tid])
+        frozen_phase_end[rank] = max(frozen_phase_end.get(rank, 0), end)
+
+    window = []
+    in_window = {}  # task_id -> (estimated start, estimated end)
+    window_phase_end = {}
+    min_starts = {}
+    blocked_rank = None  # Lowest phase rank with a task that cannot join
+    earliest = None
+
+    def estimate_after(unit, lag_hours):
+        return unit + int(round(lag_hours / 24.0 * UNITS_PER_DAY))
+
+    for tid in order:
+        if tid in frozen:
+            continue
+        task = tasks[tid]
+        rank = phase_rank(task)
+        duration = task['duration']
+        if blocked_rank is not None and rank > blocked_rank:
+            continue
+
+        bound = max([window_start] + [end for r, end in frozen_phase_end.items() if r < rank])
+        estimate = max([bound] + [end for r, end in window_phase_end.items() if r < rank])
+        joinable = True
+        for dep_tid, lag_hours, dep_type in ((dep[0], dep[1], dep[2] if len(dep) > 2 else 'FS')
+                                             for dep in task['dependencies'] if dep[0] in tasks):
+            if dep_tid in frozen:
+                dep_start, dep_end = frozen[dep_tid]
+                bound = max(bound, dependency_start_bound(dep_type, dep_start, dep_end, duration, lag_hours, lags.after))
+                estimate = max(estimate, bound)
+            elif dep_tid in in_window:
+                dep_start, dep_end = in_window[dep_tid]
+                estimate = max(estimate, dependency_start_bound(dep_type, dep_start, dep_end, duration, lag_hours,
+                                                           estimate_after))
+            else:
+                joinable = False
+                break
+
+        if not joinable or estimate >= window_end:
+            if joinable and (earliest is None or estimate < earliest):
+                earliest = estimate
+            blocked_rank = rank if blocked_rank is None else min(blocked_rank, rank)
+            continue
+
+        window.append(tid)
+        min_starts[tid] = max(bound, 0)
+        in_window[tid] = (estimate, estimate + duration)
+        window_phase_end[rank] = max(window_phase_end.get(rank, 0), estimate + duration)
+        if earliest is None or estimate < earliest:
+            earliest = estimate
+
+    return window, min_starts, earliest
+
+
+def solve_rolling_horizon(snapshot, window_days, overlap_days, resource_mode=None, symmetry_breaking=None,
+                          plan=None, use_model_cache=False, repair_hints=False, progress_callback=None,
+                          stop_event=None, solver_profile=None, stop_criteria=None, calendar=None):
+    """
+    Schedule the snapshot window by window.
+
+    Args:
+        snapshot: Problem snapshot (tasks to schedule, resources, employees)
+        window_days: Working days per window
+        overlap_days: Working days at the end of each window that are solved again
+                      in the next one (0 <= overlap_days < window_days)
+        resource_mode: Resource model mode passed to each ConstructionScheduler
+        symmetry_breaking: Symmetry breaking mode passed to each ConstructionScheduler
+        plan: Optional result of DatabaseManager.load_current_plan used as hints
+        use_model_cache: Reuse cached window models
+        repair_hints: Let the solver repair infeasible hints
+        progress_callback: Optional callable invoked with a progress dict after each window
+        stop_event: Optional threading.Event that stops after the current window
+        solver_profile: Solver profile of every window; defaults to SOLVER_PROFILE
+        stop_criteria: Optional early stopping criteria replacing the profile's
+        calendar: WorkCalendar of every window; defaults to the default working week
+
+    Returns:
+        dict: 'status' (FEASIBLE when every task was scheduled, otherwise the
+              status of the failing window), 'makespan', 'solution_count', the
+              'schedule', 'resource_assignments' and 'employee_assignments' of
+              frozen tasks, and a 'windows' summary
+    """
+    if window_days <= 0 or not 0 <= overlap_days < window_days:
+        raise ValueError(f"Invalid rolling horizon window: {window_days} days with {overlap_days} days overlap")
+
+    started = time.time()
+    tasks = {task['task_id']: task for task in snapshot['tasks']}
+    order = phase_topological_order(tasks)
+    if len(order) < len(tasks):
+        logger.error("%s tasks are on a dependency cycle and cannot be scheduled", len(tasks) - len(order))
+    window_units = window_days * UNITS_PER_DAY
+    step_units = (window_days - overlap_days) * UNITS_PER_DAY
+    max_horizon = ROLLING_MAX_HORIZON_DAYS * UNITS_PER_DAY
+    solver_profile = solver_profile or SOLVER_PROFILE
+    num_workers = search_workers(solver_profile)
+    calendar = calendar or get_work_calendar()
+    lags = LagCalendar(calendar)
+
+    outer = snapshot.get('reservations') or {}
+    reservations = {'resources': list(outer.get('resources', [])), 'employees': list(outer.get('employees', []))}
+    frozen = {}  # task_id -> (start, end)
+    schedule, resource_assignments, employee_assignments = [], [], []
+    windows = []
+    solution_count = 0
+    status = 'FEASIBLE'
+    window_start = 0
+    logger.info("Rolling horizon: %s tasks, %s-day windows with %s days overlap",
+                len(tasks), window_days, overlap_days)
+
+    while len(frozen) < len(tasks):
+        if stop_event is not None and stop_event.is_set():
+            status = 'UNKNOWN'
+            break
+
+        window, min_starts, earliest = _select_window(order, tasks, frozen, window_start,
+                                                      window_start + window_units, lags)
+        if not window:
+            if earliest is None:
+                # Only tasks on a dependency cycle are left
+                status = 'INFEASIBLE'
+                break
+            # Nothing can start in this window (long lags); jump to the first day something can
+            window_start = max(window_start + 1, earliest // UNITS_PER_DAY * UNITS_PER_DAY)
+            continue
+
+        last_window = len(frozen) + len(window) == len(tasks)
+        extra = 2 * window_units
+        while True:
+            horizon = min(max(min_starts[tid] + tasks[tid]['duration'] for tid in window) + extra, max_horizon)
+            result = solve_subproblem({
+                'index': len(windows),
+                'snapshot': {'tasks': [tasks[tid] for tid in window], 'resources': snapshot['resources'],
+                             'employees': snapshot['employees'],
+                             # Bookings that end before the window cannot affect it
+                             'reservations': {key: [booking for booking in bookings if booking[2] > window_start]
+                                              for key, bookings in reservations.items()}},
+                'resource_mode': resource_mode,
+                'symmetry_breaking': symmetry_breaking,
+                'plan': {tid: plan[tid] for tid in window if tid in plan} if plan else None,
+                'use_model_cache': use_model_cache,
+                'repair_hints': repair_hints,
+                'solver_profile': solver_profile,
+                'stop_criteria': stop_criteria,
+                'num_workers': num_workers,
+                'horizon': horizon,
+                'min_starts': min_starts,
+                'calendar': calendar
+            }, stop_event=stop_event)
+            if result['status'] != 'INFEASIBLE' or horizon >= max_horizon:
+                break
+            extra *= 2  # The window's tasks did not fit before the horizon; widen it
+            logger.info("Window %s infeasible with horizon %s; retrying with %s", len(windows), horizon,
+                        min(horizon + extra // 2, max_horizon))
+        solution_count += result['solution_count']
+
+        if result['status'] not in ('OPTIMAL', 'FEASIBLE'):
+            windows.append({'index': len(windows), 'start_day': window_start // UNITS_PER_DAY,
+                            'task_count': len(window), 'frozen': 0, 'status': result['status'],
+                            'horizon': horizon, 'elapsed': result['elapsed'],
+                            'stop_reason': result['stop_reason']})
+            status = result['status']
+            break
+
+        # Freeze tasks that start before the overlap, keeping every frozen task's predecessors frozen
+        solved = {entry['task_id']: entry for entry in result['schedule']}
+        boundary = window_start + step_units
+        if not last_window and not any(entry['start'] < boundary for entry in solved.values()):
+            boundary = min(entry['start'] for entry in solved.values()) + 1  # Always make progress
+        committed = set()
+        held_rank = None  # Lowest phase rank with a task left for the next window
+        for tid in window:
+            entry = solved[tid]
+            rank = phase_rank(tasks[tid])
+            if (held_rank is None or rank <= held_rank) and (last_window or entry['start'] < boundary) and \
+                    all(dep[0] in frozen or dep[0] in committed or dep[0] not in tasks
+                        for dep in tasks[tid]['dependencies']):
+                committed.add(tid)
+            elif held_rank is None or rank < held_rank:
+                held_rank = rank
+
+        for tid in window:
+            if tid in committed:
+                entry = solved[tid]
+                frozen[tid] = (entry['start'], entry['start'] + entry['duration'])
+                schedule.append(entry)
+        for assignments, target, key, member_key in (
+                (result['resource_assignments'], resource_assignments, 'resources', 'resource_id'),
+                (result['employee_assignments'], employee_assignments, 'employees', 'employee_id')):
+            for assignment in assignments:
+                if assignment['task_id'] in committed:
+                    target.append(assignment)
+                    start, end = frozen[assignment['task_id']]
+                    if end > start:
+                        reservations[key].append([assignment[member_key], start, end])
+
+        windows.append({'index': len(windows), 'start_day': window_start // UNITS_PER_DAY,
+                        'task_count': len(window), 'frozen': len(committed), 'status': result['status'],
+                        'horizon': horizon, 'elapsed': result['elapsed'],
+                        'stop_reason': result['stop_reason']})
+        logger.info("Window %s (day %s): %s tasks solved %s, %s frozen (%s/%s scheduled)",
+                    len(windows) - 1, window_start // UNITS_PER_DAY, len(window), result['status'],
+                    len(committed), len(frozen), len(tasks))
+
+        makespan = max(end for _, end in frozen.values()) if frozen else None
+        if progress_callback is not None:
+            progress_callback({
+                'solution_count': solution_count,
+                'best_makespan': makespan,
+                'best_makespan_hours': makespan / SCALE_FACTOR if makespan is not None else None,
+                'elapsed': round(time.time() - started, 2),
+                'windows_done': len(windows),
+                'tasks_scheduled': len(frozen),
+                'tasks': len(tasks)
+            })
+        window_start = max(window_start + step_units, boundary) if not last_window else window_start
+
+    return {
+        'status': status,
+        'makespan': max((end for _, end in frozen.values()), default=None),
+        'solution_count': solution_count,
+        'schedule': schedule,
+        'resource_assignments': resource_assignments,
+        'employee_assignments': employee_assignments,
+        'windows': windows
+    }
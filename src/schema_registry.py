@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+"""
+Process-wide cache of which tables and columns exist in the database.
+
+Several code paths adapt to older database layouts (for example employees
+without role_name, or assignment tables without is_initial/is_modified).
+Instead of querying information_schema on every call, they ask the registry,
+which reads the catalog once per database on first use. Call refresh_schema()
+after changing the schema (the API also exposes POST /api/schema/refresh).
+"""
+import logging
+import threading
+
+from psycopg2 import extensions as pg_extensions
+
+logger = logging.getLogger(__name__)
+
+
+class SchemaRegistry:
+    """
+    Tables and columns of one database, loaded with a single catalog query.
+    """
+
+    def __init__(self, columns):
+        self._columns = columns  # Map: table name -> frozenset of column names
+
+    @classmethod
+    def load(cls, conn):
+        """
+        Read the tables and columns visible on the connection's search path.
+
+        Args:
+            conn: psycopg2 connection
+
+        Returns:
+            SchemaRegistry: The resolved registry
+        """
+        was_idle = conn.info.transaction_status == pg_extensions.TRANSACTION_STATUS_IDLE
+        cur = conn.cursor()
+        try:
+            cur.execute("""
+                SELECT table_name, array_agg(column_name::text)
+                FROM information_schema.columns
+                WHERE table_schema = ANY(current_schemas(false))
+                GROUP BY table_name
+            """)
+            columns = {table: frozenset(names) for table, names in cur.fetchall()}
+        finally:
+            cur.close()
+        if was_idle and not conn.autocommit:
+            # Don't leave the caller inside a transaction opened only for the catalog read
+            conn.rollback()
+        logger.info("Resolved schema: %s tables", len(columns))
+        return cls(columns)
+
+    def has_table(self, table):
+        """Return True if the table exists."""
+        return table in self._columns
+
+    def has_column(self, table, column):
+        """Return True if the table exists and has the column."""
+        return column in self._columns.get(table, ())
+
+    def has_columns(self, table, *columns):
+        """Return True if the table exists and has every one of the columns."""
+        table_columns = self._columns.get(table, ())
+        return all(column in table_columns for column in columns)
+
+    def columns(self, table):
+        """Return the table's column names (empty if the table does not exist)."""
+        return self._columns.get(table, frozenset())
+
+
+_registries = {}
+_registries_lock = threading.Lock()
+
+
+def _database_key(conn):
+    info = conn.info
+    return (info.host, info.port, info.dbname)
+
+
+def get_schema(conn):
+    """
+    Return the schema registry for the connection's database, resolving it on first use.
+
+    Args:
+        conn: psycopg2 connection to the database
+
+    Returns:
+        SchemaRegistry: Cached tables and columns
+    """
+    key = _database_key(conn)
+    registry = _registries.get(key)
+    if registry is None:
+        with _registries_lock:
+            registry = _registries.get(key)
+            if registry is None:
+                registry = SchemaRegistry.load(conn)
+                _registries[key] = registry
+    return registry
+
+
+def refresh_schema(conn=None):
+    """
+    Drop cached schema information so it is read again on next use.
+
+    Args:
+        conn: Optional connection; only its database is refreshed (and re-read
+              immediately). Without a connection every cached database is dropped.
+    """
+    with _registries_lock:
+        if conn is None:
+            _registries.clear()
+            logger.info("Cleared all cached schema information")
+            return
+        _registries.pop(_database_key(conn), None)
+    get_schema(conn)
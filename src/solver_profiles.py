@@ -0,0 +1,324 @@
+#!/usr/bin/env python
+"""
+Solver profiles: CP-SAT time limits and search workers per kind of run.
+
+  interactive - API calls; a time limit of seconds, and the search stops at
+                the first solution found after half of it, within 1% of the
+                best bound, or after 5 seconds without improvement
+  nightly     - batch re-optimization with minutes to spend; stops within
+                0.1% of the best bound or after 2 minutes without improvement
+  exhaustive  - searches for hours, until optimal or the time limit
+
+Search workers follow the cores available to the process, capped per profile
+and shared between processes solving side by side.
+
+Within a profile, the time limit is predicted from the size of the model (its
+interval and dependency counts). Every solve is recorded in a solve history
+with its model statistics, its wall time and why it stopped. For solves that
+ended optimal or within the gap that is the time needed; for solves that hit
+the time limit, with or without a solution, it is a lower bound. Solves ended
+by stagnation or the first-solution timeout are left out, as their wall time
+measures the stop rule rather than the model. A log-log least-squares fit of
+the time against model size over the profile's own solves, times the
+profile's safety factor and clamped to its range, is the time limit of the
+next model. Small models thus get a second or less and large ones the time
+similar models needed. When the latest solve of a similar size hit its limit,
+the prediction is at least that limit, so models that keep hitting their
+limit get safety_factor times more time on each run. Until the history holds
+enough solves, a per-item estimate stands in.
+
+The history is a JSON-lines file at RSO_SOLVE_HISTORY (default:
+rso_solve_history.jsonl in the system temp directory) and keeps the last
+RSO_SOLVE_HISTORY_ENTRIES solves (default 500). Writers, including the
+worker processes of a decomposed solve, take an exclusive lock on a .lock
+file next to it.
+"""
+import json
+import logging
+import math
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows; only threads are serialized there
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+SOLVER_PROFILE_INTERACTIVE = 'interactive'
+SOLVER_PROFILE_NIGHTLY = 'nightly'
+SOLVER_PROFILE_EXHAUSTIVE = 'exhaustive'
+
+# min_time/max_time: range of the time limit in seconds
+# safety_factor: multiplier on the predicted time (None: always max_time)
+# max_workers: cap on CP-SAT search workers (None: every available core)
+# solution_timeout: fraction of the time limit after which the first solution found
+#                   ends the search (None: search until optimal or the time limit)
+# stop_criteria: default early stopping criteria (see early_stopping.py)
+SOLVER_PROFILES = {
+    SOLVER_PROFILE_INTERACTIVE: {'min_time': 0.5, 'max_time': 120, 'safety_factor': 2.0,
+                                 'max_workers': 8, 'solution_timeout': 0.5,
+                                 'stop_criteria': {'relative_gap': 0.01, 'stagnation_seconds': 5}},
+    SOLVER_PROFILE_NIGHTLY: {'min_time': 30, 'max_time': 1800, 'safety_factor': 5.0,
+                             'max_workers': 16, 'solution_timeout': None,
+                             'stop_criteria': {'relative_gap': 0.001, 'stagnation_seconds': 120}},
+    SOLVER_PROFILE_EXHAUSTIVE: {'min_time': 14400, 'max_time': 14400, 'safety_factor': None,
+                                'max_workers': None, 'solution_timeout': None,
+                                'stop_criteria': {}},
+}
+
+SOLVE_HISTORY_ENV = 'RSO_SOLVE_HISTORY'
+SOLVE_HISTORY_ENTRIES_ENV = 'RSO_SOLVE_HISTORY_ENTRIES'
+DEFAULT_HISTORY_ENTRIES = 500
+MIN_HISTORY_FOR_FIT = 5  # Solves of at least two model sizes needed before fitting
+SIMILAR_SIZE_RATIO = 1.25  # Models within this size ratio share their time-limit lower bounds
+# Stop reasons whose wall time is the time the model needed, or a lower bound on it
+TIMED_STOP_REASONS = ('optimal', 'relative_gap', 'target_makespan')
+LOWER_BOUND_STOP_REASONS = ('time_limit',)
+FALLBACK_SECONDS_PER_ITEM = 0.005  # Estimate per interval/dependency without history
+
+
+def get_solver_profile(name):
+    """
+    Look up a solver profile.
+
+    Args:
+        name: Profile name
+
+    Returns:
+        dict: Profile settings
+
+    Raises:
+        ValueError: For an unknown profile name
+    """
+    if name not in SOLVER_PROFILES:
+        raise ValueError(f"Unknown solver profile: {name}")
+    return SOLVER_PROFILES[name]
+
+
+def available_cores():
+    """Return the number of CPU cores this process may run on."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:  # Not available on macOS and Windows
+        return os.cpu_count() or 1
+
+
+def search_workers(profile_name, processes=1):
+    """
+    Return the CP-SAT search workers for one of several solves running side by side.
+
+    Args:
+        profile_name: Solver profile name
+        processes: Number of solves sharing the cores
+    """
+    profile = get_solver_profile(profile_name)
+    workers = max(1, available_cores() // max(1, processes))
+    if profile['max_workers']:
+        workers = min(workers, profile['max_workers'])
+    return workers
+
+
+def model_size(stats):
+    """Size measure the time prediction is fitted against."""
+    return max(1, stats['intervals'] + stats['dependencies'])
+
+
+class SolveHistory:
+    """Past solves and the time they needed, stored one JSON object per line."""
+
+    def __init__(self, path, max_entries=DEFAULT_HISTORY_ENTRIES):
+        self.path = path
+        self.max_entries = max(1, max_entries)
+        self._lock = threading.Lock()
+
+    def entries(self, profile_name=None):
+        """
+        Return the recorded solves, oldest first. Unreadable lines are skipped.
+
+        Args:
+            profile_name: Only return solves that ran with this solver profile
+        """
+        entries = []
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entries.append(json.loads(line))
+                    except ValueError:
+                        continue
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning("Could not read solve history %s: %s", self.path, e)
+        entries = entries[-self.max_entries:]
+        if profile_name is not None:
+            entries = [entry for entry in entries if entry.get('profile') == profile_name]
+        return entries
+
+    def record(self, stats, profile_name, num_workers, status, wall_time, solution_time=None, stop_reason=None):
+        """
+        Record a finished solve. Failures are logged and otherwise ignored.
+
+        Args:
+            stats: Model statistics from ConstructionScheduler.model_statistics
+            profile_name: Solver profile the solve ran with
+            num_workers: CP-SAT search workers
+            status: Solver status name
+            wall_time: Seconds the solve took
+            solution_time: Seconds until the last improving solution, if any
+            stop_reason: Why the search ended (see early_stopping.py)
+        """
+        entry = dict(stats, profile=profile_name, workers=num_workers, status=status,
+                     wall_time=round(wall_time, 3),
+                     solution_time=round(solution_time, 3) if solution_time is not None else None,
+                     stop_reason=stop_reason,
+                     recorded_at=round(time.time()))
+        try:
+            with self._locked():
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(entry) + '\n')
+                self._prune()
+        except Exception as e:
+            logger.warning("Could not record solve in %s: %s", self.path, e)
+
+    @contextmanager
+    def _locked(self):
+        """
+        Serialize writers across threads and processes. The lock is taken on a
+        separate file because _prune replaces the history file.
+        """
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            if fcntl is None:
+                yield
+                return
+            with open(f'{self.path}.lock', 'a') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _prune(self):
+        """Rewrite the file with the newest max_entries solves once it holds twice as many. Caller holds _locked."""
+        with open(self.path, 'r', encoding='utf-8') as f:
+            lines = f.readlines()
+        if len(lines) <= 2 * self.max_entries:
+            return
+        tmp_path = f'{self.path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.writelines(lines[-self.max_entries:])
+        os.replace(tmp_path, self.path)
+
+    def predict(self, stats, profile_name=None):
+        """
+        Predict the seconds a model with these statistics needs.
+
+        Args:
+            stats: Model statistics from ConstructionScheduler.model_statistics
+            profile_name: Only learn from solves that ran with this solver profile
+
+        Returns:
+            float: Predicted seconds to an optimal solution
+        """
+        size = model_size(stats)
+        points = []
+        last_limit_hit = None  # Wall time of the latest similar-size solve, if it hit its limit
+        for entry in self.entries(profile_name):
+            needed = entry.get('wall_time')
+            if needed is None or 'intervals' not in entry:
+                continue
+            stop_reason = entry.get('stop_reason')
+            if stop_reason is None:
+                # Recorded before stop reasons were: optimal and feasible solves, as then
+                timed = entry.get('status') in ('OPTIMAL', 'FEASIBLE')
+            else:
+                timed = stop_reason in TIMED_STOP_REASONS or stop_reason in LOWER_BOUND_STOP_REASONS
+            if timed:
+                points.append((math.log(model_size(entry)), math.log(max(needed, 0.01))))
+            if abs(math.log(model_size(entry) / size)) <= math.log(SIMILAR_SIZE_RATIO):
+                last_limit_hit = needed if stop_reason in LOWER_BOUND_STOP_REASONS else None
+
+        if len(points) >= MIN_HISTORY_FOR_FIT and len({x for x, _ in points}) > 1:
+            # log(time) = intercept + slope * log(size)
+            mean_x = sum(x for x, _ in points) / len(points)
+            mean_y = sum(y for _, y in points) / len(points)
+            slope = (sum((x - mean_x) * (y - mean_y) for x, y in points) /
+                     sum((x - mean_x) ** 2 for x, _ in points))
+            slope = min(max(slope, 0.0), 3.0)  # Solve time does not shrink with size; cap wild fits
+            predicted = math.exp(mean_y + slope * (math.log(size) - mean_x))
+        elif points:
+            # Too little history to fit: scale the median time per item
+            rates = sorted(math.exp(y - x) for x, y in points)
+            predicted = rates[len(rates) // 2] * size
+        else:
+            predicted = FALLBACK_SECONDS_PER_ITEM * size
+        # A similar model ran out of time last: it needs more than the limit it had
+        return max(predicted, last_limit_hit or 0.0)
+
+
+_solve_history = None
+_solve_history_lock = threading.Lock()
+
+
+def get_solve_history():
+    """Return the process-wide SolveHistory configured from the environment."""
+    global _solve_history
+    if _solve_history is None:
+        with _solve_history_lock:
+            if _solve_history is None:
+                path = os.environ.get(SOLVE_HISTORY_ENV) or os.path.join(tempfile.gettempdir(),
+                                                                         'rso_solve_history.jsonl')
+                try:
+                    max_entries = int(os.environ.get(SOLVE_HISTORY_ENTRIES_ENV, DEFAULT_HISTORY_ENTRIES))
+                except ValueError:
+                    max_entries = DEFAULT_HISTORY_ENTRIES
+                _solve_history = SolveHistory(path, max_entries)
+    return _solve_history
+
+
+def solver_time_limit(profile_name, stats):
+    """
+    Return the time limit for a model under a solver profile.
+
+    Args:
+        profile_name: Solver profile name
+        stats: Model statistics from ConstructionScheduler.model_statistics
+
+    Returns:
+        float: Seconds
+    """
+    profile = get_solver_profile(profile_name)
+    if profile['safety_factor'] is None:
+        return float(profile['max_time'])
+    predicted = get_solve_history().predict(stats, profile_name)
+    limit = min(max(predicted * profile['safety_factor'], profile['min_time']), profile['max_time'])
+    logger.info("Time limit %.2fs (%s profile, %s intervals, %s dependencies, %.2fs predicted)",
+                limit, profile_name, stats['intervals'], stats['dependencies'], predicted)
+    return round(limit, 2)
+
+
+def stop_criteria(profile_name, time_limit, overrides=None):
+    """
+    Return the early stopping criteria for a solve.
+
+    Args:
+        profile_name: Solver profile name
+        time_limit: The solve's time limit in seconds
+        overrides: Optional dict replacing the profile's criteria; a None value
+                   turns a criterion off
+
+    Returns:
+        dict: Criteria for EarlyStoppingCallback
+    """
+    profile = get_solver_profile(profile_name)
+    criteria = dict(profile['stop_criteria'])
+    if profile['solution_timeout']:
+        criteria['solution_timeout'] = time_limit * profile['solution_timeout']
+    criteria.update(overrides or {})
+    return {key: value for key, value in criteria.items() if value is not None}
@@ -0,0 +1,8 @@
+"""
+Shared pytest setup: the modules in src/ import each other by their flat
+names, as when the scheduler runs from src/, so src/ goes on sys.path.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
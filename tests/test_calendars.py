@@ -0,0 +1,172 @@
+"""
+WorkCalendar conversions over weekends and holidays, compile_calendar and
+CalendarRegistry.
+"""
+import logging
+from datetime import date, datetime, time, timedelta
+
+import pytest
+
+from calendars import INITIAL_CALENDAR_DAYS, CalendarRegistry, WorkCalendar, compile_calendar
+
+SATURDAY = date(2026, 10, 17)
+MONDAY = date(2026, 10, 19)
+UNITS_PER_DAY = 800
+
+CALENDARS = {
+    'default week from a Monday': WorkCalendar(MONDAY),
+    'default week from a Saturday': WorkCalendar(SATURDAY),
+    'holidays and a Saturday shift': WorkCalendar(
+        MONDAY, {0: time(7), 1: time(7, 30), 2: time(7), 3: time(7), 4: time(7), 5: time(8)},
+        holidays=[date(2026, 10, 21), date(2026, 10, 26), date(2026, 12, 25)]),
+}
+
+
+def brute_force_working_dates(calendar, count):
+    """The start date, then the next count - 1 working dates after it."""
+    dates = [calendar.start_date]
+    day = calendar.start_date
+    while len(dates) < count:
+        day += timedelta(days=1)
+        if day.weekday() in calendar.work_week and day not in calendar.holidays:
+            dates.append(day)
+    return dates
+
+
+@pytest.mark.parametrize('name', CALENDARS)
+def test_units_round_trip(name):
+    calendar = CALENDARS[name]
+    for unit in range(0, 60 * UNITS_PER_DAY, 37):
+        dt = calendar.to_datetime(unit)
+        assert calendar.to_units(dt) == unit
+        if unit >= UNITS_PER_DAY:
+            assert calendar.is_working_date(dt.date())
+        assert calendar.day_start(dt.date()) <= dt < calendar.day_end(dt.date())
+
+
+@pytest.mark.parametrize('name', CALENDARS)
+def test_working_days_match_brute_force(name):
+    calendar = CALENDARS[name]
+    # Far enough that the index has to grow past its initial size
+    count = INITIAL_CALENDAR_DAYS * 2
+    for index, day in enumerate(brute_force_working_dates(calendar, count)):
+        assert calendar.to_datetime(index * UNITS_PER_DAY) == calendar.day_start(day)
+
+
+def test_weekends_are_skipped():
+    calendar = CALENDARS['default week from a Monday']
+    assert calendar.to_datetime(4 * UNITS_PER_DAY + 400) == datetime(2026, 10, 23, 13)  # Friday
+    assert calendar.to_datetime(5 * UNITS_PER_DAY) == datetime(2026, 10, 26, 9)  # Monday
+    assert calendar.to_units(datetime(2026, 10, 24, 12)) == 5 * UNITS_PER_DAY  # Saturday snaps forward
+
+
+def test_saturday_start_is_working_day_zero():
+    calendar = CALENDARS['default week from a Saturday']
+    assert calendar.to_datetime(0) == datetime(2026, 10, 17, 9)
+    assert calendar.to_datetime(UNITS_PER_DAY) == datetime(2026, 10, 19, 9)
+    assert calendar.to_units(datetime(2026, 10, 18, 12)) == UNITS_PER_DAY  # Sunday snaps to Monday
+
+
+def test_holidays_and_day_starts():
+    calendar = CALENDARS['holidays and a Saturday shift']
+    # Mon 19, Tue 20, Thu 22 (Wed 21 is a holiday), Fri 23, Sat 24, Tue 27 (Mon 26 is a holiday)
+    assert calendar.to_datetime(UNITS_PER_DAY) == datetime(2026, 10, 20, 7, 30)
+    assert calendar.to_datetime(2 * UNITS_PER_DAY) == datetime(2026, 10, 22, 7)
+    assert calendar.to_datetime(4 * UNITS_PER_DAY + 50) == datetime(2026, 10, 24, 8, 30)
+    assert calendar.to_datetime(5 * UNITS_PER_DAY) == datetime(2026, 10, 27, 7, 30)
+    assert calendar.to_units(datetime(2026, 10, 21, 10)) == 2 * UNITS_PER_DAY
+
+
+def test_times_outside_working_hours_are_clamped():
+    calendar = CALENDARS['default week from a Monday']
+    assert calendar.to_units(datetime(2026, 10, 20, 6)) == UNITS_PER_DAY
+    assert calendar.to_units(datetime(2026, 10, 20, 19)) == 2 * UNITS_PER_DAY
+    assert calendar.to_units(datetime(2026, 10, 1, 12)) == 0  # Before the start date
+
+
+def test_next_working_time():
+    calendar = CALENDARS['holidays and a Saturday shift']
+    assert calendar.next_working_time(datetime(2026, 10, 20, 10)) == datetime(2026, 10, 20, 10)
+    assert calendar.next_working_time(datetime(2026, 10, 20, 16)) == datetime(2026, 10, 22, 7)
+    assert calendar.next_working_time(datetime(2026, 10, 25, 3)) == datetime(2026, 10, 27, 7, 30)
+
+
+def test_compile_calendar_rows():
+    calendar = compile_calendar(MONDAY, [
+        (1, time(13), time(17), True),   # Monday afternoon shift
+        (1, time(8), time(12), True),    # and morning shift: the day starts at 8
+        (2, time(7), time(15), True),
+        (3, time(9), time(17), False),   # Wednesday is not worked
+        (0, time(10), time(18), True),   # Sunday
+    ], holidays=[date(2026, 10, 20)])
+
+    assert calendar.work_week == {0: time(8), 1: time(7), 6: time(10)}
+    assert calendar.to_datetime(0) == datetime(2026, 10, 19, 8)
+    assert calendar.to_datetime(UNITS_PER_DAY) == datetime(2026, 10, 25, 10)  # Tuesday is a holiday
+    assert calendar.to_datetime(2 * UNITS_PER_DAY) == datetime(2026, 10, 26, 8)
+
+
+def test_compile_calendar_warns_about_day_length(caplog):
+    with caplog.at_level(logging.WARNING, logger='calendars'):
+        compile_calendar(MONDAY, [(1, time(8), time(12), True), (1, time(13), time(17), True),
+                                  (2, time(8), time(14), True)], name='test')
+    warnings = [record.getMessage() for record in caplog.records]
+    assert len(warnings) == 1
+    assert 'weekday 1 last 6.00 hours' in warnings[0]
+
+
+def test_compile_calendar_without_working_rows_uses_the_default_week():
+    assert compile_calendar(MONDAY).key() == WorkCalendar(MONDAY).key()
+    assert compile_calendar(MONDAY, [(1, time(9), time(17), False)]).key() == WorkCalendar(MONDAY).key()
+
+
+def test_registry_caches_and_invalidates():
+    registry = CalendarRegistry()
+    calls = []
+
+    def load_rules(project_id):
+        calls.append(project_id)
+        return {'working_hours': [(1, time(7), time(15), True)]}
+
+    first = registry.get('source', 1, MONDAY, load_rules)
+    assert registry.get('source', 1, MONDAY, load_rules) is first
+    assert calls == [1]
+
+    registry.get('source', 2, MONDAY, load_rules)
+    registry.invalidate(1)
+    assert registry.get('source', 1, MONDAY, load_rules) is not first
+    registry.get('source', 2, MONDAY, load_rules)
+    assert calls == [1, 2, 1]
+
+    registry.invalidate()
+    registry.get('source', 2, MONDAY, load_rules)
+    assert calls == [1, 2, 1, 2]
+
+
+def test_registry_does_not_cache_the_fallback():
+    registry = CalendarRegistry()
+    failures = [RuntimeError('database is down')]
+
+    def load_rules(project_id):
+        if failures:
+            raise failures.pop()
+        return {'working_hours': [(1, time(7), time(15), True)]}
+
+    fallback = registry.get('source', 1, MONDAY, load_rules)
+    assert fallback.key() == WorkCalendar(MONDAY).key()
+    compiled = registry.get('source', 1, MONDAY, load_rules)
+    assert compiled.work_week == {0: time(7)}
+    assert registry.get('source', 1, MONDAY, load_rules) is compiled
+
+
+def test_registry_evicts_the_least_recently_used():
+    registry = CalendarRegistry(max_size=2)
+    calls = []
+
+    def load_rules(project_id):
+        calls.append(project_id)
+        return None
+
+    for project_id in (1, 2, 1, 3, 1, 2):
+        registry.get('source', project_id, MONDAY, load_rules)
+    assert calls == [1, 2, 3, 2]
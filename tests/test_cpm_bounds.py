@@ -0,0 +1,90 @@
+"""
+Critical path bounds from compute_cpm_bounds, on the default week from a
+Monday. Whole-day lags move by whole working days (800 units per day).
+"""
+from datetime import date
+
+import pytest
+
+from calendars import WorkCalendar
+from initial_scheduler import LagCalendar, compute_cpm_bounds
+
+ACTIVE = 'activeConstruction'
+
+
+@pytest.fixture
+def lags():
+    return LagCalendar(WorkCalendar(date(2026, 10, 19)))
+
+
+def task(task_id, duration, dependencies=(), phase=ACTIVE):
+    return {'task_id': task_id, 'duration': duration, 'phase': phase, 'dependencies': list(dependencies)}
+
+
+def chain():
+    return [task(1, 100), task(2, 200, [(1, 0, 'FS')]), task(3, 50, [(2, 24, 'FS')]), task(4, 100)]
+
+
+def test_chain_with_whole_day_lag(lags):
+    result = compute_cpm_bounds(chain(), lags=lags)
+    bounds = result['bounds']
+
+    assert result['length'] == 100 + 200 + 800 + 50
+    assert [bounds[tid]['earliest_start'] for tid in (1, 2, 3, 4)] == [0, 100, 1100, 0]
+    assert [bounds[tid]['latest_finish'] for tid in (1, 2, 3, 4)] == [100, 300, 1150, 1150]
+    assert bounds[4]['total_float'] == 1050
+    assert result['critical'] == [1, 2, 3]
+    assert result['infeasible'] == []
+
+
+def test_horizon_adds_float_and_flags_late_tasks(lags):
+    relaxed = compute_cpm_bounds(chain(), horizon=2000, lags=lags)
+    assert relaxed['bounds'][1]['total_float'] == 2000 - 1150
+    assert relaxed['bounds'][3]['latest_finish'] == 2000
+
+    tight = compute_cpm_bounds(chain(), horizon=1000, lags=lags)
+    assert 3 in tight['infeasible']
+    assert 4 not in tight['infeasible']
+
+
+def test_dependency_types(lags):
+    tasks = [task(1, 200), task(2, 100, [(1, 0, 'SS')]), task(3, 50, [(1, 0, 'FF')]),
+             task(4, 50, [(1, 0, 'SF')]), task(5, 100, [(1, 24, 'SS')])]
+    bounds = compute_cpm_bounds(tasks, lags=lags)['bounds']
+
+    assert bounds[2]['earliest_start'] == 0
+    assert bounds[3]['earliest_finish'] == 200
+    assert bounds[4]['earliest_start'] == 0  # Start minus duration is before unit 0
+    assert bounds[5]['earliest_start'] == 800
+
+
+def test_fractional_lag_follows_the_calendar(lags):
+    tasks = [task(1, 700), task(2, 100, [(1, 4, 'FS')])]
+    bounds = compute_cpm_bounds(tasks, lags=lags)['bounds']
+    # Ends 1 hour before the end of day 0; 4 calendar hours later it is evening, so day 1 begins it
+    assert bounds[2]['earliest_start'] == lags.after(700, 4) == 800
+
+
+def test_phases_run_in_order(lags):
+    tasks = [task(1, 100, phase=ACTIVE), task(2, 300, phase='preConstruction'), task(3, 50, phase='sales')]
+    result = compute_cpm_bounds(tasks, lags=lags)
+    bounds = result['bounds']
+
+    assert bounds[3]['earliest_start'] == 0
+    assert bounds[2]['earliest_start'] == 50
+    assert bounds[1]['earliest_start'] == 350
+    assert result['length'] == 450
+    assert bounds[3]['latest_finish'] == 50
+
+
+def test_min_starts(lags):
+    bounds = compute_cpm_bounds(chain(), min_starts={1: 500}, lags=lags)['bounds']
+    assert bounds[1]['earliest_start'] == 500
+    assert bounds[2]['earliest_start'] == 600
+
+
+def test_positive_lag_cycle_is_infeasible(lags):
+    tasks = [task(1, 100, [(2, 24, 'FS')]), task(2, 100, [(1, 24, 'FS')]), task(3, 100)]
+    result = compute_cpm_bounds(tasks, horizon=48000, lags=lags)
+    assert set(result['infeasible']) >= {1, 2}
+    assert 3 not in result['infeasible']
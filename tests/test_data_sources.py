@@ -0,0 +1,115 @@
+"""
+SnapshotDataSource JSON round trip, and a cp_sat_scheduler run on it without a database.
+"""
+import json
+from datetime import date, datetime, time
+
+import pytest
+
+import solver_profiles
+from data_sources import SnapshotDataSource
+from initial_scheduler import PROJECT_START_DATE, cp_sat_scheduler
+from solver_profiles import SolveHistory
+
+# Tenant week of Monday to Friday, 7 AM to 3 PM
+TENANT_HOURS = [(day, time(7), time(15), True) for day in range(1, 6)] + [(6, time(7), time(12), False)]
+
+
+def task(task_id, project_id, duration=400, dependencies=(), phase='activeConstruction', employees=None,
+         resources=None):
+    return {'task_id': task_id, 'name': f'Task {task_id}', 'project_id': project_id, 'duration': duration,
+            'phase': phase, 'priority': 2, 'dependencies': list(dependencies),
+            'employees': employees or {}, 'resources': resources or {}}
+
+
+def snapshot():
+    return {
+        'tasks': [task(1, 1, phase='preConstruction', employees={'foreman': 1}),
+                  task(2, 1, dependencies=[(1, 0, 'FS')], employees={'labour': 1}, resources={'Truck': 1}),
+                  task(3, 1, dependencies=[(1, 2.5, 'SS'), (2, 0, 'FF')], employees={'labour': 1}),
+                  task(4, 2, employees={'labour': 1}, resources={'Truck': 1})],
+        'resources': [{'resource_id': 1, 'name': 'Truck 1', 'type': 'Truck', 'availability': True}],
+        'employees': [{'employee_id': 1, 'name': 'Foreman 1', 'skill_set': 'foreman'},
+                      {'employee_id': 2, 'name': 'Labour 1', 'skill_set': 'labour'}]
+    }
+
+
+def source(calendars=None):
+    return SnapshotDataSource(
+        snapshot(),
+        schedules={1: {'start': datetime(2026, 10, 19, 7), 'end': datetime(2026, 10, 19, 11), 'status': 'Completed'},
+                   4: {'start': datetime(2026, 10, 20, 9), 'end': datetime(2026, 10, 20, 13), 'status': 'Scheduled'}},
+        resource_assignments=[(4, 1)],
+        employee_assignments=[(1, 1), (4, 2)],
+        calendars=calendars)
+
+
+@pytest.fixture(autouse=True)
+def history(tmp_path, monkeypatch):
+    """Keep the test solves out of the shared solve history."""
+    monkeypatch.setattr(solver_profiles, '_solve_history', SolveHistory(str(tmp_path / 'history.jsonl')))
+
+
+def test_json_round_trip_keeps_everything(tmp_path):
+    original = source({None: {'working_hours': TENANT_HOURS, 'holidays': [date(2026, 12, 25)]},
+                       2: {'working_hours': TENANT_HOURS[:3], 'holidays': []}})
+    path = str(tmp_path / 'snapshot.json')
+    original.to_json(path)
+    loaded = SnapshotDataSource.from_json(path)
+
+    assert loaded.tasks == original.tasks
+    assert loaded.tasks[3]['dependencies'] == [(1, 2.5, 'SS'), (2, 0, 'FF')]
+    assert loaded.resources == original.resources
+    assert loaded.employees == original.employees
+    assert loaded.schedules == original.schedules
+    assert loaded.resource_assignments == [(4, 1)]
+    assert loaded.employee_assignments == [(1, 1), (4, 2)]
+    assert loaded.calendars == original.calendars
+    assert loaded.calendar_key() == original.calendar_key()
+
+
+def test_json_file_layout(tmp_path):
+    path = str(tmp_path / 'snapshot.json')
+    source({None: {'working_hours': TENANT_HOURS, 'holidays': []}, 2: {'working_hours': [], 'holidays': []}}
+           ).to_json(path)
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+
+    assert data['tasks'][2]['dependencies'] == [[1, 2.5, 'SS'], [2, 0, 'FF']]
+    assert sorted(data['schedules']) == ['1', '4']
+    assert data['schedules']['4'] == {'start': '2026-10-20T09:00:00', 'end': '2026-10-20T13:00:00',
+                                      'status': 'Scheduled'}
+    assert sorted(data['calendars']) == ['2', 'tenant']
+    assert data['calendars']['tenant']['working_hours'][0] == [1, '07:00:00', '15:00:00', True]
+
+
+def test_bare_snapshot_loads_without_schedules(tmp_path):
+    path = str(tmp_path / 'snapshot.json')
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(snapshot(), f)
+    loaded = SnapshotDataSource.from_json(path)
+
+    assert sorted(loaded.tasks) == [1, 2, 3, 4]
+    assert loaded.schedules == {}
+    assert loaded.resource_assignments == []
+    assert loaded.calendars == {}
+
+
+def test_scheduler_runs_on_a_snapshot(tmp_path):
+    data_source = SnapshotDataSource(snapshot(), calendars={None: {'working_hours': TENANT_HOURS, 'holidays': []}})
+    result = cp_sat_scheduler(data_source=data_source, use_model_cache=False, warm_start=False)
+
+    assert result['status'] in ('OPTIMAL', 'FEASIBLE')
+    assert sorted(data_source.schedules) == [1, 2, 3, 4]
+    for entry in data_source.schedules.values():
+        # Working day 0 is the start date, even on a weekend
+        assert entry['start'].date() == PROJECT_START_DATE or entry['start'].weekday() < 5
+        assert time(7) <= entry['start'].time() < time(15)
+    assert data_source.schedules[2]['start'] >= data_source.schedules[1]['end']
+    # The one truck and the one labourer serve tasks 2 and 4
+    assert sorted(data_source.resource_assignments) == [(2, 1), (4, 1)]
+    assert sorted(pair for pair in data_source.employee_assignments if pair[1] == 2) == [(2, 2), (3, 2), (4, 2)]
+
+    path = str(tmp_path / 'solved.json')
+    data_source.to_json(path)
+    assert SnapshotDataSource.from_json(path).schedules == data_source.schedules
@@ -0,0 +1,93 @@
+"""
+Partitioning with find_subproblems and pool splitting with reserve_capacity.
+"""
+import pytest
+
+from decomposition import find_subproblems, reserve_capacity
+
+
+def task(task_id, project_id, duration=100, dependencies=(), employees=None, resources=None):
+    return {'task_id': task_id, 'project_id': project_id, 'duration': duration,
+            'dependencies': list(dependencies), 'employees': employees or {}, 'resources': resources or {}}
+
+
+def welders(count):
+    return [{'employee_id': i, 'skill_set': 'Welder'} for i in range(1, count + 1)]
+
+
+def task_ids(groups):
+    return [sorted(t['task_id'] for t in group) for group in groups]
+
+
+def test_projects_without_links_are_separate_subproblems():
+    tasks = [task(1, 1), task(2, 1, dependencies=[(1, 0, 'FS')]), task(3, 2), task(4, 2), task(5, 2)]
+    assert task_ids(find_subproblems(tasks, 'project')) == [[3, 4, 5], [1, 2]]
+
+
+def test_cross_project_dependency_joins_projects():
+    tasks = [task(1, 1), task(2, 2, dependencies=[(1, 0, 'FS')]), task(3, 3)]
+    assert task_ids(find_subproblems(tasks, 'project')) == [[1, 2], [3]]
+
+
+def test_component_mode_joins_projects_sharing_a_pool():
+    tasks = [task(1, 1, employees={'Welder': 1}), task(2, 2, employees={'welder': 1}),
+             task(3, 3, resources={'Crane': 1})]
+    assert task_ids(find_subproblems(tasks, 'project')) == [[1], [2], [3]]
+    assert task_ids(find_subproblems(tasks, 'component')) == [[1, 2], [3]]
+
+
+def test_unknown_mode_is_rejected():
+    with pytest.raises(ValueError):
+        find_subproblems([task(1, 1)], 'phase')
+
+
+def test_pool_is_split_by_peak_need_then_workload():
+    light = [task(1, 1, duration=100, employees={'Welder': 2})]
+    heavy = [task(2, 2, duration=400, employees={'Welder': 1}), task(3, 2, duration=400, employees={'Welder': 1})]
+    snapshot = {'tasks': light + heavy, 'resources': [], 'employees': welders(5)}
+
+    light_part, heavy_part = reserve_capacity(snapshot, [light, heavy])
+
+    # Peak needs 2 and 1, then the 2 spare welders by workload (200 vs 800)
+    assert len(light_part['employees']) == 2
+    assert len(heavy_part['employees']) == 3
+    light_ids = {e['employee_id'] for e in light_part['employees']}
+    heavy_ids = {e['employee_id'] for e in heavy_part['employees']}
+    assert not light_ids & heavy_ids
+    assert light_ids | heavy_ids == {1, 2, 3, 4, 5}
+
+
+def test_pool_that_cannot_be_split_merges_subproblems():
+    first = [task(1, 1, employees={'Welder': 2})]
+    second = [task(2, 2, employees={'Welder': 2})]
+    other = [task(3, 3, resources={'Crane': 1})]
+    snapshot = {'tasks': first + second + other, 'employees': welders(3),
+                'resources': [{'resource_id': 7, 'type': 'Crane', 'availability': True}]}
+
+    subproblems = reserve_capacity(snapshot, [first, second, other])
+
+    assert sorted(task_ids(s['tasks'] for s in subproblems)) == [[1, 2], [3]]
+    merged = next(s for s in subproblems if len(s['tasks']) == 2)
+    assert len(merged['employees']) == 3
+    crane = next(s for s in subproblems if len(s['tasks']) == 1)
+    assert [r['resource_id'] for r in crane['resources']] == [7]
+    assert crane['employees'] == []
+
+
+def test_unavailable_resources_and_oversized_demand():
+    tasks = [task(1, 1, resources={'Crane': 5}), task(2, 2, resources={'Crane': 1})]
+    cranes = [{'resource_id': i, 'type': 'Crane', 'availability': i != 4} for i in range(1, 5)]
+    snapshot = {'tasks': tasks, 'resources': cranes, 'employees': []}
+
+    # Three available cranes: a demand of 5 counts as 3, so the two tasks cannot share them
+    subproblems = reserve_capacity(snapshot, [[tasks[0]], [tasks[1]]])
+    assert len(subproblems) == 1
+    assert sorted(r['resource_id'] for r in subproblems[0]['resources']) == [1, 2, 3]
+
+
+def test_reservations_are_passed_to_every_subproblem():
+    reservations = {'employees': {1: [(0, 800)]}}
+    snapshot = {'tasks': [task(1, 1), task(2, 2)], 'resources': [], 'employees': [],
+                'reservations': reservations}
+    subproblems = reserve_capacity(snapshot, find_subproblems(snapshot['tasks'], 'project'))
+    assert [s['reservations'] for s in subproblems] == [reservations, reservations]
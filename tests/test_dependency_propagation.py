@@ -0,0 +1,88 @@
+"""
+Dependency propagation of ReschedulingManager._reschedule_dependent_tasks on
+an in-memory SnapshotDataSource (default working week, 9 AM to 5 PM).
+"""
+from datetime import datetime
+
+import pytest
+
+from data_sources import SnapshotDataSource
+from rescheduler import ReschedulingManager
+
+
+def at(day, hour):
+    """Datetime in the week of Monday 2026-10-19 (day 0)."""
+    return datetime(2026, 10, 19 + day, hour)
+
+
+# task_id -> (dependencies as (dep_task_id, lag_hours, type), start, end)
+TASKS = {
+    1: ([], at(0, 9), at(0, 11)),
+    2: ([(1, 2, 'FS')], at(0, 13), at(0, 14)),
+    3: ([(2, 1, 'SS')], at(0, 14), at(0, 15)),
+    4: ([(1, 0, 'FF')], at(0, 10), at(0, 12)),
+    5: ([(1, 5, 'SF')], at(0, 9), at(0, 10)),
+    6: ([(1, 0, 'FS')], at(1, 9), at(1, 10)),
+    7: ([(2, 0, 'FS'), (3, 0, 'FS')], at(0, 15), at(0, 16)),
+    8: ([(1, 104, 'FS')], at(0, 9), at(0, 10)),
+    9: ([], at(0, 9), at(0, 10)),
+}
+
+
+@pytest.fixture
+def manager():
+    source = SnapshotDataSource(
+        {'tasks': [{'task_id': tid, 'name': f'Task {tid}', 'project_id': 1, 'dependencies': deps}
+                   for tid, (deps, _, _) in TASKS.items()],
+         'resources': [], 'employees': []},
+        schedules={tid: {'start': start, 'end': end, 'status': 'Scheduled'}
+                   for tid, (_, start, end) in TASKS.items()})
+    return ReschedulingManager(source)
+
+
+def test_each_dependency_type_moves_its_successor(manager):
+    moved = manager._reschedule_dependent_tasks(1, at(0, 11), at(0, 13))
+    new_times = {entry['task_id']: (entry['new_start'], entry['new_end']) for entry in moved}
+
+    assert new_times == {
+        2: (at(0, 15), at(0, 16)),  # FS: new end 13:00 + 2h
+        3: (at(0, 16), at(0, 17)),  # SS: task 2's new start + 1h
+        4: (at(0, 11), at(0, 13)),  # FF: finishes at task 1's new end
+        5: (at(0, 13), at(0, 14)),  # SF: task 1's start + 5h, minus its 1h duration
+        7: (at(1, 9), at(1, 10)),   # FS after 2 and 3; 17:00 snaps to Tuesday 9 AM
+        8: (at(7, 9), at(7, 10)),   # FS + 104h lands Friday 21:00; snaps past the weekend
+    }
+    # Task 6 already starts after the bound and task 9 does not depend on task 1
+    order = [entry['task_id'] for entry in moved]
+    assert order.index(2) < order.index(3) < order.index(7)
+
+
+def test_changes_are_written_and_logged(manager):
+    moved = manager._reschedule_dependent_tasks(1, at(0, 11), at(0, 13))
+    source = manager.db
+
+    assert source.schedules[3]['start'] == at(0, 16)
+    assert source.schedules[6]['start'] == at(1, 9)
+    assert [change['task_id'] for change in source.change_log] == [entry['task_id'] for entry in moved]
+    assert all(change['change_type'] == 'Dependency' for change in source.change_log)
+    binding = {change['task_id']: change['reason'] for change in source.change_log}
+    assert binding[7] == "Rescheduled due to change in dependency Task 3"
+
+
+def test_finishing_earlier_moves_nothing(manager):
+    assert manager._reschedule_dependent_tasks(1, at(0, 11), at(0, 10)) == []
+    assert manager.db.change_log == []
+
+
+def test_dependent_tasks_are_transitive(manager):
+    assert sorted(manager._get_dependent_tasks(1)) == [2, 3, 4, 5, 6, 7, 8]
+    assert sorted(manager._get_dependent_tasks(2)) == [3, 7]
+    assert manager._get_dependent_tasks(9) == []
+
+
+def test_a_task_on_a_cycle_is_not_its_own_dependent():
+    source = SnapshotDataSource(
+        {'tasks': [{'task_id': 1, 'name': 'A', 'dependencies': [(2, 0, 'FS')]},
+                   {'task_id': 2, 'name': 'B', 'dependencies': [(1, 0, 'FS')]}],
+         'resources': [], 'employees': []})
+    assert ReschedulingManager(source)._get_dependent_tasks(1) == [2]
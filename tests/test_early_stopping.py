@@ -0,0 +1,109 @@
+"""
+How EarlyStoppingCallback settles the stop reason and status name once Solve
+has returned.
+"""
+import pytest
+from ortools.sat.python import cp_model
+
+from early_stopping import EarlyStoppingCallback
+
+
+class SolvedSolver:
+    """The CpSolver accessors finish and status_name read after a solve."""
+
+    def __init__(self, objective, bound):
+        self.objective = objective
+        self.bound = bound
+
+    def ObjectiveValue(self):
+        return self.objective
+
+    def BestObjectiveBound(self):
+        return self.bound
+
+    def StatusName(self, status):
+        return cp_model.CpSolver().StatusName(status)
+
+
+def solve(model, callback):
+    solver = cp_model.CpSolver()
+    solver.parameters.num_search_workers = 1
+    callback.configure(solver)
+    status = solver.Solve(model, callback)
+    return solver, status
+
+
+def test_optimal_solve():
+    model = cp_model.CpModel()
+    x = model.NewIntVar(3, 10, 'x')
+    model.Minimize(x)
+    callback = EarlyStoppingCallback()
+    solver, status = solve(model, callback)
+
+    assert callback.finish(solver, status) == 'optimal'
+    assert callback.status_name(solver, status) == 'OPTIMAL'
+    assert callback.solution_count >= 1
+    assert callback.best_objective == 3
+
+
+def test_infeasible_solve():
+    model = cp_model.CpModel()
+    x = model.NewIntVar(0, 10, 'x')
+    model.Add(x >= 5)
+    model.Add(x <= 3)
+    model.Minimize(x)
+    callback = EarlyStoppingCallback()
+    solver, status = solve(model, callback)
+
+    assert callback.finish(solver, status) == 'infeasible'
+    assert callback.status_name(solver, status) == 'INFEASIBLE'
+
+
+def test_gap_limit_reported_as_feasible():
+    callback = EarlyStoppingCallback({'relative_gap': 0.01})
+    solver = SolvedSolver(objective=1000, bound=995)
+
+    assert callback.finish(solver, cp_model.OPTIMAL) == 'relative_gap'
+    assert callback.status_name(solver, cp_model.OPTIMAL) == 'FEASIBLE'
+
+
+def test_closed_gap_is_optimal_even_with_a_gap_criterion():
+    callback = EarlyStoppingCallback({'relative_gap': 0.01})
+    solver = SolvedSolver(objective=1000, bound=1000)
+
+    assert callback.finish(solver, cp_model.OPTIMAL) == 'optimal'
+    assert callback.status_name(solver, cp_model.OPTIMAL) == 'OPTIMAL'
+
+
+def test_earlier_stop_reason_is_kept():
+    callback = EarlyStoppingCallback({'stagnation_seconds': 5})
+    callback.stop_reason = 'stagnation_seconds'  # As set by stop() during the search
+    solver = SolvedSolver(objective=1000, bound=900)
+
+    assert callback.finish(solver, cp_model.FEASIBLE) == 'stagnation_seconds'
+    assert callback.status_name(solver, cp_model.FEASIBLE) == 'FEASIBLE'
+
+
+def test_optimal_overrides_an_earlier_stop_reason():
+    callback = EarlyStoppingCallback({'target_makespan': 2000})
+    callback.stop_reason = 'target_makespan'
+    assert callback.finish(SolvedSolver(objective=1000, bound=1000), cp_model.OPTIMAL) == 'optimal'
+
+
+@pytest.mark.parametrize('status, reason', [(cp_model.FEASIBLE, 'time_limit'), (cp_model.UNKNOWN, 'time_limit'),
+                                            (cp_model.MODEL_INVALID, 'model_invalid')])
+def test_search_that_ran_out(status, reason):
+    callback = EarlyStoppingCallback()
+    assert callback.finish(SolvedSolver(objective=0, bound=0), status) == reason
+
+
+def test_criteria():
+    callback = EarlyStoppingCallback({'relative_gap': 0.05, 'stagnation_seconds': None})
+    assert callback.criteria == {'relative_gap': 0.05}
+
+    solver = cp_model.CpSolver()
+    callback.configure(solver)
+    assert solver.parameters.relative_gap_limit == pytest.approx(0.05)
+
+    with pytest.raises(ValueError):
+        EarlyStoppingCallback({'max_solutions': 3})
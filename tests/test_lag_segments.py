@@ -0,0 +1,73 @@
+"""
+build_lag_offset_segments and LagCalendar against a brute-force walk of the
+calendar: convert to a datetime, add the lag, snap to the next working time
+and convert back.
+"""
+from datetime import date, time, timedelta
+
+import pytest
+
+from calendars import WorkCalendar
+from initial_scheduler import LagCalendar, build_lag_offset_segments
+
+SATURDAY = date(2026, 10, 17)
+MONDAY = date(2026, 10, 19)
+HORIZON = 20 * 800
+
+CALENDARS = {
+    'default week from a Monday': WorkCalendar(MONDAY),
+    'default week from a Saturday': WorkCalendar(SATURDAY),
+    'early starts and holidays': WorkCalendar(
+        MONDAY, {0: time(7), 1: time(7, 30), 2: time(7), 3: time(7), 5: time(8)},
+        holidays=[date(2026, 10, 21), date(2026, 10, 26)]),
+}
+LAGS = [1, 2.5, 7.75, 12, 30, 60]
+
+
+def brute_force_after(calendar, unit, lag_hours):
+    landing = calendar.to_datetime(unit) + timedelta(hours=lag_hours)
+    return calendar.to_units(calendar.next_working_time(landing))
+
+
+@pytest.mark.parametrize('lag_hours', LAGS)
+@pytest.mark.parametrize('name', CALENDARS)
+def test_segments_match_brute_force(name, lag_hours):
+    calendar = CALENDARS[name]
+    seg_starts, seg_ends, seg_shifts, seg_floors = build_lag_offset_segments(lag_hours, HORIZON, calendar)
+
+    assert seg_starts[0] == 0
+    assert seg_ends[-1] >= HORIZON
+    assert all(seg_starts[i + 1] == seg_ends[i] + 1 for i in range(len(seg_starts) - 1))
+    for i, (start, end) in enumerate(zip(seg_starts, seg_ends)):
+        for unit in range(start, min(end, HORIZON) + 1):
+            expected = brute_force_after(calendar, unit, lag_hours)
+            assert max(unit + seg_shifts[i], seg_floors[i]) == expected, (unit, lag_hours)
+
+
+@pytest.mark.parametrize('lag_hours', LAGS)
+def test_lag_calendar_after_and_before(lag_hours):
+    calendar = CALENDARS['early starts and holidays']
+    lags = LagCalendar(calendar)
+    for unit in range(0, HORIZON, 37):
+        assert lags.after(unit, lag_hours) == brute_force_after(calendar, unit, lag_hours)
+
+    for unit in range(0, HORIZON, 113):
+        latest = lags.before(unit, lag_hours)
+        if latest >= 0:
+            assert lags.after(latest, lag_hours) <= unit
+        assert lags.after(latest + 1, lag_hours) > unit
+
+
+def test_lag_calendar_extends_past_its_table():
+    calendar = CALENDARS['default week from a Monday']
+    lags = LagCalendar(calendar)
+    lags.after(0, 5)
+    covered, _ = lags.tables[5]
+    beyond = covered + 1234
+    assert lags.after(beyond, 5) == brute_force_after(calendar, beyond, 5)
+
+
+def test_whole_day_lags_shift_by_working_days():
+    lags = LagCalendar(CALENDARS['default week from a Monday'])
+    assert lags.after(350, 48) == 350 + 2 * 800
+    assert lags.before(350 + 2 * 800, 48) == 350
@@ -0,0 +1,85 @@
+"""
+Reusing cached models with ModelCache, and what the problem fingerprint covers.
+"""
+from datetime import date
+
+import pytest
+from ortools.sat.python import cp_model
+
+from calendars import WorkCalendar
+from initial_scheduler import (
+    ConstructionScheduler, RESOURCE_MODE_AGGREGATE, RESOURCE_MODE_INDIVIDUAL, SCALE_FACTOR, WORK_HOURS_PER_DAY
+)
+from model_cache import ModelCache
+
+MONDAY = date(2026, 10, 19)
+
+
+def calendar(holidays=()):
+    return WorkCalendar(MONDAY, holidays=holidays, hours_per_day=WORK_HOURS_PER_DAY, units_per_hour=SCALE_FACTOR)
+
+
+def task(task_id, duration=400, dependencies=(), phase='activeConstruction', employees=None, resources=None):
+    return {'task_id': task_id, 'name': f'Task {task_id}', 'project_id': 1, 'duration': duration,
+            'phase': phase, 'priority': 2, 'dependencies': list(dependencies),
+            'employees': employees or {}, 'resources': resources or {}}
+
+
+def snapshot(reservations=None):
+    tasks = [task(1, phase='preConstruction', employees={'foreman': 1}),
+             task(2, employees={'labour': 2}, resources={'Truck': 1}, dependencies=[(1, 0, 'FS')]),
+             task(3, employees={'labour': 1}, resources={'Truck': 1}, dependencies=[(1, 4, 'SS')]),
+             task(4, duration=800, employees={'labour': 1, 'foreman': 1}, dependencies=[(2, 0, 'FS')])]
+    result = {'tasks': tasks,
+              'resources': [{'resource_id': 1, 'name': 'Truck 1', 'type': 'Truck', 'availability': True}],
+              'employees': [{'employee_id': 1, 'name': 'Foreman 1', 'skill_set': 'foreman'},
+                            {'employee_id': 2, 'name': 'Labour 1', 'skill_set': 'labour'},
+                            {'employee_id': 3, 'name': 'Labour 2', 'skill_set': 'labour'}]}
+    if reservations is not None:
+        result['reservations'] = reservations
+    return result
+
+
+def build(problem, cache=None, resource_mode=RESOURCE_MODE_INDIVIDUAL, work_calendar=None):
+    return ConstructionScheduler(problem['tasks'], None, resource_mode=resource_mode, snapshot=problem,
+                                 model_cache=cache, calendar=work_calendar or calendar())
+
+
+def solve(scheduler):
+    solver = cp_model.CpSolver()
+    solver.parameters.num_search_workers = 1
+    solver.parameters.random_seed = 42
+    solver.parameters.max_time_in_seconds = 10
+    assert solver.Solve(scheduler.model) == cp_model.OPTIMAL
+    return solver.Value(scheduler.makespan), scheduler.extract_solution(solver)
+
+
+@pytest.mark.parametrize('resource_mode', [RESOURCE_MODE_INDIVIDUAL, RESOURCE_MODE_AGGREGATE])
+def test_second_build_loads_the_cached_model(tmp_path, resource_mode):
+    cache = ModelCache(str(tmp_path))
+    built = build(snapshot(), cache, resource_mode)
+    cached = build(snapshot(), cache, resource_mode)
+
+    assert not built.model_from_cache
+    assert cached.model_from_cache
+    assert cached.model_fingerprint == built.model_fingerprint
+    assert solve(cached) == solve(built)
+
+
+def test_fingerprint_covers_calendar_and_reservations():
+    fingerprint = build(snapshot())._problem_fingerprint()
+
+    assert build(snapshot())._problem_fingerprint() == fingerprint
+    assert build(snapshot(), work_calendar=calendar([date(2026, 10, 20)]))._problem_fingerprint() != fingerprint
+    reserved = snapshot({'resources': [[1, 0, 400]], 'employees': []})
+    assert build(reserved)._problem_fingerprint() != fingerprint
+    moved = snapshot({'resources': [[1, 400, 800]], 'employees': []})
+    assert build(moved)._problem_fingerprint() != build(reserved)._problem_fingerprint()
+
+
+def test_changed_problem_misses_the_cache(tmp_path):
+    cache = ModelCache(str(tmp_path))
+    build(snapshot(), cache)
+    assert not build(snapshot({'resources': [], 'employees': [[2, 0, 800]]}), cache).model_from_cache
+    assert not build(snapshot(), cache, work_calendar=calendar([date(2026, 10, 20)])).model_from_cache
+    assert build(snapshot(), cache).model_from_cache
@@ -0,0 +1,145 @@
+"""
+Window selection and window-by-window solving of the rolling horizon, on
+in-memory snapshots with the default working week from Monday 2026-10-19.
+"""
+from datetime import date
+
+import pytest
+
+import solver_profiles
+from calendars import WorkCalendar
+from initial_scheduler import UNITS_PER_DAY, LagCalendar, phase_rank, phase_topological_order
+from rolling_horizon import _select_window, solve_rolling_horizon
+from solver_profiles import SolveHistory
+
+CALENDAR = WorkCalendar(date(2026, 10, 19))
+DAY = UNITS_PER_DAY
+
+
+def task(task_id, duration=DAY, dependencies=(), phase='activeConstruction', employees=None):
+    return {'task_id': task_id, 'name': f'Task {task_id}', 'project_id': 1, 'duration': duration,
+            'phase': phase, 'priority': 2, 'dependencies': list(dependencies),
+            'employees': employees or {}, 'resources': {}}
+
+
+def chain(count, phase='activeConstruction', first_id=1):
+    return [task(tid, dependencies=[(tid - 1, 0, 'FS')] if tid > first_id else [], phase=phase)
+            for tid in range(first_id, first_id + count)]
+
+
+def snapshot(tasks, employees=()):
+    return {'tasks': tasks, 'resources': [],
+            'employees': [{'employee_id': i, 'name': f'{group} {i}', 'skill_set': group}
+                          for i, group in enumerate(employees, start=1)]}
+
+
+def select(tasks, frozen, window_start, window_end):
+    by_id = {t['task_id']: t for t in tasks}
+    return _select_window(phase_topological_order(by_id), by_id, frozen, window_start, window_end,
+                          LagCalendar(CALENDAR))
+
+
+def solve(tasks, window_days, overlap_days, employees=()):
+    return solve_rolling_horizon(snapshot(tasks, employees), window_days, overlap_days, calendar=CALENDAR)
+
+
+@pytest.fixture(autouse=True)
+def history(tmp_path, monkeypatch):
+    """Keep the test solves out of the shared solve history."""
+    monkeypatch.setattr(solver_profiles, '_solve_history', SolveHistory(str(tmp_path / 'history.jsonl')))
+
+
+def test_window_takes_tasks_estimated_to_start_before_its_end():
+    window, min_starts, earliest = select(chain(5), {}, 0, 2 * DAY)
+    assert window == [1, 2]
+    assert min_starts == {1: 0, 2: 0}
+    assert earliest == 0
+
+
+def test_frozen_predecessor_bounds_the_start_with_the_lag_calendar():
+    tasks = chain(3)
+    tasks[1]['dependencies'] = [(1, 24, 'FS')]
+    window, min_starts, _ = select(tasks, {1: (0, DAY)}, DAY, 4 * DAY)
+    assert window == [2, 3]
+    assert min_starts[2] == LagCalendar(CALENDAR).after(DAY, 24)
+    assert min_starts[3] == DAY
+
+
+def test_long_lag_leaves_the_window_empty_and_reports_the_earliest_start():
+    tasks = [task(1), task(2, dependencies=[(1, 240, 'FS')])]
+    window, _, earliest = select(tasks, {1: (0, DAY)}, DAY, 3 * DAY)
+    assert window == []
+    assert earliest == LagCalendar(CALENDAR).after(DAY, 240)
+
+
+def test_later_phases_wait_for_a_blocked_earlier_phase():
+    tasks = chain(4, phase='sales') + [task(5, phase='preConstruction')]
+    window, _, _ = select(tasks, {}, 0, 2 * DAY)
+    assert window == [1, 2]
+
+
+def test_chain_longer_than_a_window_is_scheduled_once_in_order():
+    tasks = chain(8)
+    result = solve(tasks, 3, 1)
+
+    assert result['status'] == 'FEASIBLE'
+    assert len(result['windows']) > 1
+    assert sorted(entry['task_id'] for entry in result['schedule']) == list(range(1, 9))
+    starts = {entry['task_id']: entry['start'] for entry in result['schedule']}
+    for tid in range(2, 9):
+        assert starts[tid] >= starts[tid - 1] + DAY
+    assert result['makespan'] == 8 * DAY
+
+
+def test_tasks_starting_in_the_overlap_are_solved_again():
+    result = solve(chain(8), 3, 1)
+    first = result['windows'][0]
+    # Tasks 1 to 3 start on days 0 to 2; day 2 is the overlap
+    assert first['task_count'] == 3
+    assert first['frozen'] == 2
+    assert result['windows'][1]['start_day'] == 2
+
+
+def test_phases_are_frozen_in_order():
+    tasks = chain(4, phase='sales') + chain(4, phase='preConstruction', first_id=5)
+    result = solve(tasks, 3, 1)
+
+    assert result['status'] == 'FEASIBLE'
+    ranks = {t['task_id']: phase_rank(t) for t in tasks}
+    frozen = []
+    scheduled = [entry['task_id'] for entry in result['schedule']]
+    for window in result['windows']:
+        frozen += scheduled[len(frozen):len(frozen) + window['frozen']]
+        left = [tid for tid in ranks if tid not in frozen]
+        if left:
+            assert max(ranks[tid] for tid in frozen) <= min(ranks[tid] for tid in left)
+
+
+def test_long_lag_jumps_to_the_earliest_start():
+    tasks = [task(1), task(2, dependencies=[(1, 240, 'FS')])]
+    result = solve(tasks, 2, 0)
+
+    assert result['status'] == 'FEASIBLE'
+    # One window per task; the empty windows in between are skipped
+    assert len(result['windows']) == 2
+    starts = {entry['task_id']: entry['start'] for entry in result['schedule']}
+    assert starts[2] >= LagCalendar(CALENDAR).after(starts[1] + DAY, 240)
+
+
+def test_infeasible_window_widens_its_horizon():
+    # Five one-day tasks start on day 0 but share one welder
+    tasks = [task(tid, employees={'Welder': 1}) for tid in range(1, 6)]
+    result = solve(tasks, 1, 0, employees=['Welder'])
+
+    assert result['status'] == 'FEASIBLE'
+    assert result['windows'][0]['horizon'] >= 5 * DAY
+    assert sorted(entry['task_id'] for entry in result['schedule']) == [1, 2, 3, 4, 5]
+    assert result['makespan'] == 5 * DAY
+
+
+def test_dependency_cycle_is_infeasible():
+    tasks = [task(1, dependencies=[(2, 0, 'FS')]), task(2, dependencies=[(1, 0, 'FS')]), task(3)]
+    result = solve(tasks, 3, 1)
+
+    assert result['status'] == 'INFEASIBLE'
+    assert [entry['task_id'] for entry in result['schedule']] == [3]
@@ -0,0 +1,65 @@
+"""
+Time limit prediction from the solve history.
+"""
+import pytest
+
+import solver_profiles
+from solver_profiles import SolveHistory, solver_time_limit
+
+
+def stats(intervals, dependencies=0):
+    return {'intervals': intervals, 'dependencies': dependencies}
+
+
+@pytest.fixture
+def history(tmp_path, monkeypatch):
+    history = SolveHistory(str(tmp_path / 'history.jsonl'))
+    monkeypatch.setattr(solver_profiles, '_solve_history', history)
+    return history
+
+
+def test_models_that_hit_their_limit_get_more_time(history):
+    model = stats(1622)
+    limits = []
+    for _ in range(6):
+        limit = solver_time_limit('interactive', model)
+        limits.append(limit)
+        history.record(model, 'interactive', 1, 'UNKNOWN', limit, stop_reason='time_limit')
+
+    assert all(later == min(earlier * 2.0, 120) for earlier, later in zip(limits, limits[1:]))
+    assert limits[-1] == 120
+
+
+def test_a_solved_model_returns_to_the_fitted_time(history):
+    model = stats(1000)
+    history.record(model, 'interactive', 1, 'UNKNOWN', 30.0, stop_reason='time_limit')
+    assert history.predict(model, 'interactive') >= 30.0
+    for _ in range(2):
+        history.record(model, 'interactive', 1, 'OPTIMAL', 2.0, stop_reason='optimal')
+    assert history.predict(model, 'interactive') == pytest.approx(2.0)
+
+
+def test_limit_hits_only_bound_similar_sizes(history):
+    history.record(stats(5000), 'interactive', 1, 'UNKNOWN', 60.0, stop_reason='time_limit')
+    assert history.predict(stats(50), 'interactive') < 60.0
+
+
+def test_other_profiles_are_ignored(history):
+    for intervals in (100, 200, 400, 800, 1600):
+        history.record(stats(intervals), 'nightly', 1, 'OPTIMAL', 600.0, stop_reason='optimal')
+    assert solver_time_limit('interactive', stats(50)) < 5
+    assert history.predict(stats(50), 'nightly') > 100
+
+
+def test_stagnation_and_timeout_stops_are_not_fitted(history):
+    for intervals in (100, 200, 400, 800, 1600):
+        history.record(stats(intervals), 'interactive', 1, 'FEASIBLE', 60.0, stop_reason='stagnation_seconds')
+        history.record(stats(intervals), 'interactive', 1, 'FEASIBLE', 60.0, stop_reason='solution_timeout')
+    assert history.predict(stats(400), 'interactive') == pytest.approx(
+        solver_profiles.FALLBACK_SECONDS_PER_ITEM * 400)
+
+
+def test_fit_over_timed_solves(history):
+    for intervals in (100, 200, 400, 800, 1600):
+        history.record(stats(intervals), 'interactive', 1, 'OPTIMAL', intervals / 100, stop_reason='optimal')
+    assert history.predict(stats(3200), 'interactive') == pytest.approx(32, rel=0.01)
@@ -0,0 +1,58 @@
+"""
+Concurrent usage profiles and the capacity violations validate_schedule reports.
+"""
+from initial_scheduler import build_usage_profiles, find_capacity_violations, peak_usage_between
+
+
+def task(task_id, employees=None, resources=None):
+    return {'task_id': task_id, 'employees': employees or {}, 'resources': resources or {}}
+
+
+def entry(task_id, start, duration):
+    return {'task_id': task_id, 'start': start, 'duration': duration}
+
+
+def test_back_to_back_tasks_do_not_overlap():
+    tasks = [task(1, resources={'Crane': 1}), task(2, resources={'Crane': 1})]
+    profiles = build_usage_profiles([entry(1, 0, 400), entry(2, 400, 400)], tasks, 'resources')
+
+    assert profiles['Crane'][1] == [1, 1, 0]
+    assert peak_usage_between(profiles['Crane'], 0, 800) == 1
+    assert find_capacity_violations(profiles, {'Crane': 1}) == []
+
+
+def test_peak_usage_only_counts_the_window():
+    tasks = [task(1, employees={'labour': 2}), task(2, employees={'labour': 1})]
+    profile = build_usage_profiles([entry(1, 0, 400), entry(2, 200, 400)], tasks, 'employees')['labour']
+
+    assert peak_usage_between(profile, 0, 200) == 2
+    assert peak_usage_between(profile, 300, 350) == 3
+    assert peak_usage_between(profile, 400, 800) == 1
+    assert peak_usage_between(profile, 600, 800) == 0
+    assert peak_usage_between(None, 0, 800) == 0
+
+
+def test_overlapping_pair_over_capacity_is_reported():
+    tasks = [task(1, resources={'Crane': 1}), task(2, resources={'Crane': 1}), task(3, resources={'Truck': 1})]
+    schedule = [entry(1, 0, 400), entry(2, 200, 400), entry(3, 0, 800)]
+    violations = find_capacity_violations(build_usage_profiles(schedule, tasks, 'resources'),
+                                          {'Crane': 1, 'Truck': 1})
+
+    assert violations == [{'category': 'Crane', 'start': 200, 'end': 400, 'usage': 2, 'available': 1,
+                           'task_ids': {1, 2}}]
+
+
+def test_separate_violations_in_one_category_are_all_reported():
+    tasks = [task(tid, employees={'labour': 1}) for tid in range(1, 6)]
+    schedule = [entry(1, 0, 400), entry(2, 100, 200), entry(3, 500, 100),
+                entry(4, 800, 400), entry(5, 1000, 400)]
+    violations = find_capacity_violations(build_usage_profiles(schedule, tasks, 'employees'), {'labour': 1})
+
+    assert [(v['start'], v['end'], v['task_ids']) for v in violations] == [(100, 300, {1, 2}),
+                                                                            (1000, 1200, {4, 5})]
+
+
+def test_unknown_category_has_no_capacity():
+    tasks = [task(1, resources={'Crane': 1})]
+    violations = find_capacity_violations(build_usage_profiles([entry(1, 0, 400)], tasks, 'resources'), {})
+    assert [(v['category'], v['usage'], v['available']) for v in violations] == [('Crane', 1, 0)]